@@ -0,0 +1,17 @@
+"""add heartbeat_at to rag_ingestions"""
+
+revision = '3c7e9a1d5f20'
+down_revision = 'e4a8c1f09d37'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.add_column('rag_ingestions', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('rag_ingestions', 'heartbeat_at')
@@ -0,0 +1,34 @@
+"""add ingest job columns to rag_ingestions"""
+
+revision = '5d1e7a0c2b44'
+down_revision = '03c032ce2933'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+rag_ingestion_status = sa.Enum(
+    'PENDING', 'RUNNING', 'SUCCEEDED', 'FAILED', 'CANCELLED',
+    name='rag_ingestion_status',
+)
+
+
+def upgrade() -> None:
+    rag_ingestion_status.create(op.get_bind(), checkfirst=True)
+    op.add_column('rag_ingestions', sa.Column('job_id', sa.String(36), nullable=True))
+    op.add_column(
+        'rag_ingestions',
+        sa.Column('status', rag_ingestion_status, nullable=False, server_default='SUCCEEDED'),
+    )
+    op.add_column('rag_ingestions', sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_rag_ingestions_job_id', 'rag_ingestions', ['job_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rag_ingestions_job_id', table_name='rag_ingestions')
+    op.drop_column('rag_ingestions', 'completed_at')
+    op.drop_column('rag_ingestions', 'status')
+    op.drop_column('rag_ingestions', 'job_id')
+    rag_ingestion_status.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,45 @@
+"""add bulk_draft_jobs table"""
+
+revision = '7a2f4c8e1b93'
+down_revision = '3c7e9a1d5f20'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+bulk_draft_job_status = sa.Enum(
+    'PENDING', 'PREPARING', 'SUBMITTED', 'PERSISTING', 'SUCCEEDED', 'FAILED',
+    name='bulk_draft_job_status',
+)
+
+
+def upgrade() -> None:
+    bulk_draft_job_status.create(op.get_bind(), checkfirst=True)
+    op.create_table(
+        'bulk_draft_jobs',
+        sa.Column('id', sa.String(36), primary_key=True),
+        sa.Column('status', bulk_draft_job_status, nullable=False, server_default='PENDING'),
+        sa.Column('request_ids', sa.JSON(), nullable=False),
+        sa.Column('params_json', sa.JSON(), nullable=False),
+        sa.Column('model', sa.String(128), nullable=True),
+        sa.Column('batch_id', sa.String(255), nullable=True),
+        sa.Column('batch_status', sa.String(32), nullable=True),
+        sa.Column('input_path', sa.String(1024), nullable=True),
+        sa.Column('draft_ids', sa.JSON(), nullable=True),
+        sa.Column('errors', sa.JSON(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_by', sa.String(36), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column('submitted_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index('ix_bulk_draft_jobs_status', 'bulk_draft_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bulk_draft_jobs_status', table_name='bulk_draft_jobs')
+    op.drop_table('bulk_draft_jobs')
+    bulk_draft_job_status.drop(op.get_bind(), checkfirst=True)
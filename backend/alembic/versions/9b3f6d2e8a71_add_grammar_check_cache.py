@@ -0,0 +1,27 @@
+"""add grammar_check_cache table"""
+
+revision = '9b3f6d2e8a71'
+down_revision = '5d1e7a0c2b44'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.create_table(
+        'grammar_check_cache',
+        sa.Column('key', sa.String(64), primary_key=True),
+        sa.Column('prompt_version', sa.String(32), nullable=False),
+        sa.Column('target_language', sa.String(32), nullable=False),
+        sa.Column('result_json', sa.JSON(), nullable=False),
+        sa.Column('confidence', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index('ix_grammar_check_cache_prompt_version', 'grammar_check_cache', ['prompt_version'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_grammar_check_cache_prompt_version', table_name='grammar_check_cache')
+    op.drop_table('grammar_check_cache')
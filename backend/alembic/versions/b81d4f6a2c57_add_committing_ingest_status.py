@@ -0,0 +1,18 @@
+"""add committing status to rag_ingestion_status enum"""
+
+revision = 'b81d4f6a2c57'
+down_revision = '7a2f4c8e1b93'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+
+
+def upgrade() -> None:
+    # Jobs move to COMMITTING once they start replacing tables; from then on they can no longer be cancelled.
+    op.execute("ALTER TYPE rag_ingestion_status ADD VALUE 'COMMITTING'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop enum values without recreating the type; leave it in place.
+    pass
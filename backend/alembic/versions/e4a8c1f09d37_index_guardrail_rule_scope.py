@@ -0,0 +1,57 @@
+"""index guardrail rule scope targets and add guardrail_rules_version"""
+
+revision = 'e4a8c1f09d37'
+down_revision = '9b3f6d2e8a71'
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade() -> None:
+    op.add_column('guardrail_rules', sa.Column('feature_key', sa.String(255), nullable=True))
+    op.add_column('guardrail_rules', sa.Column('request_id', sa.String(36), nullable=True))
+    op.create_index('ix_guardrail_rules_scope', 'guardrail_rules', ['scope'])
+    op.create_index('ix_guardrail_rules_feature_key', 'guardrail_rules', ['feature_key'])
+    op.create_index('ix_guardrail_rules_request_id', 'guardrail_rules', ['request_id'])
+
+    # Backfill the scope targets the ORM now copies out of payload_json on every write.
+    bind = op.get_bind()
+    rules = sa.table(
+        'guardrail_rules',
+        sa.column('id', sa.String),
+        sa.column('scope', sa.String),
+        sa.column('payload_json', sa.JSON),
+        sa.column('feature_key', sa.String),
+        sa.column('request_id', sa.String),
+    )
+    for rule_id, scope, payload in bind.execute(sa.select(rules.c.id, rules.c.scope, rules.c.payload_json)).all():
+        payload = payload or {}
+        feature = payload.get('feature_norm') or payload.get('feature_name')
+        target = payload.get('request_id')
+        bind.execute(
+            rules.update()
+            .where(rules.c.id == rule_id)
+            .values(
+                feature_key=str(feature) if scope == 'FEATURE' and feature else None,
+                request_id=str(target) if scope == 'REQUEST' and target else None,
+            )
+        )
+
+    op.create_table(
+        'guardrail_rules_version',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.execute("INSERT INTO guardrail_rules_version (id, version) VALUES (1, 0)")
+
+
+def downgrade() -> None:
+    op.drop_table('guardrail_rules_version')
+    op.drop_index('ix_guardrail_rules_request_id', table_name='guardrail_rules')
+    op.drop_index('ix_guardrail_rules_feature_key', table_name='guardrail_rules')
+    op.drop_index('ix_guardrail_rules_scope', table_name='guardrail_rules')
+    op.drop_column('guardrail_rules', 'request_id')
+    op.drop_column('guardrail_rules', 'feature_key')
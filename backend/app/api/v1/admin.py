@@ -9,8 +9,14 @@ from pydantic import BaseModel, Field
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.core import metrics
 from app.core.auth import current_user
 from app.db import get_db_session, models
+from app.services.grammar.service import grammar_stats
+from app.services.llm.accounting import usage_report
+from app.services.llm.cache import cache_stats
+from app.services.llm.router import router_stats
+from app.services.llm.transport import pool_stats
 
 
 router = APIRouter(prefix="/admin", tags=["admin"])
@@ -157,4 +163,28 @@ def delete_device(
     session.commit()
 
 
+@router.get("/metrics")
+def get_metrics(
+    user: models.User = Depends(current_user(models.UserRole.ADMIN)),
+):
+    """Return process-local counters and latency histograms (e.g. ``translate.ttft_ms``)."""
+    return {
+        **metrics.snapshot(),
+        "llm_cache": cache_stats(),
+        "llm_http": pool_stats(),
+        "llm_router": router_stats(),
+        "grammar": grammar_stats(),
+    }
+
+
+@router.get("/llm-usage")
+def get_llm_usage(
+    request_id: Optional[str] = None,
+    limit: int = 50,
+    user: models.User = Depends(current_user(models.UserRole.ADMIN)),
+):
+    """Token and latency histograms per call site and model, plus recent calls (optionally for one request)."""
+    return usage_report(request_id=request_id, limit=limit)
+
+
 __all__ = ["router"]
@@ -5,19 +5,37 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 
+import anyio
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, ConfigDict, Field
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core.auth import current_user
-from app.db import get_db_session, models
+from app.core.settings import settings
+from app.core.sse import SSE_HEADERS, format_sse
+from app.db import get_db_session, models, session_scope
+from app.services.drafts.bulk import BulkDraftJobError, get_bulk_draft_job, start_bulk_draft_job
 from app.services.drafts.service import (
     DraftGenerationParams,
     clear_draft_selection,
+    draft_translate_request,
     generate_ai_draft,
+    persist_ai_draft,
     select_draft_version,
 )
+from app.services.drafts.validation import (
+    VALIDATION_PENDING,
+    VALIDATION_TERMINAL_STATES,
+    get_version_validation,
+    queue_version_validation,
+    requeue_stale_validation,
+)
+from app.services.llm.accounting import llm_request
+from app.services.llm.client import LLMClientError
 from app.services.requests import service as request_service
+from app.services.translate.service import TranslateResponse, TranslationServiceError, translate_stream
 
 
 router = APIRouter(tags=["drafts"])
@@ -36,6 +54,20 @@ class DraftGenerationPayload(BaseModel):
     temperature: Optional[float] = Field(default=None)
 
 
+class BulkDraftGenerationPayload(BaseModel):
+    """Generate one AI draft per request from its ``source_text`` through a batch job."""
+
+    request_ids: List[str] = Field(min_length=1, max_length=50000)
+    source_language: str = Field(default="ko", min_length=2, max_length=32)
+    target_language: str = Field(default="en", min_length=2, max_length=32)
+    hints: Dict[str, Any] = Field(default_factory=dict)
+    glossary: Dict[str, str] = Field(default_factory=dict)
+    num_candidates: int = Field(default=3, ge=1, le=5)
+    use_rag: bool = True
+    rag_top_k: int = Field(default=5, ge=1, le=20)
+    temperature: Optional[float] = Field(default=None)
+
+
 class DraftVersionResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -62,6 +94,10 @@ class DraftSelectionPayload(BaseModel):
     version_id: str
     comment: Optional[str] = None
     edited_content: Optional[str] = None
+    validate_inline: bool = Field(
+        default=False,
+        description="Validate edited content before responding instead of in the background",
+    )
 
 
 class DraftSelectionState(BaseModel):
@@ -74,6 +110,17 @@ class DraftSelectionState(BaseModel):
     grammar_check_result: Optional[Dict[str, Any]] = None
     comment_id: Optional[str] = None
     new_version_created: bool = False
+    validation_status: Optional[str] = None
+
+
+class DraftVersionValidation(BaseModel):
+    draft_id: str
+    version_id: str
+    status: Optional[str] = None
+    guardrail_result: Optional[Dict[str, Any]] = None
+    grammar_check_result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    updated_at: Optional[datetime] = None
 
 
 @router.post("/drafts", response_model=DraftResponse, status_code=status.HTTP_201_CREATED)
@@ -82,14 +129,30 @@ def generate_draft(
     session: Session = Depends(get_db_session),
     actor: models.User = Depends(current_user(models.UserRole.WRITER, models.UserRole.DESIGNER)),
 ):
+    request_obj = _authorized_request(session, payload, actor)
+    params = _generation_params(payload)
+
+    draft = generate_ai_draft(session, request=request_obj, created_by=actor, params=params)
+    session.refresh(request_obj)
+    return _draft_response(draft, request_obj)
+
+
+def _ensure_writer_assigned(request_obj: models.Request, actor: models.User) -> None:
+    if actor.role == models.UserRole.WRITER and request_obj.assigned_writer_id not in {None, actor.id}:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Writer not assigned to this request")
+
+
+def _authorized_request(session: Session, payload: DraftGenerationPayload, actor: models.User) -> models.Request:
     request_obj = request_service.get_request(session, payload.request_id)
     if not request_obj:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Request not found")
 
-    if actor.role == models.UserRole.WRITER and request_obj.assigned_writer_id not in {None, actor.id}:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Writer not assigned to this request")
+    _ensure_writer_assigned(request_obj, actor)
+    return request_obj
 
-    params = DraftGenerationParams(
+
+def _generation_params(payload: DraftGenerationPayload) -> DraftGenerationParams:
+    return DraftGenerationParams(
         text=payload.text,
         source_language=payload.source_language,
         target_language=payload.target_language,
@@ -101,9 +164,8 @@ def generate_draft(
         temperature=payload.temperature,
     )
 
-    draft = generate_ai_draft(session, request=request_obj, created_by=actor, params=params)
-    session.refresh(request_obj)
 
+def _draft_response(draft: models.Draft, request_obj: models.Request) -> DraftResponse:
     return DraftResponse(
         id=draft.id,
         request_id=draft.request_id,
@@ -126,6 +188,110 @@ def generate_draft(
     )
 
 
+@router.post("/drafts/stream")
+def generate_draft_stream(
+    payload: DraftGenerationPayload,
+    session: Session = Depends(get_db_session),
+    actor: models.User = Depends(current_user(models.UserRole.WRITER, models.UserRole.DESIGNER)),
+):
+    """Stream draft candidates as SSE, then persist them and send the draft as a ``draft`` event."""
+
+    _authorized_request(session, payload, actor)
+    request_id, actor_id = payload.request_id, actor.id
+    params = _generation_params(payload)
+
+    def load_context(stream_session: Session):
+        return request_service.get_request(stream_session, request_id), stream_session.get(models.User, actor_id)
+
+    def persist_draft(stream_session: Session, request_obj: models.Request, creator: models.User, data: dict):
+        draft = persist_ai_draft(
+            stream_session,
+            request=request_obj,
+            created_by=creator,
+            translate_response=TranslateResponse.model_validate(data),
+        )
+        stream_session.refresh(request_obj)
+        response = _draft_response(draft, request_obj).model_dump(mode="json")
+        # Commit here so closing the session on the event loop does no I/O.
+        stream_session.commit()
+        return response
+
+    async def events():
+        # The stream outlives the request-scoped session, so it works in its own; all of its
+        # database I/O runs on worker threads.
+        with session_scope() as stream_session, llm_request(request_id):
+            request_obj, creator = await anyio.to_thread.run_sync(load_context, stream_session)
+            try:
+                async for event, data in translate_stream(
+                    draft_translate_request(request_obj, params),
+                    session=stream_session,
+                    request_context=request_obj,
+                ):
+                    yield format_sse(event, data)
+                    if event != "done":
+                        continue
+                    draft = await anyio.to_thread.run_sync(persist_draft, stream_session, request_obj, creator, data)
+                    yield format_sse("draft", draft)
+            except TranslationServiceError as exc:
+                yield format_sse("error", {"detail": str(exc)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/drafts/bulk", status_code=status.HTTP_202_ACCEPTED)
+def generate_drafts_bulk(
+    payload: BulkDraftGenerationPayload,
+    session: Session = Depends(get_db_session),
+    actor: models.User = Depends(current_user(models.UserRole.WRITER, models.UserRole.DESIGNER)),
+):
+    """Queue offline generation for many requests; poll ``GET /drafts/bulk/{job_id}`` for drafts."""
+
+    if actor.role == models.UserRole.WRITER:
+        stmt = select(models.Request.id).where(
+            models.Request.id.in_(payload.request_ids),
+            models.Request.assigned_writer_id.is_not(None),
+            models.Request.assigned_writer_id != actor.id,
+        )
+        foreign = list(session.scalars(stmt))
+        if foreign:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Writer not assigned to requests: {', '.join(sorted(foreign))}",
+            )
+
+    params = DraftGenerationParams(
+        text="",
+        source_language=payload.source_language,
+        target_language=payload.target_language,
+        hints=payload.hints,
+        glossary=payload.glossary,
+        num_candidates=payload.num_candidates,
+        use_rag=payload.use_rag,
+        rag_top_k=payload.rag_top_k,
+        temperature=payload.temperature,
+    )
+    try:
+        job_id = start_bulk_draft_job(payload.request_ids, params=params, created_by=actor.id)
+    except BulkDraftJobError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    except LLMClientError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Batch backend unavailable: {exc}"
+        ) from exc
+    return {"job_id": job_id, "status": "pending"}
+
+
+@router.get("/drafts/bulk/{job_id}")
+def get_drafts_bulk(
+    job_id: str,
+    actor: models.User = Depends(current_user(models.UserRole.WRITER, models.UserRole.DESIGNER)),
+):
+    job = get_bulk_draft_job(job_id)
+    if job is None or job["created_by"] != actor.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bulk draft job not found")
+    return job
+
+
 @router.post(
     "/drafts/{draft_id}/selection",
     response_model=DraftSelectionState,
@@ -141,8 +307,7 @@ def select_draft_version_endpoint(
     if not draft:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Draft not found")
 
-    if draft.request.assigned_writer_id not in {None, actor.id}:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Writer not assigned to this request")
+    _ensure_writer_assigned(draft.request, actor)
 
     version = session.get(models.DraftVersion, payload.version_id)
     if not version:
@@ -156,10 +321,16 @@ def select_draft_version_endpoint(
             actor=actor,
             comment_text=payload.comment,
             edited_content=payload.edited_content,
+            validate_inline=payload.validate_inline,
         )
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
 
+    if validation_metadata.get("validation_status") == VALIDATION_PENDING:
+        # The worker reads the new version through its own session, so it must be committed first.
+        session.commit()
+        queue_version_validation(selection.version_id, actor_id=actor.id)
+
     session.refresh(draft.request)
     return DraftSelectionState(
         draft_id=draft.id,
@@ -171,9 +342,66 @@ def select_draft_version_endpoint(
         grammar_check_result=validation_metadata.get("grammar_check_result"),
         comment_id=validation_metadata.get("comment_id"),
         new_version_created=validation_metadata.get("new_version_created", False),
+        validation_status=validation_metadata.get("validation_status"),
     )
 
 
+def _draft_version(session: Session, draft_id: str, version_id: str, actor: models.User) -> models.DraftVersion:
+    version = session.get(models.DraftVersion, version_id)
+    if not version or version.draft_id != draft_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Draft version not found")
+    _ensure_writer_assigned(version.draft.request, actor)
+    return version
+
+
+@router.get("/drafts/{draft_id}/versions/{version_id}/validation", response_model=DraftVersionValidation)
+def get_draft_version_validation(
+    draft_id: str,
+    version_id: str,
+    session: Session = Depends(get_db_session),
+    actor: models.User = Depends(current_user(models.UserRole.WRITER, models.UserRole.DESIGNER)),
+):
+    """Poll the guardrail and grammar results of an edited version."""
+
+    version = _draft_version(session, draft_id, version_id, actor)
+    if requeue_stale_validation(version_id):
+        session.refresh(version)
+    return get_version_validation(version)
+
+
+@router.get("/drafts/{draft_id}/versions/{version_id}/validation/stream")
+def stream_draft_version_validation(
+    draft_id: str,
+    version_id: str,
+    session: Session = Depends(get_db_session),
+    actor: models.User = Depends(current_user(models.UserRole.WRITER, models.UserRole.DESIGNER)),
+):
+    """Send one ``validation`` event once the version's checks finish, or ``timeout``."""
+
+    _draft_version(session, draft_id, version_id, actor)
+
+    def poll() -> Dict[str, Any]:
+        requeue_stale_validation(version_id)
+        with session_scope() as poll_session:
+            return get_version_validation(poll_session.get(models.DraftVersion, version_id))
+
+    async def events():
+        # The deadline is checked between polls: a generator must not yield inside a cancel scope.
+        deadline = anyio.current_time() + settings.draft_validation_stream_timeout_seconds
+        while True:
+            state = await anyio.to_thread.run_sync(poll)
+            if state["status"] in VALIDATION_TERMINAL_STATES or state["status"] is None:
+                yield format_sse("validation", state)
+                return
+            remaining = deadline - anyio.current_time()
+            if remaining <= 0:
+                break
+            await anyio.sleep(min(settings.draft_validation_poll_seconds, remaining))
+        yield format_sse("timeout", {"draft_id": draft_id, "version_id": version_id})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.delete(
     "/drafts/{draft_id}/selection",
     response_model=DraftSelectionState,
@@ -188,8 +416,7 @@ def clear_draft_selection_endpoint(
     if not draft:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Draft not found")
 
-    if draft.request.assigned_writer_id not in {None, actor.id}:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Writer not assigned to this request")
+    _ensure_writer_assigned(draft.request, actor)
 
     clear_draft_selection(session, draft=draft, actor=actor)
     session.refresh(draft.request)
@@ -205,5 +432,14 @@ def clear_draft_selection_endpoint(
     )
 
 
-__all__ = ["generate_draft", "select_draft_version_endpoint", "clear_draft_selection_endpoint", "router"]
+__all__ = [
+    "generate_draft",
+    "generate_drafts_bulk",
+    "get_drafts_bulk",
+    "select_draft_version_endpoint",
+    "get_draft_version_validation",
+    "stream_draft_version_validation",
+    "clear_draft_selection_endpoint",
+    "router",
+]
 
@@ -1,10 +1,12 @@
 import logging
+from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
 from app.db import get_db_session
+from app.services.ingest.jobs import IngestJobError, cancel_ingest_job, get_ingest_job, start_ingest_job
 from app.services.ingest.service import do_ingest
 
 router = APIRouter(tags=["ingest"])
@@ -13,10 +15,39 @@ logger = logging.getLogger(__name__)
 
 class IngestPayload(BaseModel):
     data_path: str = Field(default="input", description="Relative path from data/ directory (e.g., 'input' or 'mock/day6')")
+    background: bool = Field(default=False, description="Run as a background job and return its id instead of ingesting inline")
+    reindex: bool = Field(default=False, description="Rebuild vector collections as new versions and switch their aliases")
 
 
 @router.post("/ingest")
-def ingest(payload: IngestPayload, db: Session = Depends(get_db_session)):
+def ingest(response: Response, payload: Optional[IngestPayload] = None, db: Session = Depends(get_db_session)):
+    payload = payload or IngestPayload()
     logger.info(f"Ingest API called with payload: {payload}")
     logger.info(f"data_path value: {payload.data_path}")
-    return do_ingest(db, data_path=payload.data_path)
+    if not payload.background:
+        return do_ingest(db, data_path=payload.data_path, reindex=payload.reindex)
+    try:
+        job_id = start_ingest_job(payload.data_path, reindex=payload.reindex)
+    except (ValueError, FileNotFoundError) as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    response.status_code = status.HTTP_202_ACCEPTED
+    return {"job_id": job_id, "status": "pending"}
+
+
+@router.get("/ingest/{job_id}")
+def get_ingest(job_id: str, db: Session = Depends(get_db_session)):
+    job = get_ingest_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingest job not found")
+    return job
+
+
+@router.post("/ingest/{job_id}/cancel")
+def cancel_ingest(job_id: str, db: Session = Depends(get_db_session)):
+    try:
+        job = cancel_ingest_job(db, job_id)
+    except IngestJobError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(exc)) from exc
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ingest job not found")
+    return job
@@ -1,20 +1,73 @@
+import json
+import math
+
+import anyio
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.db import get_db_session
+from app.core.settings import settings
+from app.core.sse import SSE_HEADERS, format_sse
+from app.db import get_db_session, session_scope
+from app.services.translate.batch import TranslateBatchRequest, translate_batch
 from app.services.translate.service import (
     TranslateRequest,
     TranslateResponse,
     TranslationServiceError,
-    translate as svc,
+    translate_async as svc,
+    translate_stream,
 )
 
 router = APIRouter(tags=["translate"])
 
 @router.post("/translate", response_model=TranslateResponse)
-def translate(req: TranslateRequest, session: Session = Depends(get_db_session)):
+async def translate(req: TranslateRequest, session: Session = Depends(get_db_session)):
     try:
-        response = svc(req, session=session)
+        response = await svc(req, session=session)
     except TranslationServiceError as exc:
-        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+        retry_after = getattr(exc.__cause__, "retry_after", None)
+        headers = {"Retry-After": str(math.ceil(retry_after))} if retry_after else None
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc), headers=headers) from exc
     return response.model_dump()
+
+
+@router.post("/translate/stream")
+async def translate_sse(req: TranslateRequest):
+    """Stream ``token``/``candidate`` events, then a ``done`` event shaped like ``TranslateResponse``."""
+
+    async def events():
+        with session_scope() as session:
+            try:
+                async for event, data in translate_stream(req, session=session):
+                    yield format_sse(event, data)
+            except TranslationServiceError as exc:
+                yield format_sse("error", {"detail": str(exc)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.post("/translate/batch")
+async def translate_batch_ndjson(req: TranslateBatchRequest):
+    """Translate many items; NDJSON lines stream back in completion order with each item's ``index``."""
+
+    if len(req.items) > settings.translate_batch_max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch exceeds {settings.translate_batch_max_items} items",
+        )
+
+    async def lines():
+        send, receive = anyio.create_memory_object_stream(max_buffer_size=len(req.items))
+
+        async def produce() -> None:
+            async with send:
+                with session_scope() as session:
+                    await translate_batch(req.items, session=session, on_result=send.send, concurrency=req.concurrency)
+
+        async with anyio.create_task_group() as group:
+            group.start_soon(produce)
+            async with receive:
+                async for line in receive:
+                    yield json.dumps(line, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -1,5 +1,16 @@
 import csv, json, os, time, yaml
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Iterator
+
+try:  # pragma: no cover - optional dependency
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except Exception:  # pragma: no cover - optional dependency
+    pa = None  # type: ignore
+    pc = None  # type: ignore
+    pq = None  # type: ignore
+
+COLUMNAR_EXTENSIONS = (".parquet", ".arrow", ".feather")
 
 def read_jsonl(path: str) -> List[Dict[str, Any]]:
     items = []
@@ -20,5 +31,66 @@ def read_yaml(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
 
+def iter_columnar_batches(path: str, batch_size: int = 8192) -> Iterator["pa.RecordBatch"]:
+    """Yield record batches from a memory-mapped Parquet or Arrow IPC file."""
+    if pa is None:
+        raise RuntimeError("pyarrow is required for Parquet/Arrow ingest inputs (pip install .[columnar])")
+    if path.endswith(".parquet"):
+        parquet = pq.ParquetFile(path, memory_map=True)
+        yield from parquet.iter_batches(batch_size=batch_size)
+        return
+    with pa.memory_map(path, "r") as source:
+        try:
+            reader = pa.ipc.open_file(source)
+            for index in range(reader.num_record_batches):
+                yield reader.get_batch(index)
+        except pa.ArrowInvalid:
+            source.seek(0)
+            yield from pa.ipc.open_stream(source)
+
+def _vector_rows(column: "pa.Array") -> List[Any]:
+    """Split a list-of-floats column into per-row numpy views over one contiguous buffer.
+
+    Ragged or null rows fall back to Python lists.
+    """
+    list_type = pa.types.is_list(column.type) or pa.types.is_large_list(column.type)
+    if not (list_type or pa.types.is_fixed_size_list(column.type)) or not pa.types.is_floating(column.type.value_type):
+        return column.to_pylist()
+    if len(column) == 0 or column.null_count:
+        return column.to_pylist()
+    lengths = pc.min_max(pc.list_value_length(column)).as_py()
+    if lengths["min"] != lengths["max"]:
+        return column.to_pylist()
+    return list(column.flatten().to_numpy(zero_copy_only=False).reshape(len(column), lengths["max"]))
+
+def read_columnar(path: str, vector_column: str | None = None) -> Tuple[List[Dict[str, Any]], List[Any] | None]:
+    """Return rows plus the optional precomputed vector column, split off the rows.
+
+    Rows are materialized as dicts because ingest publishes them to the in-memory store
+    and bulk-loads them as such. Vectors, the bulk of a columnar export, stay as numpy
+    rows, which callers convert one upsert batch at a time.
+    """
+    rows: List[Dict[str, Any]] = []
+    vectors: List[Any] | None = None
+    for batch in iter_columnar_batches(path):
+        if vector_column and vector_column in batch.schema.names:
+            if vectors is None:
+                vectors = [None] * len(rows)
+            index = batch.schema.get_field_index(vector_column)
+            vectors.extend(_vector_rows(batch.column(index)))
+            batch = batch.drop_columns([vector_column])
+        elif vectors is not None:
+            vectors.extend([None] * batch.num_rows)
+        rows.extend(batch.to_pylist())
+    return rows, vectors
+
+def find_input(directory: str, stem: str, fallback: str) -> str:
+    """Prefer a columnar export of ``stem`` when present, else the row-oriented file."""
+    for ext in COLUMNAR_EXTENSIONS:
+        candidate = os.path.join(directory, stem + ext)
+        if os.path.exists(candidate):
+            return candidate
+    return os.path.join(directory, fallback)
+
 def new_run_id() -> str:
     return time.strftime("%Y%m%d_%H%M%S")
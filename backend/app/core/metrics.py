@@ -0,0 +1,89 @@
+"""Process-local counters and latency histograms for operational visibility."""
+
+from __future__ import annotations
+
+from collections import deque
+from threading import Lock
+from typing import Any, Deque, Dict, Iterable
+
+RESERVOIR_SIZE = 2048
+
+
+class Histogram:
+    """Running count/sum plus a window of recent samples for percentiles."""
+
+    def __init__(self, window: int = RESERVOIR_SIZE) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+        self._samples.append(value)
+
+    def percentile(self, q: float) -> float:
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+        return ordered[index]
+
+    def summary(self, quantiles: Iterable[float] = (0.5, 0.95, 0.99)) -> Dict[str, float]:
+        summary = {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+        }
+        for q in quantiles:
+            summary[f"p{int(q * 100)}"] = round(self.percentile(q), 3)
+        return summary
+
+
+_LOCK = Lock()
+_COUNTERS: Dict[str, float] = {}
+_HISTOGRAMS: Dict[str, Histogram] = {}
+
+
+def increment(name: str, amount: float = 1) -> None:
+    with _LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + amount
+
+
+def observe(name: str, value: float) -> None:
+    with _LOCK:
+        histogram = _HISTOGRAMS.get(name)
+        if histogram is None:
+            histogram = _HISTOGRAMS[name] = Histogram()
+        histogram.observe(value)
+
+
+def counter(name: str) -> float:
+    with _LOCK:
+        return _COUNTERS.get(name, 0)
+
+
+def percentile(name: str, q: float) -> float:
+    with _LOCK:
+        histogram = _HISTOGRAMS.get(name)
+        return histogram.percentile(q) if histogram else 0.0
+
+
+def snapshot() -> Dict[str, Any]:
+    with _LOCK:
+        return {
+            "counters": dict(sorted(_COUNTERS.items())),
+            "histograms": {name: histogram.summary() for name, histogram in sorted(_HISTOGRAMS.items())},
+        }
+
+
+def reset() -> None:
+    with _LOCK:
+        _COUNTERS.clear()
+        _HISTOGRAMS.clear()
+
+
+__all__ = ["Histogram", "counter", "increment", "observe", "percentile", "reset", "snapshot"]
@@ -1,24 +1,133 @@
 """Application configuration sourced from environment variables."""
 
 from functools import lru_cache
-from typing import Literal, Optional
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Dict, List, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
 
 class Settings(BaseSettings):
     """Runtime configuration for backend services."""
 
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8", extra="ignore")
 
-    llm_provider: Literal["openai"] = Field(default="openai", alias="LLM_PROVIDER")
+    llm_provider: Literal["openai", "stub"] = Field(default="openai", alias="LLM_PROVIDER")
     llm_model: str = Field(default="gpt-4o-mini", alias="LLM_MODEL")
     llm_api_key: Optional[str] = Field(default=None, alias="LLM_API_KEY")
     llm_base_url: Optional[str] = Field(default=None, alias="LLM_BASE_URL")
     llm_timeout_seconds: float = Field(default=30.0, alias="LLM_TIMEOUT_SECONDS")
     llm_temperature: float = Field(default=0.3, alias="LLM_TEMPERATURE")
 
+    llm_routes: Dict[str, List[str]] = Field(
+        default_factory=dict,
+        alias="LLM_ROUTES",
+        description='JSON map of call site to ordered models, e.g. {"normalize": ["gpt-4.1-nano", "gpt-4o-mini"]}.',
+    )
+    llm_route_latency_slo_ms: Dict[str, float] = Field(
+        default_factory=lambda: {"translate": 8000.0, "grammar": 5000.0, "normalize": 2000.0},
+        alias="LLM_ROUTE_LATENCY_SLO_MS",
+    )
+    llm_router_window_seconds: float = Field(default=60.0, alias="LLM_ROUTER_WINDOW_SECONDS")
+    llm_router_min_samples: int = Field(default=5, alias="LLM_ROUTER_MIN_SAMPLES")
+    llm_router_max_error_rate: float = Field(default=0.2, alias="LLM_ROUTER_MAX_ERROR_RATE")
+
+    llm_stub_latency: Literal["fixed", "lognormal", "histogram"] = Field(default="fixed", alias="LLM_STUB_LATENCY")
+    llm_stub_latency_ms: float = Field(default=50.0, alias="LLM_STUB_LATENCY_MS", description="Fixed or median latency.")
+    llm_stub_latency_sigma: float = Field(default=0.5, alias="LLM_STUB_LATENCY_SIGMA")
+    llm_stub_latency_file: Optional[str] = Field(
+        default=None,
+        alias="LLM_STUB_LATENCY_FILE",
+        description="Recorded latencies (ms) replayed by the histogram profile.",
+    )
+    llm_stub_error_rate: float = Field(default=0.0, alias="LLM_STUB_ERROR_RATE")
+    llm_stub_rate_limit_rate: float = Field(default=0.0, alias="LLM_STUB_RATE_LIMIT_RATE")
+    llm_stub_seed: Optional[int] = Field(default=None, alias="LLM_STUB_SEED")
+
+    llm_prompt_token_budget: Optional[int] = Field(default=2000, alias="LLM_PROMPT_TOKEN_BUDGET")
+
+    llm_cache_path: Optional[str] = Field(
+        default="./ux_writer_llm_cache.sqlite3",
+        alias="LLM_CACHE_PATH",
+        description="SQLite file for the LLM response cache; empty disables caching.",
+    )
+    llm_cache_ttl_seconds: float = Field(default=7 * 24 * 3600, alias="LLM_CACHE_TTL_SECONDS")
+    llm_cache_max_bytes: int = Field(default=256 * 1024 * 1024, alias="LLM_CACHE_MAX_BYTES")
+    llm_cache_max_temperature: float = Field(default=0.2, alias="LLM_CACHE_MAX_TEMPERATURE")
+    llm_price_input_per_1k: float = Field(default=0.00015, alias="LLM_PRICE_INPUT_PER_1K")
+    llm_price_output_per_1k: float = Field(default=0.0006, alias="LLM_PRICE_OUTPUT_PER_1K")
+
+    llm_http_max_connections: int = Field(default=64, alias="LLM_HTTP_MAX_CONNECTIONS")
+    llm_http_max_keepalive_connections: int = Field(default=32, alias="LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS")
+    llm_http_keepalive_expiry_seconds: float = Field(default=60.0, alias="LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS")
+    llm_http_connect_timeout_seconds: float = Field(default=5.0, alias="LLM_HTTP_CONNECT_TIMEOUT_SECONDS")
+    llm_http_pool_timeout_seconds: float = Field(default=10.0, alias="LLM_HTTP_POOL_TIMEOUT_SECONDS")
+    llm_http2: bool = Field(
+        default_factory=lambda: find_spec("h2") is not None,
+        alias="LLM_HTTP2",
+        description="Defaults to on when the 'h2' package (extra: http2) is installed.",
+    )
+
+    llm_rate_limit_rpm: Optional[int] = Field(default=None, alias="LLM_RATE_LIMIT_RPM")
+    llm_rate_limit_tpm: Optional[int] = Field(default=None, alias="LLM_RATE_LIMIT_TPM")
+    llm_retry_max_attempts: int = Field(default=3, alias="LLM_RETRY_MAX_ATTEMPTS")
+    llm_retry_base_delay_seconds: float = Field(default=0.5, alias="LLM_RETRY_BASE_DELAY_SECONDS")
+    llm_retry_max_delay_seconds: float = Field(default=30.0, alias="LLM_RETRY_MAX_DELAY_SECONDS")
+    llm_breaker_failure_threshold: int = Field(default=5, alias="LLM_BREAKER_FAILURE_THRESHOLD")
+    llm_breaker_reset_seconds: float = Field(default=30.0, alias="LLM_BREAKER_RESET_SECONDS")
+
+    llm_hedge_enabled: bool = Field(default=False, alias="LLM_HEDGE_ENABLED")
+    llm_hedge_percentile: float = Field(default=0.95, alias="LLM_HEDGE_PERCENTILE")
+    llm_hedge_min_delay_ms: float = Field(default=250.0, alias="LLM_HEDGE_MIN_DELAY_MS")
+    llm_hedge_budget: float = Field(default=0.05, alias="LLM_HEDGE_BUDGET")
+    llm_hedge_min_samples: int = Field(default=20, alias="LLM_HEDGE_MIN_SAMPLES")
+
+    llm_singleflight_enabled: bool = Field(default=True, alias="LLM_SINGLEFLIGHT_ENABLED")
+
+    llm_batch_backend: Optional[Literal["openai", "local"]] = Field(
+        default=None,
+        alias="LLM_BATCH_BACKEND",
+        description="Batch-completions backend; defaults to 'openai' for the OpenAI provider, else 'local'.",
+    )
+    llm_batch_dir: str = Field(default="./llm_batches", alias="LLM_BATCH_DIR")
+    llm_batch_poll_seconds: float = Field(default=30.0, alias="LLM_BATCH_POLL_SECONDS")
+    llm_batch_completion_window: str = Field(default="24h", alias="LLM_BATCH_COMPLETION_WINDOW")
+    llm_batch_job_stale_seconds: float = Field(
+        default=600.0,
+        alias="LLM_BATCH_JOB_STALE_SECONDS",
+        description="Unfinished bulk draft jobs silent this long are resumed; keep above LLM_BATCH_POLL_SECONDS.",
+    )
+
+    grammar_precheck_enabled: bool = Field(default=True, alias="GRAMMAR_PRECHECK_ENABLED")
+    grammar_precheck_max_words: int = Field(default=8, alias="GRAMMAR_PRECHECK_MAX_WORDS")
+    grammar_cache_enabled: bool = Field(default=True, alias="GRAMMAR_CACHE_ENABLED")
+    grammar_cache_min_confidence: float = Field(default=0.7, alias="GRAMMAR_CACHE_MIN_CONFIDENCE")
+    grammar_cache_ttl_seconds: float = Field(default=30 * 24 * 3600, alias="GRAMMAR_CACHE_TTL_SECONDS")
+
+    guardrail_rules_version_ttl_seconds: float = Field(
+        default=5.0,
+        alias="GUARDRAIL_RULES_VERSION_TTL_SECONDS",
+        description="How long a worker trusts its cached guardrail rules version before re-reading it.",
+    )
+
+    draft_validation_poll_seconds: float = Field(default=0.5, alias="DRAFT_VALIDATION_POLL_SECONDS")
+    draft_validation_stream_timeout_seconds: float = Field(
+        default=120.0,
+        alias="DRAFT_VALIDATION_STREAM_TIMEOUT_SECONDS",
+    )
+    draft_validation_stale_seconds: float = Field(
+        default=300.0,
+        alias="DRAFT_VALIDATION_STALE_SECONDS",
+        description="Pending validations older than this (their worker restarted) are queued again when read.",
+    )
+
+    translate_batch_concurrency: int = Field(default=8, alias="TRANSLATE_BATCH_CONCURRENCY")
+    translate_batch_max_items: int = Field(default=1000, alias="TRANSLATE_BATCH_MAX_ITEMS")
+
     database_url: str = Field(
         default="sqlite:///./ux_writer_lab.db",
         alias="DATABASE_URL",
@@ -34,6 +143,24 @@ class Settings(BaseSettings):
     embedding_backend: Literal["stub", "onnx"] = Field(default="stub", alias="EMBEDDING_BACKEND")
     embedding_onnx_path: Optional[str] = Field(default=None, alias="EMBEDDING_ONNX_PATH")
     embedding_max_batch: int = Field(default=16, alias="EMBEDDING_MAX_BATCH")
+    qdrant_upsert_batch: int = Field(default=256, alias="QDRANT_UPSERT_BATCH")
+    ingest_heartbeat_seconds: float = Field(
+        default=2.0,
+        alias="INGEST_HEARTBEAT_SECONDS",
+        description="How often a running ingest job records a heartbeat and checks for cancellation.",
+    )
+    ingest_stale_seconds: float = Field(
+        default=600.0,
+        alias="INGEST_STALE_SECONDS",
+        description="Running ingest jobs without a heartbeat for this long are failed as abandoned.",
+    )
+
+    state_snapshot_path: Optional[str] = Field(
+        default=str(BACKEND_DIR / "ux_writer_state.snapshot"),
+        alias="STATE_SNAPSHOT_PATH",
+        description="Memory-mapped corpus snapshot shared by workers; empty keeps state per process.",
+    )
+    state_run_log_limit: int = Field(default=32, alias="STATE_RUN_LOG_LIMIT")
 
     qdrant_use_grpc: bool = Field(default=False, alias="QDRANT_USE_GRPC")
     qdrant_use_https: bool = Field(default=False, alias="QDRANT_USE_HTTPS")
@@ -0,0 +1,17 @@
+"""Server-Sent Events framing helpers."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Frame ``data`` as a single SSE message of type ``event``."""
+
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+__all__ = ["SSE_HEADERS", "format_sse"]
@@ -1,8 +1,341 @@
-# VERY SIMPLE in-memory stores for lab usage
-from typing import List, Dict, Any
+"""Runtime corpus state shared by every API worker.
 
-CONTEXT: List[Dict[str, Any]] = []
-GLOSSARY: List[Dict[str, Any]] = []
-STYLE: List[Dict[str, Any]] = []
+Ingest publishes the context, glossary and style rows together with its run log as one
+snapshot file. Each worker memory-maps the newest snapshot and decodes rows lazily, so
+lookups by id only touch the rows they need and all workers serve the same ingest.
+Without a snapshot path the rows simply live in process memory.
+"""
 
-RUN_LOGS: Dict[str, Any] = {}
+from __future__ import annotations
+
+import json
+import logging
+import mmap
+import os
+import struct
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from threading import RLock
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"UXWSTATE1"
+_HEADER_LENGTH = struct.Struct("<Q")
+SECTIONS = ("context", "glossary", "style")
+
+Span = Tuple[int, int]
+
+
+class TableView:
+    """Immutable rows of one table in one snapshot: in-memory rows or spans into a mapping."""
+
+    __slots__ = ("_rows", "_buf", "_base", "_spans", "index")
+
+    def __init__(
+        self,
+        index: Dict[str, List[int]],
+        *,
+        rows: Sequence[Dict[str, Any]] = (),
+        buf: Optional[mmap.mmap] = None,
+        base: int = 0,
+        spans: Sequence[Span] = (),
+    ) -> None:
+        self._rows = tuple(rows)
+        self._buf, self._base, self._spans = buf, base, tuple(spans)
+        self.index = index
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, Any]]) -> "TableView":
+        return cls(_build_index(rows), rows=rows)
+
+    def __len__(self) -> int:
+        return len(self._spans) if self._buf is not None else len(self._rows)
+
+    def row(self, position: int) -> Dict[str, Any]:
+        if self._buf is None:
+            return self._rows[position]
+        offset, length = self._spans[position]
+        start = self._base + offset
+        return json.loads(self._buf[start : start + length])
+
+
+class Snapshot:
+    """Every table of one published ingest; replaced as a whole, never mutated."""
+
+    __slots__ = ("tables", "signature")
+
+    def __init__(self, tables: Dict[str, TableView], signature: Optional[Tuple[str, int, int, int]] = None) -> None:
+        self.tables = tables
+        self.signature = signature
+
+    def replace(self, **tables: TableView) -> "Snapshot":
+        return Snapshot({**self.tables, **tables}, self.signature)
+
+
+_EMPTY = TableView({})
+
+
+class RowTable:
+    """Read-mostly list of corpus rows with an ``id`` index.
+
+    Each call reads the store's current snapshot once, so it never mixes rows from two ingests.
+    """
+
+    def __init__(self, store: "StateStore", name: str) -> None:
+        self._store = store
+        self._name = name
+
+    def _view(self) -> TableView:
+        return self._store.snapshot().tables.get(self._name, _EMPTY)
+
+    def __len__(self) -> int:
+        return len(self._view())
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        view = self._view()
+        return iter([view.row(position) for position in range(len(view))])
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the first row whose ``id`` equals ``key``."""
+
+        view = self._view()
+        positions = view.index.get(str(key))
+        return view.row(positions[0]) if positions else None
+
+    def select(self, keys: Iterable[str]) -> List[Dict[str, Any]]:
+        """Return every row whose ``id`` is in ``keys``, in corpus order."""
+
+        view = self._view()
+        positions = sorted({position for key in keys for position in view.index.get(str(key), ())})
+        return [view.row(position) for position in positions]
+
+    def clear(self) -> None:
+        self._store._replace_tables(**{self._name: _EMPTY})
+
+
+class RunLogs(MutableMapping):
+    """Ingest run logs keyed by run id, evicting the least recently used past ``limit``."""
+
+    def __init__(self, store: "StateStore") -> None:
+        self._store = store
+        self._lock = RLock()
+        self._logs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._latest: Optional[str] = None
+
+    def _put(self, run_id: str, log: Dict[str, Any]) -> None:
+        with self._lock:
+            self._logs[run_id] = log
+            self._logs.move_to_end(run_id)
+            self._latest = run_id
+            limit = max(1, settings.state_run_log_limit)
+            while len(self._logs) > limit:
+                self._logs.popitem(last=False)
+
+    def __getitem__(self, run_id: str) -> Dict[str, Any]:
+        self._store.refresh()
+        with self._lock:
+            log = self._logs[run_id]
+            self._logs.move_to_end(run_id)
+            return log
+
+    def __setitem__(self, run_id: str, log: Dict[str, Any]) -> None:
+        self._put(run_id, log)
+
+    def __delitem__(self, run_id: str) -> None:
+        with self._lock:
+            del self._logs[run_id]
+            if self._latest == run_id:
+                self._latest = next(reversed(self._logs), None)
+
+    def __iter__(self) -> Iterator[str]:
+        self._store.refresh()
+        with self._lock:
+            return iter(list(self._logs))
+
+    def __len__(self) -> int:
+        self._store.refresh()
+        return len(self._logs)
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Return the log of the most recently published run, if it is still retained."""
+
+        self._store.refresh()
+        with self._lock:
+            return self._logs.get(self._latest) if self._latest else None
+
+    def latest_id(self) -> Optional[str]:
+        """Return the id of the most recently published run."""
+
+        self._store.refresh()
+        with self._lock:
+            return self._latest
+
+    def clear(self) -> None:
+        with self._lock:
+            self._logs.clear()
+            self._latest = None
+
+
+def _build_index(rows: Sequence[Dict[str, Any]]) -> Dict[str, List[int]]:
+    index: Dict[str, List[int]] = {}
+    for position, row in enumerate(rows):
+        key = row.get("id")
+        if key is not None:
+            index.setdefault(str(key), []).append(position)
+    return index
+
+
+def _encode_snapshot(
+    sections: Dict[str, Sequence[Dict[str, Any]]],
+    run_id: str,
+    run_log: Dict[str, Any],
+) -> bytes:
+    body = bytearray()
+    layout: Dict[str, Any] = {}
+    for name, rows in sections.items():
+        spans: List[Span] = []
+        for row in rows:
+            encoded = json.dumps(row, ensure_ascii=False, default=str).encode("utf-8")
+            spans.append((len(body), len(encoded)))
+            body += encoded
+        layout[name] = {"spans": spans, "index": _build_index(rows)}
+    header = json.dumps(
+        {"run_id": run_id, "run_log": run_log, "sections": layout},
+        ensure_ascii=False,
+        default=str,
+    ).encode("utf-8")
+    return SNAPSHOT_MAGIC + _HEADER_LENGTH.pack(len(header)) + header + bytes(body)
+
+
+class StateStore:
+    """Owns the corpus tables and run logs and keeps them in step with the snapshot file.
+
+    The tables of one ingest are published together as an immutable :class:`Snapshot`
+    by a single reference swap; readers never see a half-loaded ingest.
+    """
+
+    def __init__(self) -> None:
+        self._lock = RLock()
+        self._snapshot = Snapshot({name: _EMPTY for name in SECTIONS})
+        self.context = RowTable(self, "context")
+        self.glossary = RowTable(self, "glossary")
+        self.style = RowTable(self, "style")
+        self.run_logs = RunLogs(self)
+
+    @staticmethod
+    def _path() -> Optional[str]:
+        return settings.state_snapshot_path or None
+
+    def _replace_tables(self, **tables: TableView) -> None:
+        with self._lock:
+            self._snapshot = self._snapshot.replace(**tables)
+
+    def publish(
+        self,
+        *,
+        context: Sequence[Dict[str, Any]],
+        glossary: Sequence[Dict[str, Any]],
+        style: Sequence[Dict[str, Any]],
+        run_id: str,
+        run_log: Dict[str, Any],
+    ) -> None:
+        """Replace the corpus with a new ingest and make it visible to other workers."""
+
+        sections = {"context": context, "glossary": glossary, "style": style}
+        path = self._path()
+        with self._lock:
+            published = False
+            if path:
+                try:
+                    self._write(path, _encode_snapshot(sections, run_id, run_log))
+                    published = self._load(path)
+                except OSError:
+                    logger.warning("Could not write state snapshot %s; keeping rows in memory", path, exc_info=True)
+            if not published:
+                self._replace_tables(**{name: TableView.from_rows(rows) for name, rows in sections.items()})
+            self.run_logs._put(run_id, run_log)
+
+    @staticmethod
+    def _write(path: str, payload: bytes) -> None:
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(payload)
+            handle.flush()
+            os.fsync(handle.fileno())
+        # Readers keep their mapping of the old inode; new readers pick up the new file.
+        os.replace(temp_path, path)
+
+    def refresh(self) -> None:
+        """Reload the snapshot if another worker (or this one) has published a newer one."""
+
+        self.snapshot()
+
+    def snapshot(self) -> Snapshot:
+        """The current snapshot, reloaded first if a newer one has been published."""
+
+        path = self._path()
+        signature = None
+        if path:
+            try:
+                stat = os.stat(path)
+                signature = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            if signature is not None and signature != self._snapshot.signature:
+                self._load(path)
+            return self._snapshot
+
+    def _load(self, path: str) -> bool:
+        with open(path, "rb") as handle:
+            stat = os.fstat(handle.fileno())
+            signature = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if stat.st_size == 0:
+                return False
+            buf = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic_end = len(SNAPSHOT_MAGIC)
+        if buf[:magic_end] != SNAPSHOT_MAGIC:
+            logger.warning("Ignoring state snapshot %s with unknown format", path)
+            buf.close()
+            self._snapshot = Snapshot(self._snapshot.tables, signature)
+            return False
+        (header_length,) = _HEADER_LENGTH.unpack_from(buf, magic_end)
+        header_start = magic_end + _HEADER_LENGTH.size
+        header = json.loads(buf[header_start : header_start + header_length])
+        base = header_start + header_length
+        tables: Dict[str, TableView] = {}
+        for name in SECTIONS:
+            section = header["sections"].get(name, {"spans": [], "index": {}})
+            spans = [tuple(span) for span in section["spans"]]
+            tables[name] = TableView(section["index"], buf=buf, base=base, spans=spans)
+        self._snapshot = Snapshot(tables, signature)
+        if header.get("run_id"):
+            self.run_logs._put(header["run_id"], header.get("run_log") or {})
+        return True
+
+
+STORE = StateStore()
+
+# Module-level aliases kept for existing callers.
+CONTEXT = STORE.context
+GLOSSARY = STORE.glossary
+STYLE = STORE.style
+RUN_LOGS = STORE.run_logs
+
+__all__ = [
+    "CONTEXT",
+    "GLOSSARY",
+    "RUN_LOGS",
+    "RowTable",
+    "RunLogs",
+    "STORE",
+    "STYLE",
+    "Snapshot",
+    "StateStore",
+    "TableView",
+]
@@ -6,7 +6,7 @@ from datetime import datetime
 from enum import Enum
 from typing import List, Optional
 
-from sqlalchemy import JSON, Boolean, DateTime, Enum as SQLEnum, ForeignKey, Integer, String, Text
+from sqlalchemy import JSON, Boolean, DateTime, Enum as SQLEnum, Float, ForeignKey, Integer, String, Text, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -110,6 +110,15 @@ class RagSourceType(str, Enum):
     CONTEXT = "context"
 
 
+class RagIngestionStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMMITTING = "committing"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
 class DeviceTaxonomy(Base):
     """Managed taxonomy for device identifiers."""
 
@@ -136,6 +145,15 @@ class ExportStatus(str, Enum):
     FAILED = "failed"
 
 
+class BulkDraftJobStatus(str, Enum):
+    PENDING = "pending"
+    PREPARING = "preparing"
+    SUBMITTED = "submitted"
+    PERSISTING = "persisting"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -275,13 +293,36 @@ class GuardrailRule(Base):
     __tablename__ = "guardrail_rules"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
-    scope: Mapped[GuardrailScope] = mapped_column(SQLEnum(GuardrailScope, name="guardrail_scope"), nullable=False)
+    scope: Mapped[GuardrailScope] = mapped_column(SQLEnum(GuardrailScope, name="guardrail_scope"), nullable=False, index=True)
     rule_type: Mapped[GuardrailRuleType] = mapped_column(SQLEnum(GuardrailRuleType, name="guardrail_rule_type"), nullable=False)
     payload_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # Scope targets copied out of ``payload_json`` on write so rule lookups filter on indexes.
+    feature_key: Mapped[Optional[str]] = mapped_column(String(255), index=True)
+    request_id: Mapped[Optional[str]] = mapped_column(String(36), index=True)
     created_by: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
+@event.listens_for(GuardrailRule, "before_insert")
+@event.listens_for(GuardrailRule, "before_update")
+def _index_guardrail_scope(mapper, connection, rule: GuardrailRule) -> None:
+    payload = rule.payload_json or {}
+    feature = payload.get("feature_norm") or payload.get("feature_name")
+    target = payload.get("request_id")
+    rule.feature_key = str(feature) if rule.scope == GuardrailScope.FEATURE and feature else None
+    rule.request_id = str(target) if rule.scope == GuardrailScope.REQUEST and target else None
+
+
+class GuardrailRulesVersion(Base):
+    """Single-row counter bumped in the same transaction as every guardrail rule write."""
+
+    __tablename__ = "guardrail_rules_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
 class RagIngestion(Base):
     __tablename__ = "rag_ingestions"
 
@@ -290,8 +331,14 @@ class RagIngestion(Base):
     source_id: Mapped[Optional[str]] = mapped_column(String(255))
     version: Mapped[Optional[str]] = mapped_column(String(128))
     embedding_vector_id: Mapped[Optional[str]] = mapped_column(String(255))
+    job_id: Mapped[Optional[str]] = mapped_column(String(36), index=True)
+    status: Mapped[RagIngestionStatus] = mapped_column(
+        SQLEnum(RagIngestionStatus, name="rag_ingestion_status"), default=RagIngestionStatus.SUCCEEDED, nullable=False
+    )
     metadata_json: Mapped[Optional[dict]] = mapped_column(JSON)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
 
 
 class ExportJob(Base):
@@ -309,6 +356,47 @@ class ExportJob(Base):
     request: Mapped[Request] = relationship()
 
 
+class BulkDraftJob(Base):
+    """Offline bulk draft generation; the batch id survives restarts so results are never lost."""
+
+    __tablename__ = "bulk_draft_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    status: Mapped[BulkDraftJobStatus] = mapped_column(
+        SQLEnum(BulkDraftJobStatus, name="bulk_draft_job_status"),
+        default=BulkDraftJobStatus.PENDING,
+        nullable=False,
+        index=True,
+    )
+    request_ids: Mapped[list] = mapped_column(JSON, nullable=False)
+    params_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+    model: Mapped[Optional[str]] = mapped_column(String(128))
+    batch_id: Mapped[Optional[str]] = mapped_column(String(255))
+    batch_status: Mapped[Optional[str]] = mapped_column(String(32))
+    input_path: Mapped[Optional[str]] = mapped_column(String(1024))
+    draft_ids: Mapped[Optional[dict]] = mapped_column(JSON)
+    errors: Mapped[Optional[dict]] = mapped_column(JSON)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_by: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    submitted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+class GrammarCheckCacheEntry(Base):
+    """Grammar review shared by all workers, keyed on the checked inputs and prompt version."""
+
+    __tablename__ = "grammar_check_cache"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    prompt_version: Mapped[str] = mapped_column(String(32), nullable=False, index=True)
+    target_language: Mapped[str] = mapped_column(String(32), nullable=False)
+    result_json: Mapped[dict] = mapped_column(JSON, nullable=False)
+    confidence: Mapped[float] = mapped_column(Float, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
@@ -332,10 +420,13 @@ __all__ = [
     "GlossaryEntry",
     "ContextSnippet",
     "GuardrailRule",
+    "GuardrailRulesVersion",
     "RagIngestion",
     "ExportJob",
+    "BulkDraftJob",
     "AuditLog",
     "DeviceTaxonomy",
+    "GrammarCheckCacheEntry",
     "UserRole",
     "RequestStatus",
     "DraftGenerationMethod",
@@ -344,6 +435,8 @@ __all__ = [
     "GuardrailScope",
     "GuardrailRuleType",
     "RagSourceType",
+    "RagIngestionStatus",
     "ExportFormat",
     "ExportStatus",
+    "BulkDraftJobStatus",
 ]
@@ -1,10 +1,34 @@
+import logging
+from contextlib import asynccontextmanager
+
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.v1 import admin, approvals, comments, drafts, ingest, requests, retrieve, translate
 from app.core.auth import RoleMiddleware
+from app.services.drafts.bulk import resume_bulk_draft_jobs
+from app.services.ingest.jobs import fail_abandoned_ingest_jobs
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Bulk draft jobs left unfinished by a previous process keep polling their submitted batches.
+    try:
+        await anyio.to_thread.run_sync(resume_bulk_draft_jobs)
+    except Exception:
+        logger.exception("Could not resume bulk draft jobs")
+    # Ingest jobs whose worker died with a previous process would otherwise stay running forever.
+    try:
+        await anyio.to_thread.run_sync(fail_abandoned_ingest_jobs)
+    except Exception:
+        logger.exception("Could not fail abandoned ingest jobs")
+    yield
+
 
-app = FastAPI(title="UX Writer Assistant Backend (Lab)", version="0.1.0")
+app = FastAPI(title="UX Writer Assistant Backend (Lab)", version="0.1.0", lifespan=lifespan)
 
 app.add_middleware(RoleMiddleware)
 app.add_middleware(
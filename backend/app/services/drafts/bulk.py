@@ -0,0 +1,368 @@
+"""Offline bulk draft generation through a batch-completions backend.
+
+Jobs are ``BulkDraftJob`` rows, so a submitted batch (and the output already paid for)
+survives a restart: :func:`resume_bulk_draft_jobs` takes over unfinished jobs whose worker
+stopped heart-beating and polls their existing batch instead of submitting it again.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import func, select, update
+
+from app.core import metrics
+from app.core.settings import settings
+from app.db import models, session_scope
+from app.services.llm.accounting import call_record, llm_request, record_call
+from app.services.llm.batch import (
+    BATCH_TERMINAL_STATES,
+    BatchBackend,
+    batch_directory,
+    batch_request_line,
+    collect_results,
+    get_batch_backend,
+    write_batch_file,
+)
+from app.services.llm.client import LLMResult
+from app.services.llm.router import get_routing_table
+from app.services.translate.batch import prepare_batch
+from app.services.translate.service import TranslateResponse, _build_response
+
+from .service import DraftGenerationParams, draft_translate_request, persist_ai_drafts
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = (models.BulkDraftJobStatus.SUCCEEDED, models.BulkDraftJobStatus.FAILED)
+
+# Each step is short (prepare and submit, one poll, or persist); the wait between polls runs
+# on a timer, so a batch that takes hours holds no worker and never delays other jobs.
+_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="draft-batch")
+_ACTIVE_LOCK = Lock()
+_ACTIVE: Dict[str, "_Driver"] = {}
+# Requests prepared between heartbeats; one chunk must finish well inside LLM_BATCH_JOB_STALE_SECONDS.
+_PREPARE_CHUNK = 100
+
+
+class BulkDraftJobError(RuntimeError):
+    """Raised when a bulk draft job cannot be started or its batch does not complete."""
+
+
+@dataclass
+class _Driver:
+    """What this process needs to drive a job; rebuilt from the row when a job is resumed."""
+
+    backend: BatchBackend
+    poll_seconds: float
+    prepared: Optional[List[Tuple[str, Any]]] = None
+
+
+def _job_dict(job: models.BulkDraftJob) -> Dict[str, Any]:
+    draft_ids = dict(job.draft_ids or {})  # request id -> draft id
+    errors = dict(job.errors or {})  # request id -> error
+    return {
+        "job_id": job.id,
+        "status": job.status.value,
+        "created_by": job.created_by,
+        "model": job.model,
+        "batch_id": job.batch_id,
+        "batch_status": job.batch_status,
+        "counts": {"requested": len(job.request_ids), "drafts": len(draft_ids), "errors": len(errors)},
+        "draft_ids": draft_ids,
+        "errors": errors,
+        "error": job.error,
+        "created_at": job.created_at,
+        "completed_at": job.completed_at,
+    }
+
+
+def _load(job_id: str) -> Optional[models.BulkDraftJob]:
+    with session_scope() as session:
+        return session.get(models.BulkDraftJob, job_id)
+
+
+def _update_job(job_id: str, **values: Any) -> bool:
+    """Write ``values`` and renew the heartbeat; ``False`` (nothing written) once the job finished."""
+
+    now = datetime.now(timezone.utc)
+    values["heartbeat_at"] = now
+    if values.get("status") in TERMINAL_STATUSES:
+        values["completed_at"] = now
+    stmt = (
+        update(models.BulkDraftJob)
+        .where(models.BulkDraftJob.id == job_id, models.BulkDraftJob.status.not_in(TERMINAL_STATUSES))
+        .values(**values)
+    )
+    with session_scope() as session:
+        return session.execute(stmt).rowcount > 0
+
+
+def _prepare(
+    request_ids: List[str],
+    params: DraftGenerationParams,
+    renew: Callable[[], bool],
+) -> Tuple[List[Tuple[str, Any]], Dict[str, str]]:
+    """Build every translate prompt and its guardrail rules; returns prepared items by position.
+
+    Requests are prepared ``_PREPARE_CHUNK`` at a time and ``renew`` runs after each chunk,
+    so a long prepare keeps the job's heartbeat fresh and no other worker takes it over.
+    """
+
+    items: List[Tuple[str, Any]] = []
+    errors: Dict[str, str] = {}
+    for start in range(0, len(request_ids), _PREPARE_CHUNK):
+        chunk = request_ids[start : start + _PREPARE_CHUNK]
+        with session_scope() as session:
+            stmt = select(models.Request).where(models.Request.id.in_(chunk))
+            found = {request.id: request for request in session.scalars(stmt)}
+            contexts: List[models.Request] = []
+            for request_id in chunk:
+                request = found.get(request_id)
+                if request is None:
+                    errors[request_id] = "Request not found"
+                elif not (request.source_text or "").strip():
+                    errors[request_id] = "Request has no source text"
+                else:
+                    contexts.append(request)
+            translate_requests = [
+                draft_translate_request(request, dataclasses.replace(params, text=request.source_text))
+                for request in contexts
+            ]
+            prepared, failures = prepare_batch(translate_requests, session=session, request_contexts=contexts)
+            context_ids = [request.id for request in contexts]
+        for failure in failures:
+            errors[context_ids[failure["index"]]] = failure["error"]
+        items.extend((context_ids[item.index], item) for item in prepared)
+        if not renew():
+            raise BulkDraftJobError("Job finished elsewhere while its prompts were being prepared")
+    return items, errors
+
+
+def _prepared(job: models.BulkDraftJob, driver: _Driver) -> Dict[str, str]:
+    """Prepare the job's prompts unless this process already has; returns the per-request errors."""
+
+    if driver.prepared is not None:
+        return {}
+    params = DraftGenerationParams(**job.params_json)
+    driver.prepared, errors = _prepare(job.request_ids, params, lambda: _update_job(job.id))
+    return errors
+
+
+def _submit(job: models.BulkDraftJob, driver: _Driver) -> None:
+    _update_job(job.id, status=models.BulkDraftJobStatus.PREPARING)
+    errors = _prepared(job, driver)
+    model = get_routing_table().tier("translate")[0]
+    input_path = batch_directory() / f"{job.id}.input.jsonl"
+    lines = (batch_request_line(request_id, model, item.prompt) for request_id, item in driver.prepared)
+    write_batch_file(input_path, lines)
+    _update_job(job.id, model=model, input_path=str(input_path), errors=errors)
+    if not driver.prepared:
+        raise BulkDraftJobError("No request could be prepared for generation")
+    batch_id = driver.backend.submit(input_path)
+    _update_job(
+        job.id,
+        status=models.BulkDraftJobStatus.SUBMITTED,
+        batch_id=batch_id,
+        submitted_at=datetime.now(timezone.utc),
+    )
+
+
+def _persist(job: models.BulkDraftJob, driver: _Driver) -> None:
+    errors = {**(job.errors or {}), **_prepared(job, driver)}
+    outcomes = collect_results(driver.backend, job.batch_id)
+    submitted_at = job.submitted_at or job.created_at
+    if submitted_at.tzinfo is None:  # SQLite drops the zone
+        submitted_at = submitted_at.replace(tzinfo=timezone.utc)
+    latency_ms = (datetime.now(timezone.utc) - submitted_at).total_seconds() * 1000.0
+
+    responses: Dict[str, TranslateResponse] = {}
+    for request_id, item in driver.prepared:
+        outcome = outcomes.get(request_id)
+        if not isinstance(outcome, LLMResult):
+            errors[request_id] = str(outcome) if outcome is not None else f"Missing from batch ({job.batch_status})"
+            continue
+        with llm_request(request_id):
+            record_call(call_record(item.prompt, outcome.model or job.model, latency_ms, outcome))
+        # Guardrails for every result are applied here in one pass, with rules loaded up front.
+        response = _build_response(item.request, outcome, item.rules, item.retrieval, item.report)
+        response.metadata["llm"].update({"latency_ms": round(latency_ms, 3), "batch_id": job.batch_id})
+        responses[request_id] = response
+
+    with session_scope() as session:
+        # The drafts and the job's completion commit together, so a job resumed mid-persist
+        # (or persisted by two workers) never creates its drafts twice.
+        row = session.get(models.BulkDraftJob, job.id, with_for_update=True)
+        if row is None or row.status != models.BulkDraftJobStatus.PERSISTING:
+            return
+        creator = session.get(models.User, job.created_by)
+        stmt = select(models.Request).where(models.Request.id.in_(list(responses)))
+        requests = {request.id: request for request in session.scalars(stmt)}
+        drafts = persist_ai_drafts(
+            session,
+            created_by=creator,
+            responses=[(requests[request_id], response) for request_id, response in responses.items()],
+            extra_metadata={"bulk": {"job_id": job.id, "batch_id": job.batch_id}},
+        )
+        now = datetime.now(timezone.utc)
+        row.status = models.BulkDraftJobStatus.SUCCEEDED
+        row.draft_ids = {draft.request_id: draft.id for draft in drafts}
+        row.errors = errors
+        row.heartbeat_at = now
+        row.completed_at = now
+
+    metrics.increment("drafts.bulk.generated", len(drafts))
+    metrics.increment("drafts.bulk.errors", len(errors))
+
+
+def _advance(job: models.BulkDraftJob, driver: _Driver) -> bool:
+    """Run the job's next stage; ``True`` while its batch is still running and needs another poll."""
+
+    if job.batch_id is None:
+        _submit(job, driver)
+        job = _load(job.id)
+    if job.status == models.BulkDraftJobStatus.SUBMITTED:
+        batch_status = driver.backend.status(job.batch_id)
+        if not _update_job(job.id, batch_status=batch_status):
+            return False
+        if batch_status not in BATCH_TERMINAL_STATES:
+            return True
+        # Expired batches still return the requests that finished inside the window.
+        if batch_status not in {"completed", "expired"}:
+            raise BulkDraftJobError(f"Batch {job.batch_id} ended as {batch_status}")
+        _update_job(job.id, status=models.BulkDraftJobStatus.PERSISTING)
+        job = _load(job.id)
+    _persist(job, driver)
+    return False
+
+
+def _step(job_id: str) -> None:
+    with _ACTIVE_LOCK:
+        driver = _ACTIVE.get(job_id)
+    if driver is None:
+        return
+    try:
+        job = _load(job_id)
+        again = job is not None and job.status not in TERMINAL_STATUSES and _advance(job, driver)
+    except Exception as exc:
+        logger.exception("Bulk draft job %s failed", job_id)
+        _update_job(job_id, status=models.BulkDraftJobStatus.FAILED, error=str(exc) or exc.__class__.__name__)
+        again = False
+    if again:
+        _schedule(job_id, driver.poll_seconds)
+    else:
+        with _ACTIVE_LOCK:
+            _ACTIVE.pop(job_id, None)
+
+
+def _schedule(job_id: str, delay: float) -> None:
+    if delay <= 0:
+        _EXECUTOR.submit(_step, job_id)
+        return
+    timer = threading.Timer(delay, _EXECUTOR.submit, args=(_step, job_id))
+    timer.daemon = True
+    timer.start()
+
+
+def _drive(job_id: str, driver: _Driver) -> None:
+    with _ACTIVE_LOCK:
+        _ACTIVE[job_id] = driver
+    _schedule(job_id, 0)
+
+
+def resume_bulk_draft_jobs(
+    *,
+    backend: Optional[BatchBackend] = None,
+    poll_seconds: Optional[float] = None,
+) -> List[str]:
+    """Take over unfinished jobs without a heartbeat for ``LLM_BATCH_JOB_STALE_SECONDS``.
+
+    Run at startup and whenever a job is started. A job whose batch was submitted keeps
+    polling that batch; one that died before submitting is prepared and submitted again.
+    Returns the ids of the jobs this process resumed.
+    """
+
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(seconds=settings.llm_batch_job_stale_seconds)
+    last_seen = func.coalesce(models.BulkDraftJob.heartbeat_at, models.BulkDraftJob.created_at)
+    unfinished = (models.BulkDraftJob.status.not_in(TERMINAL_STATUSES), last_seen < cutoff)
+    with session_scope() as session:
+        stale = list(session.scalars(select(models.BulkDraftJob.id).where(*unfinished)))
+    with _ACTIVE_LOCK:
+        stale = [job_id for job_id in stale if job_id not in _ACTIVE]
+    if not stale:
+        return []
+
+    backend = backend or get_batch_backend()
+    poll_seconds = settings.llm_batch_poll_seconds if poll_seconds is None else poll_seconds
+    resumed: List[str] = []
+    for job_id in stale:
+        # Claiming renews the heartbeat in one conditional UPDATE, so only one worker resumes a job.
+        claim = update(models.BulkDraftJob).where(models.BulkDraftJob.id == job_id, *unfinished).values(heartbeat_at=now)
+        with session_scope() as session:
+            claimed = session.execute(claim).rowcount > 0
+        if claimed:
+            logger.info("Resuming bulk draft job %s", job_id)
+            _drive(job_id, _Driver(backend, poll_seconds))
+            resumed.append(job_id)
+    return resumed
+
+
+def start_bulk_draft_job(
+    request_ids: List[str],
+    *,
+    params: DraftGenerationParams,
+    created_by: str,
+    backend: Optional[BatchBackend] = None,
+    poll_seconds: Optional[float] = None,
+) -> str:
+    """Queue batch generation of one AI draft per request; ``params.text`` is ignored.
+
+    Each request's ``source_text`` is translated with ``params``. The job writes all
+    prompts to a JSONL batch file, submits it to ``backend`` (``LLM_BATCH_BACKEND`` by
+    default), polls every ``poll_seconds`` until it finishes, then persists the drafts
+    together. Requests that fail are reported per id without affecting the others.
+    Raises ``LLMClientError`` when the batch backend is not configured.
+    """
+
+    unique_ids = list(dict.fromkeys(request_ids))
+    if not unique_ids:
+        raise BulkDraftJobError("No requests selected")
+    backend = backend or get_batch_backend()
+    poll_seconds = settings.llm_batch_poll_seconds if poll_seconds is None else poll_seconds
+    job_id = str(uuid4())
+    params_json = dataclasses.asdict(dataclasses.replace(params, text=""))
+    with session_scope() as session:
+        session.add(
+            models.BulkDraftJob(
+                id=job_id,
+                status=models.BulkDraftJobStatus.PENDING,
+                request_ids=unique_ids,
+                params_json=params_json,
+                created_by=created_by,
+                heartbeat_at=datetime.now(timezone.utc),
+            )
+        )
+    _drive(job_id, _Driver(backend, poll_seconds))
+    resume_bulk_draft_jobs(backend=backend, poll_seconds=poll_seconds)
+    return job_id
+
+
+def get_bulk_draft_job(job_id: str) -> Optional[Dict[str, Any]]:
+    job = _load(job_id)
+    return _job_dict(job) if job is not None else None
+
+
+__all__ = [
+    "BulkDraftJobError",
+    "get_bulk_draft_job",
+    "resume_bulk_draft_jobs",
+    "start_bulk_draft_job",
+]
@@ -12,10 +12,16 @@ from sqlalchemy.orm import Session
 from app.db import models
 from app.services.audit.service import record_audit_event
 from app.services.comments.service import create_comment
-from app.services.grammar.service import check_grammar_and_style, GrammarCheckError
-from app.services.guardrails.loader import load_guardrail_rules
-from app.services.guardrails.service import apply_guardrails
-from app.services.translate.service import TranslateOptions, TranslateRequest, translate
+from app.services.llm.accounting import llm_request
+from app.services.translate.service import TranslateOptions, TranslateRequest, TranslateResponse, translate
+
+from .validation import (
+    completed_validation,
+    pending_validation,
+    target_language,
+    validate_content,
+    validation_summary,
+)
 
 
 @dataclass
@@ -31,6 +37,29 @@ class DraftGenerationParams:
     temperature: Optional[float] = None
 
 
+def draft_translate_request(request: models.Request, params: DraftGenerationParams) -> TranslateRequest:
+    """Build the translation request used to generate candidates for ``request``."""
+
+    return TranslateRequest(
+        text=params.text,
+        source_language=params.source_language,
+        target_language=params.target_language,
+        hints=params.hints,
+        glossary=params.glossary,
+        options=TranslateOptions(
+            tone=request.tone,
+            use_rag=params.use_rag,
+            rag_top_k=params.rag_top_k,
+            guardrails=True,
+            temperature=params.temperature,
+            num_candidates=params.num_candidates,
+            device=(request.constraints_json or {}).get("device") if request.constraints_json else None,
+            feature_norm=(request.constraints_json or {}).get("feature_norm") if request.constraints_json else None,
+            style_tag=(request.constraints_json or {}).get("style_tag") if request.constraints_json else None,
+        ),
+    )
+
+
 def generate_ai_draft(
     session: Session,
     *,
@@ -40,65 +69,86 @@ def generate_ai_draft(
 ) -> models.Draft:
     """Generate AI-backed draft candidates and persist versions."""
 
-    llm_run_id = str(uuid4())
-    translate_response = translate(
-        TranslateRequest(
-            text=params.text,
-            source_language=params.source_language,
-            target_language=params.target_language,
-            hints=params.hints,
-            glossary=params.glossary,
-            options=TranslateOptions(
-                tone=request.tone,
-                use_rag=params.use_rag,
-                rag_top_k=params.rag_top_k,
-                guardrails=True,
-                temperature=params.temperature,
-                num_candidates=params.num_candidates,
-                device=(request.constraints_json or {}).get("device") if request.constraints_json else None,
-                feature_norm=(request.constraints_json or {}).get("feature_norm") if request.constraints_json else None,
-                style_tag=(request.constraints_json or {}).get("style_tag") if request.constraints_json else None,
-            ),
-        ),
-        session=session,
-        request_context=request,
-    )
+    with llm_request(request.id):
+        translate_response = translate(
+            draft_translate_request(request, params),
+            session=session,
+            request_context=request,
+        )
+    return persist_ai_draft(session, request=request, created_by=created_by, translate_response=translate_response)
+
 
+def _ai_draft_rows(
+    request: models.Request,
+    created_by: models.User,
+    translate_response: TranslateResponse,
+    extra_metadata: Optional[Dict[str, Any]] = None,
+) -> Tuple[models.Draft, List[models.DraftVersion]]:
     draft = models.Draft(
         id=str(uuid4()),
         request_id=request.id,
-        llm_run_id=llm_run_id,
+        llm_run_id=str(uuid4()),
         generation_method=models.DraftGenerationMethod.AI,
         created_by=created_by.id,
     )
-    session.add(draft)
-    session.flush()
 
     metadata_base = {
         "retrieval": translate_response.metadata.get("retrieval"),
         "novelty_mode": translate_response.metadata.get("novelty_mode"),
+        "target_language": translate_response.metadata.get("target_language"),
+        # Token, latency and prompt-revision accounting for cost/latency regression tracing.
+        "llm": translate_response.metadata.get("llm"),
+        "prompt": translate_response.metadata.get("prompt"),
+        **(extra_metadata or {}),
     }
 
     versions: List[models.DraftVersion] = []
     for idx, candidate in enumerate(translate_response.candidates, start=1):
         guardrail_result = candidate.guardrail or translate_response.metadata.get("guardrails")
         content = guardrail_result.get("fixed", candidate.text) if guardrail_result else candidate.text
-        version = models.DraftVersion(
-            id=str(uuid4()),
-            draft_id=draft.id,
-            version_index=idx,
-            content=content,
-            metadata_json={
-                **metadata_base,
-                "candidate_index": idx,
-                "original_text": candidate.text,
-                "guardrail_result": guardrail_result,
-            },
-            created_by=created_by.id,
+        versions.append(
+            models.DraftVersion(
+                id=str(uuid4()),
+                draft_id=draft.id,
+                version_index=idx,
+                content=content,
+                metadata_json={
+                    **metadata_base,
+                    "candidate_index": idx,
+                    "original_text": candidate.text,
+                    "guardrail_result": guardrail_result,
+                },
+                created_by=created_by.id,
+            )
         )
-        session.add(version)
-        versions.append(version)
+    return draft, versions
+
+
+def _generated_payload(
+    request: models.Request,
+    versions: List[models.DraftVersion],
+    translate_response: TranslateResponse,
+) -> Dict[str, Any]:
+    return {
+        "request_id": request.id,
+        "candidate_count": len(versions),
+        "novelty_mode": translate_response.metadata.get("novelty_mode"),
+    }
+
 
+def persist_ai_draft(
+    session: Session,
+    *,
+    request: models.Request,
+    created_by: models.User,
+    translate_response: TranslateResponse,
+) -> models.Draft:
+    """Persist translated candidates as a new AI draft with one version per candidate."""
+
+    draft, versions = _ai_draft_rows(request, created_by, translate_response)
+    session.add(draft)
+    session.flush()
+    session.add_all(versions)
     session.flush()
     draft.versions = versions
     session.refresh(draft)
@@ -107,16 +157,46 @@ def generate_ai_draft(
         entity_type="draft",
         entity_id=draft.id,
         action="generated",
-        payload={
-            "request_id": request.id,
-            "candidate_count": len(versions),
-            "novelty_mode": metadata_base.get("novelty_mode"),
-        },
+        payload=_generated_payload(request, versions, translate_response),
         actor_id=created_by.id,
     )
     return draft
 
 
+def persist_ai_drafts(
+    session: Session,
+    *,
+    created_by: models.User,
+    responses: List[Tuple[models.Request, TranslateResponse]],
+    extra_metadata: Optional[Dict[str, Any]] = None,
+) -> List[models.Draft]:
+    """Persist many AI drafts, their versions and audit events with a single flush.
+
+    Used by bulk generation, where per-draft round trips would dominate; rows are
+    identical to :func:`persist_ai_draft` apart from ``extra_metadata`` on each version.
+    """
+
+    drafts: List[models.Draft] = []
+    rows: List[object] = []
+    for request, translate_response in responses:
+        draft, versions = _ai_draft_rows(request, created_by, translate_response, extra_metadata)
+        drafts.append(draft)
+        rows.append(draft)
+        rows.extend(versions)
+        rows.append(
+            models.AuditLog(
+                entity_type="draft",
+                entity_id=draft.id,
+                action="generated",
+                payload_json=_generated_payload(request, versions, translate_response),
+                actor_id=created_by.id,
+            )
+        )
+    session.add_all(rows)
+    session.flush()
+    return drafts
+
+
 def select_draft_version(
     session: Session,
     *,
@@ -125,9 +205,15 @@ def select_draft_version(
     actor: models.User,
     comment_text: Optional[str] = None,
     edited_content: Optional[str] = None,
+    validate_inline: bool = False,
 ) -> Tuple[models.SelectedDraftVersion, Dict[str, Any]]:
     """Select a draft version for designer review.
 
+    Edited content is validated (guardrails and grammar) on a background worker by
+    default: the new version is marked ``pending`` and the caller queues
+    :func:`~app.services.drafts.validation.queue_version_validation` after commit.
+    ``validate_inline`` runs the checks before selecting instead.
+
     Args:
         session: Database session
         draft: Draft to select from
@@ -135,6 +221,7 @@ def select_draft_version(
         actor: User performing the action
         comment_text: Optional comment about the selection
         edited_content: Optional edited text (creates new MANUAL version)
+        validate_inline: Validate edited content before returning
 
     Returns:
         Tuple of (SelectedDraftVersion, metadata dict with validation results)
@@ -147,6 +234,7 @@ def select_draft_version(
         "grammar_check_result": None,
         "comment_id": None,
         "new_version_created": False,
+        "validation_status": None,
     }
 
     actual_version = version
@@ -154,36 +242,18 @@ def select_draft_version(
 
     # If writer edited the content, create a new manual version
     if edited_content and edited_content.strip():
-        # 1. Run guardrail check
-        guardrail_result = None
-        try:
-            rules = load_guardrail_rules(session, request=request)
-            guardrail_result = apply_guardrails(
-                edited_content,
-                rules,
-                hints={},
-                apply_fix=True,
+        guardrail_result = grammar_check_result = None
+        language = target_language(request, version)
+        if validate_inline:
+            guardrail_result, grammar_check_result = validate_content(
+                session, request, edited_content, language=language
             )
             validation_metadata["guardrail_result"] = guardrail_result
-        except Exception:
-            # If guardrail fails, continue without it
-            pass
-
-        # 2. Run LLM grammar check
-        grammar_check_result = None
-        try:
-            grammar_check_result = check_grammar_and_style(
-                text=edited_content,
-                target_language="en",  # TODO: Get from request context
-                tone=request.tone,
-                style_preferences=request.style_preferences,
-            )
             validation_metadata["grammar_check_result"] = grammar_check_result
-        except GrammarCheckError:
-            # If grammar check fails, continue without it
-            pass
+        validation = completed_validation() if validate_inline else pending_validation(actor.id)
+        validation_metadata["validation_status"] = validation["status"]
 
-        # 3. Create new manual version with edited content
+        # Create new manual version with edited content
         new_version = models.DraftVersion(
             id=str(uuid4()),
             draft_id=draft.id,
@@ -192,8 +262,10 @@ def select_draft_version(
             metadata_json={
                 "original_version_id": version.id,
                 "edited_by": actor.id,
+                "target_language": language,
                 "guardrail_result": guardrail_result,
                 "grammar_check_result": grammar_check_result,
+                "validation": validation,
             },
             created_by=actor.id,
         )
@@ -204,17 +276,15 @@ def select_draft_version(
         actual_version = new_version
         validation_metadata["new_version_created"] = True
 
+        audit_payload: Dict[str, Any] = {"original_version_id": version.id, "new_version_id": new_version.id}
+        if validate_inline:
+            audit_payload.update(validation_summary(guardrail_result, grammar_check_result))
         record_audit_event(
             session,
             entity_type="draft",
             entity_id=draft.id,
             action="version_edited",
-            payload={
-                "original_version_id": version.id,
-                "new_version_id": new_version.id,
-                "has_guardrail_violations": not guardrail_result.get("passes", True) if guardrail_result else False,
-                "has_grammar_issues": grammar_check_result.get("has_issues", False) if grammar_check_result else False,
-            },
+            payload=audit_payload,
             actor_id=actor.id,
         )
 
@@ -302,7 +372,10 @@ def clear_draft_selection(
 
 __all__ = [
     "DraftGenerationParams",
+    "draft_translate_request",
     "generate_ai_draft",
+    "persist_ai_draft",
+    "persist_ai_drafts",
     "select_draft_version",
     "clear_draft_selection",
 ]
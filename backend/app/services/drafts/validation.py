@@ -0,0 +1,279 @@
+"""Guardrail and grammar validation of writer-edited draft versions.
+
+Selecting an edited version no longer waits for validation: the version is stored
+with a ``pending`` validation marker and :func:`queue_version_validation` runs the
+checks on a background worker once the selection has been committed. Results land
+in the version's ``metadata_json`` so any process can serve them. A version still
+pending after ``DRAFT_VALIDATION_STALE_SECONDS`` (its worker restarted) is queued
+again by the next reader.
+"""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.settings import settings
+from app.db import models, session_scope
+from app.services.audit.service import record_audit_event
+from app.services.grammar.service import GrammarCheckError, check_grammar_and_style
+from app.services.guardrails.loader import load_guardrail_rules
+from app.services.guardrails.service import apply_guardrails
+from app.services.llm.accounting import llm_request
+
+logger = logging.getLogger(__name__)
+
+VALIDATION_PENDING = "pending"
+VALIDATION_COMPLETED = "completed"
+VALIDATION_FAILED = "failed"
+VALIDATION_TERMINAL_STATES = frozenset({VALIDATION_COMPLETED, VALIDATION_FAILED})
+
+# Each validation is one guardrail pass and at most one LLM call, so a few workers keep up with writers.
+_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="draft-validation")
+_QUEUED_LOCK = Lock()
+_QUEUED: Set[str] = set()
+
+DEFAULT_TARGET_LANGUAGE = "en"
+
+
+def target_language(request: models.Request, version: Optional[models.DraftVersion] = None) -> str:
+    """Language a draft of ``request`` is written in.
+
+    Generated versions record the language they were translated into and edits inherit
+    it; otherwise the request's ``constraints_json`` may name one.
+    """
+
+    language = (version.metadata_json or {}).get("target_language") if version is not None else None
+    language = language or (request.constraints_json or {}).get("target_language")
+    return language or DEFAULT_TARGET_LANGUAGE
+
+
+def _guardrail_rules(session: Session, request: models.Request) -> Optional[Dict[str, Any]]:
+    try:
+        return load_guardrail_rules(session, request=request)
+    except Exception:
+        logger.warning("Loading guardrail rules failed for request %s", request.id, exc_info=True)
+        return None
+
+
+def _check_content(
+    content: str,
+    rules: Optional[Dict[str, Any]],
+    *,
+    request_id: str,
+    language: str,
+    tone: Optional[str],
+    style_preferences: Optional[str],
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    guardrail_result = None
+    if rules is not None:
+        try:
+            guardrail_result = apply_guardrails(content, rules, hints={}, apply_fix=True)
+        except Exception:
+            # If guardrail fails, continue without it
+            logger.warning("Guardrail check failed for request %s", request_id, exc_info=True)
+
+    grammar_check_result = None
+    try:
+        with llm_request(request_id):
+            grammar_check_result = check_grammar_and_style(
+                text=content,
+                target_language=language,
+                tone=tone,
+                style_preferences=style_preferences,
+            )
+    except GrammarCheckError:
+        # If grammar check fails, continue without it
+        pass
+    return guardrail_result, grammar_check_result
+
+
+def validate_content(
+    session: Session,
+    request: models.Request,
+    content: str,
+    *,
+    language: str = DEFAULT_TARGET_LANGUAGE,
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """Run guardrails and the grammar check on ``content``; a failing check yields ``None``."""
+
+    return _check_content(
+        content,
+        _guardrail_rules(session, request),
+        request_id=request.id,
+        language=language,
+        tone=request.tone,
+        style_preferences=request.style_preferences,
+    )
+
+
+def validation_summary(
+    guardrail_result: Optional[Dict[str, Any]],
+    grammar_check_result: Optional[Dict[str, Any]],
+) -> Dict[str, bool]:
+    return {
+        "has_guardrail_violations": not guardrail_result.get("passes", True) if guardrail_result else False,
+        "has_grammar_issues": grammar_check_result.get("has_issues", False) if grammar_check_result else False,
+    }
+
+
+def _validation_marker(status: str, **extra: Any) -> Dict[str, Any]:
+    return {"status": status, "updated_at": datetime.now(timezone.utc).isoformat(), **extra}
+
+
+def pending_validation(actor_id: Optional[str] = None, attempts: int = 1) -> Dict[str, Any]:
+    """The ``validation`` metadata entry of a version whose checks are queued."""
+
+    return _validation_marker(VALIDATION_PENDING, actor_id=actor_id, attempts=attempts)
+
+
+def completed_validation() -> Dict[str, Any]:
+    return _validation_marker(VALIDATION_COMPLETED)
+
+
+def _store_result(version_id: str, **updates: Any) -> None:
+    with session_scope() as session:
+        version = session.get(models.DraftVersion, version_id)
+        if version is not None:
+            version.metadata_json = {**(version.metadata_json or {}), **updates}
+
+
+def _run_validation(version_id: str, actor_id: str) -> None:
+    try:
+        # Read what the checks need and release the connection before the LLM call.
+        with session_scope() as session:
+            version = session.get(models.DraftVersion, version_id)
+            if version is None:
+                logger.warning("Draft version %s vanished before validation", version_id)
+                return
+            request = version.draft.request
+            draft_id, content = version.draft_id, version.content
+            rules = _guardrail_rules(session, request)
+            check = {
+                "request_id": request.id,
+                "language": target_language(request, version),
+                "tone": request.tone,
+                "style_preferences": request.style_preferences,
+            }
+
+        guardrail_result, grammar_check_result = _check_content(content, rules, **check)
+
+        with session_scope() as session:
+            version = session.get(models.DraftVersion, version_id)
+            if version is None:
+                logger.warning("Draft version %s vanished during validation", version_id)
+                return
+            version.metadata_json = {
+                **(version.metadata_json or {}),
+                "guardrail_result": guardrail_result,
+                "grammar_check_result": grammar_check_result,
+                "validation": completed_validation(),
+            }
+            record_audit_event(
+                session,
+                entity_type="draft",
+                entity_id=draft_id,
+                action="version_validated",
+                payload={"version_id": version_id, **validation_summary(guardrail_result, grammar_check_result)},
+                actor_id=actor_id,
+            )
+        metrics.increment("drafts.validation.completed")
+    except Exception as exc:
+        logger.exception("Validation of draft version %s failed", version_id)
+        metrics.increment("drafts.validation.failed")
+        _store_result(version_id, validation=_validation_marker(VALIDATION_FAILED, error=str(exc)))
+    finally:
+        with _QUEUED_LOCK:
+            _QUEUED.discard(version_id)
+
+
+def queue_version_validation(version_id: str, *, actor_id: str) -> None:
+    """Validate ``version_id`` on the background worker.
+
+    Call only after the transaction that created the version has committed; the
+    worker reads it through its own session.
+    """
+
+    metrics.increment("drafts.validation.queued")
+    with _QUEUED_LOCK:
+        _QUEUED.add(version_id)
+    _EXECUTOR.submit(_run_validation, version_id, actor_id)
+
+
+def _is_stale(marker: Dict[str, Any], now: datetime) -> bool:
+    if marker.get("status") != VALIDATION_PENDING:
+        return False
+    try:
+        updated_at = datetime.fromisoformat(marker["updated_at"])
+    except (KeyError, TypeError, ValueError):
+        return True
+    return (now - updated_at).total_seconds() >= settings.draft_validation_stale_seconds
+
+
+def requeue_stale_validation(version_id: str) -> bool:
+    """Queue again a validation left ``pending`` by a worker that stopped (e.g. a restart).
+
+    The version's marker is renewed in the same transaction, so only one reader
+    re-queues it. Returns whether the validation was queued.
+    """
+
+    with _QUEUED_LOCK:
+        if version_id in _QUEUED:
+            return False
+    now = datetime.now(timezone.utc)
+    with session_scope() as session:
+        stmt = select(models.DraftVersion).where(models.DraftVersion.id == version_id).with_for_update()
+        version = session.scalar(stmt)
+        marker = ((version.metadata_json or {}).get("validation") or {}) if version is not None else {}
+        if not _is_stale(marker, now):
+            return False
+        actor_id = marker.get("actor_id") or version.created_by
+        version.metadata_json = {
+            **(version.metadata_json or {}),
+            "validation": pending_validation(actor_id, attempts=int(marker.get("attempts") or 1) + 1),
+        }
+    logger.info("Re-queueing stale validation of draft version %s", version_id)
+    metrics.increment("drafts.validation.requeued")
+    queue_version_validation(version_id, actor_id=actor_id)
+    return True
+
+
+def get_version_validation(version: models.DraftVersion) -> Dict[str, Any]:
+    """Validation state and results of ``version`` as stored in its metadata."""
+
+    meta = version.metadata_json or {}
+    marker = meta.get("validation") or {}
+    return {
+        "draft_id": version.draft_id,
+        "version_id": version.id,
+        # Versions that were never edited carry no marker and no results.
+        "status": marker.get("status"),
+        "guardrail_result": meta.get("guardrail_result"),
+        "grammar_check_result": meta.get("grammar_check_result"),
+        "error": marker.get("error"),
+        "updated_at": marker.get("updated_at"),
+    }
+
+
+__all__ = [
+    "DEFAULT_TARGET_LANGUAGE",
+    "VALIDATION_COMPLETED",
+    "VALIDATION_FAILED",
+    "VALIDATION_PENDING",
+    "VALIDATION_TERMINAL_STATES",
+    "completed_validation",
+    "get_version_validation",
+    "pending_validation",
+    "queue_version_validation",
+    "requeue_stale_validation",
+    "target_language",
+    "validate_content",
+    "validation_summary",
+]
@@ -1,5 +1,5 @@
 """Grammar and style checking service."""
 
-from .service import GrammarCheckError, check_grammar_and_style
+from .service import GrammarCheckError, check_grammar_and_style, grammar_stats
 
-__all__ = ["check_grammar_and_style", "GrammarCheckError"]
+__all__ = ["check_grammar_and_style", "grammar_stats", "GrammarCheckError"]
@@ -0,0 +1,110 @@
+"""Database-backed cache of LLM grammar reviews, shared by all workers."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Dict, Optional, Set
+
+from sqlalchemy import delete, or_
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.core import metrics
+from app.core.settings import settings
+from app.db import models, session_scope
+
+logger = logging.getLogger(__name__)
+
+_PURGED: Set[str] = set()
+_PURGE_LOCK = Lock()
+
+
+def grammar_cache_key(
+    text: str,
+    target_language: str,
+    tone: Optional[str],
+    style_preferences: Optional[str],
+    prompt_version: str,
+) -> str:
+    payload = json.dumps([text, target_language, tone, style_preferences, prompt_version], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _expiry_cutoff() -> Optional[datetime]:
+    if not settings.grammar_cache_ttl_seconds:
+        return None
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.grammar_cache_ttl_seconds)
+
+
+def _purge_stale_entries(prompt_version: str) -> None:
+    """Once per process and prompt version, drop expired reviews and those of other prompt templates.
+
+    The version is only marked purged after the delete commits, so a failed purge is retried.
+    """
+
+    with _PURGE_LOCK:
+        if prompt_version in _PURGED:
+            return
+    entry = models.GrammarCheckCacheEntry
+    stale = entry.prompt_version != prompt_version
+    cutoff = _expiry_cutoff()
+    if cutoff is not None:
+        stale = or_(stale, entry.created_at < cutoff)
+    with session_scope() as session:
+        removed = session.execute(delete(entry).where(stale)).rowcount
+    with _PURGE_LOCK:
+        _PURGED.add(prompt_version)
+    if removed:
+        logger.info("Dropped %s expired or outdated grammar reviews", removed)
+
+
+def get_cached_review(key: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+    try:
+        _purge_stale_entries(prompt_version)
+        with session_scope() as session:
+            entry = session.get(models.GrammarCheckCacheEntry, key)
+            review = dict(entry.result_json) if entry is not None else None
+            created_at = entry.created_at if entry is not None else None
+            cutoff = _expiry_cutoff()
+            if review is not None and cutoff is not None:
+                if created_at.tzinfo is None:  # SQLite drops the zone
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                if created_at < cutoff:
+                    session.delete(entry)  # expired since the purge; evict it on read
+                    review = None
+    except SQLAlchemyError:
+        logger.warning("Grammar cache lookup failed; checking without it", exc_info=True)
+        return None
+    metrics.increment("grammar.cache.hits" if review is not None else "grammar.cache.misses")
+    return review
+
+
+def store_review(key: str, prompt_version: str, target_language: str, review: Dict[str, Any]) -> None:
+    """Cache ``review`` unless its confidence is too low to be worth repeating."""
+
+    confidence = float(review.get("confidence", 0.0))
+    if confidence < settings.grammar_cache_min_confidence:
+        metrics.increment("grammar.cache.low_confidence")
+        return
+    try:
+        with session_scope() as session:
+            session.merge(
+                models.GrammarCheckCacheEntry(
+                    key=key,
+                    prompt_version=prompt_version,
+                    target_language=target_language,
+                    result_json=review,
+                    confidence=confidence,
+                    created_at=datetime.now(timezone.utc),
+                )
+            )
+    except IntegrityError:
+        pass  # Another worker cached the same review first.
+    except SQLAlchemyError:
+        logger.warning("Could not cache grammar review", exc_info=True)
+
+
+__all__ = ["get_cached_review", "grammar_cache_key", "store_review"]
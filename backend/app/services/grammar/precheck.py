@@ -0,0 +1,228 @@
+"""Rule-based grammar pre-check that runs before (and often instead of) the LLM review."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Frequent misspellings in UI copy; the dictionary lists only unambiguous errors.
+_EN_MISSPELLINGS: Dict[str, str] = {
+    "accomodate": "accommodate",
+    "acheive": "achieve",
+    "adress": "address",
+    "alot": "a lot",
+    "begining": "beginning",
+    "calender": "calendar",
+    "cancelation": "cancellation",
+    "completly": "completely",
+    "conection": "connection",
+    "definately": "definitely",
+    "enviroment": "environment",
+    "existant": "existent",
+    "occured": "occurred",
+    "occurence": "occurrence",
+    "paramter": "parameter",
+    "prefered": "preferred",
+    "recieve": "receive",
+    "reciept": "receipt",
+    "seperate": "separate",
+    "succesful": "successful",
+    "successfull": "successful",
+    "sucessfully": "successfully",
+    "teh": "the",
+    "temperture": "temperature",
+    "untill": "until",
+    "wich": "which",
+    "wierd": "weird",
+}
+_KO_MISSPELLINGS: Dict[str, str] = {
+    "되요": "돼요",
+    "됬": "됐",
+    "몇일": "며칠",
+    "어떻해": "어떡해",
+    "할께": "할게",
+    "왠만하면": "웬만하면",
+    "금새": "금세",
+    "오랫만": "오랜만",
+    "설겆이": "설거지",
+    "희안": "희한",
+}
+# Words that clash with a requested tone, keyed by a keyword of the tone description.
+_TONE_CONFLICTS: Dict[str, Tuple[str, ...]] = {
+    "formal": ("gonna", "wanna", "gotta", "hey", "oops", "yeah", "yep", "nope", "awesome", "cool", "ㅋㅋ", "ㅎㅎ"),
+    "professional": ("gonna", "wanna", "gotta", "oops", "yeah", "awesome", "ㅋㅋ", "ㅎㅎ"),
+    "polite": ("gonna", "wanna", "hey", "must", "ㅋㅋ"),
+    "concise": ("please note that", "in order to", "at this point in time", "kindly"),
+    "friendly": ("must not", "prohibited", "failure to", "you are required"),
+}
+
+_WORD = re.compile(r"[^\W\d_]+", re.UNICODE)
+_DOUBLED_WORD = re.compile(r"\b([^\W\d_]+)\s+\1\b", re.IGNORECASE | re.UNICODE)
+_MULTI_SPACE = re.compile(r"(?<=\S) {2,}(?=\S)")
+_SPACE_BEFORE_PUNCT = re.compile(r"(?<=\w)[ \t]+(?:[,!?;:]|\.(?=\s|$))")
+_MISSING_SPACE_AFTER = re.compile(r"[,;!?](?=[A-Za-z가-힣])|(?<=[a-z])\.(?=[A-Z][a-z])")
+_REPEATED_PUNCT = re.compile(r"([!?,;:])\1+|(?<!\.)\.\.(?!\.)")
+_SENTENCE_START = re.compile(r"(?:^|[.!?]\s+)([a-z])(?![A-Z])")
+_LOWERCASE_I = re.compile(r"(?<![\w.])i(?=[\s'’]|$)")
+_SENTENCE = re.compile(r"[^.!?。\n]+(?:[.!?。]+|$)")
+_BRACKETS = {"(": ")", "[": "]", "{": "}"}
+# A sentence does not end after these, so the next word may stay lowercase.
+_NO_BREAK_SUFFIXES = ("e.g.", "i.e.", "etc.", "vs.", "...", "…")
+
+
+@dataclass(slots=True)
+class LocalIssue:
+    type: str
+    message: str
+    severity: str
+    start: int
+    end: int
+
+    def as_issue(self) -> Dict[str, str]:
+        return {"type": self.type, "message": self.message, "severity": self.severity}
+
+
+@dataclass(slots=True)
+class PrecheckResult:
+    text: str
+    issues: List[LocalIssue] = field(default_factory=list)
+
+    @property
+    def clean(self) -> bool:
+        return not self.issues
+
+    @property
+    def word_count(self) -> int:
+        return len(_WORD.findall(self.text))
+
+    def flagged_excerpt(self) -> str:
+        """Sentences containing a flagged span, in order; the whole text if none."""
+
+        if not self.issues:
+            return self.text
+        sentences = [match for match in _SENTENCE.finditer(self.text) if match.group().strip()]
+        flagged = [
+            sentence.group().strip()
+            for sentence in sentences
+            if any(issue.start < sentence.end() and issue.end > sentence.start() for issue in self.issues)
+        ]
+        return "\n".join(flagged) or self.text
+
+    def as_review(self) -> Dict[str, object]:
+        """The result in the shape of an LLM review, for when the LLM is skipped."""
+
+        return {
+            "has_issues": bool(self.issues),
+            "issues": [issue.as_issue() for issue in self.issues],
+            "suggestions": [],
+            "confidence": 0.9,
+        }
+
+
+def _check_spacing(text: str, issues: List[LocalIssue]) -> None:
+    if text != text.strip():
+        issues.append(LocalIssue("style", "Remove leading or trailing whitespace", "warning", 0, len(text)))
+    for match in _MULTI_SPACE.finditer(text):
+        issues.append(LocalIssue("style", "Use a single space between words", "warning", match.start(), match.end()))
+    for match in _SPACE_BEFORE_PUNCT.finditer(text):
+        message = f"Remove the space before '{match.group().strip()}'"
+        issues.append(LocalIssue("grammar", message, "error", match.start(), match.end()))
+    for match in _MISSING_SPACE_AFTER.finditer(text):
+        issues.append(
+            LocalIssue("grammar", f"Add a space after '{match.group()}'", "error", match.start(), match.end() + 1)
+        )
+    for match in _REPEATED_PUNCT.finditer(text):
+        issues.append(
+            LocalIssue("style", f"Avoid repeated punctuation '{match.group()}'", "warning", match.start(), match.end())
+        )
+
+
+def _check_brackets(text: str, issues: List[LocalIssue]) -> None:
+    stack: List[Tuple[str, int]] = []
+    for index, char in enumerate(text):
+        if char in _BRACKETS:
+            stack.append((char, index))
+        elif char in _BRACKETS.values():
+            if not stack or _BRACKETS[stack[-1][0]] != char:
+                issues.append(LocalIssue("grammar", f"Unmatched '{char}'", "error", index, index + 1))
+            else:
+                stack.pop()
+    for char, index in stack:
+        issues.append(LocalIssue("grammar", f"Unclosed '{char}'", "error", index, index + 1))
+    if text.count('"') % 2:
+        index = text.rfind('"')
+        issues.append(LocalIssue("grammar", "Unbalanced quotation marks", "error", index, index + 1))
+
+
+def _check_casing(text: str, issues: List[LocalIssue]) -> None:
+    for match in _SENTENCE_START.finditer(text):
+        if text[: match.start(1)].rstrip().lower().endswith(_NO_BREAK_SUFFIXES):
+            continue
+        issues.append(
+            LocalIssue("grammar", "Start the sentence with a capital letter", "error", match.start(1), match.end(1))
+        )
+    for match in _LOWERCASE_I.finditer(text):
+        issues.append(LocalIssue("grammar", "Capitalize the pronoun 'I'", "error", match.start(), match.end()))
+
+
+def _check_spelling(text: str, language: str, issues: List[LocalIssue]) -> None:
+    if language == "ko":
+        for wrong, right in _KO_MISSPELLINGS.items():
+            for match in re.finditer(re.escape(wrong), text):
+                issues.append(
+                    LocalIssue("spelling", f"'{wrong}' should be '{right}'", "error", match.start(), match.end())
+                )
+        return
+    for match in _WORD.finditer(text):
+        correction = _EN_MISSPELLINGS.get(match.group().lower())
+        if correction:
+            message = f"'{match.group()}' should be '{correction}'"
+            issues.append(LocalIssue("spelling", message, "error", match.start(), match.end()))
+
+
+def _check_tone(text: str, tone: Optional[str], issues: List[LocalIssue]) -> None:
+    if not tone:
+        return
+    lowered_tone, lowered = tone.lower(), text.lower()
+    for keyword, phrases in _TONE_CONFLICTS.items():
+        if keyword not in lowered_tone:
+            continue
+        for phrase in phrases:
+            for match in re.finditer(rf"(?<!\w){re.escape(phrase)}(?!\w)", lowered):
+                issues.append(
+                    LocalIssue(
+                        "tone",
+                        f"'{text[match.start():match.end()]}' does not fit a {keyword} tone",
+                        "warning",
+                        match.start(),
+                        match.end(),
+                    )
+                )
+
+
+def local_check(text: str, target_language: str, tone: Optional[str] = None) -> PrecheckResult:
+    """Run the deterministic checks on ``text``.
+
+    Covers doubled words, spacing and punctuation, sentence casing (en), known
+    misspellings (en/ko) and words that clash with ``tone``. Issues carry character
+    spans into ``text``.
+    """
+
+    language = target_language.lower().split("-")[0]
+    issues: List[LocalIssue] = []
+    for match in _DOUBLED_WORD.finditer(text):
+        issues.append(
+            LocalIssue("grammar", f"Repeated word '{match.group(1)}'", "error", match.start(), match.end())
+        )
+    _check_spacing(text, issues)
+    _check_brackets(text, issues)
+    if language == "en":
+        _check_casing(text, issues)
+    _check_spelling(text, language, issues)
+    _check_tone(text, tone, issues)
+    issues.sort(key=lambda issue: issue.start)
+    return PrecheckResult(text=text, issues=issues)
+
+
+__all__ = ["LocalIssue", "PrecheckResult", "local_check"]
@@ -2,50 +2,27 @@
 
 from __future__ import annotations
 
+import hashlib
 import json
 from typing import Any, Dict, List, Optional
 
+from app.core import metrics
+from app.core.settings import settings
 from app.services.llm import get_llm_client
 from app.services.llm.client import LLMClientError, PromptMessage, PromptRequest
 
+from .cache import get_cached_review, grammar_cache_key, store_review
+from .precheck import PrecheckResult, local_check
 
-class GrammarCheckError(RuntimeError):
-    """Raised when grammar check cannot complete."""
+REVIEW_PROMPT = "Please review this text:\n\n{text}"
+FLAGGED_REVIEW_PROMPT = "Please review these sentences, which automated checks flagged:\n\n{text}"
 
 
-def check_grammar_and_style(
-    text: str,
-    target_language: str,
-    tone: Optional[str] = None,
-    style_preferences: Optional[str] = None,
-) -> Dict[str, Any]:
-    """Check text for grammar, spelling, and style issues using LLM.
-
-    Args:
-        text: Text to check
-        target_language: Language of the text (e.g., "en", "ko")
-        tone: Optional tone guidelines
-        style_preferences: Optional style guide preferences
+class GrammarCheckError(RuntimeError):
+    """Raised when grammar check cannot complete."""
 
-    Returns:
-        Dictionary with:
-        - has_issues: bool, whether any issues were found
-        - issues: list of {type, message, severity}
-        - suggestions: list of improvement suggestions
-        - confidence: 0.0-1.0, confidence in the analysis
 
-    Raises:
-        GrammarCheckError: If LLM call fails or response is invalid
-    """
-    if not text.strip():
-        return {
-            "has_issues": False,
-            "issues": [],
-            "suggestions": [],
-            "confidence": 1.0,
-        }
-
-    # Build system prompt
+def _system_prompt(target_language: str, tone: Optional[str], style_preferences: Optional[str]) -> str:
     system_prompt = f"""You are a professional copy editor and UX writer.
 Your task is to review {target_language} text for the following issues:
 1. Grammar errors
@@ -78,27 +55,18 @@ Rules:
 - Set confidence based on how certain you are about the issues
 """
 
-    user_prompt = f"Please review this text:\n\n{text}"
+    return system_prompt
 
-    # Build LLM request
-    prompt_request = PromptRequest(
-        messages=[
-            PromptMessage(role="system", content=system_prompt),
-            PromptMessage(role="user", content=user_prompt),
-        ],
-        temperature=0.1,  # Low temperature for consistent analysis
-        max_output_tokens=1000,
-    )
 
-    # Call LLM
-    try:
-        client = get_llm_client()
-        result = client.generate(prompt_request)
-        response_text = result.text.strip()
-    except LLMClientError as exc:
-        raise GrammarCheckError(f"LLM call failed: {exc}") from exc
+# Cached reviews are keyed on this, so editing any prompt template invalidates them.
+PROMPT_VERSION = hashlib.sha256(
+    "\x00".join(
+        [_system_prompt("{target_language}", "{tone}", "{style_preferences}"), REVIEW_PROMPT, FLAGGED_REVIEW_PROMPT]
+    ).encode("utf-8")
+).hexdigest()[:12]
+
 
-    # Parse JSON response
+def _parse_review(response_text: str) -> Dict[str, Any]:
     try:
         # Try to extract JSON from markdown code blocks if present
         if "```json" in response_text:
@@ -164,4 +132,116 @@ Rules:
         }
 
 
-__all__ = ["check_grammar_and_style", "GrammarCheckError"]
+def _with_local_issues(review: Dict[str, Any], precheck: Optional[PrecheckResult]) -> Dict[str, Any]:
+    # Local findings are deterministic, so they are reported even when the LLM misses them.
+    if precheck is None or precheck.clean:
+        return review
+    review["issues"] = [issue.as_issue() for issue in precheck.issues] + review["issues"]
+    review["has_issues"] = True
+    return review
+
+
+def check_grammar_and_style(
+    text: str,
+    target_language: str,
+    tone: Optional[str] = None,
+    style_preferences: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Check text for grammar, spelling, and style issues using LLM.
+
+    A local rule-based pre-check runs first: short text it finds clean is answered
+    without the LLM, and when it flags spans only the flagged sentences are sent.
+    Confident LLM reviews are cached in the database for identical inputs.
+
+    Args:
+        text: Text to check
+        target_language: Language of the text (e.g., "en", "ko")
+        tone: Optional tone guidelines
+        style_preferences: Optional style guide preferences
+
+    Returns:
+        Dictionary with:
+        - has_issues: bool, whether any issues were found
+        - issues: list of {type, message, severity}
+        - suggestions: list of improvement suggestions
+        - confidence: 0.0-1.0, confidence in the analysis
+
+    Raises:
+        GrammarCheckError: If LLM call fails or response is invalid
+    """
+    if not text.strip():
+        return {
+            "has_issues": False,
+            "issues": [],
+            "suggestions": [],
+            "confidence": 1.0,
+        }
+
+    precheck: Optional[PrecheckResult] = None
+    if settings.grammar_precheck_enabled:
+        precheck = local_check(text, target_language, tone)
+        metrics.increment("grammar.checks")
+        if precheck.clean and precheck.word_count <= settings.grammar_precheck_max_words:
+            # Short, clean copy (button labels, titles) gains nothing from an LLM round trip.
+            metrics.increment("grammar.precheck.skipped")
+            return precheck.as_review()
+
+    cache_key: Optional[str] = None
+    if settings.grammar_cache_enabled:
+        cache_key = grammar_cache_key(text, target_language, tone, style_preferences, PROMPT_VERSION)
+        cached = get_cached_review(cache_key, PROMPT_VERSION)
+        if cached is not None:
+            return _with_local_issues(cached, precheck)
+
+    system_prompt = _system_prompt(target_language, tone, style_preferences)
+    user_prompt = REVIEW_PROMPT.format(text=text)
+    if precheck is not None and not precheck.clean:
+        excerpt = precheck.flagged_excerpt()
+        if excerpt != text:
+            metrics.increment("grammar.precheck.narrowed")
+            user_prompt = FLAGGED_REVIEW_PROMPT.format(text=excerpt)
+
+    # Build LLM request
+    prompt_request = PromptRequest(
+        messages=[
+            PromptMessage(role="system", content=system_prompt),
+            PromptMessage(role="user", content=user_prompt),
+        ],
+        temperature=0.1,  # Low temperature for consistent analysis
+        max_output_tokens=1000,
+        route="grammar",
+    )
+
+    # Call LLM
+    try:
+        client = get_llm_client()
+        result = client.generate(prompt_request)
+        response_text = result.text.strip()
+    except LLMClientError as exc:
+        raise GrammarCheckError(f"LLM call failed: {exc}") from exc
+
+    review = _parse_review(response_text)
+    if cache_key is not None:
+        store_review(cache_key, PROMPT_VERSION, target_language, review)
+    return _with_local_issues(review, precheck)
+
+
+def grammar_stats() -> Dict[str, Any]:
+    """How often the local pre-check or the review cache answered without a fresh LLM review."""
+
+    checks = metrics.counter("grammar.checks")
+    skipped = metrics.counter("grammar.precheck.skipped")
+    cache_hits = metrics.counter("grammar.cache.hits")
+    cache_lookups = cache_hits + metrics.counter("grammar.cache.misses")
+    return {
+        "checks": int(checks),
+        "llm_skipped": int(skipped),
+        "llm_narrowed": int(metrics.counter("grammar.precheck.narrowed")),
+        "skip_rate": round(skipped / checks, 4) if checks else 0.0,
+        "cache_hits": int(cache_hits),
+        "cache_hit_rate": round(cache_hits / cache_lookups, 4) if cache_lookups else 0.0,
+        "prompt_version": PROMPT_VERSION,
+    }
+
+
+__all__ = ["PROMPT_VERSION", "check_grammar_and_style", "grammar_stats", "GrammarCheckError"]
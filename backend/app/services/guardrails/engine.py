@@ -0,0 +1,220 @@
+"""Compiled matchers for guardrail term lists.
+
+Forbidden terms and ``replace_map`` sources are compiled into Aho-Corasick
+automata, so one pass over the text finds every term no matter how many the
+rule set holds. Compiled rule sets are cached by fingerprint, so every candidate
+checked against the same rules reuses one compilation; per-call hints compile into
+their own small rule set and are combined at match time.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import OrderedDict, deque
+from threading import Lock
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from app.core import metrics
+
+# Fingerprinted (loaded) rule sets can be large, so fewer are kept; small per-call hint
+# sets get their own cache so they never evict a loaded rule set.
+_FINGERPRINT_CACHE_SIZE = 32
+_CACHE_SIZE = 256
+_CACHE_LOCK = Lock()
+_FINGERPRINT_CACHE: "OrderedDict[Hashable, CompiledRuleSet]" = OrderedDict()
+_CACHE: "OrderedDict[Hashable, CompiledRuleSet]" = OrderedDict()
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher over a fixed set of non-empty patterns."""
+
+    __slots__ = ("_goto", "_fail", "_out", "patterns")
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: Tuple[str, ...] = tuple(dict.fromkeys(pattern for pattern in patterns if pattern))
+        # Node 0 is the root; _out holds the index of every pattern ending at a node, via fail links.
+        self._goto: List[Dict[str, int]] = [{}]
+        self._out: List[Tuple[int, ...]] = [()]
+        for index, pattern in enumerate(self.patterns):
+            node = 0
+            for char in pattern:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[node][char] = nxt
+                    self._goto.append({})
+                    self._out.append(())
+                node = nxt
+            self._out[node] = self._out[node] + (index,)
+
+        self._fail: List[int] = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                if self._out[self._fail[child]]:
+                    self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield ``(end, pattern_index)`` for every occurrence, ``end`` exclusive."""
+
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index in out[node]:
+                yield position + 1, index
+
+    def found(self, text: str) -> List[str]:
+        """Patterns occurring in ``text``, in pattern order."""
+
+        if not self.patterns:
+            return []
+        return [self.patterns[index] for index in sorted({index for _, index in self.iter_matches(text)})]
+
+
+class Replacer:
+    """Single-pass replacement: leftmost-longest matches, replacements are never rescanned."""
+
+    __slots__ = ("_matcher", "_targets")
+
+    def __init__(self, replace_map: Iterable[Tuple[str, str]]) -> None:
+        mapping = {source: target for source, target in replace_map if source}
+        self._matcher = AhoCorasick(mapping)
+        self._targets = [mapping[source] for source in self._matcher.patterns]
+
+    def matches(self, text: str) -> Dict[int, Tuple[str, str]]:
+        """Longest ``(source, target)`` starting at each position where some source occurs."""
+
+        if not self._targets:
+            return {}
+        patterns = self._matcher.patterns
+        longest: Dict[int, int] = {}
+        for end, index in self._matcher.iter_matches(text):
+            start = end - len(patterns[index])
+            if start not in longest or len(patterns[index]) > len(patterns[longest[start]]):
+                longest[start] = index
+        return {start: (patterns[index], self._targets[index]) for start, index in longest.items()}
+
+    def __call__(self, text: str) -> str:
+        return _substitute(text, self.matches(text))
+
+
+def _substitute(text: str, matches: Dict[int, Tuple[str, str]]) -> str:
+    if not matches:
+        return text
+    pieces: List[str] = []
+    position = copied = 0
+    while position < len(text):
+        match = matches.get(position)
+        if match is None:
+            position += 1
+            continue
+        source, target = match
+        pieces.append(text[copied:position])
+        pieces.append(target)
+        position += len(source)
+        copied = position
+    pieces.append(text[copied:])
+    return "".join(pieces)
+
+
+class CompiledRuleSet:
+    """Forbidden-term matcher (case-insensitive) and replacer for one rule set."""
+
+    __slots__ = ("forbidden", "replace")
+
+    def __init__(self, forbidden_terms: Tuple[str, ...], replace_map: Tuple[Tuple[str, str], ...]) -> None:
+        self.forbidden = AhoCorasick(forbidden_terms)
+        self.replace = Replacer(replace_map)
+
+    def forbidden_in(self, text: str) -> List[str]:
+        return self.forbidden.found(text.lower())
+
+
+def forbidden_in_all(text: str, rule_sets: Sequence[CompiledRuleSet]) -> List[str]:
+    """Forbidden terms of every rule set found in ``text``, in rule set then term order."""
+
+    lowered = text.lower()
+    found: Dict[str, None] = {}
+    for rule_set in rule_sets:
+        for term in rule_set.forbidden.found(lowered):
+            found.setdefault(term, None)
+    return list(found)
+
+
+def replace_all(text: str, rule_sets: Sequence[CompiledRuleSet]) -> str:
+    """Replace as one pass over the rule sets' merged ``replace_map`` would; later sets win."""
+
+    if len(rule_sets) == 1:
+        return rule_sets[0].replace(text)
+    matches: Dict[int, Tuple[str, str]] = {}
+    for rule_set in rule_sets:
+        for start, match in rule_set.replace.matches(text).items():
+            current = matches.get(start)
+            # Equal lengths at one position mean the same source, which the later map overrides.
+            if current is None or len(match[0]) >= len(current[0]):
+                matches[start] = match
+    return _substitute(text, matches)
+
+
+def rule_set_fingerprint(forbidden_terms: Iterable[str], replace_map: Dict[str, str]) -> str:
+    """Stable digest of the terms and replacements a rule set compiles from."""
+
+    payload = json.dumps([sorted(forbidden_terms), replace_map], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def compile_rule_set(
+    forbidden_terms: Sequence[Any],
+    replace_map: Optional[Dict[str, str]] = None,
+    *,
+    fingerprint: Optional[Hashable] = None,
+) -> CompiledRuleSet:
+    """Compiled matchers for the given terms, shared with every caller passing the same rule set.
+
+    ``fingerprint`` identifies the rule set when the caller already has one (loaded
+    rule sets carry it), so a cache hit does not touch the terms at all. Without
+    it, the raw terms and replacements are the key.
+    """
+
+    if fingerprint is not None:
+        cache, size, key = _FINGERPRINT_CACHE, _FINGERPRINT_CACHE_SIZE, fingerprint
+    else:
+        cache, size, key = _CACHE, _CACHE_SIZE, (tuple(forbidden_terms), tuple((replace_map or {}).items()))
+    with _CACHE_LOCK:
+        compiled = cache.get(key)
+        if compiled is not None:
+            cache.move_to_end(key)
+    if compiled is not None:
+        metrics.increment("guardrails.compile.hits")
+        return compiled
+
+    metrics.increment("guardrails.compile.misses")
+    terms = tuple(dict.fromkeys(str(term).lower() for term in forbidden_terms if term))
+    compiled = CompiledRuleSet(terms, tuple((replace_map or {}).items()))
+    with _CACHE_LOCK:
+        cache[key] = compiled
+        while len(cache) > size:
+            cache.popitem(last=False)
+    return compiled
+
+
+__all__ = [
+    "AhoCorasick",
+    "CompiledRuleSet",
+    "Replacer",
+    "compile_rule_set",
+    "forbidden_in_all",
+    "replace_all",
+    "rule_set_fingerprint",
+]
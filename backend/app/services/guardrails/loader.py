@@ -2,13 +2,30 @@
 
 from __future__ import annotations
 
-from typing import Dict, Iterable
+import json
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import Session
 
+from app.core import metrics
 from app.db import models
 
+from .engine import rule_set_fingerprint
+from .versioning import current_rules_version, has_pending_rule_writes
+
+ScopeKey = Tuple[Optional[str], Optional[str], Optional[str]]
+
+# Merged rules per (request id, feature, extra sources) scope, valid for one rules version.
+# The request id is part of the key only for requests that REQUEST-scoped rules target.
+_CACHE_SIZE = 1024
+_CACHE_LOCK = Lock()
+_CACHE: "OrderedDict[ScopeKey, Dict[str, object]]" = OrderedDict()
+_cache_version: int | None = None
+_request_rule_ids: FrozenSet[str] | None = None
+
 
 def _rule_applies(rule: models.GuardrailRule, request: models.Request | None) -> bool:
     if rule.scope == models.GuardrailScope.GLOBAL:
@@ -59,19 +76,11 @@ def _merge_guardrail_sources(*sources: Dict[str, object]) -> Dict[str, object]:
             merged_style = merged.setdefault("style", {})
             merged_style.update(style)
     merged["forbidden_terms"] = sorted(merged["forbidden_terms"])
+    merged["fingerprint"] = rule_set_fingerprint(merged["forbidden_terms"], merged["replace_map"])
     return merged
 
 
-def load_guardrail_rules(
-    session: Session,
-    *,
-    request: models.Request | None = None,
-    extra_sources: Iterable[Dict[str, object]] | None = None,
-) -> Dict[str, object]:
-    """Return merged guardrail configuration from DB + optional extras."""
-
-    stmt = select(models.GuardrailRule)
-    records = session.scalars(stmt)
+def _aggregate_rules(records: Iterable[models.GuardrailRule], request: models.Request | None) -> Dict[str, object]:
     aggregated: Dict[str, object] = {
         "forbidden_terms": [],
         "replace_map": {},
@@ -109,11 +118,168 @@ def load_guardrail_rules(
         elif rule.rule_type == models.GuardrailRuleType.STYLE:
             style_payload = {str(k): v for k, v in payload.items() if v is not None}
             aggregated.setdefault("style", {}).update(style_payload)
+    return aggregated
+
+
+def _request_feature(request: models.Request) -> str | None:
+    return (request.constraints_json or {}).get("feature_norm") or request.feature_name
+
+
+def _scope_clause(requests: Iterable[models.Request]):
+    """GLOBAL rules plus the FEATURE/REQUEST rules targeting ``requests``, on indexed columns."""
+
+    rule = models.GuardrailRule
+    requests = list(requests)
+    clauses = [rule.scope == models.GuardrailScope.GLOBAL]
+    request_ids = sorted({request.id for request in requests})
+    features = sorted({feature for feature in map(_request_feature, requests) if feature})
+    if request_ids:
+        clauses.append(and_(rule.scope == models.GuardrailScope.REQUEST, rule.request_id.in_(request_ids)))
+    if features:
+        clauses.append(and_(rule.scope == models.GuardrailScope.FEATURE, rule.feature_key.in_(features)))
+    return or_(*clauses)
+
+
+def _scoped_records(session: Session, requests: Iterable[models.Request]) -> List[models.GuardrailRule]:
+    stmt = select(models.GuardrailRule).where(_scope_clause(requests)).order_by(models.GuardrailRule.created_at)
+    return list(session.scalars(stmt))
+
+
+def _scope_key(
+    request: models.Request | None,
+    extras_key: str | None,
+    request_rule_ids: FrozenSet[str],
+) -> ScopeKey:
+    """Cache key for ``request``'s rules; requests without REQUEST rules share their feature's entry."""
+
+    if request is None:
+        return (None, None, extras_key)
+    request_id = request.id if request.id in request_rule_ids else None
+    return (request_id, _request_feature(request), extras_key)
+
+
+def _extras_key(extras: List[Dict[str, object]], extras_id: str | None) -> str | None:
+    # Extras with an identity (the ingest run id) are keyed by it; anonymous ones by their content.
+    if not extras:
+        return None
+    if extras_id is not None:
+        return f"id:{extras_id}"
+    return json.dumps(extras, sort_keys=True, default=str)
+
+
+def _reset_cache(version: int) -> None:
+    """Drop cached entries from an older rules version; the caller holds ``_CACHE_LOCK``."""
+
+    global _cache_version, _request_rule_ids
+    if version != _cache_version:
+        _CACHE.clear()
+        _request_rule_ids = None
+        _cache_version = version
+
 
-    extras = list(extra_sources or [])
-    extras.insert(0, aggregated)
-    return _merge_guardrail_sources(*extras)
+def _rule_request_ids(session: Session, version: int) -> FrozenSet[str]:
+    """Ids of the requests targeted by REQUEST-scoped rules, read once per rules version."""
+
+    global _request_rule_ids
+    with _CACHE_LOCK:
+        _reset_cache(version)
+        if _request_rule_ids is not None:
+            return _request_rule_ids
+    rule = models.GuardrailRule
+    stmt = select(rule.request_id).where(rule.scope == models.GuardrailScope.REQUEST, rule.request_id.is_not(None))
+    request_ids = frozenset(session.scalars(stmt.distinct()))
+    with _CACHE_LOCK:
+        if version == _cache_version:
+            _request_rule_ids = request_ids
+    return request_ids
+
+
+def _cached_rules(version: int, key: ScopeKey) -> Dict[str, object] | None:
+    with _CACHE_LOCK:
+        _reset_cache(version)
+        rules = _CACHE.get(key)
+        if rules is not None:
+            _CACHE.move_to_end(key)
+    metrics.increment("guardrails.rules.cache_hits" if rules is not None else "guardrails.rules.cache_misses")
+    return rules
+
+
+def _store_rules(version: int, key: ScopeKey, rules: Dict[str, object]) -> None:
+    with _CACHE_LOCK:
+        if version != _cache_version:
+            return
+        _CACHE[key] = rules
+        while len(_CACHE) > _CACHE_SIZE:
+            _CACHE.popitem(last=False)
+
+
+def _merged_rules(
+    session: Session,
+    requests: List[models.Request | None],
+    extra_sources: Iterable[Dict[str, object]] | None,
+    extras_id: str | None,
+) -> List[Dict[str, object]]:
+    """Merged rules for each of ``requests``, from the cache or one filtered query covering every miss."""
+
+    extras = [source for source in extra_sources or [] if source]
+    if has_pending_rule_writes(session):
+        # The session's own uncommitted rule writes are invisible to the shared cache.
+        records = _scoped_records(session, [request for request in requests if request is not None])
+        return [_merge_guardrail_sources(_aggregate_rules(records, request), *extras) for request in requests]
+
+    version = current_rules_version(session)
+    extras_key = _extras_key(extras, extras_id)
+    request_rule_ids = _rule_request_ids(session, version)
+    keys = [_scope_key(request, extras_key, request_rule_ids) for request in requests]
+    found: Dict[ScopeKey, Dict[str, object]] = {}
+    missing: Dict[ScopeKey, models.Request | None] = {}
+    for key, request in zip(keys, requests, strict=True):
+        if key in found or key in missing:
+            continue
+        cached = _cached_rules(version, key)
+        if cached is not None:
+            found[key] = cached
+        else:
+            missing[key] = request
+    if missing:
+        records = _scoped_records(session, [request for request in missing.values() if request is not None])
+        for key, request in missing.items():
+            found[key] = _merge_guardrail_sources(_aggregate_rules(records, request), *extras)
+            _store_rules(version, key, found[key])
+    return [found[key] for key in keys]
+
+
+def load_guardrail_rules(
+    session: Session,
+    *,
+    request: models.Request | None = None,
+    extra_sources: Iterable[Dict[str, object]] | None = None,
+    extras_id: str | None = None,
+) -> Dict[str, object]:
+    """Return merged guardrail configuration from DB + optional extras.
+
+    Only GLOBAL rules and the FEATURE/REQUEST rules targeting ``request`` are read.
+    Results are cached per scope and rules version, so repeated loads run no
+    queries until a rule is written; the returned dict must not be mutated in place.
+    ``extras_id`` names ``extra_sources`` in the cache key (e.g. the ingest run they
+    come from) and must change whenever their content does.
+    """
+
+    return dict(_merged_rules(session, [request], extra_sources, extras_id)[0])
+
+
+def load_guardrail_rules_for_requests(
+    session: Session,
+    requests: Iterable[models.Request],
+    *,
+    extra_sources: Iterable[Dict[str, object]] | None = None,
+    extras_id: str | None = None,
+) -> Dict[str, Dict[str, object]]:
+    """Merged guardrail configuration per request id, from at most one query for all uncached scopes."""
 
+    requests = list(requests)
+    merged = _merged_rules(session, requests, extra_sources, extras_id)
+    return {request.id: dict(rules) for request, rules in zip(requests, merged, strict=True)}
 
-__all__ = ["load_guardrail_rules"]
 
+__all__ = ["load_guardrail_rules", "load_guardrail_rules_for_requests"]
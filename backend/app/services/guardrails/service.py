@@ -1,10 +1,18 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
+
+from .engine import CompiledRuleSet, compile_rule_set, forbidden_in_all, replace_all
 
 
 def _tokenize(text: str) -> List[str]:
     return [tok for tok in text.strip().split() if tok]
 
 
+def _terms(source: Any) -> Tuple[Any, ...]:
+    if not source:
+        return ()
+    return tuple(source) if isinstance(source, (list, tuple, set)) else (source,)
+
+
 def apply_guardrails(text: str, rules: Dict[str, Any], hints: Dict[str, Any] | None = None, apply_fix: bool = True) -> Dict[str, Any]:
     """Apply guardrail rules to text.
 
@@ -33,28 +41,24 @@ def apply_guardrails(text: str, rules: Dict[str, Any], hints: Dict[str, Any] | N
         result["passes"] = False
         result["violations"].append(f"length>{length_max}")
 
-    forbidden_terms = set()
-    for source in (merged_rules.get("forbidden_terms"), hints.get("forbidden_terms")):
-        if not source:
-            continue
-        if isinstance(source, (list, tuple, set)):
-            forbidden_terms.update(str(term).lower() for term in source if term)
-        else:
-            forbidden_terms.add(str(source).lower())
-    lowered = text.lower()
-    for word in forbidden_terms:
-        if word and word in lowered:
-            result["passes"] = False
-            result.setdefault("violations", []).append(f"forbidden:{word}")
-
-    replace_map: Dict[str, str] = {}
-    replace_map.update(merged_rules.get("replace_map") or {})
-    replace_map.update(hints.get("replace_map") or {})
-    fixed = text
-    if apply_fix:
-        for src, dst in replace_map.items():
-            if src:
-                fixed = fixed.replace(src, dst)
+    # The loaded rule set compiles once per fingerprint; hints vary per call, so they
+    # compile into their own small rule set instead of forcing a recompile of the rules.
+    rule_sets: List[CompiledRuleSet] = [
+        compile_rule_set(
+            _terms(merged_rules.get("forbidden_terms")),
+            merged_rules.get("replace_map") or {},
+            fingerprint=merged_rules.get("fingerprint") or None,
+        )
+    ]
+    hint_terms, hint_replace_map = _terms(hints.get("forbidden_terms")), hints.get("replace_map") or {}
+    if hint_terms or hint_replace_map:
+        rule_sets.append(compile_rule_set(hint_terms, hint_replace_map))
+
+    for word in forbidden_in_all(text, rule_sets):
+        result["passes"] = False
+        result.setdefault("violations", []).append(f"forbidden:{word}")
+
+    fixed = replace_all(text, rule_sets) if apply_fix else text
 
     style_rules = merged_rules.get("style") or {}
     if style_rules:
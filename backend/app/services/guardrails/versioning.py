@@ -0,0 +1,100 @@
+"""Version counter for guardrail rules, used to invalidate cached rule sets.
+
+Every ORM write to ``guardrail_rules`` (flushed objects and bulk ``update``/``delete``
+statements) bumps ``guardrail_rules_version`` in the same transaction. Each process
+reads that counter at most every ``GUARDRAIL_RULES_VERSION_TTL_SECONDS``, and
+right after it commits a rule write itself, so cached rule sets need no queries
+in between. The listeners are registered when this module is imported.
+"""
+
+from __future__ import annotations
+
+import time
+from threading import Lock
+from typing import Optional
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.settings import settings
+from app.db import models
+
+_WRITES_KEY = "guardrail_rules_written"
+_VERSION_ID = 1
+
+_LOCK = Lock()
+_version = 0
+_checked_at: Optional[float] = None
+# Bumped by every local invalidation, so a version read racing with a commit is not trusted.
+_generation = 0
+
+
+def _bump(session: Session) -> None:
+    connection = session.connection()
+    table = models.GuardrailRulesVersion
+    bumped = connection.execute(
+        update(table).where(table.id == _VERSION_ID).values(version=table.version + 1)
+    ).rowcount
+    if not bumped:
+        connection.execute(insert(table).values(id=_VERSION_ID, version=1))
+    session.info[_WRITES_KEY] = True
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_on_flush(session: Session, flush_context, instances) -> None:
+    changed = (*session.new, *session.dirty, *session.deleted)
+    if any(isinstance(obj, models.GuardrailRule) for obj in changed):
+        _bump(session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_bulk_write(state: ORMExecuteState) -> None:
+    if (state.is_update or state.is_delete) and state.bind_mapper is not None:
+        if state.bind_mapper.class_ is models.GuardrailRule:
+            _bump(state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_WRITES_KEY, False):
+        invalidate_rules_version()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_writes(session: Session) -> None:
+    session.info.pop(_WRITES_KEY, None)
+
+
+def has_pending_rule_writes(session: Session) -> bool:
+    """Whether ``session`` wrote rules it has not committed yet (caches must not serve it)."""
+
+    return bool(session.info.get(_WRITES_KEY))
+
+
+def invalidate_rules_version() -> None:
+    """Make the next :func:`current_rules_version` call read the counter from the database."""
+
+    global _checked_at, _generation
+    with _LOCK:
+        _checked_at = None
+        _generation += 1
+
+
+def current_rules_version(session: Session) -> int:
+    """The rules version, read from the database only when the local copy is stale."""
+
+    global _version, _checked_at
+    with _LOCK:
+        if _checked_at is not None and time.monotonic() - _checked_at < settings.guardrail_rules_version_ttl_seconds:
+            return _version
+        generation = _generation
+
+    table = models.GuardrailRulesVersion
+    version = session.scalar(select(table.version).where(table.id == _VERSION_ID)) or 0
+    with _LOCK:
+        if generation == _generation:
+            _version, _checked_at = version, time.monotonic()
+    return version
+
+
+__all__ = ["current_rules_version", "has_pending_rule_writes", "invalidate_rules_version"]
@@ -0,0 +1,89 @@
+"""Bulk table loaders used by the corpus ingest pipeline."""
+
+from __future__ import annotations
+
+import json
+import logging
+from time import perf_counter
+from typing import Any, Dict, List, Mapping, Sequence
+
+from sqlalchemy import JSON, Table, column, insert, table, text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+def _stage_name(target: Table) -> str:
+    return f"_stage_{target.name}"
+
+
+def _copy_value(value: Any, is_json: bool) -> Any:
+    if is_json and value is not None:
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def _copy_rows(session: Session, stage: str, columns: Sequence[str], json_columns: set[str], rows: Sequence[Mapping[str, Any]]) -> bool:
+    """Stream rows into the stage table with ``COPY FROM STDIN``.
+
+    Returns ``False`` when the underlying DBAPI driver has no COPY support so the
+    caller can fall back to executemany inserts.
+    """
+
+    raw = session.connection().connection.driver_connection
+    cursor = raw.cursor()
+    if not hasattr(cursor, "copy"):  # psycopg2 and other drivers
+        cursor.close()
+        return False
+    column_list = ", ".join(columns)
+    try:
+        with cursor.copy(f"COPY {stage} ({column_list}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row(tuple(_copy_value(row.get(name), name in json_columns) for name in columns))
+    finally:
+        cursor.close()
+    return True
+
+
+def bulk_replace(session: Session, target: Table, rows: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Replace the contents of ``target`` with ``rows`` through a staging table.
+
+    Rows are loaded into a temporary table first (``COPY FROM STDIN`` on Postgres,
+    executemany Core inserts elsewhere) and then swapped into ``target`` with a
+    delete + ``INSERT ... SELECT`` inside the session's transaction, so readers
+    never observe a partially loaded table.
+    """
+
+    start = perf_counter()
+    columns: List[str] = sorted({key for row in rows for key in row}) if rows else []
+    column_list = ", ".join(columns)
+    stage = _stage_name(target)
+    dialect = session.get_bind().dialect.name
+    method = "noop"
+
+    if columns:
+        session.execute(text(f"DROP TABLE IF EXISTS {stage}"))
+        session.execute(text(f"CREATE TEMPORARY TABLE {stage} AS SELECT {column_list} FROM {target.name} WHERE 1 = 0"))
+
+        loaded = False
+        if dialect == "postgresql":
+            json_columns = {name for name in columns if isinstance(target.c[name].type, JSON)}
+            loaded = _copy_rows(session, stage, columns, json_columns, rows)
+            method = "copy" if loaded else method
+        if not loaded:
+            stage_table = table(stage, *[column(name, target.c[name].type) for name in columns])
+            session.execute(insert(stage_table), [{name: row.get(name) for name in columns} for row in rows])
+            method = "executemany"
+
+    session.execute(target.delete())
+    if columns:
+        session.execute(text(f"INSERT INTO {target.name} ({column_list}) SELECT {column_list} FROM {stage}"))
+        session.execute(text(f"DROP TABLE {stage}"))
+
+    elapsed = perf_counter() - start
+    rows_per_sec = round(len(rows) / elapsed, 1) if rows and elapsed > 0 else 0.0
+    logger.info("Bulk loaded %s rows into %s via %s (%.1f rows/s)", len(rows), target.name, method, rows_per_sec)
+    return {"rows": len(rows), "method": method, "elapsed_ms": round(elapsed * 1000.0, 2), "rows_per_sec": rows_per_sec}
+
+
+__all__ = ["bulk_replace"]
@@ -0,0 +1,318 @@
+"""Background ingest jobs tracked through ``RagIngestion`` records."""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from threading import Lock
+from typing import Any, Collection, Dict, List, Optional
+from uuid import uuid4
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.settings import settings
+from app.db import models, session_scope
+
+from .progress import PROGRESS_FIELDS, IngestCancelled, IngestProgress
+from .service import INGEST_SOURCES, index_corpus, persist_corpus, read_corpus, resolve_data_dir
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = {
+    models.RagIngestionStatus.SUCCEEDED,
+    models.RagIngestionStatus.FAILED,
+    models.RagIngestionStatus.CANCELLED,
+}
+ACTIVE_STATUSES = (
+    models.RagIngestionStatus.PENDING,
+    models.RagIngestionStatus.RUNNING,
+    models.RagIngestionStatus.COMMITTING,
+)
+# Once a job starts replacing tables it runs to completion, so only these can be cancelled.
+CANCELLABLE_STATUSES = (models.RagIngestionStatus.PENDING, models.RagIngestionStatus.RUNNING)
+
+# Ingest replaces whole tables, so jobs run one at a time in submission order.
+_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-job")
+_ACTIVE_LOCK = Lock()
+_ACTIVE: Dict[str, IngestProgress] = {}
+
+
+class IngestJobError(RuntimeError):
+    """Raised when an ingest job cannot be transitioned as requested."""
+
+
+def _source_key(source_type: models.RagSourceType) -> str:
+    return next(key for key, value in INGEST_SOURCES.items() if value[0] == source_type)
+
+
+def _job_records(session: Session, job_id: str) -> List[models.RagIngestion]:
+    stmt = select(models.RagIngestion).where(models.RagIngestion.job_id == job_id).order_by(models.RagIngestion.source_id)
+    return list(session.scalars(stmt))
+
+
+def _update_job(
+    job_id: str,
+    *,
+    status: models.RagIngestionStatus,
+    from_statuses: Collection[models.RagIngestionStatus],
+    metadata: Optional[Dict[str, Any]] = None,
+    progress: Optional[IngestProgress] = None,
+) -> bool:
+    """Move the job's records to ``status`` if they are still in ``from_statuses``.
+
+    Returns ``False`` when the job has already moved on (e.g. another process cancelled
+    it), in which case nothing is written.
+    """
+
+    snapshot = progress.snapshot() if progress is not None else None
+    now = datetime.now(timezone.utc)
+    values: Dict[str, Any] = {"status": status, "heartbeat_at": now}
+    if status in TERMINAL_STATUSES:
+        values["completed_at"] = now
+    with session_scope() as session:
+        # A single conditional UPDATE, so a concurrent cancel is never overwritten.
+        moved = session.execute(
+            update(models.RagIngestion)
+            .where(models.RagIngestion.job_id == job_id, models.RagIngestion.status.in_(list(from_statuses)))
+            .values(**values)
+        ).rowcount
+        if not moved:
+            return False
+        for record in _job_records(session, job_id):
+            meta = dict(record.metadata_json or {})
+            meta.update(metadata or {})
+            if snapshot is not None:
+                source = _source_key(record.source_type)
+                meta["progress"] = snapshot["progress"].get(source, meta.get("progress"))
+                meta["throughput"] = snapshot["throughput"].get(source, meta.get("throughput"))
+                meta["elapsed_ms"] = snapshot["elapsed_ms"]
+            record.metadata_json = meta
+        return True
+
+
+def _heartbeat(job_id: str) -> bool:
+    """Record that the job's worker is alive; ``False`` once the job is no longer active here."""
+
+    stmt = (
+        update(models.RagIngestion)
+        .where(models.RagIngestion.job_id == job_id, models.RagIngestion.status.in_(ACTIVE_STATUSES))
+        .values(heartbeat_at=datetime.now(timezone.utc))
+    )
+    with session_scope() as session:
+        return session.execute(stmt).rowcount > 0
+
+
+def _stale_cutoff() -> datetime:
+    return datetime.now(timezone.utc) - timedelta(seconds=settings.ingest_stale_seconds)
+
+
+def _is_stale(record: models.RagIngestion) -> bool:
+    """Whether a started job's worker has stopped heart-beating (the process died mid-run)."""
+
+    if record.status not in (models.RagIngestionStatus.RUNNING, models.RagIngestionStatus.COMMITTING):
+        return False
+    last_seen = record.heartbeat_at or record.created_at
+    if last_seen.tzinfo is None:  # SQLite drops the zone
+        last_seen = last_seen.replace(tzinfo=timezone.utc)
+    with _ACTIVE_LOCK:
+        live = record.job_id in _ACTIVE
+    return not live and last_seen < _stale_cutoff()
+
+
+def fail_abandoned_ingest_jobs() -> int:
+    """Fail started jobs whose worker stopped heart-beating; returns how many jobs were failed.
+
+    Runs when the app starts and before each new job is queued, so status reads stay free
+    of side effects.
+    """
+
+    last_seen = func.coalesce(models.RagIngestion.heartbeat_at, models.RagIngestion.created_at)
+    stmt = select(models.RagIngestion).where(
+        models.RagIngestion.status.in_([models.RagIngestionStatus.RUNNING, models.RagIngestionStatus.COMMITTING]),
+        last_seen < _stale_cutoff(),
+    )
+    with _ACTIVE_LOCK:
+        live = set(_ACTIVE)
+    failed = set()
+    with session_scope() as session:
+        for record in session.scalars(stmt.with_for_update()):
+            if record.job_id in live:
+                continue
+            logger.warning("Failing ingest job %s: no heartbeat since %s", record.job_id, record.heartbeat_at)
+            record.status = models.RagIngestionStatus.FAILED
+            record.completed_at = datetime.now(timezone.utc)
+            record.metadata_json = {**(record.metadata_json or {}), "error": "Ingest worker stopped responding"}
+            failed.add(record.job_id)
+    return len(failed)
+
+
+def _run_job(job_id: str, data_path: str, progress: IngestProgress, reindex: bool) -> None:
+    try:
+        progress.raise_if_cancelled()
+        started = _update_job(
+            job_id, status=models.RagIngestionStatus.RUNNING, from_statuses={models.RagIngestionStatus.PENDING}
+        )
+        if not started:
+            raise IngestCancelled(f"Ingest job {job_id} was cancelled before it started")
+        corpus = read_corpus(data_path, progress=progress)
+        progress.raise_if_cancelled()
+        # Past this point tables are swapped and vectors written, which a cancel could only leave
+        # half done: refuse further cancels here, and in other processes through the status.
+        committing = progress.commit() and _update_job(
+            job_id, status=models.RagIngestionStatus.COMMITTING, from_statuses={models.RagIngestionStatus.RUNNING}
+        )
+        if not committing:
+            raise IngestCancelled(f"Ingest job {job_id} was cancelled")
+        # Commit the relational load before embedding so no transaction is held open during vector I/O.
+        with session_scope() as session:
+            result = persist_corpus(session, corpus, job_id=job_id, status=models.RagIngestionStatus.COMMITTING)
+        result["vector_store"] = index_corpus(corpus, progress=progress, reindex=reindex)
+        succeeded = _update_job(
+            job_id,
+            status=models.RagIngestionStatus.SUCCEEDED,
+            from_statuses={models.RagIngestionStatus.COMMITTING},
+            metadata={"run_id": result["run_id"], "vector_store": result["vector_store"]},
+            progress=progress,
+        )
+        if not succeeded:
+            logger.info("Ingest job %s finished after it was failed elsewhere", job_id)
+    except IngestCancelled:
+        logger.info("Ingest job %s cancelled", job_id)
+        _update_job(
+            job_id,
+            status=models.RagIngestionStatus.CANCELLED,
+            from_statuses={*ACTIVE_STATUSES, models.RagIngestionStatus.CANCELLED},
+            progress=progress,
+        )
+    except Exception as exc:
+        logger.exception("Ingest job %s failed", job_id)
+        _update_job(
+            job_id,
+            status=models.RagIngestionStatus.FAILED,
+            from_statuses=ACTIVE_STATUSES,
+            metadata={"error": str(exc)},
+            progress=progress,
+        )
+    finally:
+        with _ACTIVE_LOCK:
+            _ACTIVE.pop(job_id, None)
+
+
+def start_ingest_job(data_path: str = "input", *, reindex: bool = False) -> str:
+    """Create job records for ``data_path`` and queue the ingest on the background worker.
+
+    ``reindex`` rebuilds the vector collections blue/green behind their aliases instead
+    of upserting into the live ones.
+    """
+
+    resolve_data_dir(data_path)
+    fail_abandoned_ingest_jobs()
+    job_id = str(uuid4())
+    with session_scope() as session:
+        for source_type, source_file, _ in INGEST_SOURCES.values():
+            session.add(
+                models.RagIngestion(
+                    id=str(uuid4()),
+                    source_type=source_type,
+                    source_id=source_file,
+                    version="dev",
+                    job_id=job_id,
+                    status=models.RagIngestionStatus.PENDING,
+                    metadata_json={"data_path": data_path, "reindex": reindex, "progress": {name: 0 for name in PROGRESS_FIELDS}},
+                )
+            )
+
+    progress = IngestProgress(
+        job_id,
+        cancel_check=lambda: not _heartbeat(job_id),
+        check_interval=settings.ingest_heartbeat_seconds,
+    )
+    with _ACTIVE_LOCK:
+        _ACTIVE[job_id] = progress
+    _EXECUTOR.submit(_run_job, job_id, data_path, progress, reindex)
+    return job_id
+
+
+def get_ingest_job(session: Session, job_id: str) -> Optional[Dict[str, Any]]:
+    """Return job status with per-source progress, overlaying live counters when running here.
+
+    ``stale`` reports a started job whose worker stopped heart-beating; it is failed by
+    :func:`fail_abandoned_ingest_jobs`, not here.
+    """
+
+    records = _job_records(session, job_id)
+    if not records:
+        return None
+
+    with _ACTIVE_LOCK:
+        live = _ACTIVE.get(job_id)
+    snapshot = live.snapshot() if live is not None else None
+
+    progress: Dict[str, Any] = {}
+    throughput: Dict[str, Any] = {}
+    for record in records:
+        source = _source_key(record.source_type)
+        meta = record.metadata_json or {}
+        progress[source] = (snapshot or {}).get("progress", {}).get(source) or meta.get("progress") or {}
+        throughput[source] = (snapshot or {}).get("throughput", {}).get(source, meta.get("throughput", 0.0))
+
+    first = records[0]
+    meta = first.metadata_json or {}
+    return {
+        "job_id": job_id,
+        "status": first.status.value,
+        "cancel_requested": bool(live is not None and live.cancel_requested),
+        "stale": _is_stale(first),
+        "data_path": meta.get("data_path"),
+        "reindex": bool(meta.get("reindex")),
+        "run_id": meta.get("run_id"),
+        "counts": {_source_key(record.source_type): (record.metadata_json or {}).get("count") for record in records},
+        "progress": progress,
+        "throughput": throughput,
+        "elapsed_ms": snapshot["elapsed_ms"] if snapshot else meta.get("elapsed_ms"),
+        "vector_store": meta.get("vector_store"),
+        "error": meta.get("error"),
+        "created_at": first.created_at,
+        "completed_at": first.completed_at,
+    }
+
+
+def cancel_ingest_job(session: Session, job_id: str) -> Optional[Dict[str, Any]]:
+    """Request cancellation; pending jobs stop before starting, running jobs at the next batch.
+
+    Raises :class:`IngestJobError` once the job has finished or started committing its results.
+    """
+
+    records = _job_records(session, job_id)
+    if not records:
+        return None
+    if records[0].status not in CANCELLABLE_STATUSES:
+        raise IngestJobError(f"Ingest job already {records[0].status.value}")
+
+    with _ACTIVE_LOCK:
+        live = _ACTIVE.get(job_id)
+    if live is None:
+        # Job belongs to another process: its worker sees the status change at its next
+        # heartbeat and stops; a pending job never starts.
+        cancelled = session.execute(
+            update(models.RagIngestion)
+            .where(models.RagIngestion.job_id == job_id, models.RagIngestion.status.in_(CANCELLABLE_STATUSES))
+            .values(status=models.RagIngestionStatus.CANCELLED, completed_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session="fetch")
+        ).rowcount
+    else:
+        cancelled = live.cancel()
+    if not cancelled:
+        raise IngestJobError(f"Ingest job {job_id} is already committing its results")
+    return get_ingest_job(session, job_id)
+
+
+__all__ = [
+    "IngestJobError",
+    "cancel_ingest_job",
+    "fail_abandoned_ingest_jobs",
+    "get_ingest_job",
+    "start_ingest_job",
+]
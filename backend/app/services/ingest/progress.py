@@ -0,0 +1,112 @@
+"""Thread-safe progress tracking and cancellation for ingest runs."""
+
+from __future__ import annotations
+
+from threading import Event, Lock
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional
+
+PROGRESS_FIELDS = ("rows_read", "embedded", "upserted")
+
+
+class IngestCancelled(RuntimeError):
+    """Raised inside an ingest run once cancellation has been requested."""
+
+
+class IngestProgress:
+    """Per-source counters shared between the ingest worker and status readers.
+
+    ``cancel_check`` is polled at most every ``check_interval`` seconds from
+    :meth:`raise_if_cancelled` (and :attr:`cancelled`); returning ``True`` cancels the
+    run, which is how cancellations requested by other processes reach the worker.
+    Once :meth:`commit` succeeds the run can no longer be cancelled; ``cancel_check`` is
+    still polled (it doubles as the heartbeat) but its answer is ignored.
+    """
+
+    def __init__(
+        self,
+        job_id: str,
+        *,
+        cancel_check: Optional[Callable[[], bool]] = None,
+        check_interval: float = 1.0,
+    ) -> None:
+        self.job_id = job_id
+        self._lock = Lock()
+        self._cancel = Event()
+        self._started = perf_counter()
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._cancel_check = cancel_check
+        self._check_interval = check_interval
+        self._checked_at: Optional[float] = None
+        self._committed = False
+
+    def _source(self, source: str) -> Dict[str, int]:
+        return self._counters.setdefault(source, {name: 0 for name in PROGRESS_FIELDS})
+
+    def set_read(self, source: str, rows: int) -> None:
+        with self._lock:
+            self._source(source)["rows_read"] = rows
+
+    def add(self, source: str, *, embedded: int = 0, upserted: int = 0) -> None:
+        with self._lock:
+            counters = self._source(source)
+            counters["embedded"] += embedded
+            counters["upserted"] += upserted
+
+    def cancel(self) -> bool:
+        """Cancel the run; ``False`` if it has already committed its results."""
+
+        with self._lock:
+            if self._committed:
+                return False
+            self._cancel.set()
+            return True
+
+    def commit(self) -> bool:
+        """Make the run uncancellable from here on; ``False`` if it was cancelled first."""
+
+        with self._lock:
+            if self._cancel.is_set():
+                return False
+            self._committed = True
+            return True
+
+    def _poll(self) -> bool:
+        if self._cancel.is_set() or self._cancel_check is None:
+            return self._cancel.is_set()
+        now = perf_counter()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self._check_interval:
+                return False
+            self._checked_at = now
+        if self._cancel_check():
+            with self._lock:
+                if not self._committed:
+                    self._cancel.set()
+        return self._cancel.is_set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._poll()
+
+    @property
+    def cancel_requested(self) -> bool:
+        """Whether the run has been cancelled, without polling ``cancel_check``."""
+
+        return self._cancel.is_set()
+
+    def raise_if_cancelled(self) -> None:
+        if self._poll():
+            raise IngestCancelled(f"Ingest job {self.job_id} was cancelled")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counters plus upserted rows/sec per source since the run started."""
+
+        elapsed = max(perf_counter() - self._started, 1e-6)
+        with self._lock:
+            progress = {source: dict(counters) for source, counters in self._counters.items()}
+        throughput = {source: round(counters["upserted"] / elapsed, 1) for source, counters in progress.items()}
+        return {"progress": progress, "throughput": throughput, "elapsed_ms": round(elapsed * 1000.0, 2)}
+
+
+__all__ = ["IngestCancelled", "IngestProgress", "PROGRESS_FIELDS"]
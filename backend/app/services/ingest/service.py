@@ -4,129 +4,180 @@ from __future__ import annotations
 
 import logging
 import os
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from qdrant_client import QdrantClient
-from qdrant_client.http import models as qmodels
-from sqlalchemy import delete
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.core import io_utils, state
-from app.core.settings import settings
 from app.db import models
+from app.services.rag.aliases import ensure_aliased_collections, reindex_collection
 from app.services.rag.config import default_collections, vector_store_config
-from app.services.rag.embedding import get_embedding_client
+
+from .bulk import bulk_replace
+from .pipeline import CollectionLoad, VectorItem, run_vector_pipeline
+from .progress import IngestProgress
 
 DATA_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../../..", "data"))
 logger = logging.getLogger(__name__)
 
+EMBEDDING_COLUMN = "embedding"
+
+# counts key -> (RagIngestion source type, source file, Qdrant collection)
+INGEST_SOURCES = {
+    "context": (models.RagSourceType.CONTEXT, "context.jsonl", "context_snippets"),
+    "glossary": (models.RagSourceType.GLOSSARY, "glossary.csv", "glossary_terms"),
+    "style": (models.RagSourceType.STYLE_GUIDE, "style_corpus.csv", "style_guides"),
+}
+
 
 def _ensure_collections(client: QdrantClient) -> None:
-    existing = {collection.name for collection in client.get_collections().collections or []}
-    for cfg in default_collections:
-        if cfg.name in existing:
+    ensure_aliased_collections(client, default_collections)
+
+
+def _style_vector_item(row: Dict[str, Any]) -> Optional[VectorItem]:
+    text = str(row.get("en_line", "")).strip()
+    if not text:
+        return None
+    payload = {
+        "sid": row.get("sid"),
+        "language": "en",
+        "device": row.get("device"),
+        "feature_norm": row.get("feature_norm"),
+        "style_tag": row.get("style_tag"),
+        "notes": row.get("notes"),
+    }
+    return text, payload
+
+
+def _context_vector_item(row: Dict[str, Any]) -> Optional[VectorItem]:
+    text = str(row.get("ko_response") or row.get("en_line") or "").strip()
+    if not text:
+        return None
+    payload = {
+        "context_id": row.get("id"),
+        "device": row.get("device"),
+        "feature_norm": row.get("feature_norm"),
+        "style_tag": row.get("style_tag"),
+        "tags": row.get("response_case_tags", []),
+    }
+    return text, payload
+
+
+def _glossary_vector_item(row: Dict[str, Any]) -> Optional[VectorItem]:
+    text = str(row.get("en_term") or row.get("ko_term") or "").strip()
+    if not text:
+        return None
+    payload = {
+        "term": row.get("ko_term"),
+        "translation": row.get("en_term"),
+        "language_pair": "ko-en",
+        "device": row.get("device"),
+        "must_use": str(row.get("must_use", "")).lower() in {"true", "1", "yes"},
+    }
+    return text, payload
+
+
+_VECTOR_ITEM_BUILDERS = {
+    "style": _style_vector_item,
+    "glossary": _glossary_vector_item,
+    "context": _context_vector_item,
+}
+
+
+def _collection_load(source: str, rows: List[Dict[str, Any]], vectors: Optional[List[Any]]) -> CollectionLoad:
+    """Build the Qdrant load for one source, reusing precomputed vectors when every row has one."""
+
+    build = _VECTOR_ITEM_BUILDERS[source]
+    items: List[VectorItem] = []
+    aligned: List[Any] = []
+    for index, row in enumerate(rows):
+        item = build(row)
+        if item is None:
             continue
-        distance = getattr(qmodels.Distance, cfg.distance.upper(), qmodels.Distance.COSINE)
-        logger.info("Creating Qdrant collection %s (dim=%s)", cfg.name, cfg.dimension)
-        client.recreate_collection(
-            collection_name=cfg.name,
-            vectors_config=qmodels.VectorParams(size=cfg.dimension, distance=distance),
-            shard_number=cfg.shard_number,
-            on_disk_payload=cfg.on_disk,
-        )
+        items.append(item)
+        aligned.append(vectors[index] if vectors is not None else None)
+    precomputed = aligned if aligned and all(vector is not None for vector in aligned) else None
+    return CollectionLoad(INGEST_SOURCES[source][2], items, source=source, vectors=precomputed)
 
 
-def _upsert_vectors(
-    client: QdrantClient,
-    collection_name: str,
-    points: Iterable[qmodels.PointStruct],
-) -> int:
-    points_list = list(points)
-    if not points_list:
-        return 0
-    client.upsert(collection_name=collection_name, points=points_list)
-    return len(points_list)
-
-
-def _batch_embed(
-    text_payload_pairs: Sequence[Tuple[str, Dict[str, Any]]],
-) -> List[qmodels.PointStruct]:
-    if not text_payload_pairs:
-        return []
-
-    client = get_embedding_client()
-    batch_size = max(1, getattr(settings, "embedding_max_batch", 16))
-    points: List[qmodels.PointStruct] = []
-    for start in range(0, len(text_payload_pairs), batch_size):
-        batch = text_payload_pairs[start : start + batch_size]
-        vectors = client.embed([text for text, _ in batch])
-        for vector, (_, payload) in zip(vectors, batch):
-            points.append(qmodels.PointStruct(id=str(uuid4()), vector=vector, payload=payload))
-    return points
-
-
-def _collect_style_vectors(style_rows: List[Dict[str, Any]]) -> List[qmodels.PointStruct]:
-    items: List[Tuple[str, Dict[str, Any]]] = []
-    for row in style_rows:
-        text = str(row.get("en_line", "")).strip()
-        if not text:
-            continue
-        payload = {
-            "sid": row.get("sid"),
-            "language": "en",
+def _context_table_rows(context_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": row.get("id", str(uuid4())),
             "device": row.get("device"),
+            "feature": row.get("feature"),
             "feature_norm": row.get("feature_norm"),
             "style_tag": row.get("style_tag"),
+            "user_utterance": row.get("user_utterance"),
+            "response_case_raw": row.get("response_case_raw"),
+            "response_case_norm": row.get("response_case_norm"),
+            "response_case_tags": row.get("response_case_tags"),
+            "response_text": row.get("ko_response"),
             "notes": row.get("notes"),
         }
-        items.append((text, payload))
-    return _batch_embed(items)
+        for row in context_rows
+    ]
 
 
-def _collect_context_vectors(context_rows: List[Dict[str, Any]]) -> List[qmodels.PointStruct]:
-    items: List[Tuple[str, Dict[str, Any]]] = []
-    for row in context_rows:
-        text = str(row.get("ko_response") or row.get("en_line") or "").strip()
-        if not text:
-            continue
-        payload = {
-            "context_id": row.get("id"),
+def _style_table_rows(style_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": row.get("sid", str(uuid4())),
+            "language": "en",
             "device": row.get("device"),
             "feature_norm": row.get("feature_norm"),
             "style_tag": row.get("style_tag"),
-            "tags": row.get("response_case_tags", []),
+            "text": row.get("en_line", ""),
+            "notes": row.get("notes"),
         }
-        items.append((text, payload))
-    return _batch_embed(items)
+        for row in style_rows
+    ]
 
 
-def _collect_glossary_vectors(glossary_rows: List[Dict[str, Any]]) -> List[qmodels.PointStruct]:
-    items: List[Tuple[str, Dict[str, Any]]] = []
-    for row in glossary_rows:
-        text = str(row.get("en_term") or row.get("ko_term") or "").strip()
-        if not text:
-            continue
-        payload = {
-            "term": row.get("ko_term"),
-            "translation": row.get("en_term"),
-            "language_pair": "ko-en",
+def _glossary_table_rows(glossary_rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": str(uuid4()),
+            "source_language": "ko",
+            "target_language": "en",
+            "source_term": row.get("ko_term", ""),
+            "target_term": row.get("en_term", ""),
             "device": row.get("device"),
             "must_use": str(row.get("must_use", "")).lower() in {"true", "1", "yes"},
+            "part_of_speech": row.get("pos"),
+            "synonyms": row.get("synonyms_ko"),
+            "notes": row.get("notes"),
         }
-        items.append((text, payload))
-    return _batch_embed(items)
+        for row in glossary_rows
+    ]
 
 
-def do_ingest(session: Session, data_path: str = "input", vector_client: Optional[QdrantClient] = None) -> Dict[str, Any]:
-    """Load seed data from specified path into Postgres and Qdrant.
+@dataclass
+class IngestCorpus:
+    """Raw rows read from one data directory."""
+
+    data_path: str
+    context_rows: List[Dict[str, Any]]
+    glossary_rows: List[Dict[str, Any]]
+    style_rows: List[Dict[str, Any]]
+    rules: Dict[str, Any]
+    # Precomputed embedding columns from columnar inputs, aligned with the rows of each source.
+    vectors: Dict[str, Optional[List[Any]]] = field(default_factory=dict)
+
+    def rows(self, source: str) -> List[Dict[str, Any]]:
+        return {"context": self.context_rows, "glossary": self.glossary_rows, "style": self.style_rows}[source]
+
+    def counts(self) -> Dict[str, int]:
+        return {"context": len(self.context_rows), "glossary": len(self.glossary_rows), "style": len(self.style_rows)}
 
-    Args:
-        session: Database session
-        data_path: Relative path from DATA_ROOT (e.g., "input" or "mock/day6")
-        vector_client: Optional Qdrant client
-    """
-    logger.info(f"do_ingest called with data_path={data_path}")
+
+def resolve_data_dir(data_path: str) -> str:
+    """Return the absolute input directory for ``data_path`` under DATA_ROOT."""
 
     # Security: prevent directory traversal
     if ".." in data_path or data_path.startswith("/"):
@@ -136,102 +187,166 @@ def do_ingest(session: Session, data_path: str = "input", vector_client: Optiona
     logger.info(f"Loading data from: {inp}")
     if not os.path.exists(inp):
         raise FileNotFoundError(f"Data path does not exist: {inp}")
+    return inp
 
-    context_rows = io_utils.read_jsonl(os.path.join(inp, "context.jsonl"))
-    glossary_rows = io_utils.read_csv(os.path.join(inp, "glossary.csv"))
-    style_rows = io_utils.read_csv(os.path.join(inp, "style_corpus.csv"))
-    rules = io_utils.read_yaml(os.path.join(inp, "style_rules.yaml"))
-
-    # Persist to Postgres
-    session.execute(delete(models.ContextSnippet))
-    session.execute(delete(models.StyleGuideEntry))
-    session.execute(delete(models.GlossaryEntry))
-
-    session.add_all(
-        [
-            models.ContextSnippet(
-                id=row.get("id", str(uuid4())),
-                device=row.get("device"),
-                feature=row.get("feature"),
-                feature_norm=row.get("feature_norm"),
-                style_tag=row.get("style_tag"),
-                user_utterance=row.get("user_utterance"),
-                response_case_raw=row.get("response_case_raw"),
-                response_case_norm=row.get("response_case_norm"),
-                response_case_tags=row.get("response_case_tags"),
-                response_text=row.get("ko_response"),
-                notes=row.get("notes"),
-            )
-            for row in context_rows
-        ]
-    )
 
-    session.add_all(
-        [
-            models.StyleGuideEntry(
-                id=row.get("sid", str(uuid4())),
-                language="en",
-                device=row.get("device"),
-                feature_norm=row.get("feature_norm"),
-                style_tag=row.get("style_tag"),
-                text=row.get("en_line", ""),
-                notes=row.get("notes"),
-            )
-            for row in style_rows
-        ]
-    )
+def _read_source(directory: str, stem: str, fallback: str) -> Tuple[List[Dict[str, Any]], Optional[List[Any]]]:
+    path = io_utils.find_input(directory, stem, fallback)
+    if path.endswith(io_utils.COLUMNAR_EXTENSIONS):
+        logger.info("Reading columnar input %s", path)
+        return io_utils.read_columnar(path, vector_column=EMBEDDING_COLUMN)
+    if path.endswith(".jsonl"):
+        return io_utils.read_jsonl(path), None
+    return io_utils.read_csv(path), None
+
 
-    session.add_all(
-        [
-            models.GlossaryEntry(
+def read_corpus(data_path: str = "input", progress: Optional[IngestProgress] = None) -> IngestCorpus:
+    """Read one data directory, preferring Parquet/Arrow exports over JSONL/CSV per source.
+
+    Columnar inputs are memory-mapped and decoded in record batches; an ``embedding``
+    column, when present, is kept aside so those rows skip the embedding model.
+    """
+
+    inp = resolve_data_dir(data_path)
+    context_rows, context_vectors = _read_source(inp, "context", "context.jsonl")
+    glossary_rows, glossary_vectors = _read_source(inp, "glossary", "glossary.csv")
+    style_rows, style_vectors = _read_source(inp, "style_corpus", "style_corpus.csv")
+    corpus = IngestCorpus(
+        data_path=data_path,
+        context_rows=context_rows,
+        glossary_rows=glossary_rows,
+        style_rows=style_rows,
+        rules=io_utils.read_yaml(os.path.join(inp, "style_rules.yaml")),
+        vectors={"context": context_vectors, "glossary": glossary_vectors, "style": style_vectors},
+    )
+    if progress is not None:
+        for source, count in corpus.counts().items():
+            progress.set_read(source, count)
+    return corpus
+
+
+def _record_ingestions(
+    session: Session,
+    *,
+    job_id: str,
+    counts: Dict[str, int],
+    rows_per_sec: Dict[str, float],
+    status: models.RagIngestionStatus,
+) -> None:
+    existing = {
+        record.source_type: record
+        for record in session.scalars(select(models.RagIngestion).where(models.RagIngestion.job_id == job_id))
+    }
+    for source, (source_type, source_file, _) in INGEST_SOURCES.items():
+        record = existing.get(source_type)
+        if record is None:
+            record = models.RagIngestion(
                 id=str(uuid4()),
-                source_language="ko",
-                target_language="en",
-                source_term=row.get("ko_term", ""),
-                target_term=row.get("en_term", ""),
-                device=row.get("device"),
-                must_use=str(row.get("must_use", "")).lower() in {"true", "1", "yes"},
-                part_of_speech=row.get("pos"),
-                synonyms=row.get("synonyms_ko"),
-                notes=row.get("notes"),
+                source_type=source_type,
+                source_id=source_file,
+                version="dev",
+                job_id=job_id,
             )
-            for row in glossary_rows
-        ]
-    )
-
-    ingestion_records = [
-        models.RagIngestion(
-            id=str(uuid4()),
-            source_type=models.RagSourceType.CONTEXT,
-            source_id="context.jsonl",
-            version="dev",
-            metadata_json={"count": len(context_rows)},
-        ),
-        models.RagIngestion(
-            id=str(uuid4()),
-            source_type=models.RagSourceType.GLOSSARY,
-            source_id="glossary.csv",
-            version="dev",
-            metadata_json={"count": len(glossary_rows)},
-        ),
-        models.RagIngestion(
-            id=str(uuid4()),
-            source_type=models.RagSourceType.STYLE_GUIDE,
-            source_id="style_corpus.csv",
-            version="dev",
-            metadata_json={"count": len(style_rows)},
-        ),
-    ]
-    session.add_all(ingestion_records)
+            session.add(record)
+        if record.status != models.RagIngestionStatus.CANCELLED:
+            # A cancellation from another process wins over the load still in progress.
+            record.status = status
+        record.metadata_json = {
+            **(record.metadata_json or {}),
+            "count": counts[source],
+            "rows_per_sec": rows_per_sec[source],
+        }
     session.flush()
 
-    counts = {"context": len(context_rows), "glossary": len(glossary_rows), "style": len(style_rows)}
+
+def persist_corpus(
+    session: Session,
+    corpus: IngestCorpus,
+    *,
+    job_id: Optional[str] = None,
+    status: models.RagIngestionStatus = models.RagIngestionStatus.SUCCEEDED,
+) -> Dict[str, Any]:
+    """Bulk-load the relational tables and publish the corpus snapshot to all workers."""
+
+    # Persist to Postgres through staged bulk loads instead of ORM unit-of-work inserts
+    load_stats = {
+        "context": bulk_replace(session, models.ContextSnippet.__table__, _context_table_rows(corpus.context_rows)),
+        "style": bulk_replace(session, models.StyleGuideEntry.__table__, _style_table_rows(corpus.style_rows)),
+        "glossary": bulk_replace(session, models.GlossaryEntry.__table__, _glossary_table_rows(corpus.glossary_rows)),
+    }
+    rows_per_sec = {key: stats["rows_per_sec"] for key, stats in load_stats.items()}
+    counts = corpus.counts()
+
+    job_id = job_id or str(uuid4())
+    _record_ingestions(session, job_id=job_id, counts=counts, rows_per_sec=rows_per_sec, status=status)
 
     run_id = io_utils.new_run_id()
-    state.CONTEXT[:] = context_rows
-    state.GLOSSARY[:] = glossary_rows
-    state.STYLE[:] = style_rows
-    state.RUN_LOGS[run_id] = {"counts": counts, "rules": rules}
+    state.STORE.publish(
+        context=corpus.context_rows,
+        glossary=corpus.glossary_rows,
+        style=corpus.style_rows,
+        run_id=run_id,
+        run_log={"counts": counts, "rules": corpus.rules},
+    )
+
+    return {"run_id": run_id, "job_id": job_id, "counts": counts, "rows_per_sec": rows_per_sec}
+
+
+def _reindex_collections(
+    client: QdrantClient,
+    loads: List[CollectionLoad],
+    progress: Optional[IngestProgress],
+) -> Dict[str, Any]:
+    """Rebuild each collection as a new version behind its alias, concurrently."""
+
+    configs = {cfg.name: cfg for cfg in default_collections}
+
+    def rebuild(live: CollectionLoad) -> Dict[str, Any]:
+        def load(target: str) -> int:
+            staged = CollectionLoad(target, live.items, source=live.source, vectors=live.vectors)
+            summary = run_vector_pipeline(client, [staged], progress=progress)
+            if summary["status"] != "completed":
+                raise RuntimeError(summary.get("error", f"Loading {target} failed"))
+            return summary["collections"][target]
+
+        return reindex_collection(client, configs[live.collection], live.items, load, vectors=live.vectors)
+
+    with ThreadPoolExecutor(max_workers=len(loads), thread_name_prefix="ingest-reindex") as pool:
+        futures = {load.source: pool.submit(rebuild, load) for load in loads}
+    reindexed: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for source, future in futures.items():
+        name = INGEST_SOURCES[source][2]
+        try:
+            reindexed[name] = future.result()
+        except Exception as exc:  # pragma: no cover - depends on external service
+            logger.warning("Reindex of %s failed: %s", name, exc)
+            errors[name] = str(exc)
+
+    summary: Dict[str, Any] = {
+        "status": "failed" if errors else "completed",
+        "mode": "reindex",
+        "collections": {name: info["count"] for name, info in reindexed.items()},
+        "reindex": reindexed,
+    }
+    if errors:
+        summary["error"] = "; ".join(f"{name}: {message}" for name, message in errors.items())
+    return summary
+
+
+def index_corpus(
+    corpus: IngestCorpus,
+    vector_client: Optional[QdrantClient] = None,
+    progress: Optional[IngestProgress] = None,
+    *,
+    reindex: bool = False,
+) -> Dict[str, Any]:
+    """Embed and upsert the corpus into Qdrant, returning the vector store summary.
+
+    With ``reindex`` every collection is rebuilt as a new physical version and the
+    alias is switched only after verification; otherwise points are upserted into
+    the live collections.
+    """
 
     vector_summary: Dict[str, Any] = {"collections": {}, "status": "skipped"}
 
@@ -245,22 +360,42 @@ def do_ingest(session: Session, data_path: str = "input", vector_client: Optiona
     if vector_client is not None:
         try:
             _ensure_collections(vector_client)
-            inserted_counts = {}
-            inserted_counts["style_guides"] = _upsert_vectors(
-                vector_client, "style_guides", _collect_style_vectors(style_rows)
-            )
-            inserted_counts["glossary_terms"] = _upsert_vectors(
-                vector_client, "glossary_terms", _collect_glossary_vectors(glossary_rows)
-            )
-            inserted_counts["context_snippets"] = _upsert_vectors(
-                vector_client, "context_snippets", _collect_context_vectors(context_rows)
-            )
-            vector_summary = {"status": "completed", "collections": inserted_counts}
+            loads = [
+                _collection_load(source, corpus.rows(source), corpus.vectors.get(source))
+                for source in ("style", "glossary", "context")
+            ]
+            if reindex:
+                vector_summary = _reindex_collections(vector_client, loads, progress)
+            else:
+                vector_summary = run_vector_pipeline(vector_client, loads, progress=progress)
         except Exception as exc:  # pragma: no cover - depends on external service
             logger.warning("Vector store ingestion failed: %s", exc)
             vector_summary = {"status": "failed", "error": str(exc)}
 
-    return {"run_id": run_id, "counts": counts, "vector_store": vector_summary}
+    return vector_summary
+
+
+def do_ingest(
+    session: Session,
+    data_path: str = "input",
+    vector_client: Optional[QdrantClient] = None,
+    *,
+    reindex: bool = False,
+) -> Dict[str, Any]:
+    """Load seed data from specified path into Postgres and Qdrant.
+
+    Args:
+        session: Database session
+        data_path: Relative path from DATA_ROOT (e.g., "input" or "mock/day6")
+        vector_client: Optional Qdrant client
+        reindex: Rebuild vector collections blue/green behind their aliases
+    """
+    logger.info(f"do_ingest called with data_path={data_path}")
+
+    corpus = read_corpus(data_path)
+    result = persist_corpus(session, corpus)
+    result["vector_store"] = index_corpus(corpus, vector_client, reindex=reindex)
+    return result
 
 
-__all__ = ["do_ingest"]
+__all__ = ["IngestCorpus", "do_ingest", "index_corpus", "persist_corpus", "read_corpus", "resolve_data_dir"]
@@ -7,10 +7,25 @@ from typing import Optional
 
 from app.core.settings import settings
 
-from .client import LLMClient, LLMClientError, OpenAIChatClient
+from .cache import CachingAsyncLLMClient, CachingLLMClient, get_llm_cache
+from .client import (
+    AsyncLLMClient,
+    AsyncOpenAIChatClient,
+    LLMClient,
+    LLMClientError,
+    OpenAIChatClient,
+    ThreadedLLMClient,
+)
+from .hedging import HedgedAsyncLLMClient, HedgedLLMClient, get_hedge_policy
+from .resilience import ResilientAsyncLLMClient, ResilientLLMClient, get_guard
+from .router import AsyncLLMRouter, LLMRouter, get_routing_table
+from .singleflight import SingleFlightAsyncLLMClient, SingleFlightLLMClient
+from .stub import AsyncStubLLMClient, LatencyProfile, StubLLMClient
+from .transport import get_async_http_client, get_http_client, http_timeout
 
 _CLIENT_LOCK = Lock()
 _CLIENT: Optional[LLMClient] = None
+_ASYNC_CLIENT: Optional[AsyncLLMClient] = None
 
 
 def get_llm_client() -> LLMClient:
@@ -24,15 +39,117 @@ def get_llm_client() -> LLMClient:
     return _CLIENT
 
 
+def get_async_llm_client() -> AsyncLLMClient:
+    """Return the singleton async LLM client.
+
+    A custom blocking client installed in the registry (another provider, or a stub)
+    takes precedence and is run on a worker thread so both entry points agree.
+    """
+
+    if _CLIENT is not None and not isinstance(
+        _CLIENT, (OpenAIChatClient, CachingLLMClient, HedgedLLMClient, ResilientLLMClient, LLMRouter)
+    ):
+        return ThreadedLLMClient(_CLIENT)
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is None:
+        with _CLIENT_LOCK:
+            if _ASYNC_CLIENT is None:
+                _ASYNC_CLIENT = _build_async_client()
+    return _ASYNC_CLIENT
+
+
 def _build_client() -> LLMClient:
+    table = get_routing_table()
+    return LLMRouter({model: _build_model_client(model) for model in table.models}, table)
+
+
+def _build_async_client() -> AsyncLLMClient:
+    table = get_routing_table()
+    return AsyncLLMRouter({model: _build_async_model_client(model) for model in table.models}, table)
+
+
+def _build_model_client(model: str) -> LLMClient:
+    client = ResilientLLMClient(_build_provider_client(model), get_guard(model))
+    if settings.llm_hedge_enabled:
+        client = HedgedLLMClient(client, get_hedge_policy(model))
+    if settings.llm_singleflight_enabled:
+        client = SingleFlightLLMClient(client, model=model, default_temperature=settings.llm_temperature)
+    cache = get_llm_cache()
+    if cache is None:
+        return client
+    return CachingLLMClient(
+        client,
+        cache,
+        model=model,
+        default_temperature=settings.llm_temperature,
+        max_temperature=settings.llm_cache_max_temperature,
+    )
+
+
+def _build_async_model_client(model: str) -> AsyncLLMClient:
+    client = ResilientAsyncLLMClient(_build_async_provider_client(model), get_guard(model))
+    if settings.llm_hedge_enabled:
+        client = HedgedAsyncLLMClient(client, get_hedge_policy(model))
+    if settings.llm_singleflight_enabled:
+        client = SingleFlightAsyncLLMClient(client, model=model, default_temperature=settings.llm_temperature)
+    cache = get_llm_cache()
+    if cache is None:
+        return client
+    return CachingAsyncLLMClient(
+        client,
+        cache,
+        model=model,
+        default_temperature=settings.llm_temperature,
+        max_temperature=settings.llm_cache_max_temperature,
+    )
+
+
+def _stub_kwargs() -> dict:
+    if settings.llm_stub_latency == "histogram":
+        if not settings.llm_stub_latency_file:
+            raise LLMClientError("LLM_STUB_LATENCY=histogram requires LLM_STUB_LATENCY_FILE")
+        latency = LatencyProfile.from_file(settings.llm_stub_latency_file, seed=settings.llm_stub_seed)
+    else:
+        latency = LatencyProfile(
+            settings.llm_stub_latency,
+            median_ms=settings.llm_stub_latency_ms,
+            sigma=settings.llm_stub_latency_sigma,
+            seed=settings.llm_stub_seed,
+        )
+    return {
+        "latency": latency,
+        "error_rate": settings.llm_stub_error_rate,
+        "rate_limit_rate": settings.llm_stub_rate_limit_rate,
+    }
+
+
+def _build_provider_client(model: str) -> LLMClient:
+    if settings.llm_provider == "stub":
+        return StubLLMClient(**_stub_kwargs())
     if settings.llm_provider == "openai":
         return OpenAIChatClient(
-            model=settings.llm_model,
+            model=model,
             api_key=settings.llm_api_key or "",
             base_url=settings.llm_base_url,
             default_temperature=settings.llm_temperature,
-            timeout_seconds=settings.llm_timeout_seconds,
+            timeout_seconds=http_timeout(),
+            http_client=get_http_client(),
         )
 
     raise LLMClientError(f"Unsupported LLM provider: {settings.llm_provider}")
 
+
+def _build_async_provider_client(model: str) -> AsyncLLMClient:
+    if settings.llm_provider == "stub":
+        return AsyncStubLLMClient(**_stub_kwargs())
+    if settings.llm_provider == "openai":
+        return AsyncOpenAIChatClient(
+            model=model,
+            api_key=settings.llm_api_key or "",
+            base_url=settings.llm_base_url,
+            default_temperature=settings.llm_temperature,
+            timeout_seconds=http_timeout(),
+            http_client=get_async_http_client(),
+        )
+
+    raise LLMClientError(f"Unsupported LLM provider: {settings.llm_provider}")
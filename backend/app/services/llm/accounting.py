@@ -0,0 +1,154 @@
+"""Per-call token and latency accounting, aggregated by call site and model."""
+
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from threading import Lock
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+from app.core.metrics import Histogram
+
+from .client import LLMResult, PromptRequest
+from .tokens import count_tokens
+
+RECENT_CALLS = 512
+
+_REQUEST_ID: ContextVar[Optional[str]] = ContextVar("llm_request_id", default=None)
+
+
+@contextmanager
+def llm_request(request_id: Optional[str]) -> Iterator[None]:
+    """Attribute LLM calls made inside the block (including worker threads) to ``request_id``."""
+
+    token = _REQUEST_ID.set(request_id)
+    try:
+        yield
+    finally:
+        _REQUEST_ID.reset(token)
+
+
+@dataclass(slots=True)
+class LLMCallRecord:
+    route: str
+    model: str
+    request_id: Optional[str]
+    latency_ms: float
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    response_cached: bool = False  # served from the response cache; no tokens were billed
+    response_shared: bool = False  # joined an identical in-flight call; its tokens are billed to that call
+    usage_estimated: bool = False  # provider reported no usage; counts are local estimates
+    ok: bool = True
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class _CallStats:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.response_cache_hits = 0
+        self.shared_calls = 0
+        self.latency_ms = Histogram()
+        self.prompt_tokens = Histogram()
+        self.completion_tokens = Histogram()
+        self.cached_tokens = Histogram()
+
+    def add(self, record: LLMCallRecord) -> None:
+        self.calls += 1
+        self.latency_ms.observe(record.latency_ms)
+        if not record.ok:
+            self.errors += 1
+            return
+        if record.response_cached:
+            self.response_cache_hits += 1
+            return
+        if record.response_shared:
+            self.shared_calls += 1
+            return
+        self.prompt_tokens.observe(record.prompt_tokens)
+        self.completion_tokens.observe(record.completion_tokens)
+        self.cached_tokens.observe(record.cached_tokens)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "response_cache_hits": self.response_cache_hits,
+            "shared_calls": self.shared_calls,
+            "latency_ms": self.latency_ms.summary(),
+            "prompt_tokens": self.prompt_tokens.summary(),
+            "completion_tokens": self.completion_tokens.summary(),
+            "cached_tokens": self.cached_tokens.summary(),
+        }
+
+
+_LOCK = Lock()
+_STATS: Dict[Tuple[str, str], _CallStats] = {}
+_RECENT: Deque[LLMCallRecord] = deque(maxlen=RECENT_CALLS)
+
+
+def call_record(
+    prompt: PromptRequest,
+    model: str,
+    latency_ms: float,
+    result: Optional[LLMResult] = None,
+) -> LLMCallRecord:
+    """Build the record for one routed call; ``result`` is ``None`` when it failed."""
+
+    record = LLMCallRecord(
+        route=prompt.route or "default",
+        model=model,
+        request_id=_REQUEST_ID.get(),
+        latency_ms=round(latency_ms, 3),
+        ok=result is not None,
+    )
+    if result is None:
+        return record
+    if result.cached:
+        record.response_cached = True
+    elif result.shared:
+        record.response_shared = True
+    elif result.usage:
+        record.prompt_tokens = result.usage.get("prompt_tokens", 0)
+        record.completion_tokens = result.usage.get("completion_tokens", 0)
+        record.cached_tokens = result.usage.get("cached_tokens", 0)
+    else:
+        record.usage_estimated = True
+        record.prompt_tokens = sum(count_tokens(message.content, model) for message in prompt.messages)
+        record.completion_tokens = sum(count_tokens(text, model) for text in result.candidates)
+    return record
+
+
+def record_call(record: LLMCallRecord) -> None:
+    with _LOCK:
+        stats = _STATS.get((record.route, record.model))
+        if stats is None:
+            stats = _STATS[(record.route, record.model)] = _CallStats()
+        stats.add(record)
+        _RECENT.append(record)
+
+
+def usage_report(request_id: Optional[str] = None, limit: int = 50) -> Dict[str, Any]:
+    """Aggregates per ``route:model`` plus the most recent calls, optionally for one request."""
+
+    with _LOCK:
+        aggregates = {f"{route}:{model}": stats.summary() for (route, model), stats in sorted(_STATS.items())}
+        recent: List[LLMCallRecord] = [
+            record for record in _RECENT if request_id is None or record.request_id == request_id
+        ]
+    return {"by_route_model": aggregates, "recent": [record.as_dict() for record in recent[-limit:]]}
+
+
+def reset() -> None:
+    with _LOCK:
+        _STATS.clear()
+        _RECENT.clear()
+
+
+__all__ = ["LLMCallRecord", "call_record", "llm_request", "record_call", "reset", "usage_report"]
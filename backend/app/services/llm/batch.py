@@ -0,0 +1,255 @@
+"""Batch-completions backends: submit a JSONL file of chat requests and collect the results."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Protocol, Tuple, Union
+from uuid import uuid4
+
+from openai import APIError, OpenAI, OpenAIError
+from openai.types.chat import ChatCompletion
+
+from app.core.settings import settings
+
+from .client import (
+    LLMClient,
+    LLMClientError,
+    LLMResult,
+    PromptMessage,
+    PromptRequest,
+    _client_kwargs,
+    _completion_request,
+    _completion_result,
+    _provider_error,
+)
+from .transport import get_http_client, http_timeout
+
+logger = logging.getLogger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+
+# Batch states as reported by the OpenAI Batch API.
+BATCH_TERMINAL_STATES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+BatchOutcome = Union[LLMResult, LLMClientError]
+
+
+class BatchBackend(Protocol):
+    """Runs a JSONL file of chat-completion requests asynchronously."""
+
+    def submit(self, input_path: Path) -> str:  # pragma: no cover - interface definition
+        """Upload ``input_path`` and start the batch; returns the batch id."""
+        raise NotImplementedError
+
+    def status(self, batch_id: str) -> str:  # pragma: no cover - interface definition
+        """Current state of the batch (see :data:`BATCH_TERMINAL_STATES`)."""
+        raise NotImplementedError
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, object]]:  # pragma: no cover - interface definition
+        """Output and error lines of a finished batch, in the OpenAI batch output format."""
+        raise NotImplementedError
+
+
+def batch_request_line(custom_id: str, model: str, prompt: PromptRequest) -> Dict[str, object]:
+    """One input line: the same request body an online call would send."""
+
+    body = _completion_request(model, prompt, settings.llm_temperature)
+    if body["max_tokens"] is None:
+        del body["max_tokens"]
+    return {"custom_id": custom_id, "method": "POST", "url": BATCH_ENDPOINT, "body": body}
+
+
+def write_batch_file(path: Path, lines: Iterable[Dict[str, object]]) -> int:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open("w", encoding="utf-8") as handle:
+        for line in lines:
+            handle.write(json.dumps(line, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def parse_batch_line(line: Dict[str, object]) -> Tuple[str, BatchOutcome]:
+    """Turn one output line into an :class:`LLMResult`, or the error that replaced it."""
+
+    custom_id = str(line.get("custom_id"))
+    response = line.get("response") or {}
+    error = line.get("error")
+    status_code = response.get("status_code") if isinstance(response, dict) else None
+    if error or status_code != 200:
+        message = (error or {}).get("message") if isinstance(error, dict) else None
+        if message is None and isinstance(response, dict):
+            message = ((response.get("body") or {}).get("error") or {}).get("message")
+        return custom_id, LLMClientError(message or "Batch request failed", status_code=status_code)
+    completion = ChatCompletion.construct(**response["body"])
+    result = _completion_result(completion, 0.0)
+    result.model = completion.model
+    return custom_id, result
+
+
+def _read_jsonl(content: str) -> Iterator[Dict[str, object]]:
+    for raw in content.splitlines():
+        if raw.strip():
+            yield json.loads(raw)
+
+
+class OpenAIBatchBackend:
+    """The OpenAI Batch API: half-price completions returned within the completion window."""
+
+    def __init__(
+        self,
+        api_key: str,
+        *,
+        base_url: Optional[str] = None,
+        completion_window: str = "24h",
+    ) -> None:
+        self._client = OpenAI(**_client_kwargs(api_key, base_url, http_timeout(), get_http_client()))
+        self.completion_window = completion_window
+
+    def submit(self, input_path: Path) -> str:
+        try:
+            with input_path.open("rb") as handle:
+                upload = self._client.files.create(file=handle, purpose="batch")
+            batch = self._client.batches.create(
+                input_file_id=upload.id,
+                endpoint=BATCH_ENDPOINT,
+                completion_window=self.completion_window,
+            )
+        except (APIError, OpenAIError) as exc:  # pragma: no cover - network error path
+            raise _provider_error(exc) from exc
+        return batch.id
+
+    def status(self, batch_id: str) -> str:
+        try:
+            return self._client.batches.retrieve(batch_id).status
+        except (APIError, OpenAIError) as exc:  # pragma: no cover - network error path
+            raise _provider_error(exc) from exc
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, object]]:
+        try:
+            batch = self._client.batches.retrieve(batch_id)
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    yield from _read_jsonl(self._client.files.content(file_id).text)
+        except (APIError, OpenAIError) as exc:  # pragma: no cover - network error path
+            raise _provider_error(exc) from exc
+
+
+class LocalBatchBackend:
+    """Processes batch files in-process through an online :class:`LLMClient`.
+
+    Writes ``<batch id>.output.jsonl`` next to the input in the OpenAI output format, so
+    jobs behave the same without provider access (tests, the stub provider, development).
+    """
+
+    def __init__(self, client: LLMClient, directory: Union[str, Path]) -> None:
+        self.client = client
+        self.directory = Path(directory)
+
+    def _output_path(self, batch_id: str) -> Path:
+        return self.directory / f"{batch_id}.output.jsonl"
+
+    def _process(self, line: Dict[str, object]) -> Dict[str, object]:
+        body = line["body"]
+        prompt = PromptRequest(
+            messages=[PromptMessage(role=m["role"], content=m["content"]) for m in body["messages"]],
+            temperature=body.get("temperature"),
+            max_output_tokens=body.get("max_tokens"),
+            n=body.get("n"),
+        )
+        try:
+            result = self.client.generate(prompt)
+        except LLMClientError as exc:
+            return {
+                "id": f"batch_req_{uuid4().hex}",
+                "custom_id": line["custom_id"],
+                "response": None,
+                "error": {"code": str(exc.status_code or "error"), "message": str(exc)},
+            }
+        usage = result.usage or {}
+        completion = {
+            "id": f"chatcmpl-{uuid4().hex}",
+            "object": "chat.completion",
+            "model": result.model or body["model"],
+            "choices": [
+                {"index": index, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}
+                for index, text in enumerate(result.candidates)
+            ],
+            "usage": {
+                "prompt_tokens": usage.get("prompt_tokens", 0),
+                "completion_tokens": usage.get("completion_tokens", 0),
+                "total_tokens": usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0),
+                "prompt_tokens_details": {"cached_tokens": usage.get("cached_tokens", 0)},
+            },
+        }
+        return {
+            "id": f"batch_req_{uuid4().hex}",
+            "custom_id": line["custom_id"],
+            "response": {"status_code": 200, "body": completion},
+            "error": None,
+        }
+
+    def submit(self, input_path: Path) -> str:
+        batch_id = f"local_batch_{uuid4().hex}"
+        content = input_path.read_text(encoding="utf-8")
+        write_batch_file(self._output_path(batch_id), (self._process(line) for line in _read_jsonl(content)))
+        return batch_id
+
+    def status(self, batch_id: str) -> str:
+        return "completed" if self._output_path(batch_id).exists() else "failed"
+
+    def results(self, batch_id: str) -> Iterator[Dict[str, object]]:
+        yield from _read_jsonl(self._output_path(batch_id).read_text(encoding="utf-8"))
+
+
+def batch_directory() -> Path:
+    path = Path(settings.llm_batch_dir)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def get_batch_backend() -> BatchBackend:
+    """Backend from ``LLM_BATCH_BACKEND``; defaults to the OpenAI Batch API for the OpenAI provider."""
+
+    backend = settings.llm_batch_backend or ("openai" if settings.llm_provider == "openai" else "local")
+    if backend == "openai":
+        return OpenAIBatchBackend(
+            settings.llm_api_key or "",
+            base_url=settings.llm_base_url,
+            completion_window=settings.llm_batch_completion_window,
+        )
+    if backend == "local":
+        from . import get_llm_client
+
+        return LocalBatchBackend(get_llm_client(), batch_directory())
+    raise LLMClientError(f"Unsupported LLM batch backend: {backend}")
+
+
+def collect_results(backend: BatchBackend, batch_id: str) -> Dict[str, BatchOutcome]:
+    outcomes: Dict[str, BatchOutcome] = {}
+    for line in backend.results(batch_id):
+        try:
+            custom_id, outcome = parse_batch_line(line)
+        except (KeyError, TypeError, ValueError) as exc:
+            logger.warning("Unreadable batch output line for %s", line.get("custom_id"), exc_info=True)
+            custom_id, outcome = str(line.get("custom_id")), LLMClientError(f"Unreadable batch output: {exc}")
+        outcomes[custom_id] = outcome
+    return outcomes
+
+
+__all__ = [
+    "BATCH_ENDPOINT",
+    "BATCH_TERMINAL_STATES",
+    "BatchBackend",
+    "LocalBatchBackend",
+    "OpenAIBatchBackend",
+    "batch_directory",
+    "batch_request_line",
+    "collect_results",
+    "get_batch_backend",
+    "parse_batch_line",
+    "write_batch_file",
+]
@@ -0,0 +1,299 @@
+"""Content-addressed response cache wrapped around LLM clients."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Any, AsyncIterator, Dict, Optional, Protocol
+
+import anyio
+
+from app.core import metrics
+from app.core.settings import settings
+
+from .client import AsyncLLMClient, LLMClient, LLMResult, PromptRequest, StreamChunk, stream_generate
+
+logger = logging.getLogger(__name__)
+
+CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_llm_cache_created_at ON llm_cache (created_at);
+CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access);
+"""
+
+
+class LLMCache(Protocol):
+    """Storage backend for cached completions keyed by :func:`cache_key`."""
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:  # pragma: no cover - interface definition
+        raise NotImplementedError
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:  # pragma: no cover - interface definition
+        raise NotImplementedError
+
+
+class SQLiteLLMCache:
+    """On-disk cache with TTL expiry and least-recently-used eviction past ``max_bytes``.
+
+    Each operation opens its own connection, so one file can be shared by threads and
+    worker processes alike.
+    """
+
+    def __init__(self, path: str, *, ttl_seconds: float, max_bytes: int) -> None:
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(CACHE_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT payload, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            payload, created_at = row
+            if self.ttl_seconds and created_at < now - self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(payload)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        payload = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, payload, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        if self.ttl_seconds:
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if not self.max_bytes or total <= self.max_bytes:
+            return
+        doomed = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+
+    def stats(self) -> Dict[str, int]:
+        with closing(self._connect()) as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return {"entries": entries, "bytes": size}
+
+
+def cache_key(model: str, prompt: PromptRequest, temperature: float) -> str:
+    """Hash of everything that determines the completion for ``prompt``."""
+
+    material = {
+        "model": model,
+        "messages": [[message.role, message.content] for message in prompt.messages],
+        "temperature": temperature,
+        "n": prompt.n if prompt.n is not None else 1,
+        "max_tokens": prompt.max_output_tokens,
+    }
+    return hashlib.sha256(json.dumps(material, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _usage_tokens(result: LLMResult, prompt: PromptRequest) -> Dict[str, int]:
+    if result.usage:
+        return {"input_tokens": result.usage["prompt_tokens"], "output_tokens": result.usage["completion_tokens"]}
+    # Rough 4-characters-per-token estimate when the provider reports no usage.
+    input_chars = sum(len(message.content) for message in prompt.messages)
+    output_chars = sum(len(text) for text in result.candidates)
+    return {"input_tokens": input_chars // 4, "output_tokens": output_chars // 4}
+
+
+def _cost_usd(tokens: Dict[str, int]) -> float:
+    return (
+        tokens["input_tokens"] / 1000.0 * settings.llm_price_input_per_1k
+        + tokens["output_tokens"] / 1000.0 * settings.llm_price_output_per_1k
+    )
+
+
+class _CachePolicy:
+    def __init__(self, cache: LLMCache, model: str, default_temperature: float, max_temperature: float) -> None:
+        self.cache = cache
+        self.model = model
+        self.default_temperature = default_temperature
+        self.max_temperature = max_temperature
+
+    def key_for(self, prompt: PromptRequest) -> Optional[str]:
+        """Return the cache key, or ``None`` when the call must not be cached."""
+
+        if prompt.cache is False:
+            return None
+        temperature = prompt.temperature if prompt.temperature is not None else self.default_temperature
+        if prompt.cache is None and temperature > self.max_temperature:
+            return None
+        return cache_key(self.model, prompt, temperature)
+
+    def lookup(self, key: str) -> Optional[LLMResult]:
+        started = time.perf_counter()
+        try:
+            entry = self.cache.get(key)
+        except sqlite3.Error:
+            logger.warning("LLM cache read failed", exc_info=True)
+            entry = None
+        if entry is None:
+            metrics.increment("llm.cache.misses")
+            return None
+        metrics.increment("llm.cache.hits")
+        metrics.increment("llm.cache.dollars_saved", _cost_usd(entry["usage"]))
+        return LLMResult(
+            text=entry["text"],
+            latency_ms=(time.perf_counter() - started) * 1000.0,
+            raw={"cached": True, "usage": entry["usage"], "original_latency_ms": entry["latency_ms"]},
+            candidates=list(entry["candidates"]),
+            cached=True,
+        )
+
+    def store(self, key: str, prompt: PromptRequest, result: LLMResult) -> None:
+        entry = {
+            "text": result.text,
+            "candidates": list(result.candidates),
+            "latency_ms": result.latency_ms,
+            "usage": _usage_tokens(result, prompt),
+        }
+        try:
+            self.cache.set(key, entry)
+        except sqlite3.Error:
+            logger.warning("LLM cache write failed", exc_info=True)
+
+
+class CachingLLMClient:
+    """Serves repeated deterministic prompts from ``cache`` instead of the provider.
+
+    Calls are cached when their effective temperature is at most ``max_temperature``;
+    ``PromptRequest.cache`` forces (``True``) or bypasses (``False``) the cache.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        cache: LLMCache,
+        *,
+        model: str,
+        default_temperature: float,
+        max_temperature: float,
+    ) -> None:
+        self.client = client
+        self._policy = _CachePolicy(cache, model, default_temperature, max_temperature)
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        key = self._policy.key_for(prompt)
+        if key is None:
+            return self.client.generate(prompt)
+        cached = self._policy.lookup(key)
+        if cached is not None:
+            return cached
+        result = self.client.generate(prompt)
+        self._policy.store(key, prompt, result)
+        return result
+
+
+class CachingAsyncLLMClient:
+    """Async counterpart of :class:`CachingLLMClient`; cache I/O runs on worker threads."""
+
+    def __init__(
+        self,
+        client: AsyncLLMClient,
+        cache: LLMCache,
+        *,
+        model: str,
+        default_temperature: float,
+        max_temperature: float,
+    ) -> None:
+        self.client = client
+        self._policy = _CachePolicy(cache, model, default_temperature, max_temperature)
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:
+        key = self._policy.key_for(prompt)
+        if key is None:
+            return await self.client.generate(prompt)
+        cached = await anyio.to_thread.run_sync(self._policy.lookup, key)
+        if cached is not None:
+            return cached
+        result = await self.client.generate(prompt)
+        await anyio.to_thread.run_sync(self._policy.store, key, prompt, result)
+        return result
+
+    async def stream(self, prompt: PromptRequest) -> AsyncIterator[StreamChunk]:
+        # Streams are consumed incrementally and are never served from the cache.
+        async for chunk in stream_generate(self.client, prompt):
+            yield chunk
+
+
+_SHARED_CACHE: Optional[SQLiteLLMCache] = None
+
+
+def get_llm_cache() -> Optional[SQLiteLLMCache]:
+    """Return the process-wide SQLite cache, or ``None`` when caching is disabled."""
+
+    global _SHARED_CACHE
+    if not settings.llm_cache_path:
+        return None
+    if _SHARED_CACHE is None or _SHARED_CACHE.path != settings.llm_cache_path:
+        _SHARED_CACHE = SQLiteLLMCache(
+            settings.llm_cache_path,
+            ttl_seconds=settings.llm_cache_ttl_seconds,
+            max_bytes=settings.llm_cache_max_bytes,
+        )
+    return _SHARED_CACHE
+
+
+def cache_stats() -> Dict[str, Any]:
+    """Hit rate and estimated dollars saved in this process, plus on-disk size."""
+
+    hits = metrics.counter("llm.cache.hits")
+    misses = metrics.counter("llm.cache.misses")
+    lookups = hits + misses
+    stats: Dict[str, Any] = {
+        "enabled": bool(settings.llm_cache_path),
+        "hits": int(hits),
+        "misses": int(misses),
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "dollars_saved": round(metrics.counter("llm.cache.dollars_saved"), 6),
+    }
+    cache = get_llm_cache()
+    if cache is not None:
+        try:
+            stats.update(cache.stats())
+        except sqlite3.Error:
+            logger.warning("LLM cache stats unavailable", exc_info=True)
+    return stats
+
+
+__all__ = [
+    "CachingAsyncLLMClient",
+    "CachingLLMClient",
+    "LLMCache",
+    "SQLiteLLMCache",
+    "cache_key",
+    "cache_stats",
+    "get_llm_cache",
+]
@@ -3,14 +3,39 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from time import perf_counter
-from typing import List, Optional, Protocol
+from email.utils import parsedate_to_datetime
+from time import perf_counter, time
+from typing import AsyncIterator, Dict, List, Optional, Protocol, Union
 
-from openai import APIError, OpenAI, OpenAIError
+import anyio
+import httpx
+from openai import APIConnectionError, APIError, APITimeoutError, AsyncOpenAI, OpenAI, OpenAIError
+
+from app.core import metrics
+
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504})
 
 
 class LLMClientError(RuntimeError):
-    """Base exception for LLM client issues."""
+    """Base exception for LLM client issues.
+
+    ``retryable`` marks transient provider failures (timeouts, 429, 5xx); ``retry_after``
+    carries the provider's ``Retry-After`` hint in seconds when one was sent.
+    """
+
+    def __init__(
+        self,
+        message: str,
+        *,
+        status_code: Optional[int] = None,
+        retryable: bool = False,
+        retry_after: Optional[float] = None,
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
 
 
 @dataclass(slots=True)
@@ -25,6 +50,8 @@ class PromptRequest:
     temperature: Optional[float] = None
     max_output_tokens: Optional[int] = None
     n: Optional[int] = None
+    cache: Optional[bool] = None  # None: cache only deterministic calls; True/False force either way
+    route: Optional[str] = None  # Call site ("translate", "grammar", "normalize") for model routing
 
 
 @dataclass(slots=True)
@@ -33,6 +60,10 @@ class LLMResult:
     latency_ms: float
     raw: object
     candidates: List[str] = None  # Multiple candidates when n > 1
+    cached: bool = False  # Served from the response cache
+    shared: bool = False  # Joined an identical in-flight call (single-flight); billed to that call
+    usage: Optional[Dict[str, int]] = None  # prompt/completion/cached token counts when reported
+    model: Optional[str] = None  # Model that served the call, set by the router
 
     def __post_init__(self):
         # If candidates not provided, use text as single candidate
@@ -40,6 +71,17 @@ class LLMResult:
             object.__setattr__(self, 'candidates', [self.text])
 
 
+@dataclass(slots=True)
+class StreamChunk:
+    """Incremental output for one candidate; ``finished`` marks its final chunk."""
+
+    candidate: int
+    delta: str = ""
+    finished: bool = False
+    usage: Optional[Dict[str, int]] = None  # set on the trailing usage-only chunk
+    model: Optional[str] = None  # Model that served the stream, set by the router
+
+
 class LLMClient(Protocol):
     """Minimal protocol for chat-capable LLM clients."""
 
@@ -47,6 +89,112 @@ class LLMClient(Protocol):
         raise NotImplementedError
 
 
+class AsyncLLMClient(Protocol):
+    """Protocol for chat clients that await the provider without holding a thread."""
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:  # pragma: no cover - interface definition
+        raise NotImplementedError
+
+
+def _client_kwargs(
+    api_key: str,
+    base_url: Optional[str],
+    timeout_seconds: Union[float, httpx.Timeout],
+    http_client: Optional[Union[httpx.Client, httpx.AsyncClient]] = None,
+) -> dict:
+    if not api_key:
+        raise LLMClientError("Missing OpenAI API key; set LLM_API_KEY in environment")
+
+    # Retries are owned by the resilience layer, which also rate-limits and trips the breaker.
+    client_kwargs = {"api_key": api_key, "max_retries": 0}
+    if base_url:
+        client_kwargs["base_url"] = base_url
+    if timeout_seconds:
+        client_kwargs["timeout"] = timeout_seconds
+    if http_client is not None:
+        client_kwargs["http_client"] = http_client
+    return client_kwargs
+
+
+def _completion_request(model: str, prompt: PromptRequest, default_temperature: float) -> dict:
+    return {
+        "model": model,
+        "messages": [{"role": m.role, "content": m.content} for m in prompt.messages],
+        "temperature": prompt.temperature if prompt.temperature is not None else default_temperature,
+        "max_tokens": prompt.max_output_tokens,
+        "n": prompt.n if prompt.n is not None else 1,
+    }
+
+
+def _retry_after_seconds(headers: Optional[httpx.Headers]) -> Optional[float]:
+    if headers is None:
+        return None
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000.0
+        except ValueError:
+            pass
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time())
+        except (TypeError, ValueError):
+            return None
+
+
+def _provider_error(exc: Exception) -> LLMClientError:
+    """Translate an OpenAI SDK exception into an :class:`LLMClientError` with retry hints."""
+
+    status_code = getattr(exc, "status_code", None)
+    response = getattr(exc, "response", None)
+    return LLMClientError(
+        str(exc),
+        status_code=status_code,
+        retryable=isinstance(exc, (APITimeoutError, APIConnectionError)) or status_code in RETRYABLE_STATUS_CODES,
+        retry_after=_retry_after_seconds(getattr(response, "headers", None)),
+    )
+
+
+def completion_usage(usage: object) -> Optional[Dict[str, int]]:
+    """Token counts from an OpenAI ``usage`` block, including prompt-cache hits."""
+
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    counts = {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+        "cached_tokens": int(getattr(details, "cached_tokens", 0) or 0) if details is not None else 0,
+    }
+    metrics.increment("llm.prompt_tokens", counts["prompt_tokens"])
+    metrics.increment("llm.cached_prompt_tokens", counts["cached_tokens"])
+    return counts
+
+
+def _completion_result(completion: object, elapsed_ms: float) -> LLMResult:
+    # Extract all candidates from choices
+    candidates = []
+    for choice in completion.choices:
+        if choice.message.content:
+            candidates.append(choice.message.content)
+
+    # First candidate as primary text (for backward compatibility)
+    text = candidates[0] if candidates else ""
+
+    return LLMResult(
+        text=text,
+        latency_ms=elapsed_ms,
+        raw=completion,
+        candidates=candidates,
+        usage=completion_usage(getattr(completion, "usage", None)),
+    )
+
+
 class OpenAIChatClient:
     """OpenAI chat completion client wrapper."""
 
@@ -57,18 +205,10 @@ class OpenAIChatClient:
         *,
         base_url: Optional[str] = None,
         default_temperature: float = 0.3,
-        timeout_seconds: float = 30.0,
+        timeout_seconds: Union[float, httpx.Timeout] = 30.0,
+        http_client: Optional[httpx.Client] = None,
     ) -> None:
-        if not api_key:
-            raise LLMClientError("Missing OpenAI API key; set LLM_API_KEY in environment")
-
-        client_kwargs = {"api_key": api_key}
-        if base_url:
-            client_kwargs["base_url"] = base_url
-        if timeout_seconds:
-            client_kwargs["timeout"] = timeout_seconds
-
-        self._client = OpenAI(**client_kwargs)
+        self._client = OpenAI(**_client_kwargs(api_key, base_url, timeout_seconds, http_client))
         self._model = model
         self._default_temperature = default_temperature
 
@@ -76,26 +216,86 @@ class OpenAIChatClient:
         try:
             start = perf_counter()
             completion = self._client.chat.completions.create(
-                model=self._model,
-                messages=[{"role": m.role, "content": m.content} for m in prompt.messages],
-                temperature=prompt.temperature if prompt.temperature is not None else self._default_temperature,
-                max_tokens=prompt.max_output_tokens,
-                n=prompt.n if prompt.n is not None else 1,
+                **_completion_request(self._model, prompt, self._default_temperature)
             )
         except (APIError, OpenAIError) as exc:  # pragma: no cover - network error path
+            raise _provider_error(exc) from exc
+        except Exception as exc:  # pragma: no cover - defensive programming
             raise LLMClientError(str(exc)) from exc
+
+        return _completion_result(completion, (perf_counter() - start) * 1000.0)
+
+
+class AsyncOpenAIChatClient:
+    """``AsyncOpenAI`` chat completion client; requests wait on the event loop, not a thread."""
+
+    def __init__(
+        self,
+        model: str,
+        api_key: str,
+        *,
+        base_url: Optional[str] = None,
+        default_temperature: float = 0.3,
+        timeout_seconds: Union[float, httpx.Timeout] = 30.0,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ) -> None:
+        self._client = AsyncOpenAI(**_client_kwargs(api_key, base_url, timeout_seconds, http_client))
+        self._model = model
+        self._default_temperature = default_temperature
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:
+        try:
+            start = perf_counter()
+            completion = await self._client.chat.completions.create(
+                **_completion_request(self._model, prompt, self._default_temperature)
+            )
+        except (APIError, OpenAIError) as exc:  # pragma: no cover - network error path
+            raise _provider_error(exc) from exc
         except Exception as exc:  # pragma: no cover - defensive programming
             raise LLMClientError(str(exc)) from exc
 
-        elapsed_ms = (perf_counter() - start) * 1000.0
+        return _completion_result(completion, (perf_counter() - start) * 1000.0)
+
+    async def stream(self, prompt: PromptRequest) -> AsyncIterator[StreamChunk]:
+        try:
+            completion = await self._client.chat.completions.create(
+                **_completion_request(self._model, prompt, self._default_temperature),
+                stream=True,
+                stream_options={"include_usage": True},
+            )
+            async for chunk in completion:
+                if getattr(chunk, "usage", None) is not None:
+                    yield StreamChunk(candidate=0, usage=completion_usage(chunk.usage))
+                for choice in chunk.choices:
+                    delta = choice.delta.content if choice.delta is not None else None
+                    if delta:
+                        yield StreamChunk(candidate=choice.index, delta=delta)
+                    if choice.finish_reason:
+                        yield StreamChunk(candidate=choice.index, finished=True)
+        except (APIError, OpenAIError) as exc:  # pragma: no cover - network error path
+            raise _provider_error(exc) from exc
+
+
+async def stream_generate(client: AsyncLLMClient, prompt: PromptRequest) -> AsyncIterator[StreamChunk]:
+    """Stream ``prompt`` through ``client``; clients without ``stream`` emit whole candidates."""
+
+    stream = getattr(client, "stream", None)
+    if stream is not None:
+        async for chunk in stream(prompt):
+            yield chunk
+        return
+    result = await client.generate(prompt)
+    for index, text in enumerate(result.candidates):
+        if text:
+            yield StreamChunk(candidate=index, delta=text)
+        yield StreamChunk(candidate=index, finished=True)
+
 
-        # Extract all candidates from choices
-        candidates = []
-        for choice in completion.choices:
-            if choice.message.content:
-                candidates.append(choice.message.content)
+class ThreadedLLMClient:
+    """Adapts a blocking :class:`LLMClient` to :class:`AsyncLLMClient` via a worker thread."""
 
-        # First candidate as primary text (for backward compatibility)
-        text = candidates[0] if candidates else ""
+    def __init__(self, client: LLMClient) -> None:
+        self.client = client
 
-        return LLMResult(text=text, latency_ms=elapsed_ms, raw=completion, candidates=candidates)
+    async def generate(self, prompt: PromptRequest) -> LLMResult:
+        return await anyio.to_thread.run_sync(self.client.generate, prompt)
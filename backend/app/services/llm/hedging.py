@@ -0,0 +1,201 @@
+"""Hedged LLM requests: race a duplicate call against a straggling one."""
+
+from __future__ import annotations
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextvars import copy_context
+from threading import BoundedSemaphore, Lock
+from time import perf_counter
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+import anyio
+
+from app.core import metrics
+from app.core.metrics import Histogram
+from app.core.settings import settings
+
+from .client import AsyncLLMClient, LLMClient, LLMResult, PromptRequest, StreamChunk, stream_generate
+
+# Runs hedges only; the budget keeps them to a small share of calls.
+_HEDGE_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge")
+# Runs hedgeable primaries. A primary only takes a free slot and never queues, so the hedge
+# delay counts provider time alone; once every slot is busy calls run unhedged on the caller.
+_PRIMARY_WORKERS = 64
+_PRIMARY_EXECUTOR = ThreadPoolExecutor(max_workers=_PRIMARY_WORKERS, thread_name_prefix="llm-primary")
+_PRIMARY_SLOTS = BoundedSemaphore(_PRIMARY_WORKERS)
+
+
+class HedgePolicy:
+    """Learns the hedge delay from recent latencies and caps the share of extra calls.
+
+    The delay is the ``percentile`` of recently completed calls (never below
+    ``min_delay_ms``); hedging stays off until ``min_samples`` calls have completed.
+    At most ``budget`` hedges are issued per primary call.
+    """
+
+    def __init__(self, *, percentile: float, min_delay_ms: float, budget: float, min_samples: int) -> None:
+        self.percentile = percentile
+        self.min_delay_ms = min_delay_ms
+        self.budget = budget
+        self.min_samples = min_samples
+        self._latencies = Histogram(window=512)
+        self._primaries = 0
+        self._hedges = 0
+        self._lock = Lock()
+
+    def delay_seconds(self) -> Optional[float]:
+        """Seconds to wait before hedging, or ``None`` while there is too little history."""
+
+        with self._lock:
+            self._primaries += 1
+            if self._latencies.count < self.min_samples:
+                return None
+            return max(self.min_delay_ms, self._latencies.percentile(self.percentile)) / 1000.0
+
+    def acquire_hedge(self) -> bool:
+        with self._lock:
+            if self._hedges + 1 > self.budget * self._primaries:
+                metrics.increment("llm.hedge.over_budget")
+                return False
+            self._hedges += 1
+        metrics.increment("llm.hedge.issued")
+        return True
+
+    def record(self, latency_ms: float) -> None:
+        with self._lock:
+            self._latencies.observe(latency_ms)
+
+
+def _run_primary(client: LLMClient, prompt: PromptRequest) -> LLMResult:
+    try:
+        return client.generate(prompt)
+    finally:
+        _PRIMARY_SLOTS.release()
+
+
+class HedgedLLMClient:
+    """Issues a duplicate call when the first one outlives the hedge delay; first result wins.
+
+    Primaries run on a bounded executor of their own and hedges on a second one, so a
+    burst of hedges never delays a primary. Blocking provider calls cannot be interrupted:
+    a losing call that has already started runs to completion on its worker (the client
+    closes its response) and its result is discarded; only a hedge still queued is cancelled.
+    """
+
+    def __init__(self, client: LLMClient, policy: HedgePolicy) -> None:
+        self.client = client
+        self.policy = policy
+
+    def _record(self, started: float, result: LLMResult) -> LLMResult:
+        # Latency from the primary's start, whichever call won, so hedges do not skew the delay.
+        self.policy.record((perf_counter() - started) * 1000.0)
+        return result
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        delay = self.policy.delay_seconds()
+        started = perf_counter()
+        if delay is None:
+            return self._record(started, self.client.generate(prompt))
+
+        if not _PRIMARY_SLOTS.acquire(blocking=False):
+            metrics.increment("llm.hedge.saturated")
+            return self._record(started, self.client.generate(prompt))
+        primary = _PRIMARY_EXECUTOR.submit(copy_context().run, _run_primary, self.client, prompt)
+        try:
+            return self._record(started, primary.result(timeout=delay))
+        except FutureTimeoutError:
+            pass
+        if not self.policy.acquire_hedge():
+            return self._record(started, primary.result())
+
+        hedge = _HEDGE_EXECUTOR.submit(self.client.generate, prompt)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in pending:
+                        loser.cancel()
+                    if future is hedge:
+                        metrics.increment("llm.hedge.won")
+                    return self._record(started, future.result())
+        return primary.result()
+
+
+class HedgedAsyncLLMClient:
+    """Async counterpart of :class:`HedgedLLMClient`; the losing call is cancelled."""
+
+    def __init__(self, client: AsyncLLMClient, policy: HedgePolicy) -> None:
+        self.client = client
+        self.policy = policy
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:
+        delay = self.policy.delay_seconds()
+        started = perf_counter()
+        if delay is None:
+            result = await self.client.generate(prompt)
+            self.policy.record((perf_counter() - started) * 1000.0)
+            return result
+
+        winner: List[Tuple[bool, LLMResult]] = []
+        errors: List[Exception] = []
+        launched = 1
+        settled = anyio.Event()
+
+        async def attempt(is_hedge: bool) -> None:
+            try:
+                result = await self.client.generate(prompt)
+            except Exception as exc:
+                errors.append(exc)
+                if len(errors) == launched:
+                    settled.set()
+                return
+            if not winner:
+                winner.append((is_hedge, result))
+                settled.set()
+
+        async with anyio.create_task_group() as group:
+            group.start_soon(attempt, False)
+            with anyio.move_on_after(delay):
+                await settled.wait()
+            if not settled.is_set() and self.policy.acquire_hedge():
+                launched = 2
+                group.start_soon(attempt, True)
+            await settled.wait()
+            group.cancel_scope.cancel()
+
+        if not winner:
+            raise errors[0]
+        is_hedge, result = winner[0]
+        # Latency from the primary's start, whichever call won, so hedges do not skew the delay.
+        self.policy.record((perf_counter() - started) * 1000.0)
+        if is_hedge:
+            metrics.increment("llm.hedge.won")
+        return result
+
+    async def stream(self, prompt: PromptRequest) -> AsyncIterator[StreamChunk]:
+        # Tokens are forwarded as they arrive, so streams are never duplicated.
+        async for chunk in stream_generate(self.client, prompt):
+            yield chunk
+
+
+_POLICIES: Dict[str, HedgePolicy] = {}
+_POLICIES_LOCK = Lock()
+
+
+def get_hedge_policy(model: str) -> HedgePolicy:
+    """Return the model's policy so sync and async clients learn from the same calls."""
+
+    with _POLICIES_LOCK:
+        if model not in _POLICIES:
+            _POLICIES[model] = HedgePolicy(
+                percentile=settings.llm_hedge_percentile,
+                min_delay_ms=settings.llm_hedge_min_delay_ms,
+                budget=settings.llm_hedge_budget,
+                min_samples=settings.llm_hedge_min_samples,
+            )
+        return _POLICIES[model]
+
+
+__all__ = ["HedgePolicy", "HedgedAsyncLLMClient", "HedgedLLMClient", "get_hedge_policy"]
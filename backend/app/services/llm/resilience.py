@@ -0,0 +1,285 @@
+"""Client-side rate limiting, retries and circuit breaking for LLM provider calls."""
+
+from __future__ import annotations
+
+import random
+import time
+from threading import Lock
+from typing import AsyncIterator, Dict, Optional
+
+import anyio
+
+from app.core import metrics
+from app.core.settings import settings
+
+from .client import AsyncLLMClient, LLMClient, LLMClientError, LLMResult, PromptRequest, StreamChunk, stream_generate
+from .tokens import count_tokens
+
+# Buckets hold this many seconds of quota, so a quiet period allows a short burst
+# without letting a whole minute's allowance land at once.
+BURST_SECONDS = 10.0
+DEFAULT_OUTPUT_TOKENS = 256
+
+
+class LLMCircuitOpenError(LLMClientError):
+    """Raised without contacting the provider while the circuit breaker is open."""
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations; callers sleep off any debt themselves."""
+
+    def __init__(self, rate_per_second: float, capacity: float) -> None:
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens and return the seconds to wait before using them."""
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # A single call larger than the bucket could otherwise never be admitted.
+            self._tokens -= min(amount, self.capacity)
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets mirroring provider quotas."""
+
+    def __init__(self, *, requests_per_minute: Optional[int], tokens_per_minute: Optional[int]) -> None:
+        self.requests = self._bucket(requests_per_minute)
+        self.tokens = self._bucket(tokens_per_minute)
+
+    @staticmethod
+    def _bucket(per_minute: Optional[int]) -> Optional[TokenBucket]:
+        if not per_minute:
+            return None
+        rate = per_minute / 60.0
+        return TokenBucket(rate, max(1.0, rate * BURST_SECONDS))
+
+    def reserve(self, estimated_tokens: int) -> float:
+        wait = 0.0
+        if self.requests is not None:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.reserve(estimated_tokens))
+        return wait
+
+
+class CircuitBreaker:
+    """Opens after consecutive provider failures and lets one probe through after a cool-down."""
+
+    def __init__(self, *, failure_threshold: int, reset_seconds: float) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == "closed":
+                return
+            now = time.monotonic()
+            remaining = self._opened_at + self.reset_seconds - now
+            if remaining <= 0:
+                # One probe per cool-down; another follows only if it never reports back.
+                self.state = "half_open"
+                self._opened_at = now
+                return
+        metrics.increment("llm.breaker.rejected")
+        raise LLMCircuitOpenError(
+            "LLM provider circuit is open; failing fast",
+            retry_after=max(remaining, 0.0) or self.reset_seconds,
+        )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self.state == "half_open" or self._failures >= self.failure_threshold:
+                if self.state != "open":
+                    metrics.increment("llm.breaker.opened")
+                self.state = "open"
+                self._opened_at = time.monotonic()
+
+
+class RetryPolicy:
+    """Full-jitter exponential backoff that never retries sooner than ``Retry-After``."""
+
+    def __init__(self, *, max_attempts: int, base_delay_seconds: float, max_delay_seconds: float) -> None:
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+
+    def backoff(self, attempt: int, error: LLMClientError) -> Optional[float]:
+        """Seconds to sleep before retry ``attempt + 1``, or ``None`` to give up."""
+
+        if not error.retryable or attempt + 1 >= self.max_attempts:
+            return None
+        delay = random.uniform(0, min(self.max_delay_seconds, self.base_delay_seconds * 2**attempt))
+        if error.retry_after is not None:
+            if error.retry_after > self.max_delay_seconds:
+                return None
+            delay = max(delay, error.retry_after)
+        return delay
+
+
+def estimate_tokens(prompt: PromptRequest) -> int:
+    """Prompt tokens plus the output allowance, as providers count against TPM quotas."""
+
+    prompt_tokens = sum(count_tokens(message.content) for message in prompt.messages)
+    return prompt_tokens + (prompt.max_output_tokens or DEFAULT_OUTPUT_TOKENS) * (prompt.n or 1)
+
+
+class CallGuard:
+    """Limiter, breaker and retry policy shared by every wrapped client."""
+
+    def __init__(self, limiter: Optional[RateLimiter], breaker: CircuitBreaker, retry: RetryPolicy) -> None:
+        self.limiter = limiter
+        self.breaker = breaker
+        self.retry = retry
+
+    def admit(self, prompt: PromptRequest) -> float:
+        self.breaker.before_call()
+        if self.limiter is None:
+            return 0.0
+        wait = self.limiter.reserve(estimate_tokens(prompt))
+        metrics.observe("llm.limiter.wait_ms", wait * 1000.0)
+        return wait
+
+    def failed(self, error: LLMClientError, attempt: int) -> Optional[float]:
+        # Only outages count against the breaker: a 429 or 4xx means the provider is up.
+        if error.retryable and error.status_code != 429:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if error.status_code == 429:
+            metrics.increment("llm.rate_limited")
+        delay = self.retry.backoff(attempt, error)
+        if delay is not None:
+            metrics.increment("llm.retries")
+        return delay
+
+
+class ResilientLLMClient:
+    """Wraps a provider client with the shared rate limiter, retries and circuit breaker."""
+
+    def __init__(self, client: LLMClient, guard: CallGuard) -> None:
+        self.client = client
+        self._guard = guard
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        attempt = 0
+        while True:
+            wait = self._guard.admit(prompt)
+            if wait:
+                time.sleep(wait)
+            try:
+                result = self.client.generate(prompt)
+            except LLMClientError as exc:
+                delay = self._guard.failed(exc, attempt)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._guard.breaker.record_success()
+            return result
+
+
+class ResilientAsyncLLMClient:
+    """Async counterpart of :class:`ResilientLLMClient`; waits never block the event loop."""
+
+    def __init__(self, client: AsyncLLMClient, guard: CallGuard) -> None:
+        self.client = client
+        self._guard = guard
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:
+        attempt = 0
+        while True:
+            wait = self._guard.admit(prompt)
+            if wait:
+                await anyio.sleep(wait)
+            try:
+                result = await self.client.generate(prompt)
+            except LLMClientError as exc:
+                delay = self._guard.failed(exc, attempt)
+                if delay is None:
+                    raise
+                await anyio.sleep(delay)
+                attempt += 1
+                continue
+            self._guard.breaker.record_success()
+            return result
+
+    async def stream(self, prompt: PromptRequest) -> AsyncIterator[StreamChunk]:
+        # Tokens may already have reached the caller, so streams are admitted but not retried.
+        wait = self._guard.admit(prompt)
+        if wait:
+            await anyio.sleep(wait)
+        try:
+            async for chunk in stream_generate(self.client, prompt):
+                yield chunk
+        except LLMClientError as exc:
+            self._guard.failed(exc, self._guard.retry.max_attempts)
+            raise
+        self._guard.breaker.record_success()
+
+
+_GUARDS: Dict[str, CallGuard] = {}
+_GUARDS_LOCK = Lock()
+
+
+def get_guard(model: str) -> CallGuard:
+    """Per-model limiter and breaker, shared by sync and async callers of that model.
+
+    Provider quotas and outages are per model, so one tripped breaker leaves the
+    router free to fail over to another model.
+    """
+
+    with _GUARDS_LOCK:
+        if model in _GUARDS:
+            return _GUARDS[model]
+        limiter = None
+        if settings.llm_rate_limit_rpm or settings.llm_rate_limit_tpm:
+            limiter = RateLimiter(
+                requests_per_minute=settings.llm_rate_limit_rpm,
+                tokens_per_minute=settings.llm_rate_limit_tpm,
+            )
+        guard = _GUARDS[model] = CallGuard(
+            limiter,
+            CircuitBreaker(
+                failure_threshold=settings.llm_breaker_failure_threshold,
+                reset_seconds=settings.llm_breaker_reset_seconds,
+            ),
+            RetryPolicy(
+                max_attempts=settings.llm_retry_max_attempts,
+                base_delay_seconds=settings.llm_retry_base_delay_seconds,
+                max_delay_seconds=settings.llm_retry_max_delay_seconds,
+            ),
+        )
+        return guard
+
+
+__all__ = [
+    "CallGuard",
+    "CircuitBreaker",
+    "LLMCircuitOpenError",
+    "RateLimiter",
+    "ResilientAsyncLLMClient",
+    "ResilientLLMClient",
+    "RetryPolicy",
+    "TokenBucket",
+    "estimate_tokens",
+    "get_guard",
+]
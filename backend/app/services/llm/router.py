@@ -0,0 +1,263 @@
+"""Latency-aware routing of LLM calls to per-call-site model tiers."""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, AsyncIterator, Deque, Dict, List, Mapping, Optional, Tuple
+
+from app.core import metrics
+from app.core.settings import settings
+
+from .accounting import call_record, record_call
+from .client import AsyncLLMClient, LLMClient, LLMClientError, LLMResult, PromptRequest, StreamChunk, stream_generate
+from .resilience import LLMCircuitOpenError
+
+DEFAULT_ROUTE = "default"
+
+
+class ModelHealth:
+    """Latencies and failures of one model on one route over a sliding time window."""
+
+    def __init__(self, window_seconds: float) -> None:
+        self.window_seconds = window_seconds
+        self._samples: Deque[Tuple[float, Optional[float]]] = deque()
+
+    def _prune(self, now: float) -> None:
+        while self._samples and self._samples[0][0] < now - self.window_seconds:
+            self._samples.popleft()
+
+    def record(self, latency_ms: Optional[float], now: float) -> None:
+        """Record a call; ``latency_ms`` is ``None`` for a failed call."""
+
+        self._samples.append((now, latency_ms))
+        self._prune(now)
+
+    def summary(self, now: float) -> Dict[str, float]:
+        self._prune(now)
+        latencies = sorted(latency for _, latency in self._samples if latency is not None)
+        count = len(self._samples)
+        p95 = latencies[min(len(latencies) - 1, round(0.95 * (len(latencies) - 1)))] if latencies else 0.0
+        return {
+            "count": count,
+            "p95_ms": round(p95, 3),
+            "error_rate": round((count - len(latencies)) / count, 4) if count else 0.0,
+        }
+
+
+class RoutingTable:
+    """Maps call sites to ordered model tiers and orders them by recent health.
+
+    A model is unhealthy on a route once it has ``min_samples`` recent calls and either
+    its p95 latency exceeds the route's SLO or its error rate exceeds ``max_error_rate``.
+    Samples age out after ``window_seconds``, so a demoted model is retried later.
+    """
+
+    def __init__(
+        self,
+        routes: Mapping[str, List[str]],
+        *,
+        default_model: str,
+        latency_slo_ms: Optional[Mapping[str, float]] = None,
+        window_seconds: float = 60.0,
+        min_samples: int = 5,
+        max_error_rate: float = 0.2,
+    ) -> None:
+        self.routes = {route: list(models) for route, models in routes.items() if models}
+        self.default_model = default_model
+        self.latency_slo_ms = dict(latency_slo_ms or {})
+        self.window_seconds = window_seconds
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self._health: Dict[Tuple[str, str], ModelHealth] = {}
+        self._lock = Lock()
+
+    @property
+    def models(self) -> List[str]:
+        models = [self.default_model]
+        for tier in self.routes.values():
+            models.extend(model for model in tier if model not in models)
+        return models
+
+    def tier(self, route: Optional[str]) -> List[str]:
+        return self.routes.get(route or DEFAULT_ROUTE) or [self.default_model]
+
+    def _healthy(self, route: str, model: str, now: float) -> bool:
+        health = self._health.get((route, model))
+        if health is None:
+            return True
+        summary = health.summary(now)
+        if summary["count"] < self.min_samples:
+            return True
+        slo = self.latency_slo_ms.get(route)
+        if slo is not None and summary["p95_ms"] > slo:
+            return False
+        return summary["error_rate"] <= self.max_error_rate
+
+    def plan(self, route: Optional[str]) -> List[str]:
+        """Models to try in order: healthy tiers first, demoted ones as a last resort."""
+
+        route = route or DEFAULT_ROUTE
+        tier = self.tier(route)
+        now = time.monotonic()
+        with self._lock:
+            healthy = [model for model in tier if self._healthy(route, model, now)]
+        plan = healthy + [model for model in tier if model not in healthy]
+        if plan[0] != tier[0]:
+            metrics.increment("llm.router.downshifts")
+        return plan
+
+    def record(self, route: Optional[str], model: str, latency_ms: Optional[float]) -> None:
+        key = (route or DEFAULT_ROUTE, model)
+        with self._lock:
+            health = self._health.get(key)
+            if health is None:
+                health = self._health[key] = ModelHealth(self.window_seconds)
+            health.record(latency_ms, time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            health = {f"{route}:{model}": item.summary(now) for (route, model), item in sorted(self._health.items())}
+        return {"routes": self.routes, "default_model": self.default_model, "health": health}
+
+
+def _can_fail_over(error: LLMClientError) -> bool:
+    # Bad requests would fail on every model; outages and exhausted retries may not.
+    return error.retryable or isinstance(error, LLMCircuitOpenError)
+
+
+def _served(route: Optional[str], model: str, attempt: int) -> None:
+    metrics.increment(f"llm.router.served.{route or DEFAULT_ROUTE}.{model}")
+    if attempt:
+        metrics.increment("llm.router.failovers")
+
+
+def _observe(
+    table: RoutingTable,
+    prompt: PromptRequest,
+    model: str,
+    started: float,
+    result: Optional[LLMResult] = None,
+) -> None:
+    """Feed one call into routing health and token/latency accounting."""
+
+    latency_ms = (time.perf_counter() - started) * 1000.0
+    if result is None:
+        table.record(prompt.route, model, None)
+    elif not (result.cached or result.shared):
+        table.record(prompt.route, model, latency_ms)
+    record_call(call_record(prompt, model, latency_ms, result))
+
+
+class LLMRouter:
+    """:class:`LLMClient` that sends each prompt to the healthiest model of its route.
+
+    ``PromptRequest.route`` names the call site; the served model is set on
+    ``LLMResult.model``.
+    """
+
+    def __init__(self, clients: Mapping[str, LLMClient], table: RoutingTable) -> None:
+        self.clients = dict(clients)
+        self.table = table
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        error: Optional[LLMClientError] = None
+        for attempt, model in enumerate(self.table.plan(prompt.route)):
+            started = time.perf_counter()
+            try:
+                result = self.clients[model].generate(prompt)
+            except LLMClientError as exc:
+                _observe(self.table, prompt, model, started)
+                if not _can_fail_over(exc):
+                    raise
+                error = exc
+                continue
+            _observe(self.table, prompt, model, started, result)
+            result.model = model
+            _served(prompt.route, model, attempt)
+            return result
+        raise error
+
+
+class AsyncLLMRouter:
+    """Async counterpart of :class:`LLMRouter`."""
+
+    def __init__(self, clients: Mapping[str, AsyncLLMClient], table: RoutingTable) -> None:
+        self.clients = dict(clients)
+        self.table = table
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:
+        error: Optional[LLMClientError] = None
+        for attempt, model in enumerate(self.table.plan(prompt.route)):
+            started = time.perf_counter()
+            try:
+                result = await self.clients[model].generate(prompt)
+            except LLMClientError as exc:
+                _observe(self.table, prompt, model, started)
+                if not _can_fail_over(exc):
+                    raise
+                error = exc
+                continue
+            _observe(self.table, prompt, model, started, result)
+            result.model = model
+            _served(prompt.route, model, attempt)
+            return result
+        raise error
+
+    async def stream(self, prompt: PromptRequest) -> AsyncIterator[StreamChunk]:
+        # Tokens may already have reached the caller, so a stream never fails over.
+        model = self.table.plan(prompt.route)[0]
+        started = time.perf_counter()
+        parts: Dict[int, List[str]] = {}
+        usage: Optional[Dict[str, int]] = None
+        try:
+            async for chunk in stream_generate(self.clients[model], prompt):
+                chunk.model = model
+                parts.setdefault(chunk.candidate, []).append(chunk.delta)
+                usage = chunk.usage or usage
+                yield chunk
+        except LLMClientError:
+            _observe(self.table, prompt, model, started)
+            raise
+        texts = ["".join(parts[index]) for index in sorted(parts)]
+        streamed = LLMResult(text=texts[0] if texts else "", latency_ms=0.0, raw=None, candidates=texts, usage=usage)
+        _observe(self.table, prompt, model, started, streamed)
+        _served(prompt.route, model, 0)
+
+
+_TABLE: Optional[RoutingTable] = None
+_TABLE_LOCK = Lock()
+
+
+def get_routing_table() -> RoutingTable:
+    """Process-wide table, so sync and async routers share one view of model health."""
+
+    global _TABLE
+    with _TABLE_LOCK:
+        if _TABLE is None:
+            _TABLE = RoutingTable(
+                settings.llm_routes,
+                default_model=settings.llm_model,
+                latency_slo_ms=settings.llm_route_latency_slo_ms,
+                window_seconds=settings.llm_router_window_seconds,
+                min_samples=settings.llm_router_min_samples,
+                max_error_rate=settings.llm_router_max_error_rate,
+            )
+        return _TABLE
+
+
+def router_stats() -> Dict[str, Any]:
+    return get_routing_table().stats()
+
+
+__all__ = [
+    "DEFAULT_ROUTE",
+    "AsyncLLMRouter",
+    "LLMRouter",
+    "ModelHealth",
+    "RoutingTable",
+    "get_routing_table",
+    "router_stats",
+]
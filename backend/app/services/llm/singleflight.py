@@ -0,0 +1,127 @@
+"""Single-flight deduplication: identical concurrent prompts share one upstream call."""
+
+from __future__ import annotations
+
+import dataclasses
+import threading
+from typing import AsyncIterator, Dict, Optional
+
+import anyio
+
+from app.core import metrics
+
+from .cache import _cost_usd, _usage_tokens, cache_key
+from .client import AsyncLLMClient, LLMClient, LLMResult, PromptRequest, StreamChunk, stream_generate
+
+
+def _shared_copy(result: LLMResult) -> LLMResult:
+    # Callers may annotate their result (e.g. the router sets ``model``), so each gets its own.
+    # ``shared`` keeps accounting from billing the leader's tokens once per waiter.
+    return dataclasses.replace(result, candidates=list(result.candidates), shared=True)
+
+
+def _count_saving(prompt: PromptRequest, result: LLMResult) -> None:
+    metrics.increment("llm.singleflight.waiters")
+    metrics.increment("llm.singleflight.dollars_saved", _cost_usd(_usage_tokens(result, prompt)))
+
+
+class _Flight:
+    def __init__(self, done: object) -> None:
+        self.done = done
+        self.result: Optional[LLMResult] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlightLLMClient:
+    """Concurrent calls with the same prompt key wait for the first caller's result.
+
+    The key is the response-cache key (model, messages and sampling parameters), so only
+    calls that would be interchangeable are merged; a failure is shared with all waiters.
+    """
+
+    def __init__(self, client: LLMClient, *, model: str, default_temperature: float) -> None:
+        self.client = client
+        self.model = model
+        self.default_temperature = default_temperature
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, prompt: PromptRequest) -> str:
+        temperature = prompt.temperature if prompt.temperature is not None else self.default_temperature
+        return cache_key(self.model, prompt, temperature)
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        key = self._key(prompt)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(threading.Event())
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            _count_saving(prompt, flight.result)
+            return _shared_copy(flight.result)
+
+        try:
+            flight.result = self.client.generate(prompt)
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+
+class SingleFlightAsyncLLMClient:
+    """Async counterpart of :class:`SingleFlightLLMClient`.
+
+    If the leading caller is cancelled, waiters make the call themselves rather than
+    inheriting the cancellation.
+    """
+
+    def __init__(self, client: AsyncLLMClient, *, model: str, default_temperature: float) -> None:
+        self.client = client
+        self.model = model
+        self.default_temperature = default_temperature
+        self._flights: Dict[str, _Flight] = {}
+
+    def _key(self, prompt: PromptRequest) -> str:
+        temperature = prompt.temperature if prompt.temperature is not None else self.default_temperature
+        return cache_key(self.model, prompt, temperature)
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:
+        key = self._key(prompt)
+        while True:
+            flight = self._flights.get(key)
+            if flight is None:
+                break
+            await flight.done.wait()
+            if flight.result is not None:
+                _count_saving(prompt, flight.result)
+                return _shared_copy(flight.result)
+            if not isinstance(flight.error, anyio.get_cancelled_exc_class()):
+                raise flight.error
+
+        flight = self._flights[key] = _Flight(anyio.Event())
+        try:
+            flight.result = await self.client.generate(prompt)
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            self._flights.pop(key, None)
+            flight.done.set()
+
+    async def stream(self, prompt: PromptRequest) -> AsyncIterator[StreamChunk]:
+        # Each stream is consumed incrementally by its own caller, so streams are not merged.
+        async for chunk in stream_generate(self.client, prompt):
+            yield chunk
+
+
+__all__ = ["SingleFlightAsyncLLMClient", "SingleFlightLLMClient"]
@@ -0,0 +1,185 @@
+"""Offline stub provider: deterministic outputs with simulated latency and failures."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import random
+import re
+import time
+from pathlib import Path
+from threading import Lock
+from typing import AsyncIterator, List, Optional
+
+import anyio
+
+from .client import LLMClientError, LLMResult, PromptRequest, StreamChunk
+from .tokens import count_tokens
+
+_TRANSLATE_PATTERN = re.compile(
+    r"Target language: (?P<target>\S+)\nTranslate the following text:\n(?P<text>.*)\nRespond with the translation only\.",
+    re.DOTALL,
+)
+_FEATURE_PATTERN = re.compile(r"Feature \(Korean\): (?P<feature>.+)")
+_FEATURE_WORDS = {
+    "충전": "charging",
+    "청소": "cleaning",
+    "시작": "start",
+    "일시정지": "pause",
+    "정지": "stop",
+    "복귀": "return",
+    "공기질": "air_quality",
+    "터보": "turbo",
+    "모드": "mode",
+    "타이머": "timer",
+    "설정": "set",
+}
+
+
+class LatencyProfile:
+    """Draws simulated provider latencies in milliseconds.
+
+    ``fixed`` always returns ``median_ms``; ``lognormal`` has median ``median_ms`` and
+    shape ``sigma`` (a long right tail like real providers); ``histogram`` replays
+    samples recorded from production.
+    """
+
+    def __init__(
+        self,
+        kind: str = "fixed",
+        *,
+        median_ms: float = 50.0,
+        sigma: float = 0.5,
+        samples: Optional[List[float]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        if kind == "histogram" and not samples:
+            raise ValueError("The histogram latency profile needs recorded samples")
+        self.kind = kind
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.samples = list(samples or [])
+        self._random = random.Random(seed)
+        self._lock = Lock()
+
+    @classmethod
+    def from_file(cls, path: str, *, seed: Optional[int] = None) -> "LatencyProfile":
+        """Load samples from a JSON list or a file with one latency (ms) per line."""
+
+        content = Path(path).read_text(encoding="utf-8").strip()
+        if content.startswith("["):
+            samples = [float(value) for value in json.loads(content)]
+        else:
+            samples = [float(line) for line in content.splitlines() if line.strip()]
+        return cls("histogram", samples=samples, seed=seed)
+
+    def sample_ms(self) -> float:
+        with self._lock:
+            if self.kind == "lognormal":
+                return self.median_ms * self._random.lognormvariate(0.0, self.sigma)
+            if self.kind == "histogram":
+                return self._random.choice(self.samples)
+            return self.median_ms
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256("\x00".join(parts).encode("utf-8")).hexdigest()
+
+
+def _normalize_feature(feature: str) -> str:
+    words = [word for keyword, word in _FEATURE_WORDS.items() if keyword in feature]
+    if not words:
+        return f"feature_{_digest(feature)[:8]}"
+    return "_".join(dict.fromkeys(words))
+
+
+def stub_candidates(prompt: PromptRequest) -> List[str]:
+    """Deterministic, shape-correct completions for the prompts this app sends."""
+
+    system = "\n".join(message.content for message in prompt.messages if message.role == "system")
+    user = prompt.messages[-1].content if prompt.messages else ""
+    n = prompt.n or 1
+
+    if "valid JSON format" in system:
+        review = {"has_issues": False, "issues": [], "suggestions": [], "confidence": 0.9}
+        return [json.dumps(review)] * n
+
+    feature = _FEATURE_PATTERN.search(user)
+    if feature is not None:
+        return [_normalize_feature(feature.group("feature").strip())] * n
+
+    task = _TRANSLATE_PATTERN.search(user)
+    if task is not None:
+        target, text = task.group("target"), task.group("text").strip()
+        return [f"[{target}] {text}" if index == 0 else f"[{target} #{index + 1}] {text}" for index in range(n)]
+
+    return [f"stub-{_digest(user)[:12]}"] * n
+
+
+class StubLLMClient:
+    """:class:`LLMClient` that never touches the network.
+
+    Each call sleeps for a latency drawn from ``latency``, then fails with a simulated
+    5xx (``error_rate``) or 429 (``rate_limit_rate``), or returns :func:`stub_candidates`.
+    """
+
+    def __init__(
+        self,
+        latency: Optional[LatencyProfile] = None,
+        *,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_seconds: float = 1.0,
+    ) -> None:
+        self.latency = latency or LatencyProfile("fixed", median_ms=0.0)
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+
+    def _outcome(self, prompt: PromptRequest, latency_ms: float) -> LLMResult:
+        roll = self.latency.roll()
+        if roll < self.rate_limit_rate:
+            raise LLMClientError(
+                "Stub provider: rate limit exceeded",
+                status_code=429,
+                retryable=True,
+                retry_after=self.retry_after_seconds,
+            )
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise LLMClientError("Stub provider: simulated server error", status_code=500, retryable=True)
+        candidates = stub_candidates(prompt)
+        usage = {
+            "prompt_tokens": sum(count_tokens(message.content) for message in prompt.messages),
+            "completion_tokens": sum(count_tokens(text) for text in candidates),
+            "cached_tokens": 0,
+        }
+        return LLMResult(text=candidates[0], latency_ms=latency_ms, raw={"stub": True}, candidates=candidates, usage=usage)
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        latency_ms = self.latency.sample_ms()
+        time.sleep(latency_ms / 1000.0)
+        return self._outcome(prompt, latency_ms)
+
+
+class AsyncStubLLMClient(StubLLMClient):
+    """Async :class:`StubLLMClient`; simulated latency awaits instead of blocking a thread."""
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:  # type: ignore[override]
+        latency_ms = self.latency.sample_ms()
+        await anyio.sleep(latency_ms / 1000.0)
+        return self._outcome(prompt, latency_ms)
+
+    async def stream(self, prompt: PromptRequest) -> AsyncIterator[StreamChunk]:
+        result = await self.generate(prompt)
+        for index, text in enumerate(result.candidates):
+            for word in re.findall(r"\S+\s*", text):
+                yield StreamChunk(candidate=index, delta=word)
+            yield StreamChunk(candidate=index, finished=True)
+        yield StreamChunk(candidate=0, usage=result.usage)
+
+
+__all__ = ["AsyncStubLLMClient", "LatencyProfile", "StubLLMClient", "stub_candidates"]
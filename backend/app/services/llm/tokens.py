@@ -0,0 +1,52 @@
+"""Token counting for prompt budgeting."""
+
+from __future__ import annotations
+
+import logging
+from functools import lru_cache
+from typing import Optional
+
+try:  # pragma: no cover - optional dependency
+    import tiktoken
+except ImportError:  # pragma: no cover - handled at runtime
+    tiktoken = None  # type: ignore
+
+logger = logging.getLogger(__name__)
+
+_load_failed = False
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: Optional[str]):
+    global _load_failed
+    if tiktoken is None or _load_failed:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("o200k_base")
+        except (KeyError, ValueError):
+            return tiktoken.get_encoding("o200k_base")
+    except Exception:
+        # Encodings are downloaded on first use, which fails offline; estimate instead of failing requests.
+        _load_failed = True
+        logger.warning("Could not load tiktoken encoding; estimating token counts instead", exc_info=True)
+        return None
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens with ``tiktoken`` when installed, otherwise estimate conservatively.
+
+    The estimate charges one token per four ASCII characters and one per non-ASCII
+    character, which over-counts Hangul slightly rather than under-counting it.
+    """
+
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    return -(-ascii_chars // 4) + (len(text) - ascii_chars)
+
+
+__all__ = ["count_tokens"]
@@ -0,0 +1,285 @@
+"""Shared, tuned HTTP connection pools for LLM provider clients."""
+
+from __future__ import annotations
+
+import logging
+import time
+from threading import Lock
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+
+import httpx
+
+from app.core import metrics
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+try:  # pragma: no cover - optional dependency
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:  # pragma: no cover - handled at runtime
+    HTTP2_AVAILABLE = False
+
+
+# Waits shorter than this are event-loop scheduling; longer ones mean every connection
+# (or HTTP/2 stream) was busy and the request queued in the pool.
+QUEUED_AFTER_MS = 10.0
+
+
+class _PoolGauge:
+    """Requests in flight, until their response is closed, and requests waiting for a connection."""
+
+    def __init__(self, max_connections: int) -> None:
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self._lock = Lock()
+
+    def start(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+            self.waiting += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.peak_waiting = max(self.peak_waiting, self.waiting)
+            in_flight = self.in_flight
+        metrics.observe("llm.http.in_flight", in_flight)
+
+    def acquired(self, wait_ms: float) -> None:
+        with self._lock:
+            self.waiting -= 1
+        metrics.observe("llm.http.pool_wait_ms", wait_ms)
+        if wait_ms > QUEUED_AFTER_MS:
+            metrics.increment("llm.http.pool_queued")
+
+    def finish(self, waiting: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if waiting:
+                self.waiting -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "max_connections": self.max_connections,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "queued": self.waiting,
+                "peak_queued": self.peak_waiting,
+            }
+
+
+class _RequestTracker:
+    """Times one request's wait for a pooled connection and releases it from the gauge once.
+
+    httpcore emits its first ``trace`` event (connect, or sending headers on a reused
+    connection or HTTP/2 stream) only after the pool has handed the request a connection,
+    so the time to that event is the pool wait under HTTP/1.1 and HTTP/2 alike.
+    """
+
+    def __init__(self, gauge: _PoolGauge, trace: Optional[Callable[..., Any]]) -> None:
+        self.gauge = gauge
+        self.inner_trace = trace
+        self.started = time.perf_counter()
+        self.waiting = True
+        self.closed = False
+        gauge.start()
+
+    def _acquired(self) -> None:
+        if self.waiting and not self.closed:
+            self.waiting = False
+            self.gauge.acquired((time.perf_counter() - self.started) * 1000.0)
+
+    def trace(self, name: str, info: Dict[str, Any]) -> None:
+        self._acquired()
+        if self.inner_trace is not None:
+            self.inner_trace(name, info)
+
+    async def atrace(self, name: str, info: Dict[str, Any]) -> None:
+        self._acquired()
+        if self.inner_trace is not None:
+            await self.inner_trace(name, info)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self.gauge.finish(self.waiting)
+
+
+class _TrackedStream(httpx.SyncByteStream):
+    """Keeps the request in flight until its body has been read and closed."""
+
+    def __init__(self, stream: httpx.SyncByteStream, tracker: _RequestTracker) -> None:
+        self.stream = stream
+        self.tracker = tracker
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self.stream)
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+        finally:
+            self.tracker.close()
+
+
+class _TrackedAsyncStream(httpx.AsyncByteStream):
+    """Async counterpart of :class:`_TrackedStream`."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, tracker: _RequestTracker) -> None:
+        self.stream = stream
+        self.tracker = tracker
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self.stream.__aiter__()
+
+    async def aclose(self) -> None:
+        try:
+            await self.stream.aclose()
+        finally:
+            self.tracker.close()
+
+
+def _open_connections(transport: Any) -> Optional[int]:
+    pool = getattr(transport, "_pool", None)
+    connections = getattr(pool, "connections", None)
+    return len(connections) if connections is not None else None
+
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Wraps an httpx transport to report pool waits, saturation and pool timeouts."""
+
+    def __init__(self, transport: httpx.BaseTransport, max_connections: int) -> None:
+        self.transport = transport
+        self.gauge = _PoolGauge(max_connections)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        tracker = _RequestTracker(self.gauge, request.extensions.get("trace"))
+        request.extensions = {**request.extensions, "trace": tracker.trace}
+        try:
+            response = self.transport.handle_request(request)
+        except BaseException as exc:
+            if isinstance(exc, httpx.PoolTimeout):
+                metrics.increment("llm.http.pool_timeouts")
+            tracker.close()
+            raise
+        response.stream = _TrackedStream(response.stream, tracker)
+        return response
+
+    def close(self) -> None:
+        self.transport.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.gauge.stats(), "open_connections": _open_connections(self.transport)}
+
+
+class InstrumentedAsyncTransport(httpx.AsyncBaseTransport):
+    """Async counterpart of :class:`InstrumentedTransport`."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, max_connections: int) -> None:
+        self.transport = transport
+        self.gauge = _PoolGauge(max_connections)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        tracker = _RequestTracker(self.gauge, request.extensions.get("trace"))
+        request.extensions = {**request.extensions, "trace": tracker.atrace}
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException as exc:
+            if isinstance(exc, httpx.PoolTimeout):
+                metrics.increment("llm.http.pool_timeouts")
+            tracker.close()
+            raise
+        response.stream = _TrackedAsyncStream(response.stream, tracker)
+        return response
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.gauge.stats(), "open_connections": _open_connections(self.transport)}
+
+
+def http_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_http_max_connections,
+        max_keepalive_connections=settings.llm_http_max_keepalive_connections,
+        keepalive_expiry=settings.llm_http_keepalive_expiry_seconds,
+    )
+
+
+def http_timeout() -> httpx.Timeout:
+    """Connect and pool waits fail fast; reads allow for slow completions."""
+
+    return httpx.Timeout(
+        settings.llm_timeout_seconds,
+        connect=settings.llm_http_connect_timeout_seconds,
+        pool=settings.llm_http_pool_timeout_seconds,
+    )
+
+
+def _http2_enabled() -> bool:
+    if settings.llm_http2 and not HTTP2_AVAILABLE:
+        logger.warning("LLM_HTTP2 is set but the 'h2' package is missing; using HTTP/1.1")
+    return settings.llm_http2 and HTTP2_AVAILABLE
+
+
+_LOCK = Lock()
+_HTTP_CLIENT: Optional[httpx.Client] = None
+_ASYNC_HTTP_CLIENT: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide blocking HTTP client shared by every LLM client."""
+
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        with _LOCK:
+            if _HTTP_CLIENT is None:
+                limits = http_limits()
+                transport = httpx.HTTPTransport(limits=limits, http2=_http2_enabled())
+                _HTTP_CLIENT = httpx.Client(
+                    transport=InstrumentedTransport(transport, limits.max_connections),
+                    timeout=http_timeout(),
+                )
+    return _HTTP_CLIENT
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the process-wide async HTTP client shared by every async LLM client."""
+
+    global _ASYNC_HTTP_CLIENT
+    if _ASYNC_HTTP_CLIENT is None:
+        with _LOCK:
+            if _ASYNC_HTTP_CLIENT is None:
+                limits = http_limits()
+                transport = httpx.AsyncHTTPTransport(limits=limits, http2=_http2_enabled())
+                _ASYNC_HTTP_CLIENT = httpx.AsyncClient(
+                    transport=InstrumentedAsyncTransport(transport, limits.max_connections),
+                    timeout=http_timeout(),
+                )
+    return _ASYNC_HTTP_CLIENT
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Saturation of the shared pools that have been created in this process."""
+
+    stats: Dict[str, Any] = {"http2": settings.llm_http2 and HTTP2_AVAILABLE}
+    for name, client in (("sync", _HTTP_CLIENT), ("async", _ASYNC_HTTP_CLIENT)):
+        transport = getattr(client, "_transport", None)
+        if isinstance(transport, (InstrumentedTransport, InstrumentedAsyncTransport)):
+            stats[name] = transport.stats()
+    return stats
+
+
+__all__ = [
+    "InstrumentedAsyncTransport",
+    "InstrumentedTransport",
+    "get_async_http_client",
+    "get_http_client",
+    "http_limits",
+    "http_timeout",
+    "pool_stats",
+]
@@ -1,5 +1,6 @@
 """RAG service utilities."""
 
+from .aliases import ensure_aliased_collections, reindex_collection, resolve_alias
 from .config import (
     EmbeddingModelConfig,
     VectorCollectionConfig,
@@ -11,6 +12,9 @@ from .config import (
 from .embedding import EmbeddingClient, EmbeddingRequest, get_embedding_client
 
 __all__ = [
+    "ensure_aliased_collections",
+    "reindex_collection",
+    "resolve_alias",
     "EmbeddingModelConfig",
     "VectorCollectionConfig",
     "VectorStoreConfig",
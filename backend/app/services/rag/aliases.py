@@ -0,0 +1,227 @@
+"""Versioned Qdrant collections served through stable aliases (blue/green reindex)."""
+
+from __future__ import annotations
+
+import logging
+import random
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from .config import VectorCollectionConfig, default_collections
+from .embedding import as_float_list, get_embedding_client
+
+logger = logging.getLogger(__name__)
+
+RECALL_SAMPLE_SIZE = 20
+MIN_SAMPLE_RECALL = 0.9
+# Retries for the alias that replaces a dropped legacy collection; searches fail until it lands.
+LEGACY_ALIAS_ATTEMPTS = 5
+LEGACY_ALIAS_BACKOFF_SECONDS = 0.2
+
+
+class ReindexVerificationError(RuntimeError):
+    """Raised when a freshly built collection fails count or recall checks."""
+
+
+def physical_name(alias: str, version: int) -> str:
+    return f"{alias}_v{version}"
+
+
+def _version_of(alias: str, collection: str) -> Optional[int]:
+    match = re.fullmatch(rf"{re.escape(alias)}_v(\d+)", collection)
+    return int(match.group(1)) if match else None
+
+
+def resolve_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    """Return the physical collection currently behind ``alias``."""
+
+    for description in client.get_aliases().aliases or []:
+        if description.alias_name == alias:
+            return description.collection_name
+    return None
+
+
+def _existing_collections(client: QdrantClient) -> List[str]:
+    return [collection.name for collection in client.get_collections().collections or []]
+
+
+def _create_physical(client: QdrantClient, cfg: VectorCollectionConfig, name: str) -> None:
+    distance = getattr(qmodels.Distance, cfg.distance.upper(), qmodels.Distance.COSINE)
+    logger.info("Creating Qdrant collection %s (dim=%s)", name, cfg.dimension)
+    client.create_collection(
+        collection_name=name,
+        vectors_config=qmodels.VectorParams(size=cfg.dimension, distance=distance),
+        shard_number=cfg.shard_number,
+        on_disk_payload=cfg.on_disk,
+    )
+
+
+def _switch_alias(client: QdrantClient, alias: str, target: str, *, had_alias: bool) -> None:
+    operations: List[Any] = []
+    if had_alias:
+        operations.append(qmodels.DeleteAliasOperation(delete_alias=qmodels.DeleteAlias(alias_name=alias)))
+    operations.append(
+        qmodels.CreateAliasOperation(create_alias=qmodels.CreateAlias(collection_name=target, alias_name=alias))
+    )
+    # Qdrant applies all alias operations in one request atomically.
+    client.update_collection_aliases(change_aliases_operations=operations)
+
+
+def _replace_legacy_collection(client: QdrantClient, alias: str, target: str) -> None:
+    """Drop the legacy physical collection named ``alias`` and alias ``target`` in its place.
+
+    Qdrant rejects an alias that shares its name with a collection, so the drop cannot be
+    folded into the alias request: searches on ``alias`` fail between the two calls. The
+    alias is created right after the drop and retried with backoff. If every attempt fails,
+    :func:`ensure_aliased_collections` points the alias at the newest version on next start.
+    """
+
+    logger.warning("Dropping legacy physical collection %s before aliasing it to %s", alias, target)
+    client.delete_collection(collection_name=alias)
+    for attempt in range(LEGACY_ALIAS_ATTEMPTS):
+        try:
+            _switch_alias(client, alias, target, had_alias=False)
+            return
+        except Exception:
+            if attempt + 1 == LEGACY_ALIAS_ATTEMPTS:
+                logger.error("Could not alias %s to %s; it is unavailable until the alias is created", alias, target)
+                raise
+            logger.warning("Aliasing %s to %s failed; retrying", alias, target, exc_info=True)
+            time.sleep(LEGACY_ALIAS_BACKOFF_SECONDS * 2**attempt)
+
+
+def ensure_aliased_collections(
+    client: QdrantClient,
+    collections: Sequence[VectorCollectionConfig] = default_collections,
+) -> Dict[str, str]:
+    """Make sure every configured alias resolves to a physical collection.
+
+    New deployments get ``<name>_v1`` behind the ``<name>`` alias. A legacy physical
+    collection that already uses the bare name is left serving until the first reindex.
+    An alias lost while replacing a legacy collection is restored to the newest version.
+    """
+
+    existing = set(_existing_collections(client))
+    resolved: Dict[str, str] = {}
+    for cfg in collections:
+        target = resolve_alias(client, cfg.name)
+        if target is None and cfg.name in existing:
+            resolved[cfg.name] = cfg.name
+            continue
+        if target is None:
+            versions = [v for v in (_version_of(cfg.name, name) for name in existing) if v is not None]
+            target = physical_name(cfg.name, max(versions, default=1))
+            if target not in existing:
+                _create_physical(client, cfg, target)
+            _switch_alias(client, cfg.name, target, had_alias=False)
+        resolved[cfg.name] = target
+    return resolved
+
+
+def _verify(
+    client: QdrantClient,
+    collection: str,
+    items: Sequence[Tuple[str, Dict[str, Any]]],
+    *,
+    expected: int,
+    sample_size: int,
+    min_recall: float,
+    vectors: Optional[Sequence[Sequence[float]]] = None,
+) -> Dict[str, Any]:
+    count = client.count(collection_name=collection, exact=True).count
+    if count != expected:
+        raise ReindexVerificationError(f"{collection}: expected {expected} points, found {count}")
+
+    indices = random.sample(range(len(items)), min(sample_size, len(items)))
+    if not indices:
+        return {"count": count, "sample_size": 0, "recall": 1.0}
+    sample = [items[index] for index in indices]
+    if vectors is not None:
+        queries = [as_float_list(vectors[index]) for index in indices]
+    else:
+        queries = get_embedding_client().embed([text for text, _ in sample])
+    hits = 0
+    for query, (_, payload) in zip(queries, sample, strict=True):
+        response = client.query_points(collection_name=collection, query=query, limit=1, with_payload=True)
+        top = response.points[0] if response.points else None
+        if top is not None and ((top.payload or {}) == payload or (top.score or 0.0) >= 0.999):
+            hits += 1
+    recall = hits / len(sample)
+    if recall < min_recall:
+        raise ReindexVerificationError(f"{collection}: sample recall {recall:.2f} below {min_recall:.2f}")
+    return {"count": count, "sample_size": len(sample), "recall": round(recall, 3)}
+
+
+def reindex_collection(
+    client: QdrantClient,
+    cfg: VectorCollectionConfig,
+    items: Sequence[Tuple[str, Dict[str, Any]]],
+    load: Callable[[str], int],
+    *,
+    vectors: Optional[Sequence[Sequence[float]]] = None,
+    sample_size: int = RECALL_SAMPLE_SIZE,
+    min_recall: float = MIN_SAMPLE_RECALL,
+) -> Dict[str, Any]:
+    """Build the next version of ``cfg.name`` off to the side and swap the alias to it.
+
+    ``load`` receives the new physical collection name and must upsert ``items`` into
+    it. ``vectors`` are precomputed embeddings aligned with ``items``; when given they
+    are used as the recall-check queries instead of re-embedding. The alias keeps
+    pointing at the old version until the new one passes the count and sample-recall
+    checks, so readers never see a partial collection.
+    """
+
+    alias = cfg.name
+    existing = _existing_collections(client)
+    current = resolve_alias(client, alias)
+    versions = [v for v in (_version_of(alias, name) for name in existing) if v is not None]
+    target = physical_name(alias, max(versions, default=0) + 1)
+
+    _create_physical(client, cfg, target)
+    try:
+        load(target)
+        verification = _verify(
+            client,
+            target,
+            items,
+            expected=len(items),
+            sample_size=sample_size,
+            min_recall=min_recall,
+            vectors=vectors,
+        )
+    except Exception:
+        logger.warning("Reindex of %s into %s failed; keeping %s", alias, target, current)
+        client.delete_collection(collection_name=target)
+        raise
+
+    if current is None and alias in existing:
+        # Legacy deployment: a physical collection owns the alias name and must go first.
+        _replace_legacy_collection(client, alias, target)
+    else:
+        _switch_alias(client, alias, target, had_alias=current is not None)
+
+    removed: List[str] = []
+    for name in existing:
+        if name != target and _version_of(alias, name) is not None:
+            client.delete_collection(collection_name=name)
+            removed.append(name)
+
+    logger.info("Alias %s now serves %s (previous: %s)", alias, target, current)
+    return {"alias": alias, "collection": target, "previous": current, "removed": removed, **verification}
+
+
+__all__ = [
+    "LEGACY_ALIAS_ATTEMPTS",
+    "LEGACY_ALIAS_BACKOFF_SECONDS",
+    "MIN_SAMPLE_RECALL",
+    "RECALL_SAMPLE_SIZE",
+    "ReindexVerificationError",
+    "ensure_aliased_collections",
+    "physical_name",
+    "reindex_collection",
+    "resolve_alias",
+]
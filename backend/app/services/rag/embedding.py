@@ -120,6 +120,12 @@ class EmbeddingClient:
         return normalized.astype(np.float32).tolist()
 
 
+def as_float_list(vector: Sequence[float]) -> List[float]:
+    """Python floats for the Qdrant client; precomputed vectors may be numpy rows."""
+
+    return vector.tolist() if isinstance(vector, np.ndarray) else list(vector)
+
+
 def get_embedding_client() -> EmbeddingClient:
     """Factory that caches embedding clients for reuse."""
 
@@ -132,5 +138,5 @@ def get_embedding_client() -> EmbeddingClient:
     return client
 
 
-__all__ = ["EmbeddingClient", "EmbeddingRequest", "get_embedding_client"]
+__all__ = ["EmbeddingClient", "EmbeddingRequest", "as_float_list", "get_embedding_client"]
 
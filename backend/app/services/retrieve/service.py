@@ -190,10 +190,14 @@ def retrieve(
     filters: Optional[Dict[str, Any]] = None,
     top_k: int = 5,
     mode: Optional[str] = None,
+    query_vector: Optional[Sequence[float]] = None,
 ) -> Dict[str, Any]:
     """
     Tiered retrieval with graceful filter degradation.
 
+    ``query_vector`` is a precomputed embedding of ``query`` (e.g. from a batched
+    embedding call) used instead of embedding the query here.
+
     Tier 1: Full filters (device + feature_norm)
     Tier 2: Device only
     Tier 3: No filters (semantic only)
@@ -232,7 +236,7 @@ def retrieve(
         if query.strip():
             client = _vector_client()
             if client is not None:
-                embedding = get_embedding_client().embed([query])[0]
+                embedding = query_vector if query_vector is not None else get_embedding_client().embed([query])[0]
                 vector_results = _vector_search(
                     client,
                     collection="style_guides",
@@ -288,7 +292,10 @@ def retrieve(
         candidate_vector_results: List[Tuple[str, float, Optional[List[float]], Dict[str, Any]]] = []
         client = _vector_client()
         if client is not None and query_text:
-            embedding = get_embedding_client().embed([query_text])[0]
+            if query_vector is not None and query_text == query:
+                embedding = query_vector
+            else:
+                embedding = get_embedding_client().embed([query_text])[0]
             candidate_vector_results = _vector_search(
                 client,
                 collection="style_guides",
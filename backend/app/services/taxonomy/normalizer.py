@@ -10,7 +10,7 @@ from sqlalchemy.orm import Session
 
 from app.db import models
 from app.services.llm import get_llm_client
-from app.services.llm.client import LLMClientError
+from app.services.llm.client import LLMClientError, PromptMessage, PromptRequest
 
 
 def normalize_feature_name(
@@ -132,7 +132,16 @@ Respond with ONLY the identifier (no explanation, no quotes).
 """
 
     try:
-        result = llm.generate(prompt)
+        # Deterministic and often repeated for recurring features, so always cacheable.
+        result = llm.generate(
+            PromptRequest(
+                messages=[PromptMessage(role="user", content=prompt)],
+                temperature=0.0,
+                max_output_tokens=32,
+                cache=True,
+                route="normalize",
+            )
+        )
         normalized = result.text.strip().lower()
         # Remove any quotes or extra whitespace
         normalized = normalized.strip('"').strip("'").strip()
@@ -0,0 +1,191 @@
+"""Batch translation with shared setup and bounded LLM concurrency."""
+
+from __future__ import annotations
+
+import functools
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import anyio
+from pydantic import BaseModel, Field
+from sqlalchemy.orm import Session
+
+from app.core import metrics
+from app.core.settings import settings
+from app.db import models
+from app.services.guardrails.loader import load_guardrail_rules_for_requests
+from app.services.llm import get_async_llm_client
+from app.services.llm.client import PromptRequest
+from app.services.rag.embedding import get_embedding_client
+
+from .prompting import PromptReport
+from .service import (
+    TranslateRequest,
+    _build_response,
+    _guardrail_rules,
+    _retrieval_examples,
+    _run_rules,
+    _translation_prompt,
+)
+
+logger = logging.getLogger(__name__)
+
+BatchLine = Dict[str, Any]
+
+
+class TranslateBatchRequest(BaseModel):
+    items: List[TranslateRequest] = Field(min_length=1)
+    concurrency: Optional[int] = Field(default=None, ge=1, description="Parallel LLM calls; capped by server settings")
+
+
+@dataclass(slots=True)
+class _PreparedItem:
+    index: int
+    request: TranslateRequest
+    prompt: PromptRequest
+    retrieval: Dict[str, Any]
+    rules: Dict[str, Any]
+    report: PromptReport
+
+
+def _error_line(index: int, exc: Exception) -> BatchLine:
+    return {"index": index, "status": "error", "error": str(exc) or exc.__class__.__name__}
+
+
+def _embed_queries(requests: List[TranslateRequest]) -> Dict[int, List[float]]:
+    """Embed every retrieval query up front in ``EMBEDDING_MAX_BATCH``-sized calls."""
+
+    indices = [index for index, request in enumerate(requests) if request.options.use_rag and request.text.strip()]
+    client = get_embedding_client()
+    batch_size = max(1, settings.embedding_max_batch)
+    vectors: Dict[int, List[float]] = {}
+    for start in range(0, len(indices), batch_size):
+        chunk = indices[start : start + batch_size]
+        for index, vector in zip(chunk, client.embed([requests[i].text for i in chunk]), strict=True):
+            vectors[index] = vector
+    return vectors
+
+
+def _request_scoped_rules(
+    requests: List[TranslateRequest],
+    contexts: List[models.Request],
+    session: Session,
+) -> Dict[Tuple[Optional[str], str], Dict[str, Any]]:
+    """Guardrail rules per (run id, request id), with one rule query per distinct run id."""
+
+    by_run: Dict[Optional[str], List[models.Request]] = {}
+    for request, context in zip(requests, contexts, strict=True):
+        if request.options.guardrails:
+            by_run.setdefault(request.run_id, []).append(context)
+    scoped: Dict[Tuple[Optional[str], str], Dict[str, Any]] = {}
+    for run_id, run_contexts in by_run.items():
+        rules_run_id, run_rules = _run_rules(run_id)
+        rules = load_guardrail_rules_for_requests(
+            session, run_contexts, extra_sources=[run_rules], extras_id=rules_run_id
+        )
+        scoped.update({(run_id, request_id): item for request_id, item in rules.items()})
+    return scoped
+
+
+def prepare_batch(
+    requests: List[TranslateRequest],
+    *,
+    session: Session | None,
+    request_contexts: Optional[List[models.Request]] = None,
+) -> Tuple[List[_PreparedItem], List[BatchLine]]:
+    """Run retrieval and rule loading for every item; failures are returned per item.
+
+    Guardrail rules are loaded once per distinct scope (run id + guardrails flag). With
+    ``request_contexts`` (one workflow request per item), retrieval filters and rule
+    scopes follow each item's request instead.
+    """
+
+    try:
+        vectors = _embed_queries(requests)
+    except Exception:
+        logger.warning("Batch query embedding failed; items will embed individually", exc_info=True)
+        vectors = {}
+
+    contexts: List[Optional[models.Request]] = list(request_contexts or [None] * len(requests))
+    scoped_rules: Dict[Tuple[Optional[str], str], Dict[str, Any]] = {}
+    if request_contexts is not None and session is not None:
+        scoped_rules = _request_scoped_rules(requests, request_contexts, session)
+
+    rules_by_scope: Dict[Tuple[Optional[str], bool], Dict[str, Any]] = {}
+    prepared: List[_PreparedItem] = []
+    failures: List[BatchLine] = []
+    for index, request in enumerate(requests):
+        context = contexts[index]
+        try:
+            retrieval, examples = _retrieval_examples(
+                request,
+                session=session,
+                request_context=context,
+                query_vector=vectors.get(index),
+            )
+            scope = (request.run_id, request.options.guardrails)
+            if context is not None and (request.run_id, context.id) in scoped_rules:
+                rules = scoped_rules[(request.run_id, context.id)]
+            else:
+                if scope not in rules_by_scope:
+                    rules_by_scope[scope] = _guardrail_rules(request, session=session, request_context=None)
+                rules = rules_by_scope[scope]
+            prompt, report = _translation_prompt(request, examples)
+            prepared.append(
+                _PreparedItem(
+                    index=index,
+                    request=request,
+                    prompt=prompt,
+                    retrieval=retrieval,
+                    rules=rules,
+                    report=report,
+                )
+            )
+        except Exception as exc:
+            logger.warning("Batch item %s failed during preparation", index, exc_info=True)
+            failures.append(_error_line(index, exc))
+    return prepared, failures
+
+
+async def translate_batch(
+    requests: List[TranslateRequest],
+    *,
+    session: Session | None,
+    on_result: Callable[[BatchLine], Awaitable[None]],
+    concurrency: Optional[int] = None,
+) -> None:
+    """Translate ``requests`` and hand each result line to ``on_result`` as it completes.
+
+    Lines carry the item's input ``index`` and either ``result`` (a ``TranslateResponse``)
+    or ``error``; one failing item never affects the others.
+    """
+
+    limit = max(1, min(concurrency or settings.translate_batch_concurrency, settings.translate_batch_concurrency))
+    prepared, failures = await anyio.to_thread.run_sync(functools.partial(prepare_batch, requests, session=session))
+    metrics.increment("translate.batch.items", len(requests))
+    for failure in failures:
+        metrics.increment("translate.batch.errors")
+        await on_result(failure)
+
+    limiter = anyio.CapacityLimiter(limit)
+    client = get_async_llm_client()
+
+    async def run(item: _PreparedItem) -> None:
+        async with limiter:
+            try:
+                llm_result = await client.generate(item.prompt)
+                response = _build_response(item.request, llm_result, item.rules, item.retrieval, item.report)
+                line: BatchLine = {"index": item.index, "status": "ok", "result": response.model_dump()}
+            except Exception as exc:
+                logger.warning("Batch item %s failed", item.index, exc_info=True)
+                metrics.increment("translate.batch.errors")
+                line = _error_line(item.index, exc)
+        await on_result(line)
+
+    async with anyio.create_task_group() as group:
+        for item in prepared:
+            group.start_soon(run, item)
+
+
+__all__ = ["TranslateBatchRequest", "prepare_batch", "translate_batch"]
@@ -2,10 +2,33 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional
+import hashlib
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from app.services.llm.client import PromptMessage, PromptRequest
+from app.services.llm.tokens import count_tokens
+
+# Identical for every request and always first, so provider-side prompt caching can reuse
+# it. Keep request-specific text out of this block; edits invalidate every cached prefix.
+STATIC_INSTRUCTIONS = "\n".join(
+    [
+        "You are an expert UX writer who translates product copy with precision.",
+        "Always return polished UX strings ready for end users.",
+        "Keep responses concise unless specifically asked to expand.",
+    ]
+)
+
+# Identifies the instruction block in draft metadata, so cost or latency shifts can be
+# traced back to the prompt revision that caused them.
+PROMPT_FINGERPRINT = hashlib.sha256(STATIC_INSTRUCTIONS.encode("utf-8")).hexdigest()[:12]
+
+GLOSSARY_HEADER = "Use glossary terms when applicable:"
+EXAMPLES_HEADER = "Reference these contextual examples for consistency:"
+PLAIN_EXAMPLES_HEADER = "Reference these examples for consistency:"
+MESSAGE_OVERHEAD_TOKENS = 4  # role and framing tokens per chat message
+OUTPUT_EXPANSION = 3  # translated copy rarely needs more than 3x the source tokens
+OUTPUT_MARGIN_TOKENS = 16
 
 
 @dataclass(slots=True)
@@ -21,62 +44,187 @@ class TranslationPromptParams:
     max_output_tokens: Optional[int] = None
     temperature: Optional[float] = None
     num_candidates: int = 1
+    input_token_budget: Optional[int] = None
+    length_max: Optional[int] = None
+    model: Optional[str] = None
+
+
+@dataclass(slots=True)
+class PromptReport:
+    """What made it into the prompt under the token budget."""
+
+    input_tokens: int
+    input_token_budget: Optional[int]
+    max_output_tokens: Optional[int]
+    trimmed_examples: int = 0
+    trimmed_glossary: int = 0
+    fingerprint: str = PROMPT_FINGERPRINT
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def derive_max_output_tokens(text: str, length_max: Optional[int], model: Optional[str] = None) -> int:
+    """Cap output tokens by source length, and by ``length_max`` characters when set.
+
+    A token always spans at least one character, so ``length_max`` characters never
+    need more than ``length_max`` tokens.
+    """
+
+    cap = count_tokens(text, model) * OUTPUT_EXPANSION + OUTPUT_MARGIN_TOKENS
+    if length_max is not None and length_max > 0:
+        cap = min(cap, length_max + OUTPUT_MARGIN_TOKENS)
+    return cap
+
+
+def _example_rank(example: Dict[str, str]) -> int:
+    # Explicitly requested context rows carry their utterance/case; retrieved ones do not.
+    return 0 if example.get("user_utterance") or example.get("response_case") else 1
+
+
+def _render_example(idx: int, ex: Dict[str, str]) -> str:
+    lines = [f"\nExample {idx}:"]
+    if ex.get("user_utterance"):
+        lines.append(f"  User said: \"{ex['user_utterance']}\"")
+    if ex.get("response_case"):
+        lines.append(f"  Context: {ex['response_case']}")
+    lines.append(f"  Response: {ex['text']}")
+    return "".join(lines)
+
+
+def _fit_to_budget(
+    params: TranslationPromptParams,
+    base_tokens: int,
+    glossary: List[Tuple[str, str]],
+    examples: List[Dict[str, str]],
+    contextual: bool,
+) -> Tuple[List[Tuple[str, str]], List[Dict[str, str]]]:
+    """Greedily keep glossary lines and examples by rank until the budget is spent.
+
+    Glossary terms that occur in the source text rank first, then examples (explicit
+    context before retrieved, retrieval order otherwise), then the remaining glossary.
+    """
+
+    budget = params.input_token_budget
+    used = base_tokens
+    if budget is None:
+        return glossary, examples
+
+    relevant = [pair for pair in glossary if pair[0] and pair[0] in params.text]
+    relevant_terms = {src for src, _ in relevant}
+    other = [pair for pair in glossary if pair[0] not in relevant_terms]
+    ranked_examples = sorted(range(len(examples)), key=lambda index: _example_rank(examples[index]))
+    queue: List[Tuple[str, Any]] = (
+        [("glossary", pair) for pair in relevant]
+        + [("example", index) for index in ranked_examples]
+        + [("glossary", pair) for pair in other]
+    )
+
+    kept_glossary: List[Tuple[str, str]] = []
+    kept_examples: List[int] = []
+    for kind, item in queue:
+        if kind == "glossary":
+            cost = count_tokens(f"\n{item[0]} -> {item[1]}", params.model)
+            if not kept_glossary:
+                cost += count_tokens(GLOSSARY_HEADER, params.model)
+        else:
+            if contextual:
+                rendered = _render_example(len(kept_examples) + 1, examples[item])
+                header = EXAMPLES_HEADER
+            else:
+                rendered, header = f"\n- {examples[item]['text']}", PLAIN_EXAMPLES_HEADER
+            cost = count_tokens(rendered, params.model)
+            if not kept_examples:
+                cost += count_tokens(header, params.model)
+        if used + cost > budget:
+            continue
+        used += cost
+        (kept_glossary if kind == "glossary" else kept_examples).append(item)
+
+    return sorted(kept_glossary), [examples[index] for index in sorted(kept_examples)]
 
 
 def build_prompt(params: TranslationPromptParams) -> PromptRequest:
     """Create chat messages instructing the LLM to translate with style guidance."""
 
-    system_parts: List[str] = [
-        "You are an expert UX writer who translates product copy with precision.",
-        "Always return polished UX strings ready for end users.",
-        "Keep responses concise unless specifically asked to expand.",
-    ]
+    return build_prompt_with_report(params)[0]
 
+
+def build_prompt_with_report(params: TranslationPromptParams) -> Tuple[PromptRequest, PromptReport]:
+    """Build the translation prompt within ``params.input_token_budget``.
+
+    Without a budget every example and glossary line is included. ``max_output_tokens``
+    is derived from the source and ``length_max`` unless the caller set it.
+    """
+
+    # Layout, most stable first: static instructions, then device/feature material in a
+    # deterministic order, then everything specific to this request.
+    scoped_parts: List[str] = []
+    if params.style_guides:
+        guides = "; ".join(sorted(params.style_guides))
+        scoped_parts.append(f"Style notes: {guides}.")
+
+    request_parts: List[str] = []
+    if params.tone:
+        request_parts.append(f"Adhere to the requested tone: {params.tone}.")
     if params.num_candidates > 1:
-        system_parts.append(
+        request_parts.append(
             "Each response will be generated independently. "
             "Use distinctly different vocabulary, sentence structures, and phrasings while maintaining the same meaning."
         )
 
-    if params.tone:
-        system_parts.append(f"Adhere to the requested tone: {params.tone}.")
-    if params.style_guides:
-        guides = "; ".join(params.style_guides)
-        system_parts.append(f"Style notes: {guides}.")
-
-    if params.glossary_hints:
-        glossary_lines = [f"{src} -> {tgt}" for src, tgt in sorted(params.glossary_hints.items())]
-        system_parts.append("Use glossary terms when applicable:" + "\n" + "\n".join(glossary_lines))
-
-    if params.retrieval_examples_with_context:
-        context_lines = []
-        for idx, ex in enumerate(params.retrieval_examples_with_context, 1):
-            context_lines.append(f"\nExample {idx}:")
-            if ex.get("user_utterance"):
-                context_lines.append(f"  User said: \"{ex['user_utterance']}\"")
-            if ex.get("response_case"):
-                context_lines.append(f"  Context: {ex['response_case']}")
-            context_lines.append(f"  Response: {ex['text']}")
-        system_parts.append("Reference these contextual examples for consistency:" + "".join(context_lines))
-    elif params.retrieval_examples:
-        example_lines = "\n".join(f"- {ex}" for ex in params.retrieval_examples)
-        system_parts.append("Reference these examples for consistency:\n" + example_lines)
-
-    system_message = PromptMessage(role="system", content="\n".join(system_parts))
-
-    user_lines = [
+    task_lines = [
         f"Source language: {params.source_language}",
         f"Target language: {params.target_language}",
         "Translate the following text:",
         params.text,
         "Respond with the translation only.",
     ]
+    task_content = "\n".join(task_lines)
+
+    glossary = sorted(params.glossary_hints.items())
+    examples = list(params.retrieval_examples_with_context)
+    contextual = bool(examples)
+    if not contextual:
+        examples = [{"text": str(ex)} for ex in params.retrieval_examples]
+    base_tokens = (
+        count_tokens("\n\n".join([STATIC_INSTRUCTIONS, *scoped_parts]), params.model)
+        + count_tokens("\n".join([*request_parts, task_content]), params.model)
+        + 2 * MESSAGE_OVERHEAD_TOKENS
+    )
+    kept_glossary, kept_examples = _fit_to_budget(params, base_tokens, glossary, examples, contextual)
+
+    if kept_glossary:
+        glossary_lines = [f"{src} -> {tgt}" for src, tgt in kept_glossary]
+        scoped_parts.append(GLOSSARY_HEADER + "\n" + "\n".join(glossary_lines))
+
+    if kept_examples and contextual:
+        context_lines = [_render_example(idx, ex) for idx, ex in enumerate(kept_examples, 1)]
+        request_parts.append(EXAMPLES_HEADER + "".join(context_lines))
+    elif kept_examples:
+        example_lines = "\n".join(f"- {ex['text']}" for ex in kept_examples)
+        request_parts.append(PLAIN_EXAMPLES_HEADER + "\n" + example_lines)
+
+    system_message = PromptMessage(role="system", content="\n\n".join([STATIC_INSTRUCTIONS, *scoped_parts]))
+    user_message = PromptMessage(role="user", content="\n".join([*request_parts, task_content]))
 
-    user_message = PromptMessage(role="user", content="\n".join(user_lines))
+    max_output_tokens = params.max_output_tokens
+    if max_output_tokens is None:
+        max_output_tokens = derive_max_output_tokens(params.text, params.length_max, params.model)
 
-    return PromptRequest(
+    input_tokens = sum(
+        count_tokens(message.content, params.model) + MESSAGE_OVERHEAD_TOKENS for message in (system_message, user_message)
+    )
+    report = PromptReport(
+        input_tokens=input_tokens,
+        input_token_budget=params.input_token_budget,
+        max_output_tokens=max_output_tokens,
+        trimmed_examples=len(examples) - len(kept_examples),
+        trimmed_glossary=len(glossary) - len(kept_glossary),
+    )
+    request = PromptRequest(
         messages=[system_message, user_message],
         temperature=params.temperature,
-        max_output_tokens=params.max_output_tokens,
+        max_output_tokens=max_output_tokens,
     )
-
+    return request, report
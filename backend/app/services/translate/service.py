@@ -2,22 +2,30 @@
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import anyio
 
 from pydantic import BaseModel, Field
 from sqlalchemy.orm import Session
 
-from app.core import state
+from app.core import metrics, state
 from app.core.settings import settings
 from app.services.guardrails.loader import load_guardrail_rules
 from app.services.guardrails.service import apply_guardrails
-from app.services.llm import get_llm_client
-from app.services.llm.client import LLMClientError
+from app.services.llm import get_async_llm_client, get_llm_client
+from app.services.llm.client import LLMClientError, LLMResult, PromptRequest, stream_generate
 from app.services.retrieve.service import retrieve
 
 from app.db import models
 
-from .prompting import TranslationPromptParams, build_prompt
+from .prompting import PromptReport, TranslationPromptParams, build_prompt_with_report
+
+# Rule loading for streamed translations overlaps token delivery on these threads.
+_RULES_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="guardrail-rules")
 
 
 class TranslateOptions(BaseModel):
@@ -29,6 +37,7 @@ class TranslateOptions(BaseModel):
     temperature: Optional[float] = None
     max_output_tokens: Optional[int] = None
     num_candidates: int = 1
+    prompt_token_budget: Optional[int] = None
     device: Optional[str] = None
     feature_norm: Optional[str] = None
     style_tag: Optional[str] = None
@@ -61,39 +70,42 @@ class TranslationServiceError(RuntimeError):
     """Raised when the translation pipeline cannot complete."""
 
 
+def _run_rules(run_id: Optional[str]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """The ingest run whose rules apply (``run_id``, else the latest run) and its rules."""
+
+    run_id = run_id or state.RUN_LOGS.latest_id()
+    if not run_id:
+        return None, {}
+    return run_id, state.RUN_LOGS.get(run_id, {}).get("rules", {})
+
+
 def _collect_rules(run_id: Optional[str]) -> Dict[str, Any]:
-    if run_id:
-        return state.RUN_LOGS.get(run_id, {}).get("rules", {})
-    if state.RUN_LOGS:
-        first_key = next(iter(state.RUN_LOGS))
-        return state.RUN_LOGS.get(first_key, {}).get("rules", {})
-    return {}
+    return _run_rules(run_id)[1]
 
 
 def _context_examples(ids: List[str]) -> List[Dict[str, str]]:
     """Extract context examples with user_utterance and response_case metadata."""
     if not ids:
         return []
-    lookup = set(ids)
     examples: List[Dict[str, str]] = []
-    for row in state.CONTEXT:
-        if row.get("id") in lookup:
-            text = row.get("en_line") or row.get("ko_response")
-            if text:
-                examples.append({
-                    "text": str(text),
-                    "user_utterance": str(row.get("user_utterance", "")),
-                    "response_case": str(row.get("response_case_raw", "")),
-                })
+    for row in state.CONTEXT.select(ids):
+        text = row.get("en_line") or row.get("ko_response")
+        if text:
+            examples.append({
+                "text": str(text),
+                "user_utterance": str(row.get("user_utterance", "")),
+                "response_case": str(row.get("response_case_raw", "")),
+            })
     return examples
 
 
-def translate(
+def _retrieval_examples(
     request: TranslateRequest,
     *,
-    session: Session | None = None,
-    request_context: models.Request | None = None,
-) -> TranslateResponse:
+    session: Session | None,
+    request_context: models.Request | None,
+    query_vector: Optional[List[float]] = None,
+) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
     options = request.options
 
     retrieval_debug: Dict[str, Any] = {"items": [], "latency_ms": 0, "mode": None, "feature_confidence": 0.0, "novelty_mode": False}
@@ -117,6 +129,7 @@ def translate(
                 query=request.text,
                 filters=rag_filters,
                 top_k=max(1, options.rag_top_k),
+                query_vector=query_vector,
             )
         # Extract simple text examples from RAG results (no context available for style_guides)
         for item in retrieval_debug.get("items", []):
@@ -129,7 +142,20 @@ def translate(
 
     # Include explicit context examples with full context metadata
     retrieval_examples_with_context.extend(_context_examples(request.context_ids))
+    return retrieval_debug, retrieval_examples_with_context
+
+
+def _length_max(request: TranslateRequest) -> Optional[int]:
+    """Tightest length limit known before the LLM call (hints and the ingest run's rules)."""
+
+    limits = [request.hints.get("length_max"), _collect_rules(request.run_id).get("length_max")]
+    # Hints are user-supplied; like apply_guardrails, non-integer limits are ignored.
+    values = [value for value in limits if isinstance(value, int)]
+    return min(values) if values else None
 
+
+def _translation_prompt(request: TranslateRequest, examples: List[Dict[str, str]]) -> Tuple[PromptRequest, PromptReport]:
+    options = request.options
     num_candidates = max(1, min(options.num_candidates, 5))
 
     # Build prompt with appropriate temperature for diversity
@@ -138,7 +164,7 @@ def translate(
     if candidate_temperature is None and num_candidates > 1:
         candidate_temperature = 1.0
 
-    prompt = build_prompt(
+    prompt, report = build_prompt_with_report(
         TranslationPromptParams(
             text=request.text,
             source_language=request.source_language,
@@ -146,22 +172,54 @@ def translate(
             tone=options.tone,
             style_guides=options.style_guides,
             glossary_hints=request.glossary,
-            retrieval_examples_with_context=retrieval_examples_with_context,
+            retrieval_examples_with_context=examples,
             max_output_tokens=options.max_output_tokens,
             temperature=candidate_temperature,
             num_candidates=num_candidates,
+            input_token_budget=options.prompt_token_budget or settings.llm_prompt_token_budget,
+            length_max=_length_max(request),
+            model=settings.llm_model,
         )
     )
 
     # Add n parameter to prompt request for multiple candidates
     prompt.n = num_candidates
+    prompt.route = "translate"
+    return prompt, report
 
-    # Single LLM call with n parameter to generate multiple candidates
-    client = get_llm_client()
-    try:
-        llm_result = client.generate(prompt)
-    except LLMClientError as exc:  # pragma: no cover - network error path exercised via tests mocks
-        raise TranslationServiceError(str(exc)) from exc
+
+def _guardrail_rules(
+    request: TranslateRequest,
+    *,
+    session: Session | None,
+    request_context: models.Request | None,
+) -> Dict[str, Any]:
+    if not request.options.guardrails:
+        return {}
+    run_id, state_rules = _run_rules(request.run_id)
+    if session is None:
+        return state_rules
+    return load_guardrail_rules(session, request=request_context, extra_sources=[state_rules], extras_id=run_id)
+
+
+def _check_candidate(request: TranslateRequest, text: str, rules: Dict[str, Any], idx: int) -> TranslationCandidate:
+    if not request.options.guardrails:
+        return TranslationCandidate(text=text, guardrail=None)
+    # Apply fix only to the first candidate for accuracy
+    # Others keep original text for diversity, but still check violations
+    guardrail_result = apply_guardrails(text, rules, request.hints, apply_fix=(idx == 0))
+    return TranslationCandidate(text=guardrail_result.get("fixed", text), guardrail=guardrail_result)
+
+
+def _build_response(
+    request: TranslateRequest,
+    llm_result: LLMResult,
+    rules: Dict[str, Any],
+    retrieval_debug: Dict[str, Any],
+    report: PromptReport,
+    checked: Optional[Dict[int, Tuple[str, TranslationCandidate]]] = None,
+) -> TranslateResponse:
+    options = request.options
 
     # Extract all candidates from result
     candidate_texts = [text.strip() for text in llm_result.candidates if text.strip()]
@@ -173,50 +231,39 @@ def translate(
     base_text = candidate_texts[0]
     total_latency_ms = llm_result.latency_ms
 
-    rules: Dict[str, Any] = {}
-    if options.guardrails:
-        state_rules = _collect_rules(request.run_id)
-        db_rules: Dict[str, Any] = {}
-        if session is not None:
-            db_rules = load_guardrail_rules(session, request=request_context, extra_sources=[state_rules])
-        else:
-            db_rules = state_rules
-        rules = db_rules
     candidates: List[TranslationCandidate] = []
     selected = base_text
     selected_guardrail = None
     for idx, text in enumerate(candidate_texts):
-        guardrail_result = None
-        if options.guardrails:
-            # Apply fix only to the first candidate for accuracy
-            # Others keep original text for diversity, but still check violations
-            apply_fix = (idx == 0)
-            guardrail_result = apply_guardrails(text, rules, request.hints, apply_fix=apply_fix)
-            fixed = guardrail_result.get("fixed", text)
-        else:
-            fixed = text
-        candidate_model = TranslationCandidate(text=fixed, guardrail=guardrail_result)
+        cached = (checked or {}).get(idx)
+        candidate_model = cached[1] if cached and cached[0] == text else _check_candidate(request, text, rules, idx)
         candidates.append(candidate_model)
+        guardrail_result = candidate_model.guardrail
         if options.guardrails:
             passes = guardrail_result.get("passes", True) if guardrail_result else True
             if passes and selected_guardrail is None:
-                selected = fixed
+                selected = candidate_model.text
                 selected_guardrail = guardrail_result
         else:
-            selected = fixed
+            selected = candidate_model.text
     if selected_guardrail is None and candidates:
         selected = candidates[0].text
         selected_guardrail = candidates[0].guardrail
 
     metadata = {
         "llm": {
+            "route": "translate",
             "latency_ms": total_latency_ms,
-            "model": settings.llm_model,
+            "model": llm_result.model or settings.llm_model,
             "num_candidates": len(candidate_texts),
+            "cached": llm_result.cached,
+            "usage": llm_result.usage,
         },
+        "prompt": report.as_dict(),
         "retrieval": retrieval_debug,
         "guardrails": selected_guardrail,
         "novelty_mode": retrieval_debug.get("novelty_mode", False),
+        "target_language": request.target_language,
     }
 
     return TranslateResponse(
@@ -226,3 +273,148 @@ def translate(
         metadata=metadata,
     )
 
+
+def translate(
+    request: TranslateRequest,
+    *,
+    session: Session | None = None,
+    request_context: models.Request | None = None,
+) -> TranslateResponse:
+    retrieval_debug, examples = _retrieval_examples(request, session=session, request_context=request_context)
+    prompt, report = _translation_prompt(request, examples)
+
+    # Single LLM call with n parameter to generate multiple candidates
+    client = get_llm_client()
+    try:
+        llm_result = client.generate(prompt)
+    except LLMClientError as exc:  # pragma: no cover - network error path exercised via tests mocks
+        raise TranslationServiceError(str(exc)) from exc
+
+    rules = _guardrail_rules(request, session=session, request_context=request_context)
+    return _build_response(request, llm_result, rules, retrieval_debug, report)
+
+
+async def translate_async(
+    request: TranslateRequest,
+    *,
+    session: Session | None = None,
+    request_context: models.Request | None = None,
+) -> TranslateResponse:
+    """Async variant of :func:`translate` for request handlers running on the event loop.
+
+    Blocking retrieval and rule loading run on worker threads, while the LLM call awaits
+    the network directly. Guardrail rules load while the completion is in flight; the
+    session is only ever touched by one thread at a time.
+    """
+
+    retrieval_debug, examples = await anyio.to_thread.run_sync(
+        functools.partial(_retrieval_examples, request, session=session, request_context=request_context)
+    )
+    prompt, report = _translation_prompt(request, examples)
+
+    rules: Dict[str, Any] = {}
+    rules_error: Optional[Exception] = None
+
+    async def load_rules(scope: anyio.CancelScope) -> None:
+        nonlocal rules_error
+        try:
+            rules.update(
+                await anyio.to_thread.run_sync(
+                    functools.partial(_guardrail_rules, request, session=session, request_context=request_context)
+                )
+            )
+        except Exception as exc:
+            # Raised after the task group exits, so callers see the error itself, not an ExceptionGroup.
+            rules_error = exc
+            scope.cancel()
+
+    llm_error: Optional[LLMClientError] = None
+    async with anyio.create_task_group() as group:
+        group.start_soon(load_rules, group.cancel_scope)
+        try:
+            llm_result = await get_async_llm_client().generate(prompt)
+        except LLMClientError as exc:
+            llm_error = exc
+            group.cancel_scope.cancel()
+    if rules_error is not None:
+        raise rules_error
+    if llm_error is not None:
+        raise TranslationServiceError(str(llm_error)) from llm_error
+
+    return _build_response(request, llm_result, rules, retrieval_debug, report)
+
+
+async def translate_stream(
+    request: TranslateRequest,
+    *,
+    session: Session | None = None,
+    request_context: models.Request | None = None,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Stream a translation as ``(event, data)`` pairs.
+
+    Emits ``token`` events as candidate text arrives, a ``candidate`` event with its
+    guardrail result as soon as each candidate completes, and a final ``done`` event
+    shaped like :class:`TranslateResponse`. Time-to-first-token is recorded in the
+    ``translate.ttft_ms`` histogram and in ``metadata.llm.ttft_ms``.
+    """
+
+    started = perf_counter()
+    retrieval_debug, examples = await anyio.to_thread.run_sync(
+        functools.partial(_retrieval_examples, request, session=session, request_context=request_context)
+    )
+    prompt, report = _translation_prompt(request, examples)
+    rules_future = _RULES_EXECUTOR.submit(_guardrail_rules, request, session=session, request_context=request_context)
+
+    try:
+        rules: Optional[Dict[str, Any]] = None
+        parts: Dict[int, List[str]] = {}
+        checked: Dict[int, Tuple[str, TranslationCandidate]] = {}
+        ttft_ms: Optional[float] = None
+        usage: Optional[Dict[str, int]] = None
+        model: Optional[str] = None
+        try:
+            async for chunk in stream_generate(get_async_llm_client(), prompt):
+                if chunk.usage is not None:
+                    usage = chunk.usage
+                model = chunk.model or model
+                if chunk.delta:
+                    if ttft_ms is None:
+                        ttft_ms = round((perf_counter() - started) * 1000.0, 2)
+                        metrics.observe("translate.ttft_ms", ttft_ms)
+                    parts.setdefault(chunk.candidate, []).append(chunk.delta)
+                    yield "token", {"candidate": chunk.candidate, "delta": chunk.delta}
+                if chunk.finished:
+                    if rules is None:
+                        rules = await anyio.to_thread.run_sync(rules_future.result)
+                    text = "".join(parts.get(chunk.candidate, [])).strip()
+                    if not text:
+                        continue
+                    candidate = _check_candidate(request, text, rules, chunk.candidate)
+                    checked[chunk.candidate] = (text, candidate)
+                    yield "candidate", {"candidate": chunk.candidate, **candidate.model_dump()}
+        except LLMClientError as exc:
+            raise TranslationServiceError(str(exc)) from exc
+
+        if rules is None:
+            rules = await anyio.to_thread.run_sync(rules_future.result)
+        texts = ["".join(parts[index]) for index in sorted(parts)]
+        latency_ms = (perf_counter() - started) * 1000.0
+        llm_result = LLMResult(
+            text=texts[0] if texts else "",
+            latency_ms=latency_ms,
+            raw=None,
+            candidates=texts,
+            usage=usage,
+            model=model,
+        )
+        # Candidate positions only line up with stream indices when none came back empty.
+        reusable = checked if all(text.strip() for text in texts) else None
+        response = _build_response(request, llm_result, rules, retrieval_debug, report, checked=reusable)
+        response.metadata["llm"].update({"ttft_ms": ttft_ms, "streamed": True})
+        yield "done", response.model_dump()
+    finally:
+        # Never hand the session back while the rules thread may still be using it; wait off
+        # the event loop, shielded so a cancelled stream still waits for the thread.
+        if not rules_future.cancel():
+            with anyio.CancelScope(shield=True):
+                await anyio.to_thread.run_sync(rules_future.exception)
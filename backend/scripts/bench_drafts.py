@@ -0,0 +1,96 @@
+"""End-to-end throughput benchmark of ``POST /v1/drafts`` with the stub LLM provider.
+
+Runs the app in-process against a scratch SQLite database, so no network or API
+key is needed. Latency and failures come from the ``LLM_STUB_*`` settings:
+
+    LLM_STUB_LATENCY=lognormal LLM_STUB_LATENCY_MS=400 \\
+        python scripts/bench_drafts.py --requests 200 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_SCRATCH = tempfile.mkdtemp(prefix="bench_drafts_")
+os.environ.setdefault("LLM_PROVIDER", "stub")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_SCRATCH}/bench.db")
+os.environ.setdefault("STATE_SNAPSHOT_PATH", f"{_SCRATCH}/state.snapshot")
+os.environ.setdefault("LLM_CACHE_PATH", "")
+
+from httpx import ASGITransport, AsyncClient
+
+from app.core import metrics
+from app.db import Base, get_engine, session_scope
+from app.db.models import User, UserRole
+from app.main import app
+
+DESIGNER = {"X-User-Role": "designer", "X-User-Id": "bench-designer"}
+WRITER = {"X-User-Role": "writer", "X-User-Id": "bench-writer"}
+
+
+def _prepare_database() -> None:
+    Base.metadata.create_all(bind=get_engine())
+    with session_scope() as session:
+        session.merge(User(id="bench-designer", role=UserRole.DESIGNER, name="Bench Designer", email="d@bench.local"))
+        session.merge(User(id="bench-writer", role=UserRole.WRITER, name="Bench Writer", email="w@bench.local"))
+
+
+async def run(total: int, concurrency: int, candidates: int) -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        created = await client.post(
+            "/v1/requests",
+            json={"title": "Benchmark", "feature_name": "charging", "assigned_writer_id": "bench-writer"},
+            headers=DESIGNER,
+        )
+        created.raise_for_status()
+        payload = {
+            "request_id": created.json()["id"],
+            "text": "로봇이 충전 거점으로 돌아갑니다.",
+            "source_language": "ko",
+            "target_language": "en",
+            "num_candidates": candidates,
+            "use_rag": False,
+        }
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses: dict = {}
+
+        async def one() -> None:
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/v1/drafts", json=payload, headers=WRITER)
+                metrics.observe("bench.drafts_ms", (time.perf_counter() - started) * 1000.0)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    snapshot = metrics.snapshot()
+    latency = snapshot["histograms"]["bench.drafts_ms"]
+    print(f"requests={total} concurrency={concurrency} candidates={candidates} statuses={statuses}")
+    print(f"throughput={total / elapsed:.1f} req/s elapsed={elapsed:.2f}s")
+    print(f"latency p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']} ms")
+    print(f"llm counters={ {k: v for k, v in snapshot['counters'].items() if k.startswith('llm.')} }")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--candidates", type=int, default=3)
+    args = parser.parse_args()
+
+    _prepare_database()
+    asyncio.run(run(args.requests, args.concurrency, args.candidates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Guardrail throughput with large rule sets: compiled engine vs. the per-term scan.
+
+Generates ``--terms`` forbidden terms and ``--replacements`` replace_map entries,
+checks that both implementations agree on every candidate, then times them:
+
+    python scripts/bench_guardrails.py --terms 10000 --replacements 2000 --candidates 500
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core import metrics
+from app.services.guardrails.loader import _merge_guardrail_sources
+from app.services.guardrails.service import apply_guardrails
+
+
+def _naive(text: str, rules: dict) -> tuple:
+    """The scan ``apply_guardrails`` did before compilation: one substring test and one replace per term."""
+
+    lowered = text.lower()
+    found = {term.lower() for term in rules["forbidden_terms"] if term.lower() in lowered}
+    fixed = text
+    for src, dst in rules["replace_map"].items():
+        fixed = fixed.replace(src, dst)
+    return found, fixed
+
+
+def _rule_set(rng: random.Random, terms: int, replacements: int) -> dict:
+    def token(prefix: str) -> str:
+        return prefix + "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+
+    # Prefixes keep sources from overlapping each other or the targets, where the two semantics differ.
+    return {
+        "forbidden_terms": [token("f") for _ in range(terms)],
+        "replace_map": {token("#"): token("@").upper() for _ in range(replacements)},
+    }
+
+
+def _candidates(rng: random.Random, rules: dict, count: int) -> list:
+    vocabulary = ["the", "robot", "returns", "to", "its", "station", "when", "battery", "is", "low"]
+    terms, sources = rules["forbidden_terms"], list(rules["replace_map"])
+    texts = []
+    for _ in range(count):
+        words = [rng.choice(vocabulary) for _ in range(rng.randint(8, 30))]
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(terms))
+        for _ in range(rng.randint(0, 2)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(sources))
+        texts.append(" ".join(words).capitalize() + ".")
+    return texts
+
+
+def _time(label: str, func, texts: list) -> float:
+    started = time.perf_counter()
+    for text in texts:
+        func(text)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<10} {elapsed * 1000:9.1f} ms total  {elapsed / len(texts) * 1e6:9.1f} us/candidate")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--terms", type=int, default=10000)
+    parser.add_argument("--replacements", type=int, default=2000)
+    parser.add_argument("--candidates", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=13)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rules = _rule_set(rng, args.terms, args.replacements)
+    texts = _candidates(rng, rules, args.candidates)
+    # Rule sets loaded from the database are merged like this and carry a fingerprint.
+    started = time.perf_counter()
+    loaded = _merge_guardrail_sources(rules)
+    merge_ms = (time.perf_counter() - started) * 1000
+
+    for text in texts:
+        result = apply_guardrails(text, loaded, {})
+        found, fixed = _naive(text, rules)
+        assert {violation.split(":", 1)[1] for violation in result["violations"]} == found, text
+        assert result["fixed"] == fixed, text
+
+    started = time.perf_counter()
+    apply_guardrails("warm", {**loaded, "fingerprint": "cold"}, {})
+    compile_ms = (time.perf_counter() - started) * 1000
+    print(f"terms={args.terms} replacements={args.replacements} candidates={len(texts)}")
+    print(f"load+fingerprint {merge_ms:.1f} ms, compile {compile_ms:.1f} ms (once per rule set)")
+    naive = _time("naive", lambda text: _naive(text, rules), texts)
+    compiled = _time("compiled", lambda text: apply_guardrails(text, loaded, {}), texts)
+    unkeyed = _time("unkeyed", lambda text: apply_guardrails(text, rules, {}), texts)
+    # Per-call hints differ for every candidate; they must not recompile the loaded rule set.
+    hinted = _time("hinted", lambda text: apply_guardrails(text, loaded, {"forbidden_terms": [text[:6]]}), texts)
+    print(f"speedup={naive / compiled:.1f}x (without fingerprint {naive / unkeyed:.1f}x, with hints {naive / hinted:.1f}x)")
+    hits, misses = metrics.counter("guardrails.compile.hits"), metrics.counter("guardrails.compile.misses")
+    print(f"compile cache hits={hits} misses={misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Load-test the LLM client's shared connection pool against a local mock server.
+
+Starts an OpenAI-compatible mock (``POST /v1/chat/completions`` with a fixed
+latency) on localhost, fires concurrent completions through the configured
+``AsyncOpenAIChatClient`` and shared HTTP pool, then prints latency percentiles
+and pool saturation.
+
+    python scripts/llm_load_test.py --requests 500 --concurrency 100 --latency-ms 200
+"""
+
+import argparse
+import asyncio
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import uvicorn
+from fastapi import FastAPI
+
+from app.core import metrics
+from app.core.settings import settings
+from app.services.llm.client import AsyncOpenAIChatClient, PromptMessage, PromptRequest
+from app.services.llm.transport import get_async_http_client, http_timeout, pool_stats
+
+
+def create_mock_app(latency_ms: float) -> FastAPI:
+    """Minimal OpenAI-compatible chat completions endpoint."""
+
+    mock = FastAPI()
+
+    @mock.post("/v1/chat/completions")
+    async def chat_completions(payload: dict) -> dict:
+        await asyncio.sleep(latency_ms / 1000.0)
+        n = payload.get("n") or 1
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "mock"),
+            "choices": [
+                {
+                    "index": index,
+                    "message": {"role": "assistant", "content": f"Mock translation {index}"},
+                    "finish_reason": "stop",
+                }
+                for index in range(n)
+            ],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 5, "total_tokens": 105},
+        }
+
+    return mock
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(latency_ms: float) -> str:
+    port = _free_port()
+    config = uvicorn.Config(create_mock_app(latency_ms), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("Mock server did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+async def run_load(base_url: str, total: int, concurrency: int) -> None:
+    client = AsyncOpenAIChatClient(
+        model="mock",
+        api_key="mock-key",
+        base_url=base_url,
+        timeout_seconds=http_timeout(),
+        http_client=get_async_http_client(),
+    )
+    prompt = PromptRequest(messages=[PromptMessage(role="user", content="로봇이 충전 중입니다")])
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async def one() -> None:
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.generate(prompt)
+            except Exception:
+                failures += 1
+                return
+            metrics.observe("loadtest.latency_ms", (time.perf_counter() - started) * 1000.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - started
+
+    latency = metrics.snapshot()["histograms"].get("loadtest.latency_ms", {})
+    print(f"requests={total} concurrency={concurrency} failures={failures}")
+    print(f"throughput={total / elapsed:.1f} req/s elapsed={elapsed:.2f}s")
+    print(f"latency p50={latency.get('p50')} p95={latency.get('p95')} p99={latency.get('p99')} ms")
+    print(f"pool={pool_stats()}")
+    print(f"pool_queued={metrics.counter('llm.http.pool_queued')} pool_timeouts={metrics.counter('llm.http.pool_timeouts')}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--max-connections", type=int, default=settings.llm_http_max_connections)
+    args = parser.parse_args()
+
+    settings.llm_http_max_connections = args.max_connections
+    # The mock server speaks HTTP/1.1 only.
+    settings.llm_http2 = False
+    base_url = start_mock_server(args.latency_ms)
+    asyncio.run(run_load(base_url, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
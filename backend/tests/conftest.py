@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 
 import pytest
@@ -9,7 +12,12 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+# The engine is built on import, so point it at a throwaway database before importing the app.
+DATABASE_DIR = tempfile.mkdtemp(prefix="ux_writer_tests_")
+os.environ["DATABASE_URL"] = f"sqlite:///{DATABASE_DIR}/ux_writer_lab.db"
+
 from app.core import state
+from app.core.settings import settings
 from app.db import Base, get_engine, session_scope
 from app.db import models
 from sqlalchemy import delete
@@ -23,6 +31,20 @@ def setup_database():
         yield
     finally:
         Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        shutil.rmtree(DATABASE_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def state_snapshot(tmp_path_factory):
+    original = settings.state_snapshot_path, settings.llm_cache_path
+    state_dir = tmp_path_factory.mktemp("state")
+    settings.state_snapshot_path = str(state_dir / "corpus.snapshot")
+    settings.llm_cache_path = str(state_dir / "llm_cache.sqlite3")
+    try:
+        yield settings.state_snapshot_path
+    finally:
+        settings.state_snapshot_path, settings.llm_cache_path = original
 
 
 @pytest.fixture(autouse=True)
@@ -47,6 +69,7 @@ def clean_database():
             models.Draft,
             models.Approval,
             models.ExportJob,
+            models.BulkDraftJob,
             models.Request,
             models.User,
             models.StyleGuideEntry,
@@ -55,6 +78,7 @@ def clean_database():
             models.RagIngestion,
             models.GuardrailRule,
             models.AuditLog,
+            models.GrammarCheckCacheEntry,
         ):
             session.execute(delete(table))
     yield
@@ -1,11 +1,29 @@
 import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import anyio
 import pytest
 from httpx import AsyncClient, ASGITransport
 
 from app.core import state
+from app.core.settings import settings
 from app.db import session_scope
 from app.db import models
 from app.main import app
+from app.services.ingest import jobs
+
+
+async def _wait_for_job(client: AsyncClient, job_id: str, timeout: float = 30.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while True:
+        resp = await client.get(f"/v1/ingest/{job_id}")
+        assert resp.status_code == 200
+        body = resp.json()
+        if body["status"] in {"succeeded", "failed", "cancelled"} or time.monotonic() > deadline:
+            return body
+        await anyio.sleep(0.05)
 
 
 @pytest.mark.anyio
@@ -42,3 +60,132 @@ async def test_ingest_populates_state_and_counts():
     else:
         assert "error" in vector_info
 
+
+@pytest.mark.anyio
+async def test_ingest_background_job_reports_progress():
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post("/v1/ingest", json={"background": True})
+        assert resp.status_code == 202
+        job_id = resp.json()["job_id"]
+        job = await _wait_for_job(client, job_id)
+
+    assert job["status"] == "succeeded"
+    assert set(job["progress"]) == {"context", "glossary", "style"}
+    assert all(job["progress"][source]["rows_read"] == job["counts"][source] for source in job["counts"])
+    assert job["completed_at"] is not None
+    with session_scope() as session:
+        records = session.query(models.RagIngestion).filter_by(job_id=job_id).all()
+        assert len(records) == 3
+        assert all(record.status == models.RagIngestionStatus.SUCCEEDED for record in records)
+
+
+@pytest.mark.anyio
+async def test_ingest_background_job_can_be_cancelled(monkeypatch: pytest.MonkeyPatch):
+    def _slow_read(data_path, progress=None):
+        while not progress.cancelled:
+            time.sleep(0.01)
+        progress.raise_if_cancelled()
+
+    monkeypatch.setattr(jobs, "read_corpus", _slow_read)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        job_id = (await client.post("/v1/ingest", json={"background": True})).json()["job_id"]
+        cancel_resp = await client.post(f"/v1/ingest/{job_id}/cancel")
+        assert cancel_resp.status_code == 200
+        job = await _wait_for_job(client, job_id)
+
+        assert job["status"] == "cancelled"
+        again = await client.post(f"/v1/ingest/{job_id}/cancel")
+        assert again.status_code == 409
+        missing = await client.get("/v1/ingest/does-not-exist")
+        assert missing.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_cancel_from_another_process_stops_the_running_job(monkeypatch: pytest.MonkeyPatch):
+    def _slow_read(data_path, progress=None):
+        while not progress.cancelled:
+            time.sleep(0.01)
+        progress.raise_if_cancelled()
+
+    monkeypatch.setattr(jobs, "read_corpus", _slow_read)
+    monkeypatch.setattr(settings, "ingest_heartbeat_seconds", 0.02)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        job_id = (await client.post("/v1/ingest", json={"background": True})).json()["job_id"]
+        # Another worker only sees the database rows, not this process's live progress.
+        with session_scope() as session:
+            with monkeypatch.context() as patched:
+                patched.setattr(jobs, "_ACTIVE", {})
+                jobs.cancel_ingest_job(session, job_id)
+        job = await _wait_for_job(client, job_id)
+
+    assert job["status"] == "cancelled"
+
+
+def test_running_jobs_without_heartbeat_are_failed():
+    stale = datetime.now(timezone.utc) - timedelta(seconds=settings.ingest_stale_seconds + 60)
+    with session_scope() as session:
+        session.add(
+            models.RagIngestion(
+                id="ingest-stale",
+                source_type=models.RagSourceType.CONTEXT,
+                source_id="context.csv",
+                job_id="job-stale",
+                status=models.RagIngestionStatus.RUNNING,
+                heartbeat_at=stale,
+                metadata_json={},
+            )
+        )
+    with session_scope() as session:
+        job = jobs.get_ingest_job(session, "job-stale")
+    # Reading the job only reports it; the sweep run on startup and before each new job fails it.
+    assert job["status"] == "running" and job["stale"] is True
+
+    assert jobs.fail_abandoned_ingest_jobs() == 1
+    with session_scope() as session:
+        job = jobs.get_ingest_job(session, "job-stale")
+
+    assert job["status"] == "failed" and job["stale"] is False
+    assert job["error"] == "Ingest worker stopped responding"
+
+
+@pytest.mark.anyio
+async def test_cancel_is_refused_once_the_job_is_committing(monkeypatch: pytest.MonkeyPatch):
+    persisted = threading.Event()
+    release = threading.Event()
+    persist_corpus = jobs.persist_corpus
+
+    def _persist_then_wait(*args, **kwargs):
+        result = persist_corpus(*args, **kwargs)
+        persisted.set()
+        release.wait(timeout=30)
+        return result
+
+    def _index(corpus, vector_client=None, progress=None, reindex=False):
+        assert not progress.cancelled
+        return {"status": "completed", "collections": {}}
+
+    monkeypatch.setattr(jobs, "persist_corpus", _persist_then_wait)
+    monkeypatch.setattr(jobs, "index_corpus", _index)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        job_id = (await client.post("/v1/ingest", json={"background": True})).json()["job_id"]
+        assert await anyio.to_thread.run_sync(persisted.wait, 30)
+        # Tables are swapped and the snapshot published; cancelling now would leave partial vectors.
+        local = await client.post(f"/v1/ingest/{job_id}/cancel")
+        with session_scope() as session:
+            with monkeypatch.context() as patched:
+                patched.setattr(jobs, "_ACTIVE", {})
+                with pytest.raises(jobs.IngestJobError):
+                    jobs.cancel_ingest_job(session, job_id)
+        release.set()
+        job = await _wait_for_job(client, job_id)
+
+    assert local.status_code == 409
+    assert job["status"] == "succeeded"
+    assert job["vector_store"] == {"status": "completed", "collections": {}}
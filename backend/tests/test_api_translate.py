@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import json
+import time
+
+import anyio
 import pytest
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from app.core import metrics
 from app.db import models, session_scope
 from app.main import app
 from app.services import llm as llm_registry
-from app.services.llm.client import LLMResult, PromptRequest
+from app.services.llm.client import LLMClientError, LLMResult, PromptRequest, StreamChunk
+from app.services.translate import batch as translate_batch_service
+from app.services.translate import service as translate_service
 
 
 class _StubLLM:
@@ -50,6 +57,8 @@ async def test_translate_llm_with_guardrails(stub_llm: _StubLLM) -> None:
     assert body["metadata"]["llm"]["model"]
     assert isinstance(body["metadata"]["retrieval"]["items"], list)
     assert body["metadata"].get("novelty_mode") in {True, False}
+    assert body["metadata"]["prompt"]["input_tokens"] > 0
+    assert body["metadata"]["prompt"]["trimmed_examples"] == 0
     assert body["candidates"][0]["guardrail"] is None or isinstance(body["candidates"][0]["guardrail"], dict)
     # Ensure prompt captured the request languages
     assert stub_llm.last_prompt is not None
@@ -84,6 +93,23 @@ async def test_translate_applies_guardrail_replacements() -> None:
     assert any(v for v in guardrails["violations"] if v.startswith("length"))
 
 
+@pytest.mark.anyio
+async def test_translate_ignores_non_integer_length_hints() -> None:
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        payload = {
+            "text": "로봇이 충전 거점으로 돌아갑니다.",
+            "source_language": "ko",
+            "target_language": "en",
+            "hints": {"length_max": "short"},
+            "options": {"use_rag": False, "guardrails": True},
+        }
+        resp = await client.post("/v1/translate", json=payload)
+
+    assert resp.status_code == 200
+    assert resp.json()["metadata"]["guardrails"]["passes"] is True
+
+
 @pytest.mark.anyio
 async def test_translate_without_guardrails() -> None:
     transport = ASGITransport(app=app)
@@ -202,3 +228,199 @@ async def test_translate_multiple_candidates_selective_fix(monkeypatch: pytest.M
     # Verify diversity is maintained (they should be different)
     texts = [c["text"] for c in body["candidates"]]
     assert len(set(texts)) == 3, "All candidates should be different"
+
+
+class _AsyncStubLLM:
+    def __init__(self, text: str, delay: float) -> None:
+        self.text = text
+        self.delay = delay
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:
+        await anyio.sleep(self.delay)
+        return LLMResult(text=self.text, latency_ms=self.delay * 1000.0, raw={})
+
+
+@pytest.mark.anyio
+async def test_translate_loads_rules_while_llm_in_flight(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm_registry, "_CLIENT", None, raising=False)
+    monkeypatch.setattr(llm_registry, "_ASYNC_CLIENT", _AsyncStubLLM("Returning to base.", delay=0.3), raising=False)
+    load_rules = translate_service._guardrail_rules
+
+    def slow_rules(*args, **kwargs):
+        time.sleep(0.3)
+        return load_rules(*args, **kwargs)
+
+    monkeypatch.setattr(translate_service, "_guardrail_rules", slow_rules)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        payload = {
+            "text": "로봇이 충전 거점으로 돌아갑니다.",
+            "source_language": "ko",
+            "target_language": "en",
+            "hints": {"replace_map": {"base": "the dock"}},
+            "options": {"use_rag": False, "guardrails": True},
+        }
+        start = time.perf_counter()
+        resp = await client.post("/v1/translate", json=payload)
+        elapsed = time.perf_counter() - start
+
+    assert resp.status_code == 200
+    assert resp.json()["selected"] == "Returning to the dock."
+    assert elapsed < 0.55
+
+
+@pytest.mark.anyio
+async def test_translate_async_raises_rule_loading_errors_unwrapped(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(llm_registry, "_CLIENT", None, raising=False)
+    monkeypatch.setattr(llm_registry, "_ASYNC_CLIENT", _AsyncStubLLM("Returning to base.", delay=5.0), raising=False)
+
+    def broken_rules(*args, **kwargs):
+        raise RuntimeError("guardrail rules unavailable")
+
+    monkeypatch.setattr(translate_service, "_guardrail_rules", broken_rules)
+    request = translate_service.TranslateRequest(
+        text="로봇이 충전 거점으로 돌아갑니다.",
+        source_language="ko",
+        target_language="en",
+        options={"use_rag": False, "guardrails": True},
+    )
+
+    start = time.perf_counter()
+    with pytest.raises(RuntimeError, match="guardrail rules unavailable"):
+        await translate_service.translate_async(request)
+
+    # The in-flight completion is cancelled rather than awaited.
+    assert time.perf_counter() - start < 1.0
+
+
+class _StreamingStubLLM:
+    def __init__(self, candidates: list[list[str]]) -> None:
+        self.candidates = candidates
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:  # pragma: no cover - streaming path only
+        texts = ["".join(parts) for parts in self.candidates]
+        return LLMResult(text=texts[0], candidates=texts, latency_ms=1.0, raw={})
+
+    async def stream(self, prompt: PromptRequest):
+        for index, parts in enumerate(self.candidates):
+            for part in parts:
+                await anyio.sleep(0)
+                yield StreamChunk(candidate=index, delta=part)
+            yield StreamChunk(candidate=index, finished=True)
+
+
+def _parse_sse(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+@pytest.mark.anyio
+async def test_translate_stream_emits_tokens_candidates_and_summary(monkeypatch: pytest.MonkeyPatch) -> None:
+    metrics.reset()
+    stub = _StreamingStubLLM([["The robot ", "is charging"], ["Robot ", "charges now"]])
+    monkeypatch.setattr(llm_registry, "_CLIENT", None, raising=False)
+    monkeypatch.setattr(llm_registry, "_ASYNC_CLIENT", stub, raising=False)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        payload = {
+            "text": "로봇이 충전 중입니다",
+            "source_language": "ko",
+            "target_language": "en",
+            "hints": {"replace_map": {"robot": "device"}},
+            "options": {"use_rag": False, "guardrails": True, "num_candidates": 2},
+        }
+        resp = await client.post("/v1/translate/stream", json=payload)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(resp.text)
+    names = [name for name, _ in events]
+    assert names == ["token", "token", "candidate", "token", "token", "candidate", "done"]
+
+    first_candidate = events[2][1]
+    assert first_candidate["candidate"] == 0
+    assert first_candidate["text"] == "The device is charging"
+    assert first_candidate["guardrail"] is not None
+
+    summary = events[-1][1]
+    assert set(summary) == {"selected", "candidates", "rationale", "metadata"}
+    assert [c["text"] for c in summary["candidates"]] == ["The device is charging", "Robot charges now"]
+    assert summary["metadata"]["llm"]["streamed"] is True
+    assert summary["metadata"]["llm"]["ttft_ms"] is not None
+    assert metrics.snapshot()["histograms"]["translate.ttft_ms"]["count"] == 1
+
+
+class _BatchStubLLM:
+    def __init__(self) -> None:
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate(self, prompt: PromptRequest) -> LLMResult:
+        source = prompt.messages[-1].content
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            # Earlier items take longer so completion order differs from input order.
+            await anyio.sleep(0.05 if "first" in source else 0.01)
+            if "broken" in source:
+                raise LLMClientError("provider rejected the prompt")
+            return LLMResult(text=f"Translated: {source[-12:]}", latency_ms=1.0, raw={})
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.anyio
+async def test_translate_batch_streams_ndjson_with_isolation(monkeypatch: pytest.MonkeyPatch) -> None:
+    stub = _BatchStubLLM()
+    monkeypatch.setattr(llm_registry, "_CLIENT", None, raising=False)
+    monkeypatch.setattr(llm_registry, "_ASYNC_CLIENT", stub, raising=False)
+
+    rule_loads = []
+    load_rules = translate_batch_service._guardrail_rules
+
+    def counting_rules(request, **kwargs):
+        rule_loads.append(request.run_id)
+        return load_rules(request, **kwargs)
+
+    monkeypatch.setattr(translate_batch_service, "_guardrail_rules", counting_rules)
+
+    embed_calls = []
+
+    class _Embedder:
+        def embed(self, texts):
+            embed_calls.append(list(texts))
+            return [[0.0] * 4 for _ in texts]
+
+    monkeypatch.setattr(translate_batch_service, "get_embedding_client", lambda: _Embedder())
+
+    texts = ["first item"] + [f"item {i}" for i in range(1, 6)] + ["broken item"]
+    payload = {
+        "concurrency": 2,
+        "items": [
+            {"text": text, "source_language": "ko", "target_language": "en", "options": {"use_rag": True}}
+            for text in texts
+        ],
+    }
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        resp = await client.post("/v1/translate/batch", json=payload)
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == list(range(len(texts)))
+    assert lines[0]["index"] != 0  # completion order, not input order
+    by_index = {line["index"]: line for line in lines}
+    assert by_index[6]["status"] == "error"
+    assert "rejected" in by_index[6]["error"]
+    assert all(by_index[i]["status"] == "ok" for i in range(6))
+    assert set(by_index[0]["result"]) == {"selected", "candidates", "rationale", "metadata"}
+
+    assert stub.peak <= 2
+    assert rule_loads == [None]
+    assert len(embed_calls) == 1 and len(embed_calls[0]) == len(texts)
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+
+from app.core.settings import settings
+from app.db import models, session_scope
+from app.main import app
+from app.services import llm as llm_registry
+from app.services.llm.client import LLMResult, PromptRequest
+
+HEADERS_WRITER = {"X-User-Role": "writer", "X-User-Id": "writer-1"}
+EDITED = "The robot returns to its charging station when the battery runs low during a cleaning session."
+
+
+class _GatedReviewLLM:
+    """Returns a grammar review once ``release`` is set, so tests can observe the pending state."""
+
+    def __init__(self) -> None:
+        self.release = threading.Event()
+        self.calls = 0
+        self.prompts: list[PromptRequest] = []
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        self.calls += 1
+        self.prompts.append(prompt)
+        self.release.wait(timeout=10)
+        review = {
+            "has_issues": True,
+            "issues": [{"type": "style", "message": "Consider 'dock'", "severity": "warning"}],
+            "suggestions": [],
+            "confidence": 0.9,
+        }
+        return LLMResult(text=json.dumps(review), latency_ms=1.0, raw={})
+
+
+@pytest.fixture
+def review_llm(monkeypatch: pytest.MonkeyPatch) -> _GatedReviewLLM:
+    llm = _GatedReviewLLM()
+    monkeypatch.setattr(llm_registry, "_CLIENT", llm, raising=False)
+    monkeypatch.setattr(settings, "draft_validation_poll_seconds", 0.01)
+    return llm
+
+
+@pytest.fixture
+def draft(seed_users) -> dict:
+    with session_scope() as session:
+        session.add(
+            models.Request(
+                id="req-1",
+                title="Charging",
+                feature_name="charging",
+                source_text="충전을 시작합니다",
+                requested_by=seed_users["designer"],
+                assigned_writer_id=seed_users["writer"],
+            )
+        )
+        session.add(
+            models.Draft(
+                id="draft-1",
+                request_id="req-1",
+                generation_method=models.DraftGenerationMethod.AI,
+                created_by=seed_users["writer"],
+            )
+        )
+        session.add(
+            models.DraftVersion(
+                id="version-1",
+                draft_id="draft-1",
+                version_index=1,
+                content="Charging started",
+                created_by=seed_users["writer"],
+            )
+        )
+    return {"draft_id": "draft-1", "version_id": "version-1"}
+
+
+def _wait_for_validation(version_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with session_scope() as session:
+            meta = session.get(models.DraftVersion, version_id).metadata_json
+        if meta["validation"]["status"] != "pending":
+            return meta
+        time.sleep(0.01)
+    raise AssertionError(f"Validation of {version_id} did not finish")
+
+
+@pytest.mark.anyio
+async def test_selection_commits_before_validation_runs(review_llm, draft):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        selected = await client.post(
+            f"/v1/drafts/{draft['draft_id']}/selection",
+            json={"version_id": draft["version_id"], "edited_content": EDITED},
+            headers=HEADERS_WRITER,
+        )
+        body = selected.json()
+        pending = await client.get(
+            f"/v1/drafts/{draft['draft_id']}/versions/{body['version_id']}/validation", headers=HEADERS_WRITER
+        )
+
+        assert selected.status_code == 200
+        assert body["new_version_created"] is True
+        assert body["validation_status"] == "pending"
+        assert body["grammar_check_result"] is None
+        assert body["request_status"] == "in_review"
+        assert pending.json()["status"] == "pending"
+
+        review_llm.release.set()
+        meta = _wait_for_validation(body["version_id"])
+        polled = await client.get(
+            f"/v1/drafts/{draft['draft_id']}/versions/{body['version_id']}/validation", headers=HEADERS_WRITER
+        )
+
+    assert meta["validation"]["status"] == "completed"
+    assert meta["grammar_check_result"]["issues"][0]["message"] == "Consider 'dock'"
+    assert meta["guardrail_result"]["fixed"] == EDITED
+    assert polled.json()["status"] == "completed"
+    assert polled.json()["grammar_check_result"] == meta["grammar_check_result"]
+    with session_scope() as session:
+        audit = session.scalars(select(models.AuditLog).where(models.AuditLog.action == "version_validated")).one()
+        assert audit.payload_json == {
+            "version_id": body["version_id"],
+            "has_guardrail_violations": False,
+            "has_grammar_issues": True,
+        }
+
+
+@pytest.mark.anyio
+async def test_validate_inline_returns_results_with_the_selection(review_llm, draft):
+    review_llm.release.set()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        selected = await client.post(
+            f"/v1/drafts/{draft['draft_id']}/selection",
+            json={"version_id": draft["version_id"], "edited_content": EDITED, "validate_inline": True},
+            headers=HEADERS_WRITER,
+        )
+
+    body = selected.json()
+    assert body["validation_status"] == "completed"
+    assert body["grammar_check_result"]["has_issues"] is True
+    assert review_llm.calls == 1
+    with session_scope() as session:
+        version = session.get(models.DraftVersion, body["version_id"])
+        assert version.metadata_json["grammar_check_result"] == body["grammar_check_result"]
+
+
+@pytest.mark.anyio
+async def test_validation_stream_sends_results_when_done(review_llm, draft):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        selected = await client.post(
+            f"/v1/drafts/{draft['draft_id']}/selection",
+            json={"version_id": draft["version_id"], "edited_content": EDITED},
+            headers=HEADERS_WRITER,
+        )
+        version_id = selected.json()["version_id"]
+        review_llm.release.set()
+        streamed = await client.get(
+            f"/v1/drafts/{draft['draft_id']}/versions/{version_id}/validation/stream", headers=HEADERS_WRITER
+        )
+        missing = await client.get(
+            f"/v1/drafts/other-draft/versions/{version_id}/validation", headers=HEADERS_WRITER
+        )
+
+    assert streamed.headers["content-type"].startswith("text/event-stream")
+    event, data = streamed.text.strip().split("\n")
+    assert event == "event: validation"
+    payload = json.loads(data.removeprefix("data: "))
+    assert payload["status"] == "completed"
+    assert payload["grammar_check_result"]["has_issues"] is True
+    assert missing.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_validation_stream_times_out_while_checks_are_pending(review_llm, draft, monkeypatch):
+    monkeypatch.setattr(settings, "draft_validation_stream_timeout_seconds", 0.05)
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        selected = await client.post(
+            f"/v1/drafts/{draft['draft_id']}/selection",
+            json={"version_id": draft["version_id"], "edited_content": EDITED},
+            headers=HEADERS_WRITER,
+        )
+        version_id = selected.json()["version_id"]
+        try:
+            streamed = await client.get(
+                f"/v1/drafts/{draft['draft_id']}/versions/{version_id}/validation/stream", headers=HEADERS_WRITER
+            )
+        finally:
+            review_llm.release.set()
+    _wait_for_validation(version_id)
+
+    event, data = streamed.text.strip().split("\n")
+    assert event == "event: timeout"
+    assert json.loads(data.removeprefix("data: ")) == {"draft_id": draft["draft_id"], "version_id": version_id}
+
+
+@pytest.mark.anyio
+async def test_validation_is_hidden_from_writers_not_assigned_to_the_request(draft):
+    with session_scope() as session:
+        session.add(models.User(id="writer-2", role=models.UserRole.WRITER, name="Writer Two", email="w2@example.com"))
+    headers = {"X-User-Role": "writer", "X-User-Id": "writer-2"}
+    url = f"/v1/drafts/{draft['draft_id']}/versions/{draft['version_id']}/validation"
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        polled = await client.get(url, headers=headers)
+        streamed = await client.get(f"{url}/stream", headers=headers)
+        designer = await client.get(url, headers={"X-User-Role": "designer", "X-User-Id": "designer-1"})
+
+    assert polled.status_code == 403
+    assert streamed.status_code == 403
+    assert designer.status_code == 200
+
+
+@pytest.mark.anyio
+async def test_stale_pending_validation_is_requeued_in_the_draft_language(review_llm, draft, seed_users):
+    stale = (datetime.now(timezone.utc) - timedelta(seconds=settings.draft_validation_stale_seconds + 60)).isoformat()
+    with session_scope() as session:
+        session.add(
+            models.DraftVersion(
+                id="version-2",
+                draft_id="draft-1",
+                version_index=2,
+                content=EDITED,
+                metadata_json={
+                    "target_language": "de",
+                    "validation": {"status": "pending", "updated_at": stale, "actor_id": seed_users["writer"]},
+                },
+                created_by=seed_users["writer"],
+            )
+        )
+    review_llm.release.set()
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        polled = await client.get("/v1/drafts/draft-1/versions/version-2/validation", headers=HEADERS_WRITER)
+    meta = _wait_for_validation("version-2")
+
+    assert polled.json()["status"] == "pending"
+    assert polled.json()["updated_at"] != stale
+    assert meta["validation"]["status"] == "completed"
+    assert review_llm.calls == 1
+    assert "review de text" in review_llm.prompts[0].messages[0].content
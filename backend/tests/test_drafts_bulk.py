@@ -0,0 +1,284 @@
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select, update
+
+from app.core.settings import settings
+from app.db import models, session_scope
+from app.main import app
+from app.services import llm as llm_registry
+from app.services.drafts import bulk
+from app.services.drafts.bulk import get_bulk_draft_job, resume_bulk_draft_jobs, start_bulk_draft_job
+from app.services.drafts.service import DraftGenerationParams
+from app.services.llm.batch import LocalBatchBackend, parse_batch_line
+from app.services.llm.client import LLMClientError, LLMResult, PromptRequest
+
+HEADERS_WRITER = {"X-User-Role": "writer", "X-User-Id": "writer-1"}
+HEADERS_DESIGNER = {"X-User-Role": "designer", "X-User-Id": "designer-1"}
+
+
+class _EchoLLM:
+    """Translates by tagging the source line; fails for prompts containing ``FAIL``."""
+
+    def __init__(self) -> None:
+        self.prompts: list[PromptRequest] = []
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        self.prompts.append(prompt)
+        user = prompt.messages[-1].content
+        if "FAIL" in user:
+            raise LLMClientError("content filtered", status_code=400)
+        source = next(line for line in user.splitlines() if line.startswith("SRC-"))
+        candidates = [f"Robot {source} candidate {index}" for index in range(prompt.n or 1)]
+        usage = {"prompt_tokens": 100, "completion_tokens": 8, "cached_tokens": 0}
+        return LLMResult(text=candidates[0], latency_ms=5.0, raw={}, candidates=candidates, usage=usage)
+
+
+class _SlowBackend(LocalBatchBackend):
+    """Reports the batch as in progress for the first few polls."""
+
+    def __init__(self, *args, pending_polls: int = 2, final_status: str = "completed", **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.pending_polls = pending_polls
+        self.final_status = final_status
+        self.polls = 0
+
+    def status(self, batch_id: str) -> str:
+        self.polls += 1
+        return "in_progress" if self.polls <= self.pending_polls else self.final_status
+
+
+@pytest.fixture(autouse=True)
+def batch_dir(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    monkeypatch.setattr(settings, "llm_batch_dir", str(tmp_path))
+    return tmp_path
+
+
+def _create_requests(seed_users, texts: dict[str, str | None]) -> None:
+    with session_scope() as session:
+        for request_id, text in texts.items():
+            session.add(
+                models.Request(
+                    id=request_id,
+                    title=f"Request {request_id}",
+                    feature_name="charging",
+                    source_text=text,
+                    requested_by=seed_users["designer"],
+                    assigned_writer_id=seed_users["writer"],
+                )
+            )
+        session.add(
+            models.GuardrailRule(
+                id="rule-1",
+                scope=models.GuardrailScope.REQUEST,
+                rule_type=models.GuardrailRuleType.REPLACE,
+                payload_json={"request_id": "req-1", "replace_map": {"Robot": "Vacuum"}},
+                created_by=seed_users["designer"],
+            )
+        )
+
+
+def _params() -> DraftGenerationParams:
+    return DraftGenerationParams(text="", source_language="ko", target_language="en", num_candidates=2, use_rag=False)
+
+
+def _wait(job_id: str, timeout: float = 10.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = get_bulk_draft_job(job_id)
+        if job["status"] in {"succeeded", "failed"}:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish: {get_bulk_draft_job(job_id)}")
+
+
+def test_bulk_job_persists_drafts_with_request_scoped_guardrails(seed_users, tmp_path):
+    _create_requests(seed_users, {"req-1": "SRC-1", "req-2": "SRC-2", "req-3": "SRC-3 FAIL", "req-4": None})
+    llm = _EchoLLM()
+    backend = _SlowBackend(llm, tmp_path)
+
+    job_id = start_bulk_draft_job(
+        ["req-1", "req-2", "req-3", "req-4", "req-1", "missing"],
+        params=_params(),
+        created_by=seed_users["writer"],
+        backend=backend,
+        poll_seconds=0,
+    )
+    job = _wait(job_id)
+
+    assert job["status"] == "succeeded", job
+    assert backend.polls == 3
+    assert set(job["draft_ids"]) == {"req-1", "req-2"}
+    assert job["errors"] == {
+        "missing": "Request not found",
+        "req-3": "content filtered",
+        "req-4": "Request has no source text",
+    }
+
+    input_lines = [json.loads(line) for line in (tmp_path / f"{job_id}.input.jsonl").read_text().splitlines()]
+    assert [line["custom_id"] for line in input_lines] == ["req-1", "req-2", "req-3"]
+    assert input_lines[0]["body"]["n"] == 2
+
+    with session_scope() as session:
+        drafts = {draft.request_id: draft for draft in session.scalars(select(models.Draft))}
+        assert set(drafts) == {"req-1", "req-2"}
+        first = sorted(drafts["req-1"].versions, key=lambda version: version.version_index)
+        assert first[0].content == "Vacuum SRC-1 candidate 0"
+        assert first[0].metadata_json["bulk"] == {"job_id": job_id, "batch_id": job["batch_id"]}
+        assert first[0].metadata_json["llm"]["batch_id"] == job["batch_id"]
+        second = sorted(drafts["req-2"].versions, key=lambda version: version.version_index)
+        assert second[0].content == "Robot SRC-2 candidate 0"
+        audits = session.scalars(select(models.AuditLog).where(models.AuditLog.action == "generated")).all()
+        assert {audit.entity_id for audit in audits} == {draft.id for draft in drafts.values()}
+
+
+def test_bulk_job_fails_when_batch_does_not_complete(seed_users, tmp_path):
+    _create_requests(seed_users, {"req-1": "SRC-1"})
+    backend = _SlowBackend(_EchoLLM(), tmp_path, pending_polls=0, final_status="cancelled")
+
+    job = _wait(
+        start_bulk_draft_job(["req-1"], params=_params(), created_by=seed_users["writer"], backend=backend, poll_seconds=0)
+    )
+
+    assert job["status"] == "failed"
+    assert "cancelled" in job["error"]
+    with session_scope() as session:
+        assert session.scalars(select(models.Draft)).all() == []
+
+
+def test_unfinished_job_resumes_polling_its_batch_after_a_restart(seed_users, tmp_path):
+    _create_requests(seed_users, {"req-1": "SRC-1"})
+    llm = _EchoLLM()
+    first = _SlowBackend(llm, tmp_path, pending_polls=10**6)
+    job_id = start_bulk_draft_job(
+        ["req-1"], params=_params(), created_by=seed_users["writer"], backend=first, poll_seconds=0.02
+    )
+    deadline = time.monotonic() + 10.0
+    while first.polls == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    submitted = get_bulk_draft_job(job_id)
+    assert submitted["status"] == "submitted"
+
+    # Simulate the process dying: nothing drives the job and its heartbeat goes stale.
+    with bulk._ACTIVE_LOCK:
+        bulk._ACTIVE.clear()
+    time.sleep(0.1)
+    with session_scope() as session:
+        session.execute(
+            update(models.BulkDraftJob)
+            .where(models.BulkDraftJob.id == job_id)
+            .values(heartbeat_at=datetime.now(timezone.utc) - timedelta(hours=1))
+        )
+    polls_before_restart = first.polls
+    restarted = _SlowBackend(llm, tmp_path, pending_polls=0)
+
+    assert resume_bulk_draft_jobs(backend=restarted, poll_seconds=0) == [job_id]
+    job = _wait(job_id)
+
+    assert job["status"] == "succeeded", job
+    assert job["batch_id"] == submitted["batch_id"]  # the paid batch is collected, not submitted again
+    assert restarted.polls == 1
+    assert first.polls == polls_before_restart
+    assert len(llm.prompts) == 1
+    assert resume_bulk_draft_jobs(backend=restarted, poll_seconds=0) == []
+
+
+def test_prepare_renews_the_heartbeat_after_each_chunk(seed_users, tmp_path, monkeypatch: pytest.MonkeyPatch):
+    _create_requests(seed_users, {"req-1": "SRC-1", "req-2": "SRC-2", "req-3": "SRC-3"})
+    heartbeats: list[datetime] = []
+    prepare_batch = bulk.prepare_batch
+
+    def _recording_prepare(requests, **kwargs):
+        with session_scope() as session:
+            heartbeats.append(session.scalars(select(models.BulkDraftJob.heartbeat_at)).one())
+        return prepare_batch(requests, **kwargs)
+
+    monkeypatch.setattr(bulk, "_PREPARE_CHUNK", 1)
+    monkeypatch.setattr(bulk, "prepare_batch", _recording_prepare)
+    backend = _SlowBackend(_EchoLLM(), tmp_path, pending_polls=0)
+
+    job = _wait(
+        start_bulk_draft_job(
+            ["req-1", "req-2", "req-3"], params=_params(), created_by=seed_users["writer"], backend=backend, poll_seconds=0
+        )
+    )
+
+    assert job["status"] == "succeeded", job
+    assert set(job["draft_ids"]) == {"req-1", "req-2", "req-3"}
+    # A stale heartbeat mid-prepare would let another worker resume the job and submit it twice.
+    assert len(heartbeats) == 3 and heartbeats == sorted(set(heartbeats))
+
+
+def test_parse_batch_line_reads_results_and_errors():
+    ok = {
+        "custom_id": "req-1",
+        "response": {
+            "status_code": 200,
+            "body": {
+                "id": "chatcmpl-1",
+                "object": "chat.completion",
+                "model": "gpt-4o-mini",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "Charging"}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12},
+            },
+        },
+        "error": None,
+    }
+    failed = {"custom_id": "req-2", "response": {"status_code": 429, "body": {"error": {"message": "Too many"}}}}
+
+    custom_id, result = parse_batch_line(ok)
+    assert custom_id == "req-1"
+    assert result.candidates == ["Charging"]
+    assert result.model == "gpt-4o-mini"
+    assert result.usage["prompt_tokens"] == 10
+
+    custom_id, error = parse_batch_line(failed)
+    assert custom_id == "req-2"
+    assert isinstance(error, LLMClientError)
+    assert str(error) == "Too many"
+    assert error.status_code == 429
+
+
+@pytest.mark.anyio
+async def test_bulk_endpoint_uses_local_backend(seed_users, monkeypatch: pytest.MonkeyPatch):
+    _create_requests(seed_users, {"req-1": "SRC-1"})
+    monkeypatch.setattr(llm_registry, "_CLIENT", _EchoLLM(), raising=False)
+    monkeypatch.setattr(settings, "llm_batch_backend", "local")
+    monkeypatch.setattr(settings, "llm_batch_poll_seconds", 0.0)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        payload = {"request_ids": ["req-1"], "num_candidates": 1, "use_rag": False}
+        created = await client.post("/v1/drafts/bulk", json=payload, headers=HEADERS_WRITER)
+        assert created.status_code == 202
+        job = _wait(created.json()["job_id"])
+        polled = await client.get(f"/v1/drafts/bulk/{job['job_id']}", headers=HEADERS_WRITER)
+        foreign = await client.get(f"/v1/drafts/bulk/{job['job_id']}", headers=HEADERS_DESIGNER)
+        missing = await client.get("/v1/drafts/bulk/unknown", headers=HEADERS_WRITER)
+
+    assert polled.status_code == 200
+    assert polled.json()["counts"] == {"requested": 1, "drafts": 1, "errors": 0}
+    assert foreign.status_code == 404
+    assert missing.status_code == 404
+
+
+@pytest.mark.anyio
+async def test_bulk_endpoint_reports_an_unconfigured_backend(seed_users, monkeypatch: pytest.MonkeyPatch):
+    _create_requests(seed_users, {"req-1": "SRC-1"})
+    monkeypatch.setattr(settings, "llm_batch_backend", "unknown")
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        payload = {"request_ids": ["req-1"], "num_candidates": 1, "use_rag": False}
+        response = await client.post("/v1/drafts/bulk", json=payload, headers=HEADERS_WRITER)
+
+    assert response.status_code == 503
+    assert "Unsupported LLM batch backend" in response.json()["detail"]
+    with session_scope() as session:
+        assert session.scalars(select(models.BulkDraftJob)).all() == []
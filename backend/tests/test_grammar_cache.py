@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+
+from app.core import metrics
+from app.db import models, session_scope
+from app.services import llm as llm_registry
+from app.services.grammar import cache as grammar_cache
+from app.services.grammar.service import PROMPT_VERSION, check_grammar_and_style
+from app.services.llm.client import LLMResult, PromptRequest
+
+TEXT = "The robot returns to its charging station when the battery runs low during a cleaning session."
+
+
+class _ReviewLLM:
+    def __init__(self, confidence: float) -> None:
+        self.confidence = confidence
+        self.calls = 0
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        self.calls += 1
+        review = {
+            "has_issues": True,
+            "issues": [{"type": "style", "message": "Consider 'dock'", "severity": "warning"}],
+            "suggestions": [],
+            "confidence": self.confidence,
+        }
+        return LLMResult(text=json.dumps(review), latency_ms=1.0, raw={})
+
+
+@pytest.fixture(autouse=True)
+def _reset(monkeypatch: pytest.MonkeyPatch):
+    metrics.reset()
+    monkeypatch.setattr(grammar_cache, "_PURGED", set())
+
+
+def _install(monkeypatch: pytest.MonkeyPatch, confidence: float) -> _ReviewLLM:
+    llm = _ReviewLLM(confidence)
+    monkeypatch.setattr(llm_registry, "_CLIENT", llm, raising=False)
+    return llm
+
+
+def test_identical_inputs_reuse_the_cached_review(monkeypatch: pytest.MonkeyPatch):
+    llm = _install(monkeypatch, confidence=0.9)
+
+    first = check_grammar_and_style(TEXT, "en", tone="friendly", style_preferences="system")
+    second = check_grammar_and_style(TEXT, "en", tone="friendly", style_preferences="system")
+    other_tone = check_grammar_and_style(TEXT, "en", tone="formal", style_preferences="system")
+
+    assert first == second == other_tone
+    assert llm.calls == 2
+    assert metrics.counter("grammar.cache.hits") == 1
+    with session_scope() as session:
+        entries = session.scalars(select(models.GrammarCheckCacheEntry)).all()
+        assert {entry.prompt_version for entry in entries} == {PROMPT_VERSION}
+
+
+def test_low_confidence_reviews_are_not_cached(monkeypatch: pytest.MonkeyPatch):
+    llm = _install(monkeypatch, confidence=0.3)
+
+    check_grammar_and_style(TEXT, "en")
+    check_grammar_and_style(TEXT, "en")
+
+    assert llm.calls == 2
+    assert metrics.counter("grammar.cache.low_confidence") == 2
+
+
+def test_reviews_from_an_older_prompt_version_are_purged(monkeypatch: pytest.MonkeyPatch):
+    llm = _install(monkeypatch, confidence=0.9)
+    stale_key = grammar_cache.grammar_cache_key(TEXT, "en", None, None, "old-version")
+    with session_scope() as session:
+        session.add(
+            models.GrammarCheckCacheEntry(
+                key=stale_key,
+                prompt_version="old-version",
+                target_language="en",
+                result_json={"has_issues": False, "issues": [], "suggestions": [], "confidence": 1.0},
+                confidence=1.0,
+            )
+        )
+
+    review = check_grammar_and_style(TEXT, "en")
+
+    assert llm.calls == 1
+    assert review["issues"][0]["message"] == "Consider 'dock'"
+    with session_scope() as session:
+        assert session.get(models.GrammarCheckCacheEntry, stale_key) is None
+
+
+def test_expired_reviews_are_purged(monkeypatch: pytest.MonkeyPatch):
+    llm = _install(monkeypatch, confidence=0.9)
+    expired_key = grammar_cache.grammar_cache_key("Old text.", "en", None, None, PROMPT_VERSION)
+    with session_scope() as session:
+        session.add(
+            models.GrammarCheckCacheEntry(
+                key=expired_key,
+                prompt_version=PROMPT_VERSION,
+                target_language="en",
+                result_json={"has_issues": False, "issues": [], "suggestions": [], "confidence": 1.0},
+                confidence=1.0,
+                created_at=datetime.now(timezone.utc) - timedelta(days=365),
+            )
+        )
+
+    check_grammar_and_style(TEXT, "en")
+
+    assert llm.calls == 1
+    with session_scope() as session:
+        assert session.get(models.GrammarCheckCacheEntry, expired_key) is None
+
+
+def test_failed_purge_is_retried(monkeypatch: pytest.MonkeyPatch):
+    _install(monkeypatch, confidence=0.9)
+    attempts = []
+
+    @contextmanager
+    def failing_once():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OperationalError("DELETE", {}, Exception("database is locked"))
+        with session_scope() as session:
+            yield session
+
+    monkeypatch.setattr(grammar_cache, "session_scope", failing_once)
+
+    assert grammar_cache.get_cached_review("missing", PROMPT_VERSION) is None
+    assert PROMPT_VERSION not in grammar_cache._PURGED
+    assert grammar_cache.get_cached_review("missing", PROMPT_VERSION) is None
+    assert PROMPT_VERSION in grammar_cache._PURGED
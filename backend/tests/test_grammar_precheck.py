@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.core import metrics
+from app.services import llm as llm_registry
+from app.services.grammar.precheck import local_check
+from app.services.grammar.service import check_grammar_and_style, grammar_stats
+from app.services.llm.client import LLMResult, PromptRequest
+
+
+class _ReviewLLM:
+    def __init__(self, review: dict) -> None:
+        self.review = review
+        self.prompts: list[PromptRequest] = []
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        self.prompts.append(prompt)
+        return LLMResult(text=json.dumps(self.review), latency_ms=1.0, raw={})
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+
+
+@pytest.fixture
+def review_llm(monkeypatch: pytest.MonkeyPatch) -> _ReviewLLM:
+    llm = _ReviewLLM({"has_issues": False, "issues": [], "suggestions": [], "confidence": 0.8})
+    monkeypatch.setattr(llm_registry, "_CLIENT", llm, raising=False)
+    return llm
+
+
+def _flagged(text: str, language: str = "en", tone: str | None = None) -> list[str]:
+    return [text[issue.start : issue.end] for issue in local_check(text, language, tone).issues]
+
+
+def test_local_check_flags_common_copy_errors():
+    assert _flagged("Start cleaning") == []
+    assert _flagged("Cleaning... done. Daily, e.g. at night") == []
+    assert _flagged("Save the the changes") == ["the the"]
+    assert _flagged("Saved ,recieve it!!") == [" ,", ",r", "recieve", "!!"]
+    assert _flagged("cleaning started. i think so") == ["c", "i", "i"]
+    assert _flagged("Mode (Turbo") == ["("]
+    assert _flagged("Hey, we're gonna start", tone="formal") == ["Hey", "gonna"]
+    assert _flagged("잠시 후 청소를 시작할께요", "ko") == ["할께"]
+
+
+def test_short_clean_text_skips_the_llm(review_llm):
+    review = check_grammar_and_style("Start cleaning", "en")
+
+    assert review_llm.prompts == []
+    assert review == {"has_issues": False, "issues": [], "suggestions": [], "confidence": 0.9}
+    assert grammar_stats()["skip_rate"] == 1.0
+
+
+def test_long_clean_text_gets_a_full_review(review_llm):
+    text = "The robot returns to its charging station when the battery runs low during a cleaning session."
+
+    check_grammar_and_style(text, "en")
+
+    assert len(review_llm.prompts) == 1
+    assert review_llm.prompts[0].messages[-1].content.endswith(text)
+
+
+def test_flagged_text_narrows_the_prompt_and_keeps_local_issues(review_llm):
+    text = "The robot returns to its station. Cleaning will resume resume shortly. Empty the dust bin."
+
+    review = check_grammar_and_style(text, "en")
+
+    user_prompt = review_llm.prompts[0].messages[-1].content
+    assert "Cleaning will resume resume shortly." in user_prompt
+    assert "returns to its station" not in user_prompt
+    assert review["has_issues"] is True
+    assert review["issues"][0]["message"] == "Repeated word 'resume'"
+    stats = grammar_stats()
+    assert (stats["checks"], stats["llm_skipped"], stats["llm_narrowed"], stats["skip_rate"]) == (1, 0, 1, 0.0)
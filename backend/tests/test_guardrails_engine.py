@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import random
+
+from app.core import metrics
+from app.services.guardrails.engine import AhoCorasick, Replacer, compile_rule_set
+from app.services.guardrails.loader import _merge_guardrail_sources
+from app.services.guardrails.service import apply_guardrails
+
+
+def _reference(text: str, forbidden: list[str], replace_map: dict[str, str]) -> tuple[set[str], str]:
+    """The per-term scan and sequential ``str.replace`` the engine replaced."""
+
+    lowered = text.lower()
+    found = {term.lower() for term in forbidden if term and term.lower() in lowered}
+    fixed = text
+    for src, dst in replace_map.items():
+        if src:
+            fixed = fixed.replace(src, dst)
+    return found, fixed
+
+
+def _overlap(first: str, second: str) -> bool:
+    return first in second or any(first.endswith(second[:size]) for size in range(1, len(second)))
+
+
+def test_matcher_reports_overlapping_and_nested_terms():
+    matcher = AhoCorasick(["he", "she", "his", "hers", "", "she"])
+
+    assert matcher.patterns == ("he", "she", "his", "hers")
+    assert sorted(matcher.iter_matches("ushers")) == [(4, 0), (4, 1), (6, 3)]
+    assert matcher.found("ahishers") == ["he", "she", "his", "hers"]
+    assert matcher.found("xyz") == []
+
+
+def test_replacer_is_longest_match_and_does_not_rescan_output():
+    replace = Replacer([("Robot", "Vacuum"), ("Robot cleaner", "Vacuum"), ("Vacuum", "Robot"), ("", "x")])
+
+    assert replace("Robot cleaner docks. Robot charges.") == "Vacuum docks. Vacuum charges."
+    assert replace("Vacuum mode") == "Robot mode"
+    assert replace("nothing to do") == "nothing to do"
+
+
+def test_results_match_the_per_term_scan_for_random_rule_sets():
+    rng = random.Random(7)
+    alphabet = "abcdeé 로봇"
+
+    def word(low: int, high: int) -> str:
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(low, high)))
+
+    for _ in range(300):
+        forbidden = [word(1, 4) for _ in range(rng.randint(0, 12))] + [word(1, 3).upper()]
+        # Targets use characters no source contains, so sequential replacement cannot cascade.
+        sources = list(dict.fromkeys(word(3, 5) for _ in range(rng.randint(0, 4))))
+        # Sequential replacement only agrees with leftmost-longest when sources cannot overlap.
+        sources = [src for src in sources if not any(_overlap(src, other) for other in sources if other != src)]
+        replace_map = {src: f"<{index}>" for index, src in enumerate(sources)}
+        text = word(0, 40)
+
+        found, fixed = _reference(text, forbidden, replace_map)
+        result = apply_guardrails(text, {"forbidden_terms": forbidden, "replace_map": replace_map}, {})
+
+        assert {violation.removeprefix("forbidden:") for violation in result["violations"]} == found
+        assert result["passes"] == (not found)
+        assert result["fixed"] == fixed
+
+
+def test_rule_sets_compile_once_per_fingerprint_and_hints_extend_them():
+    metrics.reset()
+    rules = _merge_guardrail_sources({"forbidden_terms": ["Click", "oops"], "replace_map": {"robot": "Robot"}})
+    reloaded = _merge_guardrail_sources({"forbidden_terms": ["oops", "Click"], "replace_map": {"robot": "Robot"}})
+
+    first = apply_guardrails("Click the robot", rules, {"forbidden_terms": "ROBOT"})
+    second = apply_guardrails("Click the robot", reloaded, {"forbidden_terms": "ROBOT"})
+    unhinted = apply_guardrails("Click the robot", reloaded)
+
+    assert rules["fingerprint"] == reloaded["fingerprint"]
+    assert first == second
+    assert first["violations"] == ["forbidden:click", "forbidden:robot"]
+    assert first["fixed"] == "Click the Robot"
+    assert unhinted["violations"] == ["forbidden:click"]
+    # The rule set compiled once; the hint set compiled separately and was reused.
+    assert (metrics.counter("guardrails.compile.misses"), metrics.counter("guardrails.compile.hits")) == (2, 3)
+
+    other_hints = apply_guardrails("Click the robot", rules, {"forbidden_terms": ["the"]})
+    assert other_hints["violations"] == ["forbidden:click", "forbidden:the"]
+    assert (metrics.counter("guardrails.compile.misses"), metrics.counter("guardrails.compile.hits")) == (3, 4)
+    assert compile_rule_set(["A", "a"], {}) is compile_rule_set(["A", "a"], {})
+    assert apply_guardrails("Click the robot", rules, apply_fix=False)["fixed"] == "Click the robot"
+
+
+def test_hint_replacements_merge_with_rule_replacements_in_one_pass():
+    rules = _merge_guardrail_sources({"replace_map": {"robot": "Robot", "dock": "Dock"}})
+    hints = {"replace_map": {"dock": "station", "robot cleaner": "vacuum"}}
+
+    result = apply_guardrails("the robot cleaner and the robot go to the dock", rules, hints)
+
+    merged = {**rules["replace_map"], **hints["replace_map"]}
+    assert result["fixed"] == Replacer(merged.items())("the robot cleaner and the robot go to the dock")
+    assert result["fixed"] == "the vacuum and the Robot go to the station"
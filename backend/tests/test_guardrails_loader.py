@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import delete, event
+
+from app.db import get_engine, models, session_scope
+from app.services.guardrails.loader import load_guardrail_rules, load_guardrail_rules_for_requests
+
+
+@contextmanager
+def _count_queries():
+    statements: list[str] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = get_engine()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _rule(rule_id: str, scope: models.GuardrailScope, terms: list[str], **target) -> models.GuardrailRule:
+    return models.GuardrailRule(
+        id=rule_id,
+        scope=scope,
+        rule_type=models.GuardrailRuleType.FORBIDDEN_TERM,
+        payload_json={"terms": terms, **target},
+        created_by="designer-1",
+    )
+
+
+@pytest.fixture
+def requests(seed_users) -> dict:
+    with session_scope() as session:
+        charging = models.Request(
+            id="req-1",
+            title="Charging",
+            feature_name="Charging",
+            constraints_json={"feature_norm": "charging"},
+            requested_by=seed_users["designer"],
+        )
+        mapping = models.Request(id="req-2", title="Map", feature_name="map", requested_by=seed_users["designer"])
+        session.add_all([charging, mapping])
+        session.add_all(
+            [
+                _rule("global", models.GuardrailScope.GLOBAL, ["oops"]),
+                _rule("feature", models.GuardrailScope.FEATURE, ["plug"], feature_norm="charging"),
+                _rule("other-feature", models.GuardrailScope.FEATURE, ["zoom"], feature_name="map"),
+                _rule("request", models.GuardrailScope.REQUEST, ["cable"], request_id="req-1"),
+            ]
+        )
+    return {"charging": charging, "map": mapping}
+
+
+def test_rules_are_filtered_by_scope_on_indexed_columns(requests):
+    with session_scope() as session:
+        rules = load_guardrail_rules(session, request=requests["charging"])
+        by_id = {rule.id: rule for rule in session.query(models.GuardrailRule)}
+
+    assert rules["forbidden_terms"] == ["cable", "oops", "plug"]
+    assert (by_id["feature"].feature_key, by_id["feature"].request_id) == ("charging", None)
+    assert (by_id["request"].feature_key, by_id["request"].request_id) == (None, "req-1")
+    assert (by_id["global"].feature_key, by_id["global"].request_id) == (None, None)
+
+
+def test_cached_rules_need_no_queries_until_a_rule_is_written(requests):
+    with session_scope() as session:
+        first = load_guardrail_rules(session, request=requests["charging"], extra_sources=[{"forbidden_terms": ["x"]}])
+        with _count_queries() as statements:
+            second = load_guardrail_rules(
+                session, request=requests["charging"], extra_sources=[{"forbidden_terms": ["x"]}]
+            )
+    assert statements == []
+    assert first == second
+    assert first["forbidden_terms"] == ["cable", "oops", "plug", "x"]
+
+    with session_scope() as session:
+        session.add(_rule("new-global", models.GuardrailScope.GLOBAL, ["hey"]))
+    with session_scope() as session:
+        assert "hey" in load_guardrail_rules(session, request=requests["charging"])["forbidden_terms"]
+
+    with session_scope() as session:
+        session.execute(delete(models.GuardrailRule).where(models.GuardrailRule.id == "new-global"))
+    with session_scope() as session:
+        assert "hey" not in load_guardrail_rules(session, request=requests["charging"])["forbidden_terms"]
+
+
+def test_batch_load_reads_all_scopes_in_one_query(requests):
+    with session_scope() as session:
+        with _count_queries() as statements:
+            rules = load_guardrail_rules_for_requests(session, [requests["charging"], requests["map"]])
+        global_rules = load_guardrail_rules(session)
+
+    assert len([statement for statement in statements if "guardrail_rules.payload_json" in statement]) == 1
+    assert rules["req-1"]["forbidden_terms"] == ["cable", "oops", "plug"]
+    assert rules["req-2"]["forbidden_terms"] == ["oops", "zoom"]
+    assert global_rules["forbidden_terms"] == ["oops"]
+
+
+def test_uncommitted_rule_writes_bypass_the_cache(requests):
+    with session_scope() as session:
+        load_guardrail_rules(session, request=requests["map"])
+        session.add(_rule("pending", models.GuardrailScope.REQUEST, ["route"], request_id="req-2"))
+        session.flush()
+        assert load_guardrail_rules(session, request=requests["map"])["forbidden_terms"] == ["oops", "route", "zoom"]
+        session.rollback()
+
+    with session_scope() as session:
+        assert load_guardrail_rules(session, request=requests["map"])["forbidden_terms"] == ["oops", "zoom"]
+
+
+def test_requests_without_request_rules_share_their_feature_entry(requests, seed_users):
+    with session_scope() as session:
+        session.add(models.Request(id="req-3", title="Map 2", feature_name="map", requested_by=seed_users["designer"]))
+    with session_scope() as session:
+        first = load_guardrail_rules(session, request=requests["map"], extra_sources=[{"style": {"tone": "calm"}}])
+        other = session.get(models.Request, "req-3")
+        with _count_queries() as statements:
+            shared = load_guardrail_rules(
+                session, request=other, extra_sources=[{"style": {"tone": "calm"}}], extras_id="run-1"
+            )
+            again = load_guardrail_rules(
+                session, request=requests["map"], extra_sources=[{"style": {"tone": "calm"}}], extras_id="run-1"
+            )
+        charging = load_guardrail_rules(session, request=requests["charging"])
+
+    # One query for the run-keyed entry; the second request reuses it.
+    assert len([statement for statement in statements if "guardrail_rules.payload_json" in statement]) == 1
+    assert shared == again == first
+    assert charging["forbidden_terms"] == ["cable", "oops", "plug"]
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from sqlalchemy import select
+
+from app.db import models, session_scope
+from app.services.ingest.bulk import bulk_replace
+from app.services.ingest.service import do_ingest
+
+
+def test_bulk_replace_swaps_table_contents() -> None:
+    table = models.ContextSnippet.__table__
+    with session_scope() as session:
+        bulk_replace(session, table, [{"id": "old-1", "device": "robot_vacuum", "response_case_tags": ["a"]}])
+
+    rows = [
+        {"id": f"ctx-{idx}", "device": "air_purifier", "response_case_tags": ["tag", str(idx)]}
+        for idx in range(50)
+    ]
+    with session_scope() as session:
+        stats = bulk_replace(session, table, rows)
+
+    assert stats["rows"] == 50
+    assert stats["method"] == "executemany"
+    assert stats["rows_per_sec"] > 0
+    with session_scope() as session:
+        snippets = list(session.scalars(select(models.ContextSnippet).order_by(models.ContextSnippet.id)))
+        assert len(snippets) == 50
+        assert all(snippet.id != "old-1" for snippet in snippets)
+        assert snippets[0].response_case_tags == ["tag", "0"]
+        assert snippets[0].created_at is not None
+
+
+def test_do_ingest_reports_rows_per_sec() -> None:
+    with session_scope() as session:
+        result = do_ingest(session, vector_client=None)
+
+    assert set(result["rows_per_sec"]) == set(result["counts"])
+    with session_scope() as session:
+        assert session.query(models.GlossaryEntry).count() == result["counts"]["glossary"]
+        ingestion = session.scalars(select(models.RagIngestion)).first()
+        assert "rows_per_sec" in ingestion.metadata_json
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+from qdrant_client import QdrantClient
+
+from app.core import io_utils
+from app.services.ingest import pipeline as ingest_pipeline
+from app.services.ingest import service as ingest_service
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+SOURCE_DIR = Path(ingest_service.DATA_ROOT) / "input"
+
+
+@pytest.fixture
+def columnar_root(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    corpus_dir = tmp_path / "warehouse"
+    corpus_dir.mkdir()
+    shutil.copy(SOURCE_DIR / "style_rules.yaml", corpus_dir / "style_rules.yaml")
+    shutil.copy(SOURCE_DIR / "style_corpus.csv", corpus_dir / "style_corpus.csv")
+
+    context_rows = io_utils.read_jsonl(str(SOURCE_DIR / "context.jsonl"))
+    context_table = pa.Table.from_pylist(context_rows)
+    embeddings = pa.array([[float(idx)] * 1024 for idx in range(1, len(context_rows) + 1)], type=pa.list_(pa.float32()))
+    pq.write_table(context_table.append_column("embedding", embeddings), corpus_dir / "context.parquet", row_group_size=2)
+
+    glossary_table = pa.Table.from_pylist(io_utils.read_csv(str(SOURCE_DIR / "glossary.csv")))
+    with pa.OSFile(str(corpus_dir / "glossary.arrow"), "wb") as sink:
+        with pa.ipc.new_file(sink, glossary_table.schema) as writer:
+            writer.write_table(glossary_table)
+
+    monkeypatch.setattr(ingest_service, "DATA_ROOT", str(tmp_path))
+    return corpus_dir
+
+
+def test_read_corpus_prefers_columnar_inputs(columnar_root: Path) -> None:
+    corpus = ingest_service.read_corpus("warehouse")
+    expected_context = io_utils.read_jsonl(str(SOURCE_DIR / "context.jsonl"))
+
+    assert corpus.context_rows == expected_context
+    assert len(corpus.glossary_rows) == len(io_utils.read_csv(str(SOURCE_DIR / "glossary.csv")))
+    assert corpus.vectors["context"][0][:2].tolist() == [1.0, 1.0]
+    assert len(corpus.vectors["context"]) == len(expected_context)
+    assert corpus.vectors["glossary"] is None
+    assert corpus.vectors["style"] is None
+    assert all("embedding" not in row for row in corpus.context_rows)
+
+
+def test_precomputed_embeddings_skip_embedding(columnar_root: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    embedded: list[str] = []
+    original_embed = ingest_pipeline.get_embedding_client().embed
+
+    class _CountingEmbedder:
+        def embed(self, texts):
+            embedded.extend(texts)
+            return original_embed(texts)
+
+    monkeypatch.setattr(ingest_pipeline, "get_embedding_client", lambda: _CountingEmbedder())
+    corpus = ingest_service.read_corpus("warehouse")
+    summary = ingest_service.index_corpus(corpus, QdrantClient(":memory:"))
+
+    assert summary["status"] == "completed"
+    assert summary["collections"]["context_snippets"] == len(corpus.context_rows)
+    assert summary["timings"]["context_snippets"]["embed_ms"] == 0
+    context_texts = {row["ko_response"] for row in corpus.context_rows}
+    assert not context_texts.intersection(embedded)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import threading
+import time
+
+from app.core.settings import settings
+from app.services.ingest.pipeline import CollectionLoad, run_vector_pipeline
+
+
+class _RecordingQdrant:
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.calls: list[tuple[str, int, bool, str]] = []
+        self._lock = threading.Lock()
+
+    def upsert(self, *, collection_name: str, points, wait: bool) -> None:
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls.append((collection_name, len(points), wait, threading.current_thread().name))
+
+
+def test_pipeline_batches_and_barriers_each_collection(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "embedding_max_batch", 4)
+    monkeypatch.setattr(settings, "qdrant_upsert_batch", 8)
+    client = _RecordingQdrant()
+    loads = [
+        CollectionLoad("style_guides", [(f"style {i}", {"sid": str(i)}) for i in range(20)]),
+        CollectionLoad("glossary_terms", [(f"term {i}", {"term": str(i)}) for i in range(3)]),
+        CollectionLoad("context_snippets", []),
+    ]
+
+    summary = run_vector_pipeline(client, loads)
+
+    assert summary["status"] == "completed"
+    assert summary["collections"] == {"style_guides": 20, "glossary_terms": 3, "context_snippets": 0}
+    style_calls = [call for call in client.calls if call[0] == "style_guides"]
+    assert [size for _, size, _, _ in style_calls] == [8, 8, 4]
+    assert [wait for _, _, wait, _ in style_calls] == [False, False, True]
+    assert [call[2] for call in client.calls if call[0] == "glossary_terms"] == [True]
+    assert all(name.startswith("ingest-upsert") for _, _, _, name in client.calls)
+    assert summary["timings"]["style_guides"]["batches"] == 3
+
+
+def test_pipeline_runs_collections_concurrently(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "embedding_max_batch", 2)
+    monkeypatch.setattr(settings, "qdrant_upsert_batch", 2)
+    client = _RecordingQdrant(delay=0.05)
+    loads = [CollectionLoad(name, [(f"{name} {i}", {}) for i in range(4)]) for name in ("a", "b", "c")]
+
+    summary = run_vector_pipeline(client, loads)
+
+    slowest = max(timing["wall_ms"] for timing in summary["timings"].values())
+    total = sum(timing["wall_ms"] for timing in summary["timings"].values())
+    assert summary["wall_ms"] < total
+    assert summary["wall_ms"] < slowest * 1.5
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+
+from app.core.settings import settings
+from app.db import models, session_scope
+from app.main import app
+from app.services import llm as llm_registry
+from app.services.llm import accounting
+from app.services.llm.client import LLMResult, PromptMessage, PromptRequest
+from app.services.llm.router import LLMRouter, RoutingTable
+
+HEADERS_DESIGNER = {"X-User-Role": "designer", "X-User-Id": "designer-1"}
+HEADERS_WRITER = {"X-User-Role": "writer", "X-User-Id": "writer-1"}
+HEADERS_ADMIN = {"X-User-Role": "admin", "X-User-Id": "admin-1"}
+
+
+class _UsageLLM:
+    def __init__(self, usage=None) -> None:
+        self.usage = usage
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        return LLMResult(text="return_to_charging", latency_ms=1.0, raw={}, usage=self.usage)
+
+
+@pytest.fixture(autouse=True)
+def _reset_accounting():
+    accounting.reset()
+    yield
+    accounting.reset()
+
+
+def test_router_records_tokens_latency_and_request_id():
+    table = RoutingTable({}, default_model="gpt-test")
+    usage = {"prompt_tokens": 1200, "completion_tokens": 8, "cached_tokens": 1024}
+    router = LLMRouter({"gpt-test": _UsageLLM(usage)}, table)
+    prompt = PromptRequest(messages=[PromptMessage(role="user", content="충전 복귀")], route="normalize")
+
+    with accounting.llm_request("req-1"):
+        router.generate(prompt)
+    LLMRouter({"gpt-test": _UsageLLM()}, table).generate(prompt)
+
+    report = accounting.usage_report()
+    stats = report["by_route_model"]["normalize:gpt-test"]
+    assert stats["calls"] == 2
+    assert stats["cached_tokens"]["max"] == 1024
+    first, second = report["recent"]
+    assert first["request_id"] == "req-1" and first["prompt_tokens"] == 1200
+    assert second["request_id"] is None and second["usage_estimated"] and second["prompt_tokens"] > 0
+    assert [record["request_id"] for record in accounting.usage_report(request_id="req-1")["recent"]] == ["req-1"]
+
+
+@pytest.mark.anyio
+async def test_draft_versions_carry_llm_accounting(seed_users, monkeypatch: pytest.MonkeyPatch):
+    with session_scope() as session:
+        session.merge(models.User(id="admin-1", role=models.UserRole.ADMIN, name="Admin", email="admin@example.com"))
+    monkeypatch.setattr(settings, "llm_provider", "stub")
+    monkeypatch.setattr(settings, "llm_stub_latency_ms", 0.0)
+    monkeypatch.setattr(llm_registry, "_CLIENT", None)
+
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        create_resp = await client.post(
+            "/v1/requests",
+            json={"title": "Robot vacuum returns", "feature_name": "charging", "assigned_writer_id": "writer-1"},
+            headers=HEADERS_DESIGNER,
+        )
+        request_id = create_resp.json()["id"]
+        draft_resp = await client.post(
+            "/v1/drafts",
+            json={
+                "request_id": request_id,
+                "text": "로봇이 충전 거점으로 돌아갑니다.",
+                "source_language": "ko",
+                "target_language": "en",
+                "num_candidates": 2,
+                "use_rag": False,
+            },
+            headers=HEADERS_WRITER,
+        )
+        usage_resp = await client.get("/v1/admin/llm-usage", params={"request_id": request_id}, headers=HEADERS_ADMIN)
+
+    assert draft_resp.status_code == 201
+    with session_scope() as session:
+        versions = session.scalars(select(models.DraftVersion)).all()
+        assert len(versions) == 2
+        metadata = versions[0].metadata_json
+        assert metadata["llm"]["model"] == settings.llm_model and metadata["llm"]["route"] == "translate"
+        assert metadata["llm"]["usage"]["prompt_tokens"] > 0
+        assert metadata["prompt"]["fingerprint"]
+
+    assert usage_resp.status_code == 200
+    recent = usage_resp.json()["recent"]
+    assert [(call["route"], call["request_id"]) for call in recent] == [("translate", request_id)]
@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+from app.core import metrics
+from app.services.llm.cache import CachingAsyncLLMClient, CachingLLMClient, SQLiteLLMCache, cache_stats
+from app.services.llm.client import LLMResult, PromptMessage, PromptRequest
+
+
+class _CountingLLM:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        self.calls += 1
+        return LLMResult(text=f"answer {self.calls}", latency_ms=500.0, raw={})
+
+
+class _AsyncCountingLLM(_CountingLLM):
+    async def generate(self, prompt: PromptRequest) -> LLMResult:  # type: ignore[override]
+        return super().generate(prompt)
+
+
+def _prompt(text: str = "Check grammar: Returning to base.", **kwargs) -> PromptRequest:
+    return PromptRequest(messages=[PromptMessage(role="user", content=text)], **kwargs)
+
+
+def _caching(inner, cache, cls=CachingLLMClient):
+    return cls(inner, cache, model="gpt-test", default_temperature=0.3, max_temperature=0.2)
+
+
+@pytest.fixture
+def cache(tmp_path) -> SQLiteLLMCache:
+    metrics.reset()
+    return SQLiteLLMCache(str(tmp_path / "cache.sqlite3"), ttl_seconds=3600, max_bytes=1_000_000)
+
+
+def test_deterministic_calls_are_served_from_cache(cache):
+    inner = _CountingLLM()
+    client = _caching(inner, cache)
+
+    first = client.generate(_prompt(temperature=0.1))
+    second = client.generate(_prompt(temperature=0.1))
+
+    assert inner.calls == 1
+    assert second.text == first.text and second.cached and not first.cached
+    # A different sampling parameter is a different key.
+    client.generate(_prompt(temperature=0.1, max_output_tokens=50))
+    assert inner.calls == 2
+
+    stats = cache_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["hit_rate"] == pytest.approx(1 / 3, abs=1e-3)
+    assert stats["dollars_saved"] > 0
+
+
+def test_sampled_calls_skip_cache_unless_requested(cache):
+    inner = _CountingLLM()
+    client = _caching(inner, cache)
+
+    client.generate(_prompt())  # default temperature 0.3 is above the threshold
+    client.generate(_prompt())
+    assert inner.calls == 2
+
+    client.generate(_prompt(cache=True))
+    client.generate(_prompt(cache=True))
+    assert inner.calls == 3
+
+    client.generate(_prompt(temperature=0.0, cache=False))
+    assert inner.calls == 4
+
+
+def test_ttl_and_size_eviction(tmp_path):
+    entry = {"text": "x" * 50, "candidates": ["x" * 50], "latency_ms": 1.0, "usage": {"input_tokens": 1, "output_tokens": 1}}
+    entry_size = len(json.dumps(entry))
+    cache = SQLiteLLMCache(str(tmp_path / "small.sqlite3"), ttl_seconds=3600, max_bytes=entry_size * 3)
+    for key in ("a", "b", "c"):
+        cache.set(key, entry)
+        time.sleep(0.01)
+    cache.get("a")  # refresh "a" so "b" is least recently used
+    cache.set("d", entry)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("d") is not None
+    assert cache.stats()["bytes"] <= entry_size * 3
+
+    cache.ttl_seconds = 0.01
+    time.sleep(0.02)
+    assert cache.get("a") is None
+
+
+@pytest.mark.anyio
+async def test_async_client_uses_cache(cache):
+    inner = _AsyncCountingLLM()
+    client = _caching(inner, cache, cls=CachingAsyncLLMClient)
+
+    await client.generate(_prompt(temperature=0.0))
+    result = await client.generate(_prompt(temperature=0.0))
+
+    assert inner.calls == 1
+    assert result.cached
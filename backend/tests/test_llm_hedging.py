@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import anyio
+import pytest
+
+from app.core import metrics
+from app.services.llm import hedging
+from app.services.llm.client import LLMClientError, LLMResult, PromptMessage, PromptRequest
+from app.services.llm.hedging import HedgedAsyncLLMClient, HedgedLLMClient, HedgePolicy
+
+
+def _prompt() -> PromptRequest:
+    return PromptRequest(messages=[PromptMessage(role="user", content="Translate: 충전 중")])
+
+
+def _warm_policy(budget: float = 1.0, latency_ms: float = 50.0) -> HedgePolicy:
+    policy = HedgePolicy(percentile=0.95, min_delay_ms=10.0, budget=budget, min_samples=5)
+    for _ in range(5):
+        policy.record(latency_ms)
+    return policy
+
+
+class _StragglerLLM:
+    """First call straggles, later calls are fast."""
+
+    def __init__(self, slow_seconds: float = 0.5) -> None:
+        self.slow_seconds = slow_seconds
+        self.calls = 0
+        self.cancelled = 0
+
+    def _delay(self) -> float:
+        self.calls += 1
+        return self.slow_seconds if self.calls == 1 else 0.01
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        call = self.calls + 1
+        time.sleep(self._delay())
+        return LLMResult(text=f"call {call}", latency_ms=0.0, raw={})
+
+
+class _AsyncStragglerLLM(_StragglerLLM):
+    async def generate(self, prompt: PromptRequest) -> LLMResult:  # type: ignore[override]
+        call = self.calls + 1
+        try:
+            await anyio.sleep(self._delay())
+        except anyio.get_cancelled_exc_class():
+            self.cancelled += 1
+            raise
+        return LLMResult(text=f"call {call}", latency_ms=0.0, raw={})
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+
+
+@pytest.mark.anyio
+async def test_async_hedge_wins_and_cancels_straggler():
+    inner = _AsyncStragglerLLM()
+    client = HedgedAsyncLLMClient(inner, _warm_policy())
+
+    started = time.perf_counter()
+    result = await client.generate(_prompt())
+
+    assert time.perf_counter() - started < 0.3
+    assert result.text == "call 2"
+    assert inner.cancelled == 1
+    assert metrics.counter("llm.hedge.issued") == 1 and metrics.counter("llm.hedge.won") == 1
+
+
+@pytest.mark.anyio
+async def test_async_hedge_respects_budget_and_cold_start():
+    inner = _AsyncStragglerLLM(slow_seconds=0.1)
+    result = await HedgedAsyncLLMClient(inner, _warm_policy(budget=0.0)).generate(_prompt())
+    assert result.text == "call 1" and inner.calls == 1
+    assert metrics.counter("llm.hedge.over_budget") == 1
+
+    cold = HedgePolicy(percentile=0.95, min_delay_ms=10.0, budget=1.0, min_samples=5)
+    inner = _AsyncStragglerLLM(slow_seconds=0.1)
+    await HedgedAsyncLLMClient(inner, cold).generate(_prompt())
+    assert inner.calls == 1 and metrics.counter("llm.hedge.issued") == 0
+
+
+@pytest.mark.anyio
+async def test_async_hedge_survives_primary_failure():
+    class _FailingFirst(_AsyncStragglerLLM):
+        async def generate(self, prompt):  # type: ignore[override]
+            if self.calls == 0:
+                self.calls += 1
+                await anyio.sleep(0.1)
+                raise LLMClientError("upstream reset")
+            return await super().generate(prompt)
+
+    result = await HedgedAsyncLLMClient(_FailingFirst(), _warm_policy()).generate(_prompt())
+    assert result.text == "call 2"
+
+
+def test_sync_hedge_returns_first_result():
+    inner = _StragglerLLM(slow_seconds=0.4)
+    client = HedgedLLMClient(inner, _warm_policy())
+
+    started = time.perf_counter()
+    result = client.generate(_prompt())
+
+    assert time.perf_counter() - started < 0.3
+    assert result.text == "call 2"
+    assert metrics.counter("llm.hedge.won") == 1
+
+
+def test_sync_winning_hedge_records_latency_from_the_primary_start():
+    policy = _warm_policy(latency_ms=15.0)
+    result = HedgedLLMClient(_StragglerLLM(slow_seconds=0.4), policy).generate(_prompt())
+
+    assert result.text == "call 2"
+    # The hedge itself took ~10 ms; the caller waited the 15 ms delay on top of it.
+    assert policy._latencies.count == 6
+    assert policy._latencies.percentile(1.0) > 20.0
+
+
+def test_sync_primary_does_not_queue_behind_busy_hedges():
+    release = threading.Event()
+    blockers = [hedging._HEDGE_EXECUTOR.submit(release.wait) for _ in range(hedging._HEDGE_EXECUTOR._max_workers)]
+    try:
+        inner = _StragglerLLM(slow_seconds=0.02)
+        started = time.perf_counter()
+        result = HedgedLLMClient(inner, _warm_policy()).generate(_prompt())
+        elapsed = time.perf_counter() - started
+    finally:
+        release.set()
+        for blocker in blockers:
+            blocker.result()
+
+    assert result.text == "call 1"
+    # With the primary queued behind the busy executor this call would never return.
+    assert elapsed < 0.2
+    assert metrics.counter("llm.hedge.issued") == 0
+
+
+def test_sync_primaries_run_unhedged_once_the_primary_pool_is_full(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(hedging, "_PRIMARY_SLOTS", threading.BoundedSemaphore(1))
+    hedging._PRIMARY_SLOTS.acquire()
+    inner = _StragglerLLM(slow_seconds=0.1)
+
+    result = HedgedLLMClient(inner, _warm_policy()).generate(_prompt())
+
+    # The call ran on the caller's thread instead of spawning another one, and was not hedged.
+    assert result.text == "call 1"
+    assert inner.calls == 1
+    assert metrics.counter("llm.hedge.saturated") == 1
+    assert metrics.counter("llm.hedge.issued") == 0
+
+
+def test_sync_primary_releases_its_slot_when_it_loses(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(hedging, "_PRIMARY_SLOTS", threading.BoundedSemaphore(2))
+    inner = _StragglerLLM(slow_seconds=0.2)
+
+    assert HedgedLLMClient(inner, _warm_policy()).generate(_prompt()).text == "call 2"
+    # The losing primary keeps its slot until the provider call returns.
+    assert hedging._PRIMARY_SLOTS._value == 1
+    time.sleep(0.3)
+    assert hedging._PRIMARY_SLOTS._value == 2
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.core import metrics
+from app.services.llm.client import LLMClientError, LLMResult, PromptMessage, PromptRequest
+from app.services.llm.resilience import (
+    CallGuard,
+    CircuitBreaker,
+    LLMCircuitOpenError,
+    RateLimiter,
+    ResilientAsyncLLMClient,
+    ResilientLLMClient,
+    RetryPolicy,
+    TokenBucket,
+)
+
+
+def _prompt() -> PromptRequest:
+    return PromptRequest(messages=[PromptMessage(role="user", content="충전 중")], max_output_tokens=20)
+
+
+def _guard(limiter=None, *, threshold: int = 3, reset_seconds: float = 30.0, attempts: int = 3) -> CallGuard:
+    return CallGuard(
+        limiter,
+        CircuitBreaker(failure_threshold=threshold, reset_seconds=reset_seconds),
+        RetryPolicy(max_attempts=attempts, base_delay_seconds=0.0, max_delay_seconds=1.0),
+    )
+
+
+class _ScriptedLLM:
+    """Raises the scripted errors in order, then succeeds."""
+
+    def __init__(self, *errors: LLMClientError) -> None:
+        self.errors = list(errors)
+        self.calls = 0
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return LLMResult(text="Charging.", latency_ms=1.0, raw={})
+
+
+class _AsyncScriptedLLM(_ScriptedLLM):
+    async def generate(self, prompt: PromptRequest) -> LLMResult:  # type: ignore[override]
+        return super().generate(prompt)
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+
+
+def test_token_bucket_reports_wait_for_debt():
+    bucket = TokenBucket(rate_per_second=10.0, capacity=2.0)
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+
+
+def test_limiter_applies_token_quota_and_records_wait():
+    # 100-token burst; each prompt is estimated at 4 prompt + 20 output tokens.
+    guard = _guard(RateLimiter(requests_per_minute=None, tokens_per_minute=600))
+    assert [guard.admit(_prompt()) for _ in range(4)] == [0.0] * 4
+    assert guard.admit(_prompt()) == pytest.approx(2.0, abs=0.05)  # 20-token debt at 10 tokens/s
+    assert metrics.snapshot()["histograms"]["llm.limiter.wait_ms"]["count"] == 5
+
+
+def test_retries_honour_retry_after_then_succeed():
+    inner = _ScriptedLLM(
+        LLMClientError("rate limited", status_code=429, retryable=True, retry_after=0.05),
+        LLMClientError("bad gateway", status_code=502, retryable=True),
+    )
+    client = ResilientLLMClient(inner, _guard())
+
+    started = time.perf_counter()
+    assert client.generate(_prompt()).text == "Charging."
+
+    assert inner.calls == 3
+    assert time.perf_counter() - started >= 0.05
+    assert metrics.counter("llm.retries") == 2 and metrics.counter("llm.rate_limited") == 1
+
+
+def test_non_retryable_errors_and_long_retry_after_fail_immediately():
+    inner = _ScriptedLLM(LLMClientError("bad request", status_code=400))
+    with pytest.raises(LLMClientError):
+        ResilientLLMClient(inner, _guard()).generate(_prompt())
+    assert inner.calls == 1
+
+    inner = _ScriptedLLM(LLMClientError("slow down", status_code=429, retryable=True, retry_after=60))
+    with pytest.raises(LLMClientError):
+        ResilientLLMClient(inner, _guard()).generate(_prompt())
+    assert inner.calls == 1
+
+
+def test_breaker_sheds_load_then_probes_after_cool_down():
+    guard = _guard(threshold=2, reset_seconds=0.05, attempts=1)
+    outage = [LLMClientError("unavailable", status_code=503, retryable=True) for _ in range(2)]
+    inner = _ScriptedLLM(*outage)
+    client = ResilientLLMClient(inner, guard)
+
+    for _ in range(2):
+        with pytest.raises(LLMClientError):
+            client.generate(_prompt())
+    with pytest.raises(LLMCircuitOpenError) as excinfo:
+        client.generate(_prompt())
+    assert inner.calls == 2
+    assert 0 < excinfo.value.retry_after <= 0.05
+
+    time.sleep(0.06)
+    assert client.generate(_prompt()).text == "Charging."
+    assert guard.breaker.state == "closed"
+
+
+@pytest.mark.anyio
+async def test_async_client_retries_transient_errors():
+    inner = _AsyncScriptedLLM(LLMClientError("timeout", retryable=True))
+    result = await ResilientAsyncLLMClient(inner, _guard()).generate(_prompt())
+    assert result.text == "Charging." and inner.calls == 2
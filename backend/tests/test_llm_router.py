@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.core import metrics
+from app.services.llm.client import LLMClientError, LLMResult, PromptMessage, PromptRequest
+from app.services.llm.router import AsyncLLMRouter, LLMRouter, RoutingTable
+
+
+def _prompt(route: str = "normalize") -> PromptRequest:
+    return PromptRequest(messages=[PromptMessage(role="user", content="Feature (Korean): 충전")], route=route)
+
+
+class _FakeModel:
+    def __init__(self, name: str, error: LLMClientError | None = None) -> None:
+        self.name = name
+        self.error = error
+        self.calls = 0
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return LLMResult(text=f"from {self.name}", latency_ms=1.0, raw={})
+
+
+class _AsyncFakeModel(_FakeModel):
+    async def generate(self, prompt: PromptRequest) -> LLMResult:  # type: ignore[override]
+        return super().generate(prompt)
+
+
+def _table(**kwargs) -> RoutingTable:
+    options = dict(
+        default_model="gpt-default",
+        latency_slo_ms={"normalize": 100.0},
+        window_seconds=60.0,
+        min_samples=3,
+        max_error_rate=0.5,
+    )
+    options.update(kwargs)
+    return RoutingTable({"normalize": ["nano", "mini"]}, **options)
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+
+
+def test_call_sites_map_to_their_tier_and_report_the_model():
+    table = _table()
+    clients = {name: _FakeModel(name) for name in table.models}
+    router = LLMRouter(clients, table)
+
+    assert router.generate(_prompt()).model == "nano"
+    assert router.generate(_prompt("translate")).model == "gpt-default"
+    assert table.models == ["gpt-default", "nano", "mini"]
+    assert metrics.counter("llm.router.served.normalize.nano") == 1
+
+
+def test_primary_over_latency_slo_is_downshifted_until_samples_age_out():
+    table = _table(window_seconds=0.1)
+    for _ in range(3):
+        table.record("normalize", "nano", 250.0)
+
+    assert table.plan("normalize") == ["mini", "nano"]
+    assert metrics.counter("llm.router.downshifts") == 1
+
+    time.sleep(0.12)
+    assert table.plan("normalize") == ["nano", "mini"]
+
+
+def test_retryable_failures_fail_over_and_count_against_health():
+    table = _table()
+    clients = {
+        "gpt-default": _FakeModel("gpt-default"),
+        "nano": _FakeModel("nano", LLMClientError("overloaded", status_code=503, retryable=True)),
+        "mini": _FakeModel("mini"),
+    }
+    router = LLMRouter(clients, table)
+
+    for _ in range(3):
+        assert router.generate(_prompt()).model == "mini"
+    assert metrics.counter("llm.router.failovers") == 3
+    assert table.stats()["health"]["normalize:nano"]["error_rate"] == 1.0
+    # Now demoted, the failing primary is no longer tried first.
+    router.generate(_prompt())
+    assert clients["nano"].calls == 3
+
+
+def test_non_retryable_errors_do_not_fail_over():
+    table = _table()
+    clients = {name: _FakeModel(name) for name in table.models}
+    clients["nano"].error = LLMClientError("bad request", status_code=400)
+
+    with pytest.raises(LLMClientError):
+        LLMRouter(clients, table).generate(_prompt())
+    assert clients["mini"].calls == 0
+
+
+@pytest.mark.anyio
+async def test_async_router_fails_over():
+    table = _table()
+    clients = {name: _AsyncFakeModel(name) for name in table.models}
+    clients["nano"].error = LLMClientError("timeout", retryable=True)
+
+    result = await AsyncLLMRouter(clients, table).generate(_prompt())
+    assert result.model == "mini" and result.text == "from mini"
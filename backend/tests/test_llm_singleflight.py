@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import anyio
+import pytest
+
+from app.core import metrics
+from app.services.llm import accounting
+from app.services.llm.client import LLMClientError, LLMResult, PromptMessage, PromptRequest
+from app.services.llm.router import LLMRouter, RoutingTable
+from app.services.llm.singleflight import SingleFlightAsyncLLMClient, SingleFlightLLMClient
+
+
+def _prompt(text: str = "Feature (Korean): 충전") -> PromptRequest:
+    return PromptRequest(messages=[PromptMessage(role="user", content=text)], route="normalize")
+
+
+class _SlowLLM:
+    def __init__(self, delay: float = 0.2, error: Exception | None = None) -> None:
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _result(self, prompt: PromptRequest) -> LLMResult:
+        if self.error is not None:
+            raise self.error
+        usage = {"prompt_tokens": 1000, "completion_tokens": 10, "cached_tokens": 0}
+        return LLMResult(text="charging", latency_ms=0.0, raw={}, candidates=["charging"], usage=usage)
+
+    def generate(self, prompt: PromptRequest) -> LLMResult:
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        return self._result(prompt)
+
+
+class _AsyncSlowLLM(_SlowLLM):
+    async def generate(self, prompt: PromptRequest) -> LLMResult:  # type: ignore[override]
+        self.calls += 1
+        await anyio.sleep(self.delay)
+        return self._result(prompt)
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset()
+    accounting.reset()
+
+
+def _client(inner) -> SingleFlightLLMClient:
+    return SingleFlightLLMClient(inner, model="gpt-4o-mini", default_temperature=0.0)
+
+
+def test_concurrent_identical_calls_share_one_request():
+    inner = _SlowLLM()
+    client = _client(inner)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: client.generate(_prompt()), range(8)))
+
+    assert inner.calls == 1
+    assert {result.text for result in results} == {"charging"}
+    assert len({id(result) for result in results}) == 8
+    assert metrics.counter("llm.singleflight.waiters") == 7
+    assert metrics.counter("llm.singleflight.dollars_saved") > 0
+
+
+def test_shared_results_are_not_billed_or_sampled_per_waiter():
+    table = RoutingTable({}, default_model="gpt-4o-mini")
+    router = LLMRouter({"gpt-4o-mini": _client(_SlowLLM())}, table)
+
+    with ThreadPoolExecutor(max_workers=10) as pool:
+        results = list(pool.map(lambda _: router.generate(_prompt()), range(10)))
+
+    stats = accounting.usage_report()["by_route_model"]["normalize:gpt-4o-mini"]
+    assert [result.shared for result in results].count(False) == 1
+    assert (stats["calls"], stats["shared_calls"]) == (10, 9)
+    assert stats["prompt_tokens"]["count"] == 1
+    assert stats["prompt_tokens"]["sum"] == 1000
+    assert table.stats()["health"]["normalize:gpt-4o-mini"]["count"] == 1
+
+
+def test_different_prompts_and_sequential_calls_are_not_merged():
+    inner = _SlowLLM(delay=0.05)
+    client = _client(inner)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(client.generate, [_prompt("Feature (Korean): 충전"), _prompt("Feature (Korean): 청소")]))
+    client.generate(_prompt())
+
+    assert inner.calls == 3
+    assert metrics.counter("llm.singleflight.waiters") == 0
+
+
+def test_failure_is_shared_with_waiters():
+    inner = _SlowLLM(error=LLMClientError("upstream down", status_code=503, retryable=True))
+    client = _client(inner)
+
+    def call(_):
+        with pytest.raises(LLMClientError):
+            client.generate(_prompt())
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(call, range(4)))
+
+    assert inner.calls == 1
+
+
+@pytest.mark.anyio
+async def test_async_concurrent_identical_calls_share_one_request():
+    inner = _AsyncSlowLLM(delay=0.1)
+    client = SingleFlightAsyncLLMClient(inner, model="gpt-4o-mini", default_temperature=0.0)
+    results = []
+
+    async def call() -> None:
+        results.append(await client.generate(_prompt()))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(5):
+            tg.start_soon(call)
+
+    assert inner.calls == 1
+    assert [result.text for result in results] == ["charging"] * 5
+    assert metrics.counter("llm.singleflight.waiters") == 4
+
+
+@pytest.mark.anyio
+async def test_async_waiter_retries_when_leader_is_cancelled():
+    inner = _AsyncSlowLLM(delay=0.2)
+    client = SingleFlightAsyncLLMClient(inner, model="gpt-4o-mini", default_temperature=0.0)
+    results = []
+
+    async def waiter() -> None:
+        await anyio.sleep(0.05)
+        results.append(await client.generate(_prompt()))
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(waiter)
+        with anyio.move_on_after(0.1):
+            await client.generate(_prompt())
+
+    assert inner.calls == 2
+    assert [result.text for result in results] == ["charging"]
+    assert metrics.counter("llm.singleflight.waiters") == 0
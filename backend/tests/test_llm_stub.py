@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.core.settings import settings
+from app.services import llm as llm_registry
+from app.services.grammar.service import check_grammar_and_style
+from app.services.llm.client import LLMClientError, PromptMessage, PromptRequest
+from app.services.llm.stub import AsyncStubLLMClient, LatencyProfile, StubLLMClient
+from app.services.taxonomy.normalizer import _llm_normalize
+from app.services.translate.prompting import TranslationPromptParams, build_prompt
+
+
+def test_translate_prompts_get_one_candidate_per_n():
+    prompt = build_prompt(
+        TranslationPromptParams(text="로봇이 충전 중입니다", source_language="ko", target_language="en", num_candidates=3)
+    )
+    prompt.n = 3
+    result = StubLLMClient().generate(prompt)
+
+    assert result.candidates == ["[en] 로봇이 충전 중입니다", "[en #2] 로봇이 충전 중입니다", "[en #3] 로봇이 충전 중입니다"]
+    assert result.usage["prompt_tokens"] > 0
+    assert StubLLMClient().generate(prompt).candidates == result.candidates
+
+
+def test_grammar_and_normalization_prompts_are_shape_correct(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(llm_registry, "_CLIENT", StubLLMClient(), raising=False)
+
+    review = check_grammar_and_style("Returning to base.", "en")
+    assert review["has_issues"] is False and review["issues"] == []
+    assert _llm_normalize("충전 복귀", "robot_vacuum") == "charging_return"
+
+
+def test_latency_profiles_are_reproducible(tmp_path):
+    first = LatencyProfile("lognormal", median_ms=100.0, sigma=0.8, seed=7)
+    second = LatencyProfile("lognormal", median_ms=100.0, sigma=0.8, seed=7)
+    samples = [first.sample_ms() for _ in range(200)]
+    assert samples == [second.sample_ms() for _ in range(200)]
+    assert max(samples) > 200.0  # long right tail
+
+    recorded = tmp_path / "latencies.json"
+    recorded.write_text(json.dumps([12.5, 40.0, 900.0]))
+    replay = LatencyProfile.from_file(str(recorded), seed=1)
+    assert {replay.sample_ms() for _ in range(50)} <= {12.5, 40.0, 900.0}
+
+
+@pytest.mark.anyio
+async def test_simulated_failures_carry_retry_hints():
+    prompt = PromptRequest(messages=[PromptMessage(role="user", content="hello")])
+    with pytest.raises(LLMClientError) as excinfo:
+        await AsyncStubLLMClient(rate_limit_rate=1.0, retry_after_seconds=2.0).generate(prompt)
+    assert excinfo.value.status_code == 429 and excinfo.value.retry_after == 2.0
+
+    with pytest.raises(LLMClientError) as excinfo:
+        StubLLMClient(error_rate=1.0).generate(prompt)
+    assert excinfo.value.status_code == 500 and excinfo.value.retryable
+
+
+def test_stub_provider_builds_without_api_key(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(settings, "llm_provider", "stub")
+    monkeypatch.setattr(settings, "llm_api_key", None)
+    monkeypatch.setattr(settings, "llm_stub_latency_ms", 0.0)
+
+    client = llm_registry._build_client()
+    result = client.generate(PromptRequest(messages=[PromptMessage(role="user", content="Feature (Korean): 청소 시작")]))
+    assert result.text == "cleaning_start"
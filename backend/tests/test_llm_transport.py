@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import anyio
+import httpx
+import pytest
+
+from app.core import metrics
+from app.services.llm.client import AsyncOpenAIChatClient, PromptMessage, PromptRequest
+from app.services.llm.transport import InstrumentedAsyncTransport, InstrumentedTransport
+
+
+class _CompletionHandler(BaseHTTPRequestHandler):
+    """OpenAI-compatible chat completion endpoint that answers after 50 ms over keep-alive HTTP/1.1."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        time.sleep(0.05)
+        body = json.dumps(
+            {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": 0,
+                "model": payload["model"],
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": "Charging."}, "finish_reason": "stop"}
+                ],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 2, "total_tokens": 14},
+            }
+        ).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _CompletionHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.anyio
+async def test_openai_client_waits_for_pooled_connections(server_url):
+    metrics.reset()
+    limits = httpx.Limits(max_connections=2, max_keepalive_connections=2)
+    transport = InstrumentedAsyncTransport(httpx.AsyncHTTPTransport(limits=limits), max_connections=2)
+    async with httpx.AsyncClient(transport=transport) as http_client:
+        client = AsyncOpenAIChatClient(
+            model="gpt-test",
+            api_key="test-key",
+            base_url=server_url,
+            http_client=http_client,
+        )
+        prompt = PromptRequest(messages=[PromptMessage(role="user", content="충전 중")])
+        results = []
+
+        async def call() -> None:
+            results.append(await client.generate(prompt))
+
+        async with anyio.create_task_group() as group:
+            for _ in range(5):
+                group.start_soon(call)
+        open_connections = transport.stats()["open_connections"]
+
+    assert [result.text for result in results] == ["Charging."] * 5
+    stats = transport.stats()
+    assert stats["peak_in_flight"] == 5 and stats["in_flight"] == 0
+    assert stats["peak_queued"] >= 3 and stats["queued"] == 0
+    assert open_connections == 2
+    # Three requests found both connections busy and waited at least one response (50 ms).
+    assert metrics.counter("llm.http.pool_queued") == 3
+    assert metrics.percentile("llm.http.pool_wait_ms", 1.0) >= 40.0
+
+
+def test_request_stays_in_flight_until_its_body_is_closed(server_url):
+    metrics.reset()
+    transport = InstrumentedTransport(httpx.HTTPTransport(limits=httpx.Limits(max_connections=1)), max_connections=1)
+    payload = {"model": "gpt-test", "messages": [{"role": "user", "content": "충전 중"}]}
+    with httpx.Client(transport=transport) as client:
+        with client.stream("POST", f"{server_url}/chat/completions", json=payload) as response:
+            assert response.status_code == 200
+            assert transport.stats()["in_flight"] == 1
+            body = json.loads(response.read())
+        assert transport.stats()["in_flight"] == 0
+        client.post(f"{server_url}/chat/completions", json=payload)
+        stats = transport.stats()
+
+    assert body["choices"][0]["message"]["content"] == "Charging."
+    assert stats == {
+        "max_connections": 1,
+        "in_flight": 0,
+        "peak_in_flight": 1,
+        "queued": 0,
+        "peak_queued": 1,
+        "open_connections": 1,
+    }
+    assert metrics.counter("llm.http.pool_queued") == 0
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+from qdrant_client import QdrantClient
+
+from app.services.ingest.pipeline import CollectionLoad, run_vector_pipeline
+from app.services.rag import aliases
+from app.services.rag.aliases import (
+    ReindexVerificationError,
+    ensure_aliased_collections,
+    reindex_collection,
+    resolve_alias,
+)
+from app.services.rag.config import VectorCollectionConfig
+
+CFG = VectorCollectionConfig(name="style_guides", dimension=1024)
+
+
+def _items(count: int) -> list[tuple[str, dict]]:
+    return [(f"Returning to charging station {idx}.", {"sid": f"s-{idx}"}) for idx in range(count)]
+
+
+def _loader(client: QdrantClient, items):
+    def load(target: str) -> int:
+        summary = run_vector_pipeline(client, [CollectionLoad(target, items)])
+        return summary["collections"][target]
+
+    return load
+
+
+def test_ensure_creates_versioned_collection_behind_alias() -> None:
+    client = QdrantClient(":memory:")
+
+    resolved = ensure_aliased_collections(client, [CFG])
+
+    assert resolved == {"style_guides": "style_guides_v1"}
+    assert resolve_alias(client, "style_guides") == "style_guides_v1"
+    # Idempotent on re-run
+    assert ensure_aliased_collections(client, [CFG]) == resolved
+
+
+def test_reindex_switches_alias_and_collects_old_version() -> None:
+    client = QdrantClient(":memory:")
+    ensure_aliased_collections(client, [CFG])
+    run_vector_pipeline(client, [CollectionLoad("style_guides", _items(3))])
+
+    items = _items(10)
+    result = reindex_collection(client, CFG, items, _loader(client, items))
+
+    assert result["collection"] == "style_guides_v2"
+    assert result["previous"] == "style_guides_v1"
+    assert result["removed"] == ["style_guides_v1"]
+    assert result["recall"] == 1.0
+    assert resolve_alias(client, "style_guides") == "style_guides_v2"
+    assert client.count(collection_name="style_guides", exact=True).count == 10
+
+
+def test_failed_verification_keeps_serving_old_version() -> None:
+    client = QdrantClient(":memory:")
+    ensure_aliased_collections(client, [CFG])
+    run_vector_pipeline(client, [CollectionLoad("style_guides", _items(3))])
+
+    items = _items(10)
+    with pytest.raises(ReindexVerificationError):
+        reindex_collection(client, CFG, items, _loader(client, items[:5]))
+
+    assert resolve_alias(client, "style_guides") == "style_guides_v1"
+    assert {c.name for c in client.get_collections().collections} == {"style_guides_v1"}
+    assert client.count(collection_name="style_guides", exact=True).count == 3
+
+
+def test_legacy_collection_is_replaced_by_an_alias_with_retries(monkeypatch: pytest.MonkeyPatch) -> None:
+    client = QdrantClient(":memory:")
+    aliases._create_physical(client, CFG, "style_guides")
+    run_vector_pipeline(client, [CollectionLoad("style_guides", _items(3))])
+    update_aliases = client.update_collection_aliases
+    calls = []
+
+    def flaky_update(**kwargs):
+        calls.append(kwargs)
+        if len(calls) == 1:
+            raise ConnectionError("qdrant unavailable")
+        return update_aliases(**kwargs)
+
+    monkeypatch.setattr(client, "update_collection_aliases", flaky_update)
+    monkeypatch.setattr(aliases, "LEGACY_ALIAS_BACKOFF_SECONDS", 0.0)
+
+    items = _items(10)
+    result = reindex_collection(client, CFG, items, _loader(client, items))
+
+    assert result["collection"] == "style_guides_v1"
+    assert len(calls) == 2
+    assert resolve_alias(client, "style_guides") == "style_guides_v1"
+    assert {c.name for c in client.get_collections().collections} == {"style_guides_v1"}
+    assert client.count(collection_name="style_guides", exact=True).count == 10
+
+
+def test_ensure_restores_a_lost_alias_to_the_newest_version() -> None:
+    client = QdrantClient(":memory:")
+    # A reindex dropped the legacy collection but could not create the alias.
+    aliases._create_physical(client, CFG, "style_guides_v3")
+    run_vector_pipeline(client, [CollectionLoad("style_guides_v3", _items(4))])
+
+    assert ensure_aliased_collections(client, [CFG]) == {"style_guides": "style_guides_v3"}
+    assert client.count(collection_name="style_guides", exact=True).count == 4
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import threading
+
+from app.core import state
+from app.core.settings import settings
+from app.core.state import StateStore
+
+
+def _publish(store: StateStore, run_id: str, rows) -> None:
+    store.publish(context=rows, glossary=[], style=[], run_id=run_id, run_log={"counts": {"context": len(rows)}})
+
+
+def test_context_lookup_by_id_uses_index():
+    rows = [{"id": f"ctx-{i}", "en_line": f"line {i}"} for i in range(1000)]
+    _publish(state.STORE, "run-a", rows)
+
+    assert len(state.CONTEXT) == 1000
+    assert state.CONTEXT.get("ctx-42")["en_line"] == "line 42"
+    assert state.CONTEXT.get("missing") is None
+    # Corpus order is preserved regardless of the requested order.
+    assert [row["id"] for row in state.CONTEXT.select(["ctx-7", "ctx-3", "nope"])] == ["ctx-3", "ctx-7"]
+
+
+def test_run_logs_evict_least_recently_used(monkeypatch):
+    monkeypatch.setattr(settings, "state_run_log_limit", 2)
+    state.RUN_LOGS["run-1"] = {"counts": 1}
+    state.RUN_LOGS["run-2"] = {"counts": 2}
+    assert state.RUN_LOGS["run-1"]["counts"] == 1  # touch run-1 so run-2 is the eviction candidate
+    state.RUN_LOGS["run-3"] = {"counts": 3}
+
+    assert list(state.RUN_LOGS) == ["run-1", "run-3"]
+    assert state.RUN_LOGS.latest() == {"counts": 3}
+
+
+def test_published_snapshot_is_visible_to_other_workers():
+    other_worker = StateStore()
+    _publish(state.STORE, "run-b", [{"id": "ctx-1", "en_line": "Hello"}])
+
+    assert other_worker.context.get("ctx-1") == {"id": "ctx-1", "en_line": "Hello"}
+    assert "run-b" in other_worker.run_logs
+
+    _publish(other_worker, "run-c", [{"id": "ctx-2", "en_line": "Bye"}])
+    assert state.CONTEXT.get("ctx-1") is None
+    assert [row["id"] for row in state.CONTEXT] == ["ctx-2"]
+    assert state.RUN_LOGS.latest() == {"counts": {"context": 1}}
+
+
+def test_readers_see_whole_snapshots_while_another_worker_publishes():
+    publisher = StateStore()
+    runs = {
+        "run-big": [{"id": f"ctx-{i}", "run": "run-big"} for i in range(500)],
+        "run-small": [{"id": f"ctx-{i}", "run": "run-small"} for i in range(5)],
+    }
+    errors: list = []
+    stop = threading.Event()
+
+    def read() -> None:
+        while not stop.is_set():
+            try:
+                rows = list(state.CONTEXT)
+                assert len({row["run"] for row in rows}) <= 1
+                assert len(rows) in (0, 5, 500)
+                state.CONTEXT.get("ctx-3")
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+                return
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    for round_ in range(20):
+        run_id = "run-big" if round_ % 2 else "run-small"
+        _publish(publisher, f"{run_id}-{round_}", runs[run_id])
+    stop.set()
+    for reader in readers:
+        reader.join()
+
+    assert errors == []
+    assert state.STORE.snapshot().signature == publisher.snapshot().signature
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.llm import tokens
+from app.services.llm.client import completion_usage
+from app.services.llm.tokens import count_tokens
+from app.services.translate.prompting import (
+    OUTPUT_MARGIN_TOKENS,
+    STATIC_INSTRUCTIONS,
+    TranslationPromptParams,
+    build_prompt_with_report,
+    derive_max_output_tokens,
+)
+
+
+def _params(**kwargs) -> TranslationPromptParams:
+    glossary = {f"용어{i}": f"term {i}" for i in range(40)}
+    glossary["충전"] = "charging"
+    examples = [{"text": f"Retrieved example number {i} about docking.", "user_utterance": "", "response_case": ""} for i in range(20)]
+    examples.append({"text": "Returning to the dock.", "user_utterance": "돌아가", "response_case": "return"})
+    defaults = dict(
+        text="로봇이 충전 중입니다",
+        source_language="ko",
+        target_language="en",
+        glossary_hints=glossary,
+        retrieval_examples_with_context=examples,
+    )
+    defaults.update(kwargs)
+    return TranslationPromptParams(**defaults)
+
+
+def _prompt_text(prompt) -> str:
+    return "\n".join(message.content for message in prompt.messages)
+
+
+def test_without_budget_everything_is_included():
+    prompt, report = build_prompt_with_report(_params())
+
+    system = _prompt_text(prompt)
+    assert "Example 21:" in system
+    assert "용어39 -> term 39" in system
+    assert report.trimmed_examples == 0 and report.trimmed_glossary == 0
+
+
+def test_budget_trims_low_ranked_examples_and_glossary():
+    budget = count_tokens(STATIC_INSTRUCTIONS) + 250
+    prompt, report = build_prompt_with_report(_params(input_token_budget=budget))
+
+    system = _prompt_text(prompt)
+    assert report.input_tokens <= budget
+    assert report.trimmed_examples > 0 and report.trimmed_glossary > 0
+    # Glossary terms found in the source and explicit context examples survive first.
+    assert "충전 -> charging" in system
+    assert 'User said: "돌아가"' in system
+    # The user turn is never trimmed.
+    assert "로봇이 충전 중입니다" in prompt.messages[1].content
+
+
+def test_output_cap_follows_length_max_and_source_length():
+    assert derive_max_output_tokens("Hi", None) == count_tokens("Hi") * 3 + OUTPUT_MARGIN_TOKENS
+    assert derive_max_output_tokens("로봇이 충전 중입니다" * 10, 20) == 20 + OUTPUT_MARGIN_TOKENS
+
+    prompt, report = build_prompt_with_report(_params(length_max=12))
+    assert prompt.max_output_tokens == report.max_output_tokens == 12 + OUTPUT_MARGIN_TOKENS
+
+    prompt, _ = build_prompt_with_report(_params(length_max=12, max_output_tokens=200))
+    assert prompt.max_output_tokens == 200
+
+
+def test_prompt_prefix_is_stable_across_requests():
+    first, _ = build_prompt_with_report(_params(text="청소 시작", tone="playful", num_candidates=3))
+    second, _ = build_prompt_with_report(
+        _params(text="충전 완료", retrieval_examples_with_context=[{"text": "Charging complete."}])
+    )
+
+    # Same glossary and style scope: the whole system message is shared; only the user turn differs.
+    assert first.messages[0].content.startswith(STATIC_INSTRUCTIONS)
+    assert first.messages[0].content == second.messages[0].content
+    assert "playful" in first.messages[1].content and "playful" not in first.messages[0].content
+    assert "Charging complete." in second.messages[1].content
+
+
+def test_completion_usage_reports_cached_prompt_tokens():
+    usage = SimpleNamespace(
+        prompt_tokens=1500,
+        completion_tokens=20,
+        prompt_tokens_details=SimpleNamespace(cached_tokens=1280),
+    )
+    assert completion_usage(usage) == {"prompt_tokens": 1500, "completion_tokens": 20, "cached_tokens": 1280}
+    assert completion_usage(SimpleNamespace(prompt_tokens=10, completion_tokens=2))["cached_tokens"] == 0
+    assert completion_usage(None) is None
+
+
+def test_count_tokens_estimates_when_the_encoding_cannot_be_loaded(monkeypatch: pytest.MonkeyPatch, caplog):
+    class _OfflineTiktoken:
+        calls = 0
+
+        def get_encoding(self, name):
+            self.calls += 1
+            raise OSError("network is unreachable")
+
+        encoding_for_model = get_encoding
+
+    offline = _OfflineTiktoken()
+    monkeypatch.setattr(tokens, "tiktoken", offline)
+    monkeypatch.setattr(tokens, "_load_failed", False)
+    tokens._encoding.cache_clear()
+    try:
+        with caplog.at_level(logging.WARNING, logger=tokens.__name__):
+            assert count_tokens("charging") == 2
+            assert count_tokens("충전 중", model="gpt-4o-mini") == 4
+    finally:
+        tokens._encoding.cache_clear()
+
+    # The download is attempted and logged once, not on every prompt.
+    assert offline.calls == 1
+    assert len(caplog.records) == 1
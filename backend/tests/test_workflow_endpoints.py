@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
@@ -209,3 +211,37 @@ async def test_comment_creation_and_resolution(seed_users):
     assert resolve_resp.status_code == 200
     assert resolve_resp.json()["status"] == "resolved"
 
+
+@pytest.mark.anyio
+async def test_draft_stream_persists_candidates(seed_users):
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        request_payload = {
+            "title": "Robot vacuum returns",
+            "feature_name": "charging",
+            "assigned_writer_id": "writer-1",
+        }
+        create_resp = await client.post("/v1/requests", json=request_payload, headers=HEADERS_DESIGNER)
+        request_id = create_resp.json()["id"]
+
+        draft_payload = {
+            "request_id": request_id,
+            "text": "로봇이 충전 거점으로 돌아갑니다.",
+            "source_language": "ko",
+            "target_language": "en",
+            "num_candidates": 1,
+            "use_rag": False,
+        }
+        resp = await client.post("/v1/drafts/stream", json=draft_payload, headers=HEADERS_WRITER)
+
+    assert resp.status_code == 200
+    events = [block.split("\n", 1) for block in resp.text.strip().split("\n\n")]
+    names = [head.removeprefix("event: ") for head, _ in events]
+    assert names == ["token", "candidate", "done", "draft"]
+    draft = json.loads(events[-1][1].removeprefix("data: "))
+    assert draft["request_id"] == request_id
+    assert [version["content"] for version in draft["versions"]] == ["Returning to charging station."]
+
+    with session_scope() as session:
+        assert session.scalar(select(models.Draft).where(models.Draft.request_id == request_id)) is not None
+